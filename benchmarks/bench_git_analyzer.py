@@ -0,0 +1,112 @@
+"""Benchmark GitRepositoryAnalyzerTool against a large synthetic repository.
+
+The repository is generated with `git fast-import`: the first commit adds
+--files files spread over directories of 1,000 entries (a mix of Python
+modules, API route files, specs and config files), and every further commit
+modifies one file, up to --commits commits in total.
+
+Usage:
+    python benchmarks/bench_git_analyzer.py [--commits 100000] [--files 200000] [--keep DIR]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import git
+from tools.git_analyzer import GitRepositoryAnalyzerTool, classify_file
+
+# Cycle of file names so every classifier branch is exercised
+FILE_KINDS = ["module_{}.py", "service_{}.py", "routes_{}.py", "schema_{}.json", "settings_{}.ini", "notes_{}.md"]
+
+
+def file_path(index):
+    return f"pkg{index // 1000:04d}/" + FILE_KINDS[index % len(FILE_KINDS)].format(index)
+
+
+def fast_import_stream(commits, files):
+    """Yield a git fast-import stream for the synthetic history."""
+    yield b"blob\nmark :1\ndata 12\nprint('v1')\n\n"
+    yield b"blob\nmark :2\ndata 12\nprint('v2')\n\n"
+    timestamp = 1_600_000_000
+    for number in range(commits):
+        message = f"Commit {number}\n".encode()
+        header = (
+            f"commit refs/heads/main\n"
+            f"committer Bench <bench@example.com> {timestamp + number} +0000\n"
+            f"data {len(message)}\n"
+        ).encode() + message
+        if number == 0:
+            lines = [f"M 100644 :1 {file_path(i)}\n" for i in range(files)]
+            yield header + "".join(lines).encode() + b"\n"
+        else:
+            mark = 2 if number % 2 else 1
+            yield header + f"M 100644 :{mark} {file_path(number % files)}\n\n".encode()
+
+
+def build_repository(path, commits, files):
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    importer = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    for chunk in fast_import_stream(commits, files):
+        importer.stdin.write(chunk)
+    importer.stdin.close()
+    if importer.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+
+
+def legacy_analysis(repo_path):
+    """The previous implementation: two tree traversals and two full commit lists."""
+    repo = git.Repo(repo_path)
+    commit_count = len(list(repo.iter_commits()))
+    file_count = len([item for item in repo.tree().traverse() if item.type == 'blob'])
+    categories = {}
+    for item in repo.tree().traverse():
+        if item.type == 'blob':
+            category = classify_file(item.name)
+            categories.setdefault(category, []).append(item.path)
+    recent = [commit.hexsha for commit in list(repo.iter_commits())[:5]]
+    return commit_count, file_count, len(recent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--keep", help="Build (or reuse) the synthetic repository in this directory")
+    parser.add_argument("--skip-baseline", action="store_true", help="Do not time the previous implementation")
+    args = parser.parse_args()
+
+    repo_path = args.keep or tempfile.mkdtemp(prefix="bench_git_")
+    try:
+        if not os.path.exists(os.path.join(repo_path, ".git")):
+            started = time.perf_counter()
+            build_repository(repo_path, args.commits, args.files)
+            print(f"Built synthetic repository in {time.perf_counter() - started:.1f}s: {repo_path}")
+
+        tool = GitRepositoryAnalyzerTool()
+        started = time.perf_counter()
+        report = json.loads(tool._run(repo_path=repo_path))
+        elapsed = time.perf_counter() - started
+        print(f"Single-pass analyzer: {elapsed:.2f}s "
+              f"({report['commit_count']:,} commits, {report['file_count']:,} files, "
+              f"{len(report['python_files']):,} python files)")
+
+        if not args.skip_baseline:
+            started = time.perf_counter()
+            commit_count, file_count, _ = legacy_analysis(repo_path)
+            elapsed = time.perf_counter() - started
+            print(f"Previous two-pass analyzer: {elapsed:.2f}s ({commit_count:,} commits, {file_count:,} files)")
+    finally:
+        if not args.keep:
+            shutil.rmtree(repo_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark TestGeneratorTool's open-loop load runner against a stand-in server.
+
+Starts an asyncio HTTP/1.1 server on a local port (in a background thread)
+that answers after --latency-ms, drives it with `LoadRunner` at each --rps
+for --duration seconds and reports the throughput reached, latency
+percentiles and how late the scheduler sent requests.  Then the server
+stalls for --stall-ms once in the middle of a run, and the runner's p99 is
+compared with a closed-loop runner (workers that each wait for their
+previous response), which sends nothing during the stall and so never
+records the requests that would have waited it out.
+
+Usage:
+    python benchmarks/bench_load_runner.py [--rps 100 500 1000] [--duration 3] [--latency-ms 20] [--stall-ms 500]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import aiohttp
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.load_runner import LoadRunner, LoadScenario
+
+
+class StandInServer:
+    """Local HTTP/1.1 server answering every request after a fixed latency, optionally stalling once."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.stall_until = 0.0
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def stall(self, seconds):
+        self.stall_until = time.monotonic() + seconds
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                await asyncio.sleep(max(self.latency, self.stall_until - time.monotonic()))
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def closed_loop(url, rps, duration, latency):
+    """Workers sized for `rps` at the server's latency, each sending its next request after the last answer."""
+    workers = max(1, round(rps * latency))
+    latencies = []
+    deadline = time.monotonic() + duration
+
+    async def worker(session):
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            async with session.get(url) as response:
+                await response.read()
+            latencies.append((time.monotonic() - started) * 1000)
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=workers)) as session:
+        await asyncio.gather(*(worker(session) for _ in range(workers)))
+    return float(np.percentile(latencies, 99)), len(latencies)
+
+
+async def with_stall(server, run, duration, stall):
+    async def stall_midway():
+        await asyncio.sleep(duration / 2)
+        server.stall(stall)
+    stalling = asyncio.ensure_future(stall_midway())
+    result = await run
+    await stalling
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--stall-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    server = StandInServer(latency)
+    base_url = f"http://127.0.0.1:{server.port}"
+    runner = LoadRunner()
+    print(f"stand-in server answering after {args.latency_ms:.0f}ms")
+
+    for rps in args.rps:
+        scenario = LoadScenario(f"{rps:g} rps", "performance", "GET", "/", rps, args.duration)
+        result = asyncio.run(runner.run(base_url, [scenario]))[0]
+        print(f"{rps:>6g} rps offered: {result['throughput_rps']:>7.1f} rps answered, "
+              f"p50 {result['latency_ms']['p50']}ms, p99 {result['latency_ms']['p99']}ms, "
+              f"max send lag {result['max_send_lag_ms']}ms, {result['errors']} errors")
+
+    rps = args.rps[0]
+    stall = args.stall_ms / 1000
+    scenario = LoadScenario("stall", "performance", "GET", "/", rps, args.duration)
+    open_result = asyncio.run(with_stall(server, runner.run(base_url, [scenario]), args.duration, stall))[0]
+    closed_p99, closed_requests = asyncio.run(with_stall(
+        server, closed_loop(base_url + "/", rps, args.duration, latency), args.duration, stall))
+    print(f"{args.stall_ms:.0f}ms stall at {rps:g} rps: open loop p99 {open_result['latency_ms']['p99']}ms "
+          f"over {open_result['completed']} requests, closed loop p99 {closed_p99:.1f}ms over {closed_requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark access log ingestion throughput of PerformanceMetricsTool.
+
+Generates a --size byte access log (default 5GB) in the chosen --format,
+optionally gzip-compressed, then streams it through AccessLogReader into the
+metrics engine and reports lines/sec and MB/sec along with peak memory.
+
+Usage:
+    python benchmarks/bench_log_ingestion.py [--size 5GB] [--format nginx|envoy|json] [--gzip] [--keep PATH]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.performance_metrics import PerformanceMetricsTool
+
+# Lines per distinct generated block; blocks are cycled to reach --size quickly
+BLOCK_LINES = 50000
+DISTINCT_BLOCKS = 16
+
+RESOURCES = ["users", "orders", "products", "payments", "inventory", "auth", "reports", "search"]
+STATUSES = [200] * 85 + [201] * 5 + [404] * 5 + [500] * 3 + [503] * 2
+
+
+def parse_size(text):
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.upper().rstrip("B")
+    return int(float(text[:-1]) * units[text[-1]]) if text[-1] in units else int(text)
+
+
+def format_line(log_format, moment, path, status, duration_ms):
+    if log_format == "nginx":
+        return (f'10.0.{random.randint(0, 255)}.{random.randint(1, 254)} - - '
+                f'[{moment.strftime("%d/%b/%Y:%H:%M:%S +0000")}] "GET {path}?page=1 HTTP/1.1" {status} '
+                f'{random.randint(100, 9000)} "-" "Mozilla/5.0 (X11; Linux x86_64)" {duration_ms / 1000:.3f}\n')
+    if log_format == "envoy":
+        return (f'[{moment.strftime("%Y-%m-%dT%H:%M:%S")}.{moment.microsecond // 1000:03d}Z] '
+                f'"GET {path} HTTP/1.1" {status} - 0 {random.randint(100, 9000)} {int(duration_ms)} '
+                f'{int(duration_ms * 0.9)} "-" "Mozilla/5.0" "{random.getrandbits(64):016x}" "api" "10.0.0.2:80"\n')
+    return json.dumps({"timestamp": moment.isoformat(), "method": "GET", "path": path, "status": status,
+                       "duration_ms": round(duration_ms, 1), "bytes": random.randint(100, 9000)}) + "\n"
+
+
+def generate_block(log_format, start, seconds_per_line):
+    lines = []
+    for number in range(BLOCK_LINES):
+        resource_name = random.choice(RESOURCES)
+        path = f"/api/v1/{resource_name}/{random.randint(1, 100000)}" if random.random() < 0.6 else f"/api/v1/{resource_name}"
+        duration_ms = random.lognormvariate(4, 0.8)
+        moment = start + timedelta(seconds=number * seconds_per_line)
+        lines.append(format_line(log_format, moment, path, random.choice(STATUSES), duration_ms))
+    return "".join(lines).encode()
+
+
+def generate_log(path, size, log_format, compress):
+    random.seed(0)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    blocks = [generate_block(log_format, start + timedelta(hours=index), 0.05) for index in range(DISTINCT_BLOCKS)]
+    opener = gzip.open(path, "wb", compresslevel=1) if compress else open(path, "wb")
+    written = 0
+    with opener as f:
+        while written < size:
+            block = blocks[(written // len(blocks[0])) % DISTINCT_BLOCKS]
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="5GB", help="uncompressed log size, e.g. 500MB or 5GB")
+    parser.add_argument("--format", default="nginx", choices=["nginx", "envoy", "json"])
+    parser.add_argument("--gzip", action="store_true", help="write and read a gzip-compressed log")
+    parser.add_argument("--keep", help="write the log to this path and keep it")
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(), "access.log" + (".gz" if args.gzip else ""))
+    size = parse_size(args.size)
+    if not os.path.exists(path):
+        print(f"Generating {size / (1 << 30):.2f} GiB {args.format} log at {path}...")
+        started = time.perf_counter()
+        generate_log(path, size, args.format, args.gzip)
+        print(f"generated in {time.perf_counter() - started:.1f}s ({os.path.getsize(path) / (1 << 20):,.0f} MiB on disk)")
+
+    try:
+        started = time.perf_counter()
+        result = json.loads(PerformanceMetricsTool(log_format=args.format)._run(log_path=path))
+        elapsed = time.perf_counter() - started
+        stats = result["ingestion"]
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"ingested {stats['lines']:,} lines ({stats['parsed_lines']:,} parsed) in {elapsed:.1f}s: "
+              f"{stats['lines'] / elapsed:,.0f} lines/s, {stats['bytes'] / elapsed / (1 << 20):,.0f} MiB/s, "
+              f"peak RSS {peak_mb:,.0f} MiB, {len(result['analysis'])} endpoints")
+    finally:
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
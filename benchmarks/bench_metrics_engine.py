@@ -0,0 +1,154 @@
+"""Benchmark the vectorized metrics analysis of PerformanceMetricsTool.
+
+Generates --points data points (default 10M: 30 days of per-second samples
+spread over --endpoints endpoints) directly as columnar arrays, then times
+building the frame's per-endpoint aggregate (averages, issue counts, latency
+sketches and histograms) and the analysis built from it.
+The legacy per-dict implementation is timed on --legacy-points points
+(materializing 10M dicts needs tens of GB) and extrapolated linearly.
+
+Usage:
+    python benchmarks/bench_metrics_engine.py [--points 10000000] [--endpoints 300] [--legacy-points 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from tools.metrics_engine import METRIC_COLUMNS, REPORTED_QUANTILES, MetricsAggregate, MetricsFrame
+from tools.performance_metrics import PerformanceMetricsTool
+
+
+def generate_frame(points, endpoints, seed=0):
+    """Random per-second samples in time order, as the sample generator would produce them."""
+    rng = np.random.default_rng(seed)
+    response_time = rng.uniform(50, 500, points)
+    spikes = rng.random(points) < 0.1
+    response_time[spikes] *= rng.uniform(2, 5, spikes.sum())
+    columns = {
+        "response_time_ms": response_time,
+        "requests_per_minute": rng.integers(10, 1000, points).astype(np.float64),
+        "error_rate": rng.uniform(0, 5, points),
+        "cpu_usage": rng.uniform(10, 90, points),
+        "memory_usage": rng.uniform(20, 80, points),
+    }
+    start = datetime(2024, 1, 1).timestamp()
+    return MetricsFrame(
+        [f"/api/service_{index}" for index in range(endpoints)],
+        rng.integers(0, endpoints, points),
+        start + np.arange(points, dtype=np.float64) * (30 * 86400 / points),
+        columns
+    )
+
+
+def frame_to_records(frame, points):
+    """Materialize the first `points` rows as the list of dicts the legacy code consumes."""
+    start = datetime.fromtimestamp(frame.timestamps[0])
+    columns = {name: frame.columns[name][:points].tolist() for name in METRIC_COLUMNS}
+    offsets = (frame.timestamps[:points] - frame.timestamps[0]).tolist()
+    return [
+        {
+            "timestamp": (start + timedelta(seconds=offset)).isoformat(),
+            "endpoint": frame.endpoints[code],
+            **{name: columns[name][row] for name in METRIC_COLUMNS},
+        }
+        for row, (code, offset) in enumerate(zip(frame.codes[:points].tolist(), offsets))
+    ]
+
+
+def legacy_analyze(metrics_data):
+    """The pre-vectorization implementation: group dicts, then eight Python passes per endpoint."""
+    tool = PerformanceMetricsTool()
+    endpoint_metrics = {}
+    for metric in metrics_data:
+        endpoint_metrics.setdefault(metric["endpoint"], []).append(metric)
+    analysis = {}
+    for endpoint, metrics in endpoint_metrics.items():
+        avg_response_time = sum(m["response_time_ms"] for m in metrics) / len(metrics)
+        avg_requests_per_minute = sum(m["requests_per_minute"] for m in metrics) / len(metrics)
+        avg_error_rate = sum(m["error_rate"] for m in metrics) / len(metrics)
+        avg_cpu_usage = sum(m["cpu_usage"] for m in metrics) / len(metrics)
+        avg_memory_usage = sum(m["memory_usage"] for m in metrics) / len(metrics)
+        slow_responses = [m for m in metrics if m["response_time_ms"] > 300]
+        high_errors = [m for m in metrics if m["error_rate"] > 2.0]
+        high_cpu = [m for m in metrics if m["cpu_usage"] > 80]
+        recent_metrics = metrics[-5:]
+        older_metrics = metrics[:-5] if len(metrics) > 5 else metrics[:len(metrics)//2]
+        if older_metrics:
+            recent_avg_response = sum(m["response_time_ms"] for m in recent_metrics) / len(recent_metrics)
+            older_avg_response = sum(m["response_time_ms"] for m in older_metrics) / len(older_metrics)
+            trend = "improving" if recent_avg_response < older_avg_response else "degrading"
+        else:
+            trend = "stable"
+        analysis[endpoint] = {
+            "average_response_time_ms": round(avg_response_time, 2),
+            "average_requests_per_minute": round(avg_requests_per_minute, 2),
+            "average_error_rate_percent": round(avg_error_rate, 2),
+            "average_cpu_usage_percent": round(avg_cpu_usage, 2),
+            "average_memory_usage_percent": round(avg_memory_usage, 2),
+            "performance_issues": {
+                "slow_responses_count": len(slow_responses),
+                "high_error_rate_count": len(high_errors),
+                "high_cpu_usage_count": len(high_cpu)
+            },
+            "trend": trend,
+            "recommendations": tool._generate_recommendations(avg_response_time, avg_error_rate, avg_cpu_usage)
+        }
+    return analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=10_000_000)
+    parser.add_argument("--endpoints", type=int, default=300)
+    parser.add_argument("--legacy-points", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.points:,} points over {args.endpoints} endpoints...")
+    frame = generate_frame(args.points, args.endpoints)
+    tool = PerformanceMetricsTool()
+
+    started = time.perf_counter()
+    aggregate = MetricsAggregate.from_frame(frame)
+    aggregated = time.perf_counter() - started
+    analysis = tool._analyze_aggregate(aggregate)
+    vectorized = time.perf_counter() - started
+    print(f"vectorized: {vectorized:.2f}s for {args.points:,} points "
+          f"(aggregate {aggregated:.2f}s), {args.points / vectorized:,.0f} points/s")
+
+    legacy_points = min(args.legacy_points, args.points)
+    records = frame_to_records(frame, legacy_points)
+    started = time.perf_counter()
+    legacy = legacy_analyze(records)
+    legacy_seconds = time.perf_counter() - started
+    extrapolated = legacy_seconds * args.points / legacy_points
+    print(f"legacy:     {legacy_seconds:.2f}s for {legacy_points:,} points, "
+          f"~{extrapolated:.1f}s extrapolated to {args.points:,} ({extrapolated / vectorized:.0f}x slower)")
+
+    # The trend now comes from the regression detector, so only the other fields are comparable
+    subset = tool._analyze_metrics(records)
+    assert {
+        endpoint: {key: value for key, value in result.items() if key in legacy[endpoint] and key != "trend"}
+        for endpoint, result in subset.items()
+    } == {
+        endpoint: {key: value for key, value in result.items() if key != "trend"}
+        for endpoint, result in legacy.items()
+    }, "vectorized analysis differs from the legacy implementation"
+    assert len(analysis) == args.endpoints
+
+    # Sketch quantiles against exact ones for the busiest endpoint
+    busiest = int(np.argmax(aggregate.counts))
+    exact = np.quantile(frame.columns["response_time_ms"][frame.codes == busiest],
+                        list(REPORTED_QUANTILES.values()), method="inverted_cdf")
+    estimated = aggregate.latency.quantiles(list(REPORTED_QUANTILES.values()))[busiest]
+    print("sketch relative error: " + ", ".join(
+        f"{key} {abs(estimate / value - 1):.3%}" for key, estimate, value in zip(REPORTED_QUANTILES, estimated, exact)
+    ))
+
+
+if __name__ == "__main__":
+    main()
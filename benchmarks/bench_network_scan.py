@@ -0,0 +1,107 @@
+"""Benchmark the NetworkScannerTool port sweep against local stand-in listeners.
+
+Every address in 127.0.0.0/8 is routed to the loopback interface on Linux, so
+a range of stand-in hosts can be simulated by binding listeners on 127.0.0.x:
+
+* "open" hosts accept a connection on the first scanned port;
+* "filtered" hosts have every scanned port bound with a full accept backlog,
+  so the kernel drops further SYNs and each probe runs into the connect
+  timeout, like a firewalled host on a real network;
+* all remaining hosts refuse connections immediately.
+
+Usage:
+    python benchmarks/bench_network_scan.py [--prefix 24] [--open-hosts 32] [--filtered-hosts 16]
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.network_scanner import NetworkScannerTool
+from utils.helpers import run_coroutine
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def bind_listener(host, port, backlog):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def start_stand_ins(hosts, ports, open_hosts, filtered_hosts):
+    """Bind open and filtered stand-in listeners; returns every socket to close afterwards."""
+    sockets = []
+    for host in hosts[:open_hosts]:
+        sockets.append(bind_listener(host, ports[0], 1024))
+    for host in hosts[open_hosts:open_hosts + filtered_hosts]:
+        for port in ports:
+            sockets.append(bind_listener(host, port, 0))
+            # Occupy the single backlog slot so later SYNs are dropped
+            filler = socket.create_connection((host, port))
+            sockets.append(filler)
+    return sockets
+
+
+def sequential_sweep(hosts, ports, timeout):
+    """The previous implementation: one blocking connect_ex per host x port."""
+    open_ports = []
+    for host in hosts:
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            if sock.connect_ex((host, port)) == 0:
+                open_ports.append((host, port))
+            sock.close()
+    return open_ports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prefix", type=int, default=24, help="CIDR prefix length of the 127.0.0.0 range to sweep")
+    parser.add_argument("--open-hosts", type=int, default=32, help="Stand-in hosts with an open port")
+    parser.add_argument("--filtered-hosts", type=int, default=16, help="Stand-in hosts whose ports all time out")
+    parser.add_argument("--ports", type=int, default=8, help="Ports checked per host")
+    parser.add_argument("--timeout", type=float, default=0.25, help="Connect timeout in seconds")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--skip-baseline", action="store_true", help="Do not time the sequential sweep")
+    args = parser.parse_args()
+
+    ports = [free_port() for _ in range(args.ports)]
+    tool = NetworkScannerTool(common_ports=ports, connect_timeout=args.timeout)
+    network_range = f"127.0.0.0/{args.prefix}"
+    hosts = tool._expand_network_range(network_range)
+    stand_ins = start_stand_ins(hosts, ports, args.open_hosts, args.filtered_hosts)
+
+    try:
+        print(f"Sweeping {len(hosts)} hosts x {len(ports)} ports "
+              f"({args.open_hosts} open, {args.filtered_hosts} filtered, timeout {args.timeout}s)")
+        for round_number in range(1, args.rounds + 1):
+            started = time.perf_counter()
+            found = run_coroutine(tool._sweep(hosts, ports))
+            elapsed = time.perf_counter() - started
+            assert len(found) == args.open_hosts, f"expected {args.open_hosts} open ports, found {len(found)}"
+            print(f"  asyncio sweep round {round_number}: {elapsed:.3f}s, {len(hosts) / elapsed:,.0f} hosts/sec")
+
+        if not args.skip_baseline:
+            started = time.perf_counter()
+            found = sequential_sweep(hosts, ports, args.timeout)
+            elapsed = time.perf_counter() - started
+            assert len(found) == args.open_hosts
+            print(f"  sequential connect_ex sweep: {elapsed:.3f}s, {len(hosts) / elapsed:,.0f} hosts/sec")
+    finally:
+        for sock in stand_ins:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
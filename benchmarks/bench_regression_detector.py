@@ -0,0 +1,95 @@
+"""Benchmark the streaming regression detector of PerformanceMetricsTool.
+
+Streams a day of per-request samples for --endpoints endpoints (--requests
+per endpoint per minute) through a RegressionDetector in --frames batches.
+Halfway through, every fourth endpoint's latency rises by --latency-shift
+and every fourth endpoint (offset by one) moves from a 1% to a --error-rate
+error rate.  Reports throughput, detector state per endpoint, how many of
+the injected regressions were found and how quickly, and false alarms.
+
+Usage:
+    python benchmarks/bench_regression_detector.py [--endpoints 2000] [--requests 20]
+                                                   [--latency-shift 1.3] [--error-rate 0.06] [--frames 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from tools.metrics_engine import MetricsFrame
+from tools.regression_detector import RegressionDetector
+
+MINUTES = 24 * 60
+
+
+def generate_minutes(first, last, endpoints, requests, latency_shift, error_rate, rng, start):
+    """Per-request samples for minutes [first, last), in time order."""
+    minutes = last - first
+    points = minutes * endpoints * requests
+    codes = np.tile(np.repeat(np.arange(endpoints), requests), minutes)
+    timestamps = start + np.repeat(np.arange(first, last) * 60.0, endpoints * requests) + rng.uniform(0, 60, points)
+    shifted = timestamps >= start + MINUTES // 2 * 60
+    base = 100.0 + codes
+    response_times = rng.lognormal(np.log(base * np.where(shifted & (codes % 4 == 0), latency_shift, 1.0)), 0.3)
+    error_probability = np.where(shifted & (codes % 4 == 1), error_rate, 0.01)
+    errors = np.where(rng.random(points) < error_probability, 100.0, 0.0)
+    order = np.argsort(timestamps, kind="stable")
+    return codes[order], timestamps[order], response_times[order], errors[order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint per minute")
+    parser.add_argument("--latency-shift", type=float, default=1.3)
+    parser.add_argument("--error-rate", type=float, default=0.06)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    start = float(1700000000 // 60 * 60)
+    names = [f"/api/service_{index}" for index in range(args.endpoints)]
+    rng = np.random.default_rng(0)
+    detector = RegressionDetector()
+
+    events = []
+    points = 0
+    elapsed = 0.0
+    bounds = np.linspace(0, MINUTES, args.frames + 1).astype(int)
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        codes, timestamps, response_times, errors = generate_minutes(
+            first, last, args.endpoints, args.requests, args.latency_shift, args.error_rate, rng, start
+        )
+        frame = MetricsFrame(names, codes, timestamps, {"response_time_ms": response_times, "error_rate": errors})
+        started = time.perf_counter()
+        events.extend(detector.update(frame))
+        elapsed += time.perf_counter() - started
+        points += len(frame)
+    events.extend(detector.flush())
+
+    state_bytes = sum(value.nbytes for value in vars(detector).values() if isinstance(value, np.ndarray))
+    print(f"{points:,} points over {args.endpoints:,} endpoints in {elapsed:.1f}s "
+          f"({points / elapsed:,.0f} points/s), {state_bytes / args.endpoints:.0f} bytes of state per endpoint")
+
+    change = start + MINUTES // 2 * 60
+    injected = {"response_time_ms": 0, "error_rate": 1}
+    for metric, offset in injected.items():
+        expected = {name for index, name in enumerate(names) if index % 4 == offset}
+        delays = {}
+        for event in events:
+            if (event["metric"] == metric and event["direction"] == "regression"
+                    and event["endpoint"] in expected and event["detected_at"] >= change):
+                delays.setdefault(event["endpoint"], (event["detected_at"] - change) / 60)
+        false_alarms = sum(
+            1 for event in events
+            if event["metric"] == metric and (event["endpoint"] not in expected or event["detected_at"] < change)
+        )
+        delay = f"median delay {np.median(list(delays.values())):.0f} min" if delays else "no detections"
+        print(f"{metric}: found {len(delays)}/{len(expected)} regressions, {delay}, "
+              f"{false_alarms} false alarms in {args.endpoints * MINUTES:,} endpoint-minutes")
+
+
+if __name__ == "__main__":
+    main()
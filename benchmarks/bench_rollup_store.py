@@ -0,0 +1,125 @@
+"""Benchmark range queries against the minute/hour/day rollup store.
+
+Streams --days days of samples (--points-per-second across --endpoints
+endpoints) into a RollupStore one hour at a time, applies the default
+retention and compacts what is left.  Then it times "last N" queries answered from the
+rollups against re-aggregating the raw points of the same range.  Raw points
+are only kept for the last --raw-days days (90 days of raw columns do not fit
+in memory); longer raw timings are extrapolated from the measured points/s.
+Request counts of the rollup and raw answers are checked to be identical.
+
+Usage:
+    python benchmarks/bench_rollup_store.py [--days 90] [--endpoints 100] [--points-per-second 20]
+                                            [--raw-days 7] [--keep DIR]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from tools.metrics_engine import METRIC_COLUMNS, MetricsAggregate, MetricsFrame
+from tools.rollup_store import RollupStore
+
+QUERY_HOURS = [1, 24, 24 * 7, 24 * 30, 24 * 90]
+
+
+def generate_hour(hour_start, endpoints, points_per_second, rng):
+    points = int(3600 * points_per_second)
+    timestamps = hour_start + np.arange(points) / points_per_second
+    columns = {name: rng.uniform(10, 90, points) for name in METRIC_COLUMNS}
+    columns["response_time_ms"] = rng.lognormal(4.5, 0.7, points)
+    return rng.integers(0, endpoints, points), timestamps, columns
+
+
+def best_of(repeats, function):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--endpoints", type=int, default=100)
+    parser.add_argument("--points-per-second", type=float, default=20.0)
+    parser.add_argument("--raw-days", type=int, default=7)
+    parser.add_argument("--keep", help="build the store in this directory and keep it")
+    args = parser.parse_args()
+
+    # Hour-aligned, so every "last N hours" range is made of whole rollup buckets
+    end = float(int(time.time()) // 3600 * 3600)
+    names = [f"/api/service_{index}" for index in range(args.endpoints)]
+    rng = np.random.default_rng(0)
+
+    root = args.keep or tempfile.mkdtemp()
+    try:
+        store = RollupStore(root)
+        raw_parts = []
+        total_points = 0
+        appending = 0.0
+        for hour in range(args.days * 24):
+            hour_start = end - (args.days * 24 - hour) * 3600
+            codes, timestamps, columns = generate_hour(hour_start, args.endpoints, args.points_per_second, rng)
+            started = time.perf_counter()
+            store.append_frame(MetricsFrame(names, codes, timestamps, columns))
+            appending += time.perf_counter() - started
+            total_points += len(codes)
+            if hour_start >= end - args.raw_days * 86400:
+                raw_parts.append((codes, timestamps, columns))
+        started = time.perf_counter()
+        store.apply_retention(now=end)
+        store.compact_dirty()
+        compacting = time.perf_counter() - started
+        print(f"ingest: {total_points:,} points over {args.days} days and {args.endpoints} endpoints in "
+              f"{appending:.1f}s ({total_points / appending:,.0f} points/s), compaction {compacting:.1f}s; "
+              f"store size {directory_size(root) / (1 << 20):.1f} MiB vs "
+              f"{total_points * 8 * (len(METRIC_COLUMNS) + 2) / (1 << 20):,.0f} MiB of raw columns")
+
+        codes = np.concatenate([part[0] for part in raw_parts])
+        timestamps = np.concatenate([part[1] for part in raw_parts])
+        columns = {name: np.concatenate([part[2][name] for part in raw_parts]) for name in METRIC_COLUMNS}
+        raw_points_per_second = None
+
+        print(f"{'range':>8} {'rollup':>10} {'raw':>12} {'speedup':>8}  pieces")
+        for hours in QUERY_HOURS:
+            if hours > args.days * 24:
+                continue
+            start = end - hours * 3600
+            rollup_seconds, aggregate = best_of(5, lambda: store.query(start, end, now=end))
+            pieces = ", ".join(tier for tier, _, _ in store.plan(start, end, now=end))
+
+            if hours <= args.raw_days * 24:
+                def raw():
+                    selected = (timestamps >= start) & (timestamps < end)
+                    frame = MetricsFrame(names, codes[selected], timestamps[selected],
+                                         {name: values[selected] for name, values in columns.items()})
+                    return MetricsAggregate.from_frame(frame)
+                raw_seconds, reference = best_of(3, raw)
+                raw_points_per_second = int((timestamps >= start).sum()) / raw_seconds
+                counts = dict(zip(aggregate.endpoints, aggregate.counts.tolist()))
+                assert counts == dict(zip(reference.endpoints, reference.counts.tolist())), "rollup counts differ"
+                raw_label = f"{raw_seconds * 1000:>10.1f}ms"
+            else:
+                raw_seconds = hours * 3600 * args.points_per_second / raw_points_per_second
+                assert int(aggregate.counts.sum()) == int(hours * 3600 * args.points_per_second)
+                raw_label = f"~{raw_seconds * 1000:>9.0f}ms"
+            print(f"{hours:>7}h {rollup_seconds * 1000:>8.1f}ms {raw_label} {raw_seconds / rollup_seconds:>7.0f}x  {pieces}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark SDKGeneratorTool's batch mode across many APIs and languages.
+
+Writes --apis specs of --operations operations each (the spec of
+bench_sdk_generator.py) and generates the python, javascript, java,
+typescript and go SDKs of all of them into a temporary directory, with SDK
+caching disabled: first one API and one language at a time, as callers of
+the tool did before batch mode, then in batch mode with each --workers
+count.  Reports the wall time and when the first SDK reached the disk.
+
+Usage:
+    python benchmarks/bench_sdk_batch.py [--apis 40] [--operations 600] [--workers 1 2 4]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_sdk_generator import generate_spec
+from tools.sdk_batch import generate_sdk_batch, sdk_file_path
+from tools.sdk_generator import SDKGeneratorTool
+from tools.spec_diff import SPEC_INDEXES
+
+LANGUAGES = ["python", "javascript", "java", "typescript", "go"]
+
+
+def one_at_a_time(tool, specs, output_dir):
+    first = None
+    for api, path in specs.items():
+        for language in LANGUAGES:
+            sdks, _ = tool._generate_sdks(tool._spec_endpoints(path), [language])
+            target = sdk_file_path(output_dir, api, language)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(sdks[language]["code"])
+            first = first or time.perf_counter()
+    return first
+
+
+def batch(tool, specs, output_dir, workers):
+    apis = {api: tool._spec_endpoints(path) for api, path in specs.items()}
+    first = None
+    for entry in generate_sdk_batch(apis, LANGUAGES, output_dir, max_workers=workers):
+        assert "error" not in entry, entry
+        first = first or time.perf_counter()
+    return first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apis", type=int, default=40)
+    parser.add_argument("--operations", type=int, default=600)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    tool = SDKGeneratorTool(sdk_cache_dir=None)
+    with tempfile.TemporaryDirectory() as workdir:
+        specs = {}
+        for index in range(args.apis):
+            specs[f"api-{index}"] = os.path.join(workdir, f"api-{index}.json")
+            with open(specs[f"api-{index}"], "w") as f:
+                json.dump(generate_spec(args.operations), f)
+        print(f"{args.apis} APIs of {args.operations} operations, {len(LANGUAGES)} languages, "
+              f"{os.cpu_count()} CPUs")
+
+        def timed(label, run):
+            output_dir = tempfile.mkdtemp(dir=workdir)
+            SPEC_INDEXES.clear()
+            started = time.perf_counter()
+            first = run(output_dir)
+            elapsed = time.perf_counter() - started
+            written = sum(os.path.getsize(os.path.join(root, name))
+                          for root, _, names in os.walk(output_dir) for name in names)
+            print(f"{label:<20} {elapsed:6.2f}s, first SDK on disk after {first - started:5.2f}s, "
+                  f"{written / 1e6:.0f}MB written")
+
+        timed("one at a time", lambda output_dir: one_at_a_time(tool, specs, output_dir))
+        for workers in args.workers:
+            timed(f"batch, {workers} workers", lambda output_dir: batch(tool, specs, output_dir, workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Benchmark the Python client SDKGeneratorTool generates against a stand-in server.
+
+Generates the Python SDK for /api/users, loads it, and calls `list_users()`
+--requests times in a row against a local HTTP/1.1 server (asyncio, in a
+background thread) that answers with a --items record JSON list, gzipped
+when asked to.  The generated client, with its pooled session, is compared
+with one whose `_make_request` calls `requests.get/post/put/delete` per
+request, as generated clients did before.  Reports requests/second, the
+TCP connections the server accepted and the bytes of response bodies sent.
+Then every --fail-every'th request is answered 503 with `Retry-After: 0`,
+and the failures each client surfaces are counted.  Finally the server
+answers after --latency-ms, and the blocking client's sequential calls are
+compared with `AsyncEnterpriseAPIClient` gathering all of them at
+--concurrency requests in flight.
+
+Usage:
+    python benchmarks/bench_sdk_client.py [--requests 2000] [--items 50] [--fail-every 10] [--latency-ms 20] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+import types
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.sdk_templates import SDK_TEMPLATES, endpoint_model
+
+ACCEPTS_GZIP = re.compile(rb'^accept-encoding:[^\r\n]*gzip', re.IGNORECASE | re.MULTILINE)
+
+
+class StandInServer:
+    """Local HTTP/1.1 server answering every request with the same JSON list."""
+
+    def __init__(self, items):
+        body = json.dumps([{"id": index, "name": f"user {index}", "email": f"user{index}@example.com"}
+                           for index in range(items)]).encode()
+        self.bodies = {False: body, True: gzip.compress(body)}
+        self.fail_every = 0
+        self.latency = 0.0
+        self.reset()
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+    def reset(self):
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.fail_every and self.requests % self.fail_every == 0:
+                    writer.write(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 0\r\nContent-Length: 0\r\n\r\n")
+                else:
+                    gzipped = bool(ACCEPTS_GZIP.search(request))
+                    body = self.bodies[gzipped]
+                    self.bytes_sent += len(body)
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                 + (b"Content-Encoding: gzip\r\n" if gzipped else b"")
+                                 + b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_client_module():
+    code = SDK_TEMPLATES["python"].render(endpoint_model(["/api/users"]))["code"]
+    module = types.ModuleType("enterprise_api_client")
+    exec(compile(code, "enterprise_api_client.py", "exec"), module.__dict__)
+    return module
+
+
+def one_shot_client(module):
+    """The generated client with the per-call requests functions generated clients used to make."""
+
+    class OneShotClient(module.EnterpriseAPIClient):
+        def _make_request(self, method, endpoint, data=None, params=None):
+            url = f"{self.base_url}{endpoint}"
+            try:
+                if method.upper() == 'GET':
+                    response = requests.get(url, headers=self.headers, params=params)
+                elif method.upper() == 'POST':
+                    response = requests.post(url, headers=self.headers, json=data)
+                elif method.upper() == 'PUT':
+                    response = requests.put(url, headers=self.headers, json=data)
+                else:
+                    response = requests.delete(url, headers=self.headers)
+                response.raise_for_status()
+                return response.json() if response.content else {}
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"API request failed: {str(e)}")
+
+    return OneShotClient
+
+
+def drive(client, requests_count):
+    failures = 0
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        try:
+            client.list_users()
+        except Exception:
+            failures += 1
+    return time.perf_counter() - started, failures
+
+
+async def drive_async(client, requests_count):
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(client.list_users() for _ in range(requests_count)), return_exceptions=True)
+    await client.aclose()
+    return time.perf_counter() - started, sum(1 for outcome in outcomes if isinstance(outcome, Exception))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--fail-every", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    server = StandInServer(args.items)
+    base_url = f"http://127.0.0.1:{server.port}"
+    module = load_client_module()
+    clients = {
+        "per-call requests": one_shot_client(module)(base_url, "key"),
+        "pooled session": module.EnterpriseAPIClient(base_url, "key", backoff_factor=0),
+    }
+    print(f"{args.requests:,} sequential list_users() calls, {args.items} records per response "
+          f"({len(server.bodies[False]):,} bytes, {len(server.bodies[True]):,} gzipped)")
+    for label, client in clients.items():
+        server.reset()
+        elapsed, failures = drive(client, args.requests)
+        print(f"{label:<18} {args.requests / elapsed:8.0f} req/s, {server.connections:>5,} connections, "
+              f"{server.bytes_sent / args.requests:,.0f} body bytes/request, {failures} failures")
+
+    server.fail_every = args.fail_every
+    for label, client in clients.items():
+        server.reset()
+        elapsed, failures = drive(client, args.requests)
+        print(f"{label:<18} with every {args.fail_every}th request answered 503: {failures:,} failures "
+              f"in {args.requests:,} calls, {server.requests:,} requests sent")
+
+    server.fail_every = 0
+    server.latency = args.latency_ms / 1000
+    server.reset()
+    elapsed, failures = drive(clients["pooled session"], args.requests // 10)
+    print(f"server latency {args.latency_ms:.0f}ms: blocking client {args.requests // 10 / elapsed:8.0f} req/s "
+          f"one call at a time, {failures} failures")
+    server.reset()
+    client = module.AsyncEnterpriseAPIClient(base_url, "key", max_concurrency=args.concurrency)
+    elapsed, failures = asyncio.run(drive_async(client, args.requests))
+    print(f"server latency {args.latency_ms:.0f}ms: async client    {args.requests / elapsed:8.0f} req/s "
+          f"at {args.concurrency} in flight, {server.connections} connections, {failures} failures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark SDKGeneratorTool on a large OpenAPI spec.
+
+Writes a spec with --operations operations (--operations / 5 resources, each
+a collection path with GET/POST and an item path with GET/PUT/DELETE) to a
+temporary file and generates the python, javascript and java SDKs for it
+with a fresh SDK cache: cold, again unchanged (served from the cache),
+after editing operation descriptions (same paths, still cached) and after
+adding a resource, timing the read of the spec's paths separately.  Then renders the endpoint model with the compiled templates
+into a list joined once, against appending each piece to a string as the
+generator used to.
+
+Usage:
+    python benchmarks/bench_sdk_generator.py [--operations 3000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.sdk_generator import SDKGeneratorTool
+from tools.sdk_templates import SDK_TEMPLATES, endpoint_model
+from tools.spec_diff import SPEC_INDEXES
+
+LANGUAGES = ["python", "javascript", "java"]
+
+
+def generate_spec(operations):
+    paths = {}
+    for index in range(max(1, operations // 5)):
+        response = {"200": {"description": "OK", "content": {"application/json": {"schema": {"type": "object"}}}}}
+        paths[f"/api/resource{index}s"] = {
+            method: {"summary": f"{method} resource {index}", "responses": response} for method in ("get", "post")
+        }
+        paths[f"/api/resource{index}s/{{id}}"] = {
+            method: {"summary": f"{method} resource {index}", "responses": response,
+                     "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}]}
+            for method in ("get", "put", "delete")
+        }
+    return {"openapi": "3.0.3", "info": {"title": "Benchmark API", "version": "1.0.0"}, "paths": paths}
+
+
+def concatenated(template, model):
+    """Rendering by appending every piece to one string, as the generator did before templates."""
+    code = ""
+    for header, collection, item in template._sections:
+        code += header
+        for fields in model:
+            code += item(**fields) if fields["is_item"] else collection(**fields)
+    return code + template.footer
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    spec = generate_spec(args.operations)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "openapi.json")
+        tool = SDKGeneratorTool(sdk_cache_dir=os.path.join(workdir, "sdks"))
+        print(f"spec: {sum(len(item) for item in spec['paths'].values()):,} operations, "
+              f"{len(spec['paths']):,} paths, languages: {', '.join(LANGUAGES)}")
+
+        def write_and_generate(label):
+            with open(path, "w") as f:
+                json.dump(spec, f)
+            SPEC_INDEXES.clear()
+            started = time.perf_counter()
+            endpoints = tool._spec_endpoints(path)
+            loaded = time.perf_counter()
+            sdks, cached = tool._generate_sdks(endpoints, LANGUAGES)
+            finished = time.perf_counter()
+            size = sum(len(sdk["code"]) for sdk in sdks.values())
+            print(f"{label:<22} spec {(loaded - started) * 1000:6.1f}ms + SDKs {(finished - loaded) * 1000:6.1f}ms  "
+                  f"{size / 1e6:5.1f}MB of code, {len(cached)} of {len(LANGUAGES)} languages cached")
+
+        write_and_generate("cold")
+        write_and_generate("unchanged")
+        for item in spec["paths"].values():
+            for operation in item.values():
+                operation["summary"] += " (edited)"
+        write_and_generate("descriptions edited")
+        index = len(spec["paths"]) // 2
+        spec["paths"][f"/api/extra{index}s"] = {"get": {"responses": {"200": {"description": "OK"}}}}
+        write_and_generate("resource added")
+
+        model = endpoint_model(tool._spec_endpoints(path))
+        for language in LANGUAGES:
+            template = SDK_TEMPLATES[language]
+            joined, code = best_of(args.repeat, lambda: template.render(model)["code"])
+            appended, appended_code = best_of(args.repeat, lambda: concatenated(template, model))
+            assert code == appended_code
+            print(f"render {language:<11} list join {joined * 1000:6.1f}ms, string append {appended * 1000:6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
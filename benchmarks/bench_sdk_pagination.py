@@ -0,0 +1,141 @@
+"""Benchmark the paginating iterators of the Python client SDKGeneratorTool generates.
+
+Generates the Python SDK for /api/users, loads it, and reads a --records
+record collection through `iter_users()` from a local HTTP/1.1 server
+(asyncio, in a background thread) that serves `limit`/`offset` pages after
+--latency-ms each.  Each --page-size page is consumed for --work-ms.  Pages
+fetched on demand (prefetch 0) are compared with each --prefetch depth, for
+the blocking and the async client, and with reading the whole collection
+with one `list_users(limit=--records)` call.  Reports records/second and the
+peak memory traced while reading.
+
+Usage:
+    python benchmarks/bench_sdk_pagination.py [--records 50000] [--page-size 500] [--latency-ms 20] [--work-ms 10] [--prefetch 1 2 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.sdk_templates import SDK_TEMPLATES, endpoint_model
+
+QUERY = re.compile(rb'[?&](limit|offset)=(\d+)')
+
+
+class PagingServer:
+    """Local HTTP/1.1 server serving slices of one collection by limit and offset."""
+
+    def __init__(self, records, latency):
+        self.records = [{"id": index, "name": f"user {index}", "email": f"user{index}@example.com"}
+                        for index in range(records)]
+        self.latency = latency
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                query = {name.decode(): int(value) for name, value in QUERY.findall(request.split(b"\r\n", 1)[0])}
+                offset = query.get("offset", 0)
+                body = json.dumps(self.records[offset:offset + query.get("limit", 100)]).encode()
+                await asyncio.sleep(self.latency)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: "
+                             + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_client_module():
+    code = SDK_TEMPLATES["python"].render(endpoint_model(["/api/users"]))["code"]
+    module = types.ModuleType("enterprise_api_client")
+    exec(compile(code, "enterprise_api_client.py", "exec"), module.__dict__)
+    return module
+
+
+def traced(read):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = read()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def consume(records, page_size, work):
+    """Count records, spending `work` seconds on every `page_size` of them."""
+    count = 0
+    for _ in records:
+        count += 1
+        if count % page_size == 0:
+            time.sleep(work)
+    return count
+
+
+async def consume_async(records, page_size, work):
+    count = 0
+    async for _ in records:
+        count += 1
+        if count % page_size == 0:
+            await asyncio.sleep(work)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--work-ms", type=float, default=10)
+    parser.add_argument("--prefetch", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    server = PagingServer(args.records, args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.port}"
+    module = load_client_module()
+    work = args.work_ms / 1000
+    print(f"{args.records:,} records in pages of {args.page_size}, {args.latency_ms:.0f}ms per page served, "
+          f"{args.work_ms:.0f}ms per page consumed")
+
+    def report(label, count, elapsed, peak):
+        assert count == args.records, count
+        print(f"{label:<26} {count / elapsed:9,.0f} records/s, peak {peak / 1e6:6.1f}MB traced")
+
+    with module.EnterpriseAPIClient(base_url, "key") as client:
+        report("list_users(all records)", *traced(
+            lambda: consume(client.list_users(limit=args.records), args.page_size, work)))
+        for prefetch in [0] + args.prefetch:
+            report(f"iter_users, prefetch {prefetch}", *traced(
+                lambda: consume(client.iter_users(args.page_size, prefetch), args.page_size, work)))
+
+    async def read_async(prefetch):
+        async with module.AsyncEnterpriseAPIClient(base_url, "key") as client:
+            return await consume_async(client.iter_users(args.page_size, prefetch), args.page_size, work)
+
+    for prefetch in [0] + args.prefetch:
+        report(f"async iter_users, prefetch {prefetch}", *traced(lambda: asyncio.run(read_async(prefetch))))
+
+
+if __name__ == "__main__":
+    main()
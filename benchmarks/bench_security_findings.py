@@ -0,0 +1,111 @@
+"""Benchmark aggregating security findings into severity counts and a scorecard.
+
+Generates --findings findings in per-API batches over --apis APIs and the
+default rules' categories, then times the former SecurityScannerTool
+aggregation (four severity list comprehensions, then a loop grouping findings
+into lists by severity and category), extended the same way to the per-rule
+and per-API counts, endpoint risk and most severe findings a scorecard
+reports, against one pass of
+`FindingsAccumulator`, and against accumulating --shards shards separately
+and merging them.  The counts are checked to agree.
+
+Usage:
+    python benchmarks/bench_security_findings.py [--findings 500000] [--apis 50] [--shards 8]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.security_findings import SEVERITIES, SEVERITY_WEIGHTS, TOP_FINDINGS, FindingsAccumulator
+from tools.security_rules import RULES
+
+
+def generate_findings(count, apis, seed=0):
+    """[(api, findings of that API)], one batch per API as a scan produces them."""
+    rng = random.Random(seed)
+    batches = []
+    for number in range(apis):
+        api = f"api_{number}"
+        findings = []
+        for finding in range(count // apis):
+            rule = rng.choice(RULES)
+            findings.append(rule.finding(f"Finding {finding}", f"GET /{api}/resource_{rng.randrange(1000)}",
+                                         "paths./resource.get"))
+        batches.append((api, findings))
+    return batches
+
+
+def legacy_aggregation(batches):
+    vulnerabilities = [finding for _, findings in batches for finding in findings]
+    counts = {severity: len([f for f in vulnerabilities if f["severity"] == severity]) for severity in SEVERITIES}
+    by_severity = {}
+    by_category = {}
+    for vuln in vulnerabilities:
+        by_severity.setdefault(vuln["severity"], []).append(vuln)
+        by_category.setdefault(vuln.get("owasp_category") or vuln.get("compliance_framework", "Other"), []).append(vuln)
+    by_rule = {}
+    for vuln in vulnerabilities:
+        by_rule.setdefault(vuln["id"], []).append(vuln)
+    api_counts = {
+        api: {severity: len([f for f in findings if f["severity"] == severity]) for severity in SEVERITIES}
+        for api, findings in batches
+    }
+    api_categories = {}
+    endpoint_risk = {}
+    for api, findings in batches:
+        for vuln in findings:
+            api_categories.setdefault(api, {}).setdefault(vuln["owasp_category"], []).append(vuln)
+            endpoint_risk[(api, vuln["endpoint"])] = endpoint_risk.get((api, vuln["endpoint"]), 0) \
+                + SEVERITY_WEIGHTS[vuln["severity"]]
+    top_endpoints = sorted(endpoint_risk.items(), key=lambda item: -item[1])[:TOP_FINDINGS]
+    top = sorted(vulnerabilities, key=lambda f: -SEVERITY_WEIGHTS[f["severity"]])[:TOP_FINDINGS]
+    return counts, api_counts, by_severity, by_category, by_rule, api_categories, top_endpoints, top
+
+
+def accumulate(batches):
+    accumulator = FindingsAccumulator()
+    for api, findings in batches:
+        accumulator.extend(findings, api)
+    return accumulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, default=500000)
+    parser.add_argument("--apis", type=int, default=50)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    findings = generate_findings(args.findings, args.apis)
+    print(f"findings: {args.findings:,} over {args.apis} APIs")
+
+    started = time.perf_counter()
+    counts, api_counts, *_ = legacy_aggregation(findings)
+    legacy = time.perf_counter() - started
+    print(f"legacy passes:       {legacy:.2f}s")
+
+    started = time.perf_counter()
+    scorecard = accumulate(findings).scorecard()
+    single = time.perf_counter() - started
+    assert scorecard["by_severity"] == counts, "accumulated counts disagree with the legacy passes"
+    assert {api: summary["by_severity"] for api, summary in scorecard["apis"].items()} == api_counts
+    print(f"accumulator:         {single:.2f}s ({legacy / single:.1f}x), including the scorecard")
+
+    started = time.perf_counter()
+    shards = [accumulate([(api, batch[shard::args.shards]) for api, batch in findings])
+              for shard in range(args.shards)]
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged = merged.merge(shard)
+    sharded = merged.scorecard()
+    elapsed = time.perf_counter() - started
+    assert sharded["by_severity"] == counts and sharded["apis"] == scorecard["apis"], "merged shards disagree"
+    print(f"{args.shards} merged shards:    {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
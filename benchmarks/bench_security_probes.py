@@ -0,0 +1,95 @@
+"""Benchmark SecurityScannerTool's active probes against many stand-in services.
+
+Starts --services HTTP services on local ports (one asyncio server per port,
+in a background thread) that answer every request after --latency-ms, then
+probes all of them with `ActiveProber` and reports the wall time against the
+time the same requests take one after another, plus the peak number of
+requests in flight at any one service and overall, which the per-host and
+global limits must bound.
+
+Usage:
+    python benchmarks/bench_security_probes.py [--services 200] [--latency-ms 50] [--concurrency 64] [--per-host 2] [--rate 10]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.security_probes import ActiveProber
+
+
+class StandInServices:
+    """Local HTTP/1.1 services that count how many requests each has in flight."""
+
+    def __init__(self, count, latency):
+        self.count = count
+        self.latency = latency
+        self.in_flight = Counter()
+        self.peak_per_host = 0
+        self.peak_total = 0
+        self.ports = []
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        servers = [self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+                   for _ in range(self.count)]
+        self.ports = [server.sockets[0].getsockname()[1] for server in servers]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        port = writer.get_extra_info("sockname")[1]
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ", 2)[1]
+                self.in_flight[port] += 1
+                self.peak_per_host = max(self.peak_per_host, self.in_flight[port])
+                self.peak_total = max(self.peak_total, sum(self.in_flight.values()))
+                await asyncio.sleep(self.latency)
+                self.in_flight[port] -= 1
+                status = b"401 Unauthorized" if path.startswith(b"/api") else b"404 Not Found"
+                writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: 0\r\nServer: stand-in\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second per service")
+    args = parser.parse_args()
+
+    services = StandInServices(args.services, args.latency_ms / 1000)
+    base_urls = [f"http://127.0.0.1:{port}" for port in services.ports]
+    prober = ActiveProber(max_concurrency=args.concurrency, per_host_limit=args.per_host, per_host_rate=args.rate)
+
+    started = time.perf_counter()
+    results = asyncio.run(prober.probe(base_urls))
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for result in results for status in result["checks"].values() if status.startswith("error"))
+
+    serial = prober.requests_sent * args.latency_ms / 1000
+    print(f"{args.services} services, {prober.requests_sent:,} requests at {args.latency_ms:.0f}ms each")
+    print(f"probed in {elapsed:.2f}s; one after another: {serial:.1f}s ({serial / elapsed:.1f}x), {errors} check errors")
+    print(f"peak in flight: {services.peak_per_host} per service (limit {args.per_host}), "
+          f"{services.peak_total} overall (limit {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
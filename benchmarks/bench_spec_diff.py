@@ -0,0 +1,187 @@
+"""Benchmark diffing two large OpenAPI specs with ContractValidatorTool's spec-diff engine.
+
+Generates an OpenAPI 3 document with --operations operations (spread over
+paths with up to four methods each) sharing --schemas component schemas via
+`$ref`, and a next version with a known number of breaking edits: removed
+paths and operations, newly required parameters, a narrowed component schema
+used by many operations and removed response codes.  Times indexing plus
+diffing, and a nested-loop baseline that looks up every old operation by
+scanning the new ones and compares their fully `$ref`-inlined JSON (timed on
+--baseline-operations operations and extrapolated quadratically).
+
+Usage:
+    python benchmarks/bench_spec_diff.py [--operations 5000] [--schemas 500] [--baseline-operations 1000] [--keep DIR]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.spec_diff import HTTP_METHODS, SpecIndex, diff_specs, load_spec
+
+METHODS = ["get", "post", "put", "delete"]
+
+
+def generate_spec(operations, schemas, seed=0):
+    rng = random.Random(seed)
+    components = {}
+    for index in range(schemas):
+        properties = {
+            f"field_{field}": {"type": rng.choice(["string", "integer", "number", "boolean"]),
+                               "description": f"Field {field} of schema {index}"}
+            for field in range(8)
+        }
+        properties["status"] = {"type": "string", "enum": ["active", "pending", "closed"]}
+        if index:
+            properties["parent"] = {"$ref": f"#/components/schemas/Schema{rng.randrange(index)}"}
+        components[f"Schema{index}"] = {"type": "object", "required": ["field_0"], "properties": properties}
+
+    paths = {}
+    count = 0
+    resource = 0
+    while count < operations:
+        path = f"/api/v1/resource_{resource}/{{id}}"
+        item = {"parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}]}
+        for method in METHODS[:min(4, operations - count)]:
+            schema = {"$ref": f"#/components/schemas/Schema{rng.randrange(schemas)}"}
+            operation = {
+                "operationId": f"{method}_{resource}",
+                "summary": f"{method.upper()} resource {resource}",
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer", "maximum": 1000}},
+                    {"name": "fields", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {
+                    "200": {"description": "OK", "content": {"application/json": {"schema": schema}}},
+                    "400": {"description": "Bad request"},
+                    "404": {"description": "Not found"},
+                },
+            }
+            if method in ("post", "put"):
+                operation["requestBody"] = {"content": {"application/json": {"schema": schema}}}
+            item[method] = operation
+            count += 1
+        paths[path] = item
+        resource += 1
+    return {"openapi": "3.0.3", "info": {"title": "Synthetic API", "version": "1.0.0"},
+            "paths": paths, "components": {"schemas": components}}
+
+
+def next_version(spec, seed=1):
+    """Apply breaking edits to a copy; returns the new spec."""
+    rng = random.Random(seed)
+    new = copy.deepcopy(spec)
+    new["info"]["version"] = f"{seed + 1}.0.0"
+    paths = list(new["paths"])
+    for path in rng.sample(paths, 10):
+        del new["paths"][path]
+    remaining = [path for path in paths if path in new["paths"]]
+    for path in rng.sample(remaining, 20):
+        new["paths"][path].pop("delete", None)
+    for path in rng.sample(remaining, 30):
+        operation = new["paths"][path]["get"]
+        operation["parameters"].append({"name": "tenant", "in": "header", "required": True, "schema": {"type": "string"}})
+        operation["responses"].pop("404", None)
+    for path in rng.sample(remaining, 200):
+        new["paths"][path]["get"]["summary"] = "Documentation-only edit"
+    # Narrow a request field of one widely used schema
+    target = new["components"]["schemas"][f"Schema{seed}"]
+    target["properties"]["status"]["enum"] = ["active", "pending"]
+    target["required"].append("field_1")
+    return new
+
+
+def inline(node, spec, depth=0):
+    """Fully inline `$ref`s (cut at a fixed depth), as a schema-unaware comparison would."""
+    if isinstance(node, dict):
+        if "$ref" in node:
+            if depth > 3:
+                return {"$ref": node["$ref"]}
+            target = spec
+            for token in node["$ref"][2:].split("/"):
+                target = target[token]
+            return inline(target, spec, depth + 1)
+        return {key: inline(value, spec, depth) for key, value in node.items()}
+    if isinstance(node, list):
+        return [inline(item, spec, depth) for item in node]
+    return node
+
+
+def nested_loop_diff(old, new, limit):
+    """Baseline: per old operation, scan every new operation, then compare inlined JSON."""
+    new_operations = [
+        (path, method, operation) for path, item in new["paths"].items()
+        for method, operation in item.items() if method in HTTP_METHODS
+    ]
+    changed = 0
+    checked = 0
+    for path, item in old["paths"].items():
+        for method, operation in item.items():
+            if method not in HTTP_METHODS:
+                continue
+            if checked == limit:
+                return changed, checked
+            checked += 1
+            match = None
+            for new_path, new_method, new_operation in new_operations[:limit]:
+                if new_path == path and new_method == method:
+                    match = new_operation
+            if match is None or json.dumps(inline(operation, old), sort_keys=True) != \
+                    json.dumps(inline(match, new), sort_keys=True):
+                changed += 1
+    return changed, checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--schemas", type=int, default=500)
+    parser.add_argument("--baseline-operations", type=int, default=1000)
+    parser.add_argument("--keep", help="write the two specs into this directory and keep them")
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp()
+    os.makedirs(directory, exist_ok=True)
+    old_path = os.path.join(directory, "openapi-v1.json")
+    new_path = os.path.join(directory, "openapi-v2.json")
+    old_spec = generate_spec(args.operations, args.schemas)
+    new_spec = next_version(old_spec)
+    for path, spec in ((old_path, old_spec), (new_path, new_spec)):
+        with open(path, "w") as f:
+            json.dump(spec, f)
+    print(f"specs: {args.operations:,} operations, {args.schemas} schemas, "
+          f"{os.path.getsize(old_path) / (1 << 20):.1f} MiB each")
+
+    try:
+        started = time.perf_counter()
+        old, new = SpecIndex(load_spec(old_path)), SpecIndex(load_spec(new_path))
+        indexed = time.perf_counter() - started
+        changes = diff_specs(old, new)
+        elapsed = time.perf_counter() - started
+        kinds = {}
+        for change in changes["breaking_changes"]:
+            kinds[change["type"]] = kinds.get(change["type"], 0) + 1
+        print(f"indexed diff: {elapsed:.2f}s (load + index {indexed:.2f}s), "
+              f"{len(changes['breaking_changes'])} breaking changes {kinds}")
+
+        limit = min(args.baseline_operations, args.operations)
+        started = time.perf_counter()
+        nested_loop_diff(old_spec, new_spec, limit)
+        baseline = time.perf_counter() - started
+        extrapolated = baseline * (args.operations / limit) ** 2
+        print(f"nested loop:  {baseline:.2f}s for {limit:,} operations, ~{extrapolated:.1f}s extrapolated "
+              f"to {args.operations:,} ({extrapolated / elapsed:.0f}x slower)")
+    finally:
+        if not args.keep:
+            for path in (old_path, new_path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
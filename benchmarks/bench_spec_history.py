@@ -0,0 +1,99 @@
+"""Benchmark validating every version of a spec along a repository's history.
+
+Builds a throwaway git repository in which --versions commits each change a
+spec of --operations operations (the generator of bench_spec_diff.py; every
+commit adds an operation and every fifth one narrows a schema), then times
+a naive loop that loads and indexes both sides of every consecutive pair
+against `validate_spec_history` inline and across --workers processes, which
+parse each version once.  The timelines are checked to agree.
+
+Usage:
+    python benchmarks/bench_spec_history.py [--versions 100] [--operations 2000] [--workers N] [--keep DIR]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import git
+from benchmarks.bench_spec_diff import generate_spec
+from tools.git_analyzer import iter_file_history
+from tools.spec_diff import SPEC_INDEXES, SpecIndex, diff_specs, parse_spec
+from tools.spec_history import validate_spec_history
+
+SPEC_PATH = "api/openapi.json"
+
+
+def build_repository(directory, versions, operations):
+    repo = git.Repo.init(directory)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "bench")
+        config.set_value("user", "email", "bench@example.com")
+    spec = generate_spec(operations, max(10, operations // 10))
+    rng = random.Random(0)
+    os.makedirs(os.path.join(directory, "api"), exist_ok=True)
+    for number in range(versions):
+        spec["info"]["version"] = f"1.{number}.0"
+        spec["paths"][f"/api/v2/added_{number}"] = {"get": {"responses": {"200": {"description": "OK"}}}}
+        if number % 5 == 4:
+            schema = spec["components"]["schemas"][f"Schema{rng.randrange(len(spec['components']['schemas']))}"]
+            schema["required"] = sorted(set(schema["required"]) | {f"field_{rng.randrange(8)}"})
+        with open(os.path.join(directory, SPEC_PATH), "w") as f:
+            json.dump(spec, f)
+        repo.index.add([SPEC_PATH])
+        repo.index.commit(f"Spec version {number}")
+    return repo
+
+
+def naive_history(repo):
+    """Baseline: every comparison loads and indexes both of its versions."""
+    commits = [commit for commit in iter_file_history(repo, SPEC_PATH) if commit["blob_sha"]]
+    breaking = []
+    for old, new in zip(commits, commits[1:]):
+        indexes = [SpecIndex(parse_spec(repo.git.get_object_data(commit["blob_sha"])[3])) for commit in (old, new)]
+        breaking.append(len(diff_specs(*indexes)["breaking_changes"]))
+    return breaking
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versions", type=int, default=100)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--keep", help="build the repository in this directory and keep it")
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp()
+    try:
+        started = time.perf_counter()
+        repo = build_repository(directory, args.versions, args.operations)
+        print(f"repository: {args.versions} versions of a {args.operations:,}-operation spec, "
+              f"built in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        expected = naive_history(repo)
+        naive = time.perf_counter() - started
+        print(f"naive pairwise:        {naive:.2f}s")
+
+        for workers in sorted({1, args.workers}):
+            SPEC_INDEXES.clear()
+            started = time.perf_counter()
+            history = validate_spec_history(repo, SPEC_PATH, max_workers=workers)
+            elapsed = time.perf_counter() - started
+            found = [len(entry.get("breaking_changes", [])) for entry in history["timeline"][1:]]
+            assert found == expected, "history validation disagrees with the naive loop"
+            print(f"history, {workers} worker(s): {elapsed:.2f}s ({naive / elapsed:.1f}x), "
+                  f"{history['comparisons']} comparisons, {history['breaking_commits']} breaking commits")
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark loading a large OpenAPI spec eagerly and lazily.
+
+Writes a spec with --operations operations sharing --schemas component
+schemas (the generator of bench_spec_diff.py) as JSON, and as YAML, then
+measures each way of loading it in a fresh process, reporting parse time
+and peak RSS: `json.load`, the lazy `load_spec`, the lazy loader followed by
+documenting --subset paths with DocumentationBuilderTool, indexing every
+operation for validation after a lazy and an eager load, and YAML with the
+pure-Python and the libyaml C loader.
+
+Usage:
+    python benchmarks/bench_spec_loader.py [--operations 50000] [--schemas 2000] [--subset 10]
+                                           [--yaml-operations 5000] [--keep DIR]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = {
+    "json.load": "json",
+    "load_spec (lazy)": "json",
+    "lazy + document subset": "json",
+    "lazy + index all operations": "json",
+    "json.load + index all operations": "json",
+    "yaml SafeLoader": "yaml",
+    "yaml CSafeLoader": "yaml",
+}
+
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, path, subset):
+    """Runs in a child process; prints seconds and peak RSS as JSON."""
+    import yaml
+    from tools.documentation_builder import DocumentationBuilderTool
+    from tools.spec_diff import SpecIndex, index_spec_file, load_spec
+
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+    if mode == "json.load":
+        with open(path) as f:
+            json.load(f)
+    elif mode == "load_spec (lazy)":
+        load_spec(path)
+    elif mode == "lazy + document subset":
+        paths = list(index_spec_file(path).spec["paths"])[:subset]
+        documentation = DocumentationBuilderTool()._run(api_endpoints=paths, format_type="markdown", api_spec_path=path)
+        assert '"operations"' in documentation, documentation[:200]
+    elif mode == "lazy + index all operations":
+        SpecIndex(load_spec(path)).operations
+    elif mode == "json.load + index all operations":
+        with open(path) as f:
+            SpecIndex(json.load(f)).operations
+    else:
+        loader = yaml.CSafeLoader if mode == "yaml CSafeLoader" else yaml.SafeLoader
+        with open(path, "rb") as f:
+            yaml.load(f, Loader=loader)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"seconds": elapsed, "peak_rss_mib": peak_rss_mib(), "baseline_mib": baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=50000)
+    parser.add_argument("--schemas", type=int, default=2000)
+    parser.add_argument("--subset", type=int, default=10)
+    parser.add_argument("--yaml-operations", type=int, default=5000)
+    parser.add_argument("--keep", help="write the specs into this directory and keep them")
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure[0], args.measure[1], args.subset)
+        return
+
+    import yaml
+    from benchmarks.bench_spec_diff import generate_spec
+
+    directory = args.keep or tempfile.mkdtemp()
+    os.makedirs(directory, exist_ok=True)
+    files = {"json": os.path.join(directory, "openapi.json"), "yaml": os.path.join(directory, "openapi.yaml")}
+    with open(files["json"], "w") as f:
+        json.dump(generate_spec(args.operations, args.schemas), f)
+    with open(files["yaml"], "w") as f:
+        yaml.dump(generate_spec(args.yaml_operations, min(args.schemas, args.yaml_operations)), f,
+                  Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+    print(f"JSON spec: {args.operations:,} operations, {os.path.getsize(files['json']) / (1 << 20):.1f} MiB; "
+          f"YAML spec: {args.yaml_operations:,} operations, {os.path.getsize(files['yaml']) / (1 << 20):.1f} MiB")
+
+    try:
+        print(f"{'mode':<34} {'time':>8} {'peak RSS':>10} {'over baseline':>14}")
+        for mode, kind in MODES.items():
+            if mode == "yaml CSafeLoader" and not hasattr(yaml, "CSafeLoader"):
+                print(f"{mode:<34} {'libyaml not available':>34}")
+                continue
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--subset", str(args.subset), "--measure", mode, files[kind]],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<34} {result['seconds']:>7.2f}s {result['peak_rss_mib']:>8.0f}MiB "
+                  f"{result['peak_rss_mib'] - result['baseline_mib']:>11.0f}MiB")
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
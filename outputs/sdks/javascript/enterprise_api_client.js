@@ -1,106 +1,192 @@
-// Register a new agent
-const url = "http://localhost:8000/agents";
-const data = {
-  agent_id: "research_agent_001",
-  agent_type: "research"
-};
-
-fetch(url, {
-  method: 'POST',
-  headers: {
-    'Content-Type': 'application/json'
-  },
-  body: JSON.stringify(data)
-})
-.then(response => response.json())
-.then(data => console.log(data));
-
-// Assign a task to an agent
-const taskUrl = "http://localhost:8000/tasks";
-const taskData = {
-  agent_id: "research_agent_001",
-  task_description: "Analyze the sentiment of a given text.",
-  task_data: {text: "This is a great product!"}
-};
-
-fetch(taskUrl, {
-  method: 'POST',
-  headers: {
-    'Content-Type': 'application/json'
-  },
-  body: JSON.stringify(taskData)
-})
-.then(response => response.json())
-.then(data => console.log(data));
-
-// Retrieve results for an agent
-const resultsUrl = "http://localhost:8000/results/research_agent_001";
-
-fetch(resultsUrl)
-  .then(response => response.json())
-  .then(data => console.log(data));
-```
-
-## 5. SDKs
-
-### Python SDK
-
-```python
-# Enterprise API Python SDK
-import requests
-import json
-from typing import Dict, List, Optional
-
-class EnterpriseAPIClient:
-    def __init__(self, base_url: str, api_key: str):
-        """
-        Initialize the Enterprise API client.
-        
-        Args:
-            base_url (str): The base URL of the API
-            api_key (str): Your API key for authentication
-        """
-        self.base_url = base_url.rstrip('/')
-        self.api_key = api_key
-        self.headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
-    
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
-        """
-        Make an HTTP request to the API.
-        
-        Args:
-            method (str): HTTP method (GET, POST, PUT, DELETE)
-            endpoint (str): API endpoint
-            data (Dict, optional): Request data for POST/PUT requests
-            
-        Returns:
-            Dict: API response
-        """
-        url = f"{self.base_url}{endpoint}"
-        
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=self.headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json() if response.content else {}
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"API request failed: {str(e)}")
-    
-
-# Usage example:
-# client = EnterpriseAPIClient("https://api.example.com/v1", "your-api-key")
-# users = client.list_users(limit=10)
-# new_user = client.create_user({"name": "John Doe", "email": "john@example.com"})
\ No newline at end of file
+// Enterprise API JavaScript SDK
+class EnterpriseAPIClient {
+    constructor(baseUrl, apiKey) {
+        /**
+         * Initialize the Enterprise API client.
+         * 
+         * @param {string} baseUrl - The base URL of the API
+         * @param {string} apiKey - Your API key for authentication
+         */
+        this.baseUrl = baseUrl.replace(/\/$/, '');
+        this.apiKey = apiKey;
+        this.headers = {
+            'Authorization': `Bearer ${apiKey}`,
+            'Content-Type': 'application/json'
+        };
+    }
+    
+    async _makeRequest(method, endpoint, data = null, params = null) {
+        /**
+         * Make an HTTP request to the API.
+         * 
+         * @param {string} method - HTTP method (GET, POST, PUT, DELETE)
+         * @param {string} endpoint - API endpoint
+         * @param {Object} data - Request data for POST/PUT requests
+         * @param {Object} params - Query string parameters
+         * 
+         * @returns {Object} API response
+         */
+        let url = `${this.baseUrl}${endpoint}`;
+        if (params) {
+            url += `?${new URLSearchParams(params)}`;
+        }
+        const config = {
+            method: method,
+            headers: this.headers
+        };
+        
+        if (data) {
+            config.body = JSON.stringify(data);
+        }
+        
+        try {
+            const response = await fetch(url, config);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return await response.json();
+        } catch (error) {
+            throw new Error(`API request failed: ${error.message}`);
+        }
+    }
+    
+    async *_iterPages(endpoint, pageSize, prefetch) {
+        /**
+         * Yield every item of a limit/offset paginated collection.
+         * 
+         * The next `prefetch` pages are requested while the current one is
+         * consumed, so at most `prefetch` + 1 pages are held in memory however
+         * large the collection.  Paging stops at the first page shorter than
+         * `pageSize`; up to `prefetch` requests made past the end are dropped.
+         */
+        const pending = [];
+        let offset = 0;
+        while (true) {
+            while (pending.length <= prefetch) {
+                const request = this._makeRequest('GET', endpoint, null, {limit: pageSize, offset: offset});
+                // Failures surface when the page is awaited; pages dropped after an early stop stay silent
+                request.catch(() => {});
+                pending.push(request);
+                offset += pageSize;
+            }
+            const page = await pending.shift();
+            yield* page;
+            if (page.length < pageSize) {
+                return;
+            }
+        }
+    }
+    
+    async listDeploy(limit = 20, offset = 0) {
+        /**
+         * List deploy.
+         * 
+         * @param {number} limit - Maximum number of items to return
+         * @param {number} offset - Offset for pagination
+         * 
+         * @returns {Array} List of deploy
+         */
+        return await this._makeRequest('GET', '/agent/deploy', null, {limit: limit, offset: offset});
+    }
+    
+    async *iterDeploy(pageSize = 100, prefetch = 2) {
+        /**
+         * Iterate lazily over all deploy, fetching pages ahead while earlier ones are consumed.
+         * 
+         * @param {number} pageSize - Items requested per page
+         * @param {number} prefetch - Pages requested ahead of the one being consumed (0 fetches on demand)
+         * 
+         * @yields {Object} Each of the deploy
+         */
+        yield* this._iterPages('/agent/deploy', pageSize, prefetch);
+    }
+    
+    async createDeploy(data) {
+        /**
+         * Create a new deploy.
+         * 
+         * @param {Object} data - Deploy data
+         * 
+         * @returns {Object} Created deploy data
+         */
+        return await this._makeRequest('POST', '/agent/deploy', data);
+    }
+    
+    async getStatu(statuId) {
+        /**
+         * Get a specific statu by ID.
+         * 
+         * @param {string} statuId - The statu ID
+         * 
+         * @returns {Object} Statu data
+         */
+        return await this._makeRequest('GET', `/agent/status/${statuId}`);
+    }
+    
+    async updateStatu(statuId, data) {
+        /**
+         * Update a specific statu.
+         * 
+         * @param {string} statuId - The statu ID
+         * @param {Object} data - Updated statu data
+         * 
+         * @returns {Object} Updated status data
+         */
+        return await this._makeRequest('PUT', `/agent/status/${statuId}`, data);
+    }
+    
+    async deleteStatu(statuId) {
+        /**
+         * Delete a specific statu.
+         * 
+         * @param {string} statuId - The statu ID
+         * 
+         * @returns {boolean} True if deleted successfully
+         */
+        await this._makeRequest('DELETE', `/agent/status/${statuId}`);
+        return true;
+    }
+    
+    async listMessage(limit = 20, offset = 0) {
+        /**
+         * List message.
+         * 
+         * @param {number} limit - Maximum number of items to return
+         * @param {number} offset - Offset for pagination
+         * 
+         * @returns {Array} List of message
+         */
+        return await this._makeRequest('GET', '/queue/message', null, {limit: limit, offset: offset});
+    }
+    
+    async *iterMessage(pageSize = 100, prefetch = 2) {
+        /**
+         * Iterate lazily over all message, fetching pages ahead while earlier ones are consumed.
+         * 
+         * @param {number} pageSize - Items requested per page
+         * @param {number} prefetch - Pages requested ahead of the one being consumed (0 fetches on demand)
+         * 
+         * @yields {Object} Each of the message
+         */
+        yield* this._iterPages('/queue/message', pageSize, prefetch);
+    }
+    
+    async createMessage(data) {
+        /**
+         * Create a new message.
+         * 
+         * @param {Object} data - Message data
+         * 
+         * @returns {Object} Created message data
+         */
+        return await this._makeRequest('POST', '/queue/message', data);
+    }
+    
+
+}
+
+// Usage example:
+// const client = new EnterpriseAPIClient("https://api.example.com/v1", "your-api-key");
+// const users = await client.listUsers(10);
+// const newUser = await client.createUser({name: "John Doe", email: "john@example.com"});
+// for await (const user of client.iterUsers()) { ... }
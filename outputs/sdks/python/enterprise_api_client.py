@@ -1,149 +1,507 @@
-# Enterprise API Python SDK
-import requests
-import json
-from typing import Dict, List, Optional
-
-class EnterpriseAPIClient:
-    def __init__(self, base_url: str, api_key: str):
-        """
-        Initialize the Enterprise API client.
-
-        Args:
-            base_url (str): The base URL of the API
-            api_key (str): Your API key for authentication
-        """
-        self.base_url = base_url.rstrip('/')
-        self.api_key = api_key
-        self.headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
-
-    def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
-        """
-        Make an HTTP request to the API.
-
-        Args:
-            method (str): HTTP method (GET, POST, PUT, DELETE)
-            endpoint (str): API endpoint
-            data (Dict, optional): Request data for POST/PUT requests
-
-        Returns:
-            Dict: API response
-        """
-        url = f"{self.base_url}{endpoint}"
-
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=self.headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-            return response.json() if response.content else {}
-
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"API request failed: {str(e)}")
-
-        def list_deploy(self, limit: int = 20, offset: int = 0) -> List[Dict]:
-        """
-        List deploy.
-
-        Args:
-            limit (int): Maximum number of items to return
-            offset (int): Offset for pagination
-
-        Returns:
-            List[Dict]: List of deploy
-        """
-        params = {'limit': limit, 'offset': offset}
-        # In a real implementation, you would pass params to the request
-        return self._make_request('GET', '/agent/deploy')
-
-    def create_deploy(self, data: Dict) -> Dict:
-        """
-        Create a new deploy.
-
-        Args:
-            data (Dict): Deploy data
-
-        Returns:
-            Dict: Created deploy data
-        """
-        return self._make_request('POST', '/agent/deploy', data)
-
-        def get_statu(self, statu_id: str) -> Dict:
-        """
-        Get a specific statu by ID.
-
-        Args:
-            statu_id (str): The statu ID
-
-        Returns:
-            Dict: Statu data
-        """
-        return self._make_request('GET', f'/agent/status/{agent_id}{statu_id}')
-
-    def update_statu(self, statu_id: str, data: Dict) -> Dict:
-        """
-        Update a specific statu.
-
-        Args:
-            statu_id (str): The statu ID
-            data (Dict): Updated statu data
-
-        Returns:
-            Dict: Updated status data
-        """
-        return self._make_request('PUT', f'/agent/status/{agent_id}{statu_id}', data)
-
-    def delete_statu(self, statu_id: str) -> bool:
-        """
-        Delete a specific statu.
-
-        Args:
-            statu_id (str): The statu ID
-
-        Returns:
-            bool: True if deleted successfully
-        """
-        self._make_request('DELETE', f'/agent/status/{agent_id}{statu_id}')
-        return True
-        def list_message(self, limit: int = 20, offset: int = 0) -> List[Dict]:
-        """
-        List message.
-
-        Args:
-            limit (int): Maximum number of items to return
-            offset (int): Offset for pagination
-
-        Returns:
-            List[Dict]: List of message
-        """
-        params = {'limit': limit, 'offset': offset}
-        # In a real implementation, you would pass params to the request
-        return self._make_request('GET', '/queue/message')
-
-    def create_message(self, data: Dict) -> Dict:
-        """
-        Create a new message.
-
-        Args:
-            data (Dict): Message data
-
-        Returns:
-            Dict: Created message data
-        """
-        return self._make_request('POST', '/queue/message', data)
-
-
-# Usage example:
-# client = EnterpriseAPIClient("https://api.example.com/v1", "your-api-key")
-# users = client.list_users(limit=10)
-# new_user = client.create_user({"name": "John Doe", "email": "john@example.com"})
\ No newline at end of file
+# Enterprise API Python SDK
+import asyncio
+import requests
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # Only AsyncEnterpriseAPIClient needs httpx
+    httpx = None
+
+class EnterpriseAPIClient:
+    # Responses retried with exponential backoff; 429 and 503 wait as long as their Retry-After asks
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url: str, api_key: str, timeout: float = 30.0, connect_timeout: float = 5.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, pool_size: int = 10):
+        """
+        Initialize the Enterprise API client.
+        
+        Requests share one session, so connections are kept alive and reused
+        instead of opened per call.  Connection errors and RETRY_STATUSES
+        responses to idempotent requests (GET, PUT, DELETE) are retried; POST
+        is only retried when the request never reached the server.
+        
+        Args:
+            base_url (str): The base URL of the API
+            api_key (str): Your API key for authentication
+            timeout (float): Seconds to wait for response data
+            connect_timeout (float): Seconds to wait for a connection
+            max_retries (int): Retries of a failed request
+            backoff_factor (float): Retry n > 1 waits backoff_factor * 2 ** (n - 1) seconds (the first is immediate)
+            pool_size (int): Connections kept open per host; raise it when sharing the client across threads
+        """
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = (connect_timeout, timeout)
+        self.headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=self.RETRY_STATUSES,
+                      respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _make_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
+        """
+        Make an HTTP request to the API.
+        
+        Args:
+            method (str): HTTP method (GET, POST, PUT, DELETE)
+            endpoint (str): API endpoint
+            data (Dict, optional): Request data for POST/PUT requests
+            params (Dict, optional): Query string parameters
+            
+        Returns:
+            Dict: API response
+        """
+        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        try:
+            response = self.session.request(method, url, json=data, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json() if response.content else {}
+            
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"API request failed: {str(e)}")
+    
+    def _iter_pages(self, endpoint: str, page_size: int, prefetch: int) -> Iterator[Dict]:
+        """
+        Yield every item of a limit/offset paginated collection.
+        
+        The next `prefetch` pages are requested on background threads while
+        the current one is consumed, so at most `prefetch` + 1 pages are held
+        in memory however large the collection.  Paging stops at the first
+        page shorter than `page_size`; up to `prefetch` requests made past
+        the end come back empty and are dropped.
+        """
+        def fetch(offset: int) -> List[Dict]:
+            return self._make_request('GET', endpoint, params={'limit': page_size, 'offset': offset})
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        pending = deque()
+        offset = 0
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    pending.append(executor.submit(fetch, offset))
+                    offset += page_size
+                page = pending.popleft().result()
+                yield from page
+                if len(page) < page_size:
+                    return
+        finally:
+            # Also runs when the caller stops early; pages not yet requested never will be
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def list_deploy(self, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        List deploy.
+        
+        Args:
+            limit (int): Maximum number of items to return
+            offset (int): Offset for pagination
+            
+        Returns:
+            List[Dict]: List of deploy
+        """
+        params = {'limit': limit, 'offset': offset}
+        return self._make_request('GET', '/agent/deploy', params=params)
+    
+    def iter_deploy(self, page_size: int = 100, prefetch: int = 2) -> Iterator[Dict]:
+        """
+        Iterate lazily over all deploy, fetching pages ahead while earlier ones are consumed.
+        
+        Args:
+            page_size (int): Items requested per page
+            prefetch (int): Pages requested ahead of the one being consumed (0 fetches on demand)
+            
+        Yields:
+            Dict: Each of the deploy
+        """
+        return self._iter_pages('/agent/deploy', page_size, prefetch)
+    
+    def create_deploy(self, data: Dict) -> Dict:
+        """
+        Create a new deploy.
+        
+        Args:
+            data (Dict): Deploy data
+            
+        Returns:
+            Dict: Created deploy data
+        """
+        return self._make_request('POST', '/agent/deploy', data)
+    
+    def get_statu(self, statu_id: str) -> Dict:
+        """
+        Get a specific statu by ID.
+        
+        Args:
+            statu_id (str): The statu ID
+            
+        Returns:
+            Dict: Statu data
+        """
+        return self._make_request('GET', f'/agent/status/{statu_id}')
+    
+    def update_statu(self, statu_id: str, data: Dict) -> Dict:
+        """
+        Update a specific statu.
+        
+        Args:
+            statu_id (str): The statu ID
+            data (Dict): Updated statu data
+            
+        Returns:
+            Dict: Updated status data
+        """
+        return self._make_request('PUT', f'/agent/status/{statu_id}', data)
+    
+    def delete_statu(self, statu_id: str) -> bool:
+        """
+        Delete a specific statu.
+        
+        Args:
+            statu_id (str): The statu ID
+            
+        Returns:
+            bool: True if deleted successfully
+        """
+        self._make_request('DELETE', f'/agent/status/{statu_id}')
+        return True
+    
+    def list_message(self, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        List message.
+        
+        Args:
+            limit (int): Maximum number of items to return
+            offset (int): Offset for pagination
+            
+        Returns:
+            List[Dict]: List of message
+        """
+        params = {'limit': limit, 'offset': offset}
+        return self._make_request('GET', '/queue/message', params=params)
+    
+    def iter_message(self, page_size: int = 100, prefetch: int = 2) -> Iterator[Dict]:
+        """
+        Iterate lazily over all message, fetching pages ahead while earlier ones are consumed.
+        
+        Args:
+            page_size (int): Items requested per page
+            prefetch (int): Pages requested ahead of the one being consumed (0 fetches on demand)
+            
+        Yields:
+            Dict: Each of the message
+        """
+        return self._iter_pages('/queue/message', page_size, prefetch)
+    
+    def create_message(self, data: Dict) -> Dict:
+        """
+        Create a new message.
+        
+        Args:
+            data (Dict): Message data
+            
+        Returns:
+            Dict: Created message data
+        """
+        return self._make_request('POST', '/queue/message', data)
+    
+
+class AsyncEnterpriseAPIClient:
+    # Responses retried with exponential backoff, waiting as long as their Retry-After asks
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # Methods retried after the server may have seen the request
+    IDEMPOTENT_METHODS = ('GET', 'PUT', 'DELETE')
+    # Upper bound of one backoff, in seconds
+    BACKOFF_MAX = 120.0
+
+    def __init__(self, base_url: str, api_key: str, timeout: float = 30.0, connect_timeout: float = 5.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, pool_size: int = 100,
+                 max_concurrency: int = 100):
+        """
+        Initialize the asynchronous Enterprise API client.
+        
+        Requests share one pooled httpx.AsyncClient, and at most
+        `max_concurrency` of them are in flight at once however many
+        coroutines call the client, so hundreds of calls can be gathered
+        without threads.  Failed requests are retried like
+        EnterpriseAPIClient's.
+        
+        Args:
+            base_url (str): The base URL of the API
+            api_key (str): Your API key for authentication
+            timeout (float): Seconds to wait for response data
+            connect_timeout (float): Seconds to wait for a connection
+            max_retries (int): Retries of a failed request
+            backoff_factor (float): Retry n > 1 waits backoff_factor * 2 ** (n - 1) seconds (the first is immediate)
+            pool_size (int): Connections kept open
+            max_concurrency (int): Requests in flight at once
+        """
+        if httpx is None:
+            raise ImportError("httpx is required for AsyncEnterpriseAPIClient")
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+    
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    def _backoff(self, attempt: int, response=None) -> float:
+        """Seconds to wait before retry `attempt` (1-based), preferring the response's Retry-After."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.BACKOFF_MAX, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                    return min(self.BACKOFF_MAX, max(0.0, delay))
+                except (TypeError, ValueError):
+                    pass
+        if attempt <= 1:
+            return 0.0
+        return min(self.BACKOFF_MAX, self.backoff_factor * 2 ** (attempt - 1))
+    
+    async def _make_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
+        """
+        Make an HTTP request to the API.
+        
+        Args:
+            method (str): HTTP method (GET, POST, PUT, DELETE)
+            endpoint (str): API endpoint
+            data (Dict, optional): Request data for POST/PUT requests
+            params (Dict, optional): Query string parameters
+            
+        Returns:
+            Dict: API response
+        """
+        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        attempt = 0
+        while True:
+            response = None
+            try:
+                # Only the request itself holds a slot, not the wait before a retry
+                async with self._slots:
+                    response = await self.client.request(method, url, json=data, params=params)
+                retry = response.status_code in self.RETRY_STATUSES and method in self.IDEMPOTENT_METHODS
+                if not retry or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.json() if response.content else {}
+            except httpx.HTTPStatusError as e:
+                raise Exception(f"API request failed: {str(e)}")
+            except httpx.TransportError as e:
+                # A request that never connected cannot have reached the server, whatever its method
+                retryable = isinstance(e, httpx.ConnectError) or method in self.IDEMPOTENT_METHODS
+                if not retryable or attempt >= self.max_retries:
+                    raise Exception(f"API request failed: {str(e)}")
+            attempt += 1
+            await asyncio.sleep(self._backoff(attempt, response))
+    
+    async def _iter_pages(self, endpoint: str, page_size: int, prefetch: int) -> AsyncIterator[Dict]:
+        """
+        Yield every item of a limit/offset paginated collection.
+        
+        The next `prefetch` pages are requested as tasks while the current
+        one is consumed, so at most `prefetch` + 1 pages are held in memory
+        however large the collection.  Paging stops at the first page
+        shorter than `page_size`; up to `prefetch` requests made past the
+        end come back empty and are dropped.
+        """
+        pending = deque()
+        offset = 0
+        try:
+            while True:
+                while len(pending) <= prefetch:
+                    params = {'limit': page_size, 'offset': offset}
+                    pending.append(asyncio.ensure_future(self._make_request('GET', endpoint, params=params)))
+                    offset += page_size
+                page = await pending.popleft()
+                for item in page:
+                    yield item
+                if len(page) < page_size:
+                    return
+        finally:
+            # Also runs when the caller stops early or the generator is closed
+            for task in pending:
+                task.cancel()
+    
+    async def list_deploy(self, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        List deploy.
+        
+        Args:
+            limit (int): Maximum number of items to return
+            offset (int): Offset for pagination
+            
+        Returns:
+            List[Dict]: List of deploy
+        """
+        params = {'limit': limit, 'offset': offset}
+        return await self._make_request('GET', '/agent/deploy', params=params)
+    
+    def iter_deploy(self, page_size: int = 100, prefetch: int = 2) -> AsyncIterator[Dict]:
+        """
+        Iterate lazily over all deploy, fetching pages ahead while earlier ones are consumed.
+        
+        Args:
+            page_size (int): Items requested per page
+            prefetch (int): Pages requested ahead of the one being consumed (0 fetches on demand)
+            
+        Yields:
+            Dict: Each of the deploy
+        """
+        return self._iter_pages('/agent/deploy', page_size, prefetch)
+    
+    async def create_deploy(self, data: Dict) -> Dict:
+        """
+        Create a new deploy.
+        
+        Args:
+            data (Dict): Deploy data
+            
+        Returns:
+            Dict: Created deploy data
+        """
+        return await self._make_request('POST', '/agent/deploy', data)
+    
+    async def get_statu(self, statu_id: str) -> Dict:
+        """
+        Get a specific statu by ID.
+        
+        Args:
+            statu_id (str): The statu ID
+            
+        Returns:
+            Dict: Statu data
+        """
+        return await self._make_request('GET', f'/agent/status/{statu_id}')
+    
+    async def update_statu(self, statu_id: str, data: Dict) -> Dict:
+        """
+        Update a specific statu.
+        
+        Args:
+            statu_id (str): The statu ID
+            data (Dict): Updated statu data
+            
+        Returns:
+            Dict: Updated status data
+        """
+        return await self._make_request('PUT', f'/agent/status/{statu_id}', data)
+    
+    async def delete_statu(self, statu_id: str) -> bool:
+        """
+        Delete a specific statu.
+        
+        Args:
+            statu_id (str): The statu ID
+            
+        Returns:
+            bool: True if deleted successfully
+        """
+        await self._make_request('DELETE', f'/agent/status/{statu_id}')
+        return True
+    
+    async def list_message(self, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        List message.
+        
+        Args:
+            limit (int): Maximum number of items to return
+            offset (int): Offset for pagination
+            
+        Returns:
+            List[Dict]: List of message
+        """
+        params = {'limit': limit, 'offset': offset}
+        return await self._make_request('GET', '/queue/message', params=params)
+    
+    def iter_message(self, page_size: int = 100, prefetch: int = 2) -> AsyncIterator[Dict]:
+        """
+        Iterate lazily over all message, fetching pages ahead while earlier ones are consumed.
+        
+        Args:
+            page_size (int): Items requested per page
+            prefetch (int): Pages requested ahead of the one being consumed (0 fetches on demand)
+            
+        Yields:
+            Dict: Each of the message
+        """
+        return self._iter_pages('/queue/message', page_size, prefetch)
+    
+    async def create_message(self, data: Dict) -> Dict:
+        """
+        Create a new message.
+        
+        Args:
+            data (Dict): Message data
+            
+        Returns:
+            Dict: Created message data
+        """
+        return await self._make_request('POST', '/queue/message', data)
+    
+
+# Usage example:
+# client = EnterpriseAPIClient("https://api.example.com/v1", "your-api-key")
+# users = client.list_users(limit=10)
+# new_user = client.create_user({"name": "John Doe", "email": "john@example.com"})
+#
+# async with AsyncEnterpriseAPIClient("https://api.example.com/v1", "your-api-key") as client:
+#     users = await asyncio.gather(*(client.get_user(user_id) for user_id in user_ids))
+#     async for user in client.iter_users(page_size=500, prefetch=4):
+#         ...
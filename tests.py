@@ -3,11 +3,61 @@ import os
 import json
 import tempfile
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+
+@contextmanager
+def _stand_in_server(handler):
+    """Serve `handler` from a local threaded HTTP server for the block, yielding its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Quiet keep-alive handler for stand-in servers; responses must send a Content-Length."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+
+class _InFlight:
+    """Counts the requests a stand-in server handles and the most it handled at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = self.current = self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.requests += 1
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        return self
+
+    def __exit__(self, *exc_info):
+        with self.lock:
+            self.current -= 1
+
+    def reset(self):
+        # Requests made past the end of a previous run may still be finishing
+        time.sleep(0.1)
+        with self.lock:
+            self.requests = self.peak = 0
+
+
 class TestEnterpriseAPIEcosystem(unittest.TestCase):
     
     def setUp(self):
@@ -97,7 +147,7 @@ class TestEnterpriseAPIEcosystem(unittest.TestCase):
     def test_04_git_repository_analyzer_tool(self):
         """Test Git repository analyzer tool functionality"""
         from tools.git_analyzer import GitRepositoryAnalyzerTool
-        git_tool = GitRepositoryAnalyzerTool()
+        git_tool = GitRepositoryAnalyzerTool(incremental=False)
         self.assertIsNotNone(git_tool, "Git Repository Analyzer Tool creation failed")
         self.assertEqual(git_tool.name, "Git Repository Analyzer Tool")
         
@@ -186,5 +236,1419 @@ class TestEnterpriseAPIEcosystem(unittest.TestCase):
             # Verify the function executed without error
             self.assertIsInstance(success, bool, "extract_and_save_components should return boolean")
 
+    def test_11_network_scanner_sweeps_cidr_range(self):
+        """Test that the network scanner honours network_range and finds open services"""
+        import socket
+        import threading
+        from http.server import HTTPServer, BaseHTTPRequestHandler
+        from tools.network_scanner import NetworkScannerTool
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        open_port = server.server_address[1]
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed_port = sock.getsockname()[1]
+
+        try:
+            network_tool = NetworkScannerTool(common_ports=[open_port, closed_port], connect_timeout=0.5)
+            result = json.loads(network_tool._run('127.0.0.0/30'))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(result['scanned_hosts'], 2, "A /30 range should expand to two hosts")
+        services = [(s['ip'], s['port']) for s in result['active_services']]
+        self.assertEqual(services, [('127.0.0.1', open_port)], "Only the listening port should be reported open")
+        self.assertTrue(result['active_services'][0].get('potential_api'), "HTTP service should be probed")
+
+    def test_12_network_scanner_parallel_probing(self):
+        """Test that endpoint probes fan out concurrently and report per-endpoint latency"""
+        from urllib.parse import urlsplit
+        from tools.network_scanner import NetworkScannerTool
+
+        class GetOnlyHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(0.3)
+                self.send_response(200 if self.path == '/api' else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        class HeadHandler(GetOnlyHandler):
+            def do_HEAD(self):
+                self.do_GET()
+
+        with _stand_in_server(HeadHandler) as head, _stand_in_server(GetOnlyHandler) as get_only:
+            services = [('127.0.0.1', urlsplit(base_url).port) for base_url in (head, get_only)]
+            network_tool = NetworkScannerTool()
+            started = time.perf_counter()
+            probes = network_tool._probe_services(services)
+            elapsed = time.perf_counter() - started
+
+        # Ten probes at 0.3s each would take 3s back to back
+        self.assertLess(elapsed, 2.0, "Probes should run concurrently")
+        head_probe = probes[services[0]]['found_endpoints']
+        get_probe = probes[services[1]]['found_endpoints']
+        self.assertEqual([e['endpoint'] for e in head_probe], ['/api'])
+        self.assertEqual(head_probe[0]['probe_method'], 'HEAD', "HEAD should be tried first")
+        self.assertEqual(get_probe[0]['probe_method'], 'GET', "GET should be used when HEAD is unsupported")
+        self.assertGreaterEqual(get_probe[0]['latency_ms'], 300, "Latency should be reported per endpoint")
+
+    def test_13_git_analyzer_single_pass_classification(self):
+        """Test Git analyzer counts and classifies files and bounds recent commits"""
+        import git
+        from tools.git_analyzer import GitRepositoryAnalyzerTool
+
+        with tempfile.TemporaryDirectory() as repo_dir:
+            repo = git.Repo.init(repo_dir)
+            files = {
+                'app/routes.py': 'x = 1',
+                'app/models.py': 'y = 2',
+                'specs/openapi.yaml': 'openapi: 3.0.0',
+                'deploy/settings.ini': '[main]',
+                'deploy/service.json': '{}',
+                'README.md': '# readme',
+            }
+            for number, (path, content) in enumerate(files.items()):
+                full_path = os.path.join(repo_dir, path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'w') as f:
+                    f.write(content)
+                repo.index.add([path])
+                repo.index.commit(f"Add {path} ({number})")
+
+            git_tool = GitRepositoryAnalyzerTool(recent_commit_limit=3, incremental=False)
+            result = json.loads(git_tool._run(repo_path=repo_dir))
+
+        self.assertEqual(result['commit_count'], 6)
+        self.assertEqual(result['file_count'], 6)
+        api_files = {f['path']: f['type'] for f in result['potential_api_files']}
+        self.assertEqual(api_files, {
+            'app/routes.py': 'api_definition',
+            'specs/openapi.yaml': 'api_definition',
+            'deploy/service.json': 'config_or_spec',
+        })
+        self.assertEqual([f['path'] for f in result['python_files']], ['app/models.py'])
+        self.assertEqual([f['path'] for f in result['config_files']], ['deploy/settings.ini'])
+        self.assertEqual(len(result['recent_commits']), 3, "Recent commits should honour the configured limit")
+        self.assertIn('README.md', result['recent_commits'][0]['message'])
+
+    def test_14_git_analyzer_clone_cache(self):
+        """Test remote analysis reuses a cached mirror, fetches new commits and evicts by budget"""
+        import git
+        from tools.git_analyzer import GitRepositoryAnalyzerTool
+
+        with tempfile.TemporaryDirectory() as source_dir, tempfile.TemporaryDirectory() as cache_dir:
+            source = git.Repo.init(source_dir)
+            source.git.config('uploadpack.allowFilter', 'true')
+
+            def commit_file(path):
+                with open(os.path.join(source_dir, path), 'w') as f:
+                    f.write(path)
+                source.index.add([path])
+                source.index.commit(f"Add {path}")
+
+            commit_file('api.py')
+            repo_url = 'file://' + source_dir
+            git_tool = GitRepositoryAnalyzerTool(clone_cache_dir=cache_dir, clone_mode='sparse', incremental=False)
+
+            first = json.loads(git_tool._run(repo_url=repo_url))
+            mirrors = os.listdir(cache_dir)
+            self.assertEqual(first['commit_count'], 1)
+            self.assertEqual(len(mirrors), 1, "Remote repository should be cached as one mirror")
+
+            commit_file('routes.py')
+            second = json.loads(git_tool._run(repo_url=repo_url))
+            self.assertEqual(second['commit_count'], 2, "Cached mirror should be updated incrementally")
+            self.assertEqual(os.listdir(cache_dir), mirrors, "Second run should reuse the cached mirror")
+
+            # A tiny budget evicts every mirror except the one just used
+            tight_tool = GitRepositoryAnalyzerTool(clone_cache_dir=cache_dir, clone_mode='full', clone_cache_max_bytes=1,
+                                                   incremental=False)
+            third = json.loads(tight_tool._run(repo_url=repo_url))
+            self.assertEqual(third['file_count'], 2)
+            self.assertEqual(len(os.listdir(cache_dir)), 1, "Least recently used mirror should be evicted")
+            self.assertNotEqual(os.listdir(cache_dir), mirrors)
+
+    def test_15_git_analyzer_incremental_reanalysis(self):
+        """Test that re-analysis applies the commit diff and matches a full scan"""
+        import git
+        from tools.git_analyzer import GitRepositoryAnalyzerTool
+
+        with tempfile.TemporaryDirectory() as repo_dir:
+            repo = git.Repo.init(repo_dir)
+
+            def write(path, content):
+                full_path = os.path.join(repo_dir, path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'w') as f:
+                    f.write(content)
+                repo.index.add([path])
+
+            write('app/routes.py', 'routes')
+            write('app/models.py', 'models')
+            write('settings.ini', '[main]')
+            repo.index.commit("Initial commit")
+
+            store_url = 'sqlite:///' + os.path.join(repo_dir, '.git', 'analysis.db')
+            git_tool = GitRepositoryAnalyzerTool(analysis_store_url=store_url)
+            first = json.loads(git_tool._run(repo_path=repo_dir))
+            self.assertEqual(first, json.loads(git_tool._run(repo_path=repo_dir)),
+                             "Unchanged HEAD should return the stored analysis")
+
+            # Modify, add and delete files, then re-analyze from the stored HEAD
+            write('app/models.py', 'models v2')
+            write('docs/openapi.json', '{}')
+            repo.index.remove(['settings.ini'], working_tree=True)
+            repo.index.commit("Second commit")
+
+            incremental = json.loads(git_tool._run(repo_path=repo_dir))
+            full_scan = json.loads(GitRepositoryAnalyzerTool(incremental=False)._run(repo_path=repo_dir))
+
+        self.assertEqual(incremental, full_scan, "Incremental result should match a full scan")
+        self.assertEqual(incremental['file_count'], 3)
+        self.assertEqual(incremental['commit_count'], 2)
+        self.assertEqual(incremental['config_files'], [])
+        self.assertIn('docs/openapi.json', [f['path'] for f in incremental['potential_api_files']])
+
+    def test_16_git_analyzer_endpoint_index(self):
+        """Test that routes are extracted across files and parse results are cached by blob"""
+        import git
+        import sqlite3
+        from tools.git_analyzer import GitRepositoryAnalyzerTool
+
+        with tempfile.TemporaryDirectory() as repo_dir:
+            repo = git.Repo.init(repo_dir)
+
+            def write(path, content):
+                full_path = os.path.join(repo_dir, path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'w') as f:
+                    f.write(content)
+                repo.index.add([path])
+
+            write('app/users.py', (
+                "from fastapi import APIRouter, Header\n"
+                "from pydantic import BaseModel\n"
+                "router = APIRouter(prefix='/users')\n"
+                "class User(BaseModel):\n"
+                "    name: str\n"
+                "@router.get('/{user_id}')\n"
+                "def get_user(user_id: int, verbose: bool = False, x_token: str = Header(None)):\n"
+                "    pass\n"
+                "@router.post('/')\n"
+                "def create_user(user: User):\n"
+                "    pass\n"
+            ))
+            write('app/main.py', (
+                "from fastapi import FastAPI\n"
+                "from app.users import router\n"
+                "app = FastAPI()\n"
+                "app.include_router(router, prefix='/v1')\n"
+            ))
+            write('legacy/views.py', (
+                "from flask import Flask\n"
+                "app = Flask(__name__)\n"
+                "@app.route('/orders/<int:order_id>', methods=['GET', 'DELETE'])\n"
+                "def order(order_id):\n"
+                "    pass\n"
+            ))
+            repo.index.commit("Initial commit")
+
+            db_path = os.path.join(repo_dir, '.git', 'analysis.db')
+            git_tool = GitRepositoryAnalyzerTool(analysis_store_url='sqlite:///' + db_path)
+            result = json.loads(git_tool._run(repo_path=repo_dir))
+
+            write('app/main.py', (
+                "from fastapi import FastAPI\n"
+                "from app.users import router\n"
+                "app = FastAPI()\n"
+                "app.include_router(router, prefix='/v2')\n"
+            ))
+            repo.index.commit("Bump API version")
+            updated = json.loads(git_tool._run(repo_path=repo_dir))
+
+            connection = sqlite3.connect(db_path)
+            cached_blobs = connection.execute("SELECT COUNT(*) FROM endpoint_cache").fetchone()[0]
+            connection.close()
+
+        routes = {(e['method'], e['path']): e for e in result['endpoint_index']}
+        self.assertEqual(set(routes), {
+            ('GET', '/v1/users/{user_id}'), ('POST', '/v1/users/'),
+            ('GET', '/orders/<int:order_id>'), ('DELETE', '/orders/<int:order_id>')
+        }, "Router prefixes and include_router mounts should be resolved")
+        get_user = routes[('GET', '/v1/users/{user_id}')]
+        self.assertEqual(get_user['file'], 'app/users.py')
+        self.assertEqual([(p['name'], p['in']) for p in get_user['params']],
+                         [('user_id', 'path'), ('verbose', 'query'), ('x_token', 'header')])
+        self.assertEqual([(p['name'], p['in']) for p in routes[('POST', '/v1/users/')]['params']],
+                         [('user', 'body')])
+        self.assertIn(('GET', '/v2/users/{user_id}'), {(e['method'], e['path']) for e in updated['endpoint_index']})
+        # Only the changed main.py blob should have been parsed on the second run
+        self.assertEqual(cached_blobs, 4, "Unchanged blobs should be served from the endpoint cache")
+
+    def test_17_metrics_engine_vectorized_analysis(self):
+        """Test that columnar aggregation and merging match a plain per-point computation"""
+        from tools.metrics_engine import MetricsAggregate, MetricsFrame, aggregate_frames
+        from tools.performance_metrics import PerformanceMetricsTool
+
+        records = []
+        for i in range(20):
+            records.append({"timestamp": f"2024-01-01T00:{i:02d}:00", "endpoint": "/api/users",
+                            "response_time_ms": 100.0 + i * 20, "requests_per_minute": 60,
+                            "error_rate": 1.0 if i % 2 else 3.0, "cpu_usage": 50.0 + i * 2,
+                            "memory_usage": 40.0})
+        records.append({"timestamp": "2024-01-01T00:30:00", "endpoint": "/api/auth",
+                        "response_time_ms": 80.0, "requests_per_minute": 5, "error_rate": 0.0,
+                        "cpu_usage": None, "memory_usage": 30.0})
+
+        analysis = PerformanceMetricsTool()._analyze_metrics(records)
+        users = analysis["/api/users"]
+        self.assertEqual(users["average_response_time_ms"], 290.0)
+        self.assertEqual(users["performance_issues"], {
+            "slow_responses_count": 9, "high_error_rate_count": 10, "high_cpu_usage_count": 4
+        })
+        self.assertEqual(users["trend"], "degrading", "Rising response times should degrade")
+        self.assertIsNone(analysis["/api/auth"]["average_cpu_usage_percent"],
+                          "Missing metrics should not be averaged as zero")
+        self.assertEqual(analysis["/api/auth"]["trend"], "stable")
+
+        # Aggregating in batches and merging must give the same summary
+        frame = MetricsFrame.from_records(records)
+        whole = MetricsAggregate.from_frame(frame)
+        merged = aggregate_frames(
+            MetricsFrame.from_records(records[start:start + 6]) for start in range(0, len(records), 6)
+        )
+        self.assertEqual(merged.endpoints, whole.endpoints)
+        self.assertEqual(merged.counts.tolist(), whole.counts.tolist())
+        self.assertEqual(merged.tails[0].tolist(), [400.0, 420.0, 440.0, 460.0, 480.0])
+        self.assertEqual(merged.trend(0), whole.trend(0))
+
+    def test_18_latency_percentiles_and_histograms(self):
+        """Test that latency sketches give accurate, mergeable percentiles and histograms"""
+        import numpy as np
+        from tools.metrics_engine import LatencySketch, MetricsAggregate, MetricsFrame
+        from tools.performance_metrics import PerformanceMetricsTool
+
+        values = np.arange(1, 10001, dtype=np.float64)
+        sketch = LatencySketch.from_values(values)
+        estimates = sketch.quantiles([0.5, 0.99, 0.999])[0]
+        for estimate, exact in zip(estimates, [5000, 9900, 9990]):
+            self.assertLess(abs(estimate / exact - 1), 0.01, "Quantiles should be within 1%")
+
+        halves = LatencySketch.from_values(values[:5000]).merge(LatencySketch.from_values(values[5000:]))
+        self.assertTrue(np.array_equal(halves.counts, sketch.counts), "Merged sketches should equal one pass")
+
+        frame = MetricsFrame(["/api/users"], np.zeros(len(values)), np.arange(len(values)),
+                             {"response_time_ms": values})
+        tool = PerformanceMetricsTool(slow_threshold_ms=9000)
+        analysis = tool._analyze_aggregate(MetricsAggregate.from_frame(frame, tool._issue_thresholds()))
+        users = analysis["/api/users"]
+        self.assertEqual(set(users["response_time_percentiles_ms"]), {"p50", "p90", "p99", "p99.9"})
+        self.assertEqual(users["performance_issues"]["slow_responses_count"], 1000)
+        histogram = {bucket["le_ms"]: bucket["count"] for bucket in users["response_time_histogram"]}
+        self.assertEqual(histogram[10], 10)
+        self.assertEqual(histogram[10000], 5000)
+        self.assertEqual(sum(histogram.values()), 10000)
+
+    def test_19_access_log_ingestion(self):
+        """Test streaming nginx (gzip) and JSON-lines access logs into the metrics engine"""
+        import gzip
+        from tools.log_ingestion import AccessLogReader
+        from tools.metrics_engine import aggregate_frames
+        from tools.performance_metrics import PerformanceMetricsTool
+
+        nginx_lines = [
+            f'10.0.0.1 - - [10/Oct/2023:13:{minute:02d}:00 +0000] "GET /api/users/{minute}?page=1 HTTP/1.1" '
+            f'{503 if minute % 4 == 0 else 200} 512 "-" "curl/8.0" 0.{minute + 10:03d}\n'
+            for minute in range(20)
+        ]
+        nginx_lines.insert(5, 'not an access log line\n')
+        # A line with a malformed time is skipped, not the log
+        nginx_lines.insert(12, '10.0.0.1 - - [10/Oct/2023:13:55:37] "GET /api/users/9 HTTP/1.1" 503 512 "-" "curl/8.0" 9.0\n')
+
+        with tempfile.TemporaryDirectory() as log_dir:
+            nginx_path = os.path.join(log_dir, 'access.log.gz')
+            with gzip.open(nginx_path, 'wt') as f:
+                f.writelines(nginx_lines)
+            json_path = os.path.join(log_dir, 'access.jsonl')
+            with open(json_path, 'w') as f:
+                f.write('{"timestamp": "2023-10-10T13:00:00Z", "path": "/api/items/7", "status": 200, "duration_ms": 40}\n')
+                f.write('{"ts": 1696943100, "uri": "/api/items/8?x=1", "status_code": 500, "request_time": 0.06}\n')
+                # Values that are not numbers skip their record, not the log
+                f.write('{"timestamp": "2023-10-10T13:01:00Z", "path": "/api/items/9", "status": "-", "duration_ms": 5}\n')
+                f.write('{"timestamp": "2023-10-10T13:02:00Z", "path": "/api/items/9", "status": 200, "duration_ms": "12ms"}\n')
+
+            result = json.loads(PerformanceMetricsTool()._run(log_path=nginx_path))
+            json_result = json.loads(PerformanceMetricsTool()._run(log_path=json_path))
+            # Chunk boundaries must not change the result
+            small_chunks = aggregate_frames(AccessLogReader(nginx_path, chunk_size=64).frames())
+
+        self.assertEqual(result["ingestion"]["format"], "nginx")
+        self.assertEqual(result["ingestion"]["parsed_lines"], 20)
+        self.assertEqual(result["ingestion"]["skipped_lines"], 2, "Malformed lines and times are skipped")
+        users = result["analysis"]["/api/users/{id}"]
+        self.assertEqual(users["average_error_rate_percent"], 25.0, "One in four requests was a 5xx")
+        self.assertEqual(users["average_response_time_ms"], 19.5)
+        self.assertEqual(users["average_requests_per_minute"], round(20 / 19, 2))
+        self.assertEqual(small_chunks.counts.tolist(), [20])
+        self.assertEqual(small_chunks.tails[0].tolist(), [25.0, 26.0, 27.0, 28.0, 29.0])
+
+        self.assertEqual(json_result["ingestion"]["format"], "json")
+        self.assertEqual(json_result["ingestion"]["parsed_lines"], 2)
+        self.assertEqual(json_result["ingestion"]["skipped_lines"], 2, "Records with malformed values are skipped")
+        items = json_result["analysis"]["/api/items/{id}"]
+        self.assertEqual(items["average_response_time_ms"], 50.0)
+        self.assertEqual(items["average_error_rate_percent"], 50.0)
+
+    def test_20_rollup_store_queries(self):
+        """Test that rollup queries over minute/hour/day tiers match the raw log analysis"""
+        from datetime import datetime, timedelta, timezone
+        import numpy as np
+        from tools.metrics_engine import MetricsFrame
+        from tools.performance_metrics import PerformanceMetricsTool
+        from tools.rollup_store import RollupStore
+
+        now = datetime.now(timezone.utc)
+        nginx_lines = [
+            f'10.0.0.1 - - [{(now - timedelta(minutes=90 - minute)).strftime("%d/%b/%Y:%H:%M:%S +0000")}] '
+            f'"GET /api/orders/{minute} HTTP/1.1" {500 if minute % 5 == 0 else 200} 512 "-" "curl/8.0" '
+            f'0.{minute + 100:03d}\n'
+            for minute in range(90)
+        ]
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            log_path = os.path.join(work_dir, 'access.log')
+            with open(log_path, 'w') as f:
+                f.writelines(nginx_lines)
+            store_dir = os.path.join(work_dir, 'rollups')
+            tool = PerformanceMetricsTool(rollup_store_dir=store_dir)
+            from_log = json.loads(tool._run(log_path=log_path))
+            # Ingesting the same log again appends nothing to the rollups
+            again = json.loads(tool._run(log_path=log_path))
+            from_rollups = json.loads(tool._run(duration_hours=24))
+            with open(log_path, 'a') as f:
+                f.write(nginx_lines[-1].replace('/api/orders/89', '/api/orders/90'))
+            appended = json.loads(tool._run(log_path=log_path))
+
+            # A 40 day range is split over every tier; the minute tier only covers its retention
+            store = RollupStore(os.path.join(work_dir, 'tiers'), retention_days={"minute": 1})
+            end = 1700000000
+            frame = MetricsFrame(["/api/a"], np.zeros(3, dtype=np.int64), np.array([end - 86400 * 30, end - 7200, end - 30.0]),
+                                 {"response_time_ms": np.array([100.0, 200.0, 300.0])})
+            store.append_frame(frame)
+            plan = store.plan(end - 86400 * 40, end, now=end)
+            total = store.query(end - 86400 * 40, end, now=end)
+            removed = store.apply_retention(now=end + 86400 * 400)
+
+        # Regression detection needs the point stream, which the rollups no longer have
+        detected = ("trend", "regressions")
+        self.assertEqual(
+            {endpoint: {key: value for key, value in result.items() if key not in detected}
+             for endpoint, result in from_rollups["analysis"].items()},
+            {endpoint: {key: value for key, value in result.items() if key not in detected}
+             for endpoint, result in from_log["analysis"].items()},
+            "Rollups must reproduce the log analysis"
+        )
+        self.assertEqual(from_rollups["analysis"]["/api/orders/{id}"]["average_error_rate_percent"], 20.0)
+        self.assertEqual(from_log["ingestion"]["rollups"], {"resumed_at_byte": 0, "recorded_rows": 90})
+        self.assertEqual(again["ingestion"]["rollups"]["recorded_rows"], 0, "Ingestion is idempotent")
+        self.assertEqual(again["analysis"], from_log["analysis"], "The whole log is still analyzed")
+        self.assertEqual(appended["ingestion"]["rollups"],
+                         {"resumed_at_byte": from_log["ingestion"]["bytes"], "recorded_rows": 1})
+        self.assertTrue(from_rollups["rollups"]["pieces"], "The query plan should be reported")
+
+        self.assertEqual([tier for tier, _, _ in plan], ["hour", "day", "hour", "minute"])
+        self.assertEqual(total.counts.tolist(), [3])
+        self.assertEqual(total.mean("response_time_ms", 0), 200.0)
+        self.assertTrue(any(os.sep + 'minute' + os.sep in path for path in removed),
+                        "Minute segments past retention should be deleted")
+
+    def test_21_streaming_regression_detection(self):
+        """Test that the online detector flags latency and error regressions with change points"""
+        import numpy as np
+        from tools.metrics_engine import MetricsFrame
+        from tools.performance_metrics import PerformanceMetricsTool
+        from tools.regression_detector import RegressionDetector
+
+        rng = np.random.default_rng(7)
+        start = 1700000000.0 // 60 * 60
+        minutes, per_minute = 120, 30
+        codes = np.tile(np.repeat(np.arange(3), per_minute), minutes)
+        timestamps = start + np.repeat(np.arange(minutes) * 60.0, 3 * per_minute) + np.tile(
+            np.tile(np.arange(per_minute) * 2.0, 3), minutes)
+        late = timestamps >= start + 80 * 60
+        # /api/slow gets 60% slower and /api/failing starts failing 40% of requests at minute 80
+        response_times = rng.normal(100.0, 10.0, len(codes)) * np.where(late & (codes == 1), 1.6, 1.0)
+        errors = np.where(late & (codes == 2), rng.random(len(codes)) < 0.4, False) * 100.0
+        frame_rows = np.array_split(np.argsort(timestamps, kind="stable"), 7)
+
+        detector = RegressionDetector()
+        events = []
+        for rows in frame_rows:
+            events += detector.update(MetricsFrame(["/api/steady", "/api/slow", "/api/failing"], codes[rows],
+                                                   timestamps[rows], {"response_time_ms": response_times[rows],
+                                                                      "error_rate": errors[rows]}))
+        events += detector.flush()
+
+        found = {(event["endpoint"], event["metric"]): event for event in events}
+        self.assertEqual(set(found), {("/api/slow", "response_time_ms"), ("/api/failing", "error_rate")},
+                         "Only the injected regressions should be flagged")
+        for event in found.values():
+            self.assertEqual(event["direction"], "regression")
+            self.assertEqual(event["change_point"], start + 80 * 60, "The change point is the first shifted minute")
+            self.assertLessEqual(event["detected_at"] - event["change_point"], 5 * 60)
+        self.assertEqual(detector.trend("/api/slow"), "degrading")
+        self.assertEqual(detector.trend("/api/steady"), "stable")
+        self.assertEqual(detector.trend("/api/failing", "error_rate"), "degrading")
+        self.assertIsNone(detector.trend("/api/unknown"))
+
+        records = [
+            {"timestamp": start + minute * 60, "endpoint": "/api/orders",
+             "response_time_ms": 100.0 + (minute % 3) + (150.0 if minute >= 40 else 0.0), "error_rate": 0.0}
+            for minute in range(60)
+        ]
+        analysis = PerformanceMetricsTool()._analyze_metrics(records)["/api/orders"]
+        self.assertEqual(analysis["trend"], "degrading")
+        self.assertEqual([regression["metric"] for regression in analysis["regressions"]], ["response_time_ms"])
+
+    def test_22_contract_spec_diff(self):
+        """Test breaking change detection between two real OpenAPI/Swagger documents"""
+        import copy
+        from tools.contract_validator import ContractValidatorTool
+
+        user = {"type": "object", "required": ["id"], "properties": {
+            "id": {"type": "string"}, "status": {"type": "string", "enum": ["active", "banned"]},
+            "nickname": {"type": "string"}}}
+        new_user = {"type": "object", "properties": {"email": {"type": "string"}, "age": {"type": "number"}}}
+        node = {"type": "object", "properties": {"children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}}}
+        user_response = {"description": "OK", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/User"}}}}
+        old_spec = {
+            "openapi": "3.0.3", "info": {"title": "Users", "version": "1.0.0"},
+            "paths": {
+                "/users": {
+                    "get": {"parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer", "maximum": 100}}],
+                            "responses": {"200": user_response, "401": {"description": "Unauthorized"}}},
+                    "post": {"requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/NewUser"}}}},
+                             "responses": {"201": user_response}}
+                },
+                "/users/{id}": {
+                    "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+                    "get": {"responses": {"200": user_response}},
+                    "delete": {"responses": {"204": {"description": "Deleted"}}}
+                },
+                "/legacy": {"get": {"responses": {"200": user_response}}},
+                "/tree": {"get": {"responses": {"200": {"description": "OK", "content": {
+                    "application/json": {"schema": {"$ref": "#/components/schemas/Node"}}}}}}}
+            },
+            "components": {"schemas": {"User": user, "NewUser": new_user, "Node": node}}
+        }
+        new_spec = copy.deepcopy(old_spec)
+        new_spec["info"]["version"] = "2.0.0"
+        paths, schemas = new_spec["paths"], new_spec["components"]["schemas"]
+        del paths["/legacy"]
+        # Renaming a path parameter is not a change; removing DELETE is
+        paths["/users/{userId}"] = paths.pop("/users/{id}")
+        paths["/users/{userId}"]["parameters"][0]["name"] = "userId"
+        del paths["/users/{userId}"]["delete"]
+        paths["/users"]["get"]["parameters"][0]["schema"]["maximum"] = 50
+        paths["/users"]["get"]["parameters"].append({"name": "X-Tenant", "in": "header", "required": True, "schema": {"type": "string"}})
+        del paths["/users"]["get"]["responses"]["401"]
+        schemas["NewUser"]["required"] = ["email"]
+        schemas["NewUser"]["properties"]["age"]["type"] = "integer"
+        del schemas["User"]["properties"]["nickname"]
+        # Documentation-only edits inside a recursive schema are ignored
+        schemas["Node"]["properties"]["children"]["description"] = "Child nodes"
+        paths["/orders"] = {"get": {"responses": {"200": {"description": "OK"}}}}
+
+        with tempfile.TemporaryDirectory() as spec_dir:
+            old_path = os.path.join(spec_dir, 'v1.json')
+            new_path = os.path.join(spec_dir, 'v2.yaml')
+            with open(old_path, 'w') as f:
+                json.dump(old_spec, f)
+            with open(new_path, 'w') as f:
+                f.write("# YAML version of the spec\n" + json.dumps(new_spec))
+            result = json.loads(ContractValidatorTool()._run(api_spec_path=new_path, previous_version=old_path))
+            # A version label is not compared, and a previous spec that is not there is an error
+            labelled = json.loads(ContractValidatorTool()._run(api_spec_path=new_path, previous_version="1.2.0"))
+            missing = ContractValidatorTool()._run(api_spec_path=new_path,
+                                                   previous_version=os.path.join(spec_dir, 'v0.json'))
+
+        validation = result["contract_validation"]
+        found = {(change["type"], change["endpoint"], change.get("location")) for change in validation["breaking_changes"]}
+        self.assertEqual(found, {
+            ("removed_path", "/legacy", None),
+            ("removed_operation", "DELETE /users/{id}", None),
+            ("narrowed_type", "GET /users", "query parameter 'limit'"),
+            ("new_required_parameter", "GET /users", "header parameter 'X-Tenant'"),
+            ("removed_response_code", "GET /users", "response 401"),
+            ("response_schema_changed", "GET /users", "response 200.nickname"),
+            ("new_required_parameter", "POST /users", "request body.email"),
+            ("narrowed_type", "POST /users", "request body.age"),
+            ("response_schema_changed", "POST /users", "response 201.nickname"),
+            ("response_schema_changed", "GET /users/{id}", "response 200.nickname"),
+        })
+        self.assertEqual([change["type"] for change in validation["non_breaking_changes"]], ["added_path"])
+        self.assertEqual(validation["previous_version"], "1.0.0")
+        self.assertEqual(validation["total_endpoints"], 5)
+        self.assertEqual(validation["compatibility_score"], round(100 / 6, 2),
+                         "Only GET /tree of the six previous operations is unaffected")
+        self.assertEqual(validation["validation_issues"][0]["type"], "missing_response_schema")
+        self.assertEqual(result["analysis"]["compatibility_status"], "BREAKING_CHANGES")
+
+        self.assertIsNone(labelled["contract_validation"]["compatibility_score"])
+        self.assertEqual(labelled["contract_validation"]["breaking_changes"], [])
+        self.assertEqual(labelled["analysis"]["compatibility_status"], "NOT_COMPARED",
+                         "A version label should not be reported compatible")
+        self.assertTrue(missing.startswith("Contract validation failed:"), missing)
+        self.assertIn("v0.json", missing)
+
+    def test_23_schema_resolver(self):
+        """Test shared $ref resolution, schema interning and the resolver-backed documentation builder"""
+        from tools.documentation_builder import DocumentationBuilderTool
+        from tools.schema_resolver import LRUCache, SchemaResolver
+        from tools.spec_diff import index_spec_file
+
+        spec = {
+            "openapi": "3.0.3", "info": {"title": "Shop", "version": "1.0.0"},
+            "paths": {
+                "/users/{id}": {
+                    "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+                    "get": {"summary": "Get user", "responses": {"200": {"description": "OK", "content": {
+                        "application/json": {"schema": {"$ref": "#/components/schemas/User"}}}}}}
+                },
+                "/tree": {"get": {"responses": {"200": {"description": "OK", "content": {
+                    "application/json": {"schema": {"$ref": "#/components/schemas/Node"}}}}}}}
+            },
+            "components": {"schemas": {
+                "User": {"type": "object", "required": ["name", "id"],
+                         "properties": {"id": {"type": "string"}, "name": {"type": ["string"]}}},
+                # Same schema in another key order, with a default-valued keyword
+                "Person": {"properties": {"name": {"type": "string"}, "id": {"type": "string"}},
+                           "required": ["id", "name"], "nullable": False, "type": "object"},
+                "Node": {"type": "object", "properties": {"children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}}}
+            }}
+        }
+
+        resolver = SchemaResolver(spec, cache=LRUCache(1000))
+        user = resolver.normalize({"$ref": "#/components/schemas/User"})
+        self.assertIs(user, resolver.normalize(spec["components"]["schemas"]["Person"]), "Identical schemas should be interned")
+        self.assertEqual(user["required"], ["id", "name"])
+        self.assertEqual(user["properties"]["name"], {"type": "string"})
+        node = resolver.normalize({"$ref": "#/components/schemas/Node"})
+        self.assertEqual(node["properties"]["children"]["items"], {"$ref": "#/components/schemas/Node"})
+        self.assertEqual(resolver.cycles, {"#/components/schemas/Node"})
+        self.assertEqual(resolver.fingerprint(spec["components"]["schemas"]["User"]),
+                         resolver.fingerprint({"$ref": "#/components/schemas/User"}))
+
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertNotIn("b", cache, "The least recently used entry should be evicted")
+        self.assertEqual(len(cache), 2)
+
+        with tempfile.TemporaryDirectory() as spec_dir:
+            spec_path = os.path.join(spec_dir, 'openapi.json')
+            with open(spec_path, 'w') as f:
+                json.dump(spec, f)
+            self.assertIs(index_spec_file(spec_path), index_spec_file(spec_path), "Unchanged spec files should be indexed once")
+            doc_tool = DocumentationBuilderTool()
+            openapi = json.loads(doc_tool._run(api_spec_path=spec_path))["generated_documentation"]
+            markdown = json.loads(doc_tool._run(api_endpoints=["/users/{id}"], format_type="markdown",
+                                                api_spec_path=spec_path))["generated_documentation"]
+
+        response = openapi["paths"]["/users/{id}"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        self.assertEqual(response["properties"]["id"], {"type": "string"}, "Schemas should be dereferenced")
+        self.assertEqual(list(openapi["components"]["schemas"]), ["Node"], "Only recursive schemas stay components")
+        self.assertEqual(markdown["operations"], 1)
+        self.assertIn("| id | path | string | Yes |", markdown["content"])
+        self.assertIn('"required": [', markdown["content"])
+
+    def test_24_lazy_spec_loader(self):
+        """Test that JSON specs are decoded lazily and behave like json.load output"""
+        import copy
+        from tools.documentation_builder import DocumentationBuilderTool
+        from tools.spec_diff import SpecIndex, index_spec_file, load_spec
+        from tools.spec_loader import LazyDict
+
+        spec = {
+            "openapi": "3.0.3", "info": {"title": "Orders", "version": "2.1.0"},
+            "paths": {
+                f"/orders/{index}": {"get": {"summary": f"Order {index}", "parameters": [
+                    {"name": "verbose", "in": "query", "schema": {"type": "boolean"}}],
+                    "responses": {"200": {"description": "OK \u00e9", "content": {"application/json": {
+                        "schema": {"$ref": "#/components/schemas/Order"}}}}}}}
+                for index in range(50)
+            },
+            "components": {"schemas": {
+                "Order": {"type": "object", "properties": {"id": {"type": "string"}, "lines": {"type": "array", "items": {"type": "integer"}}}},
+                "Unused": {"type": "string", "enum": ["a", "b"]}
+            }}
+        }
+
+        with tempfile.TemporaryDirectory() as spec_dir:
+            spec_path = os.path.join(spec_dir, 'openapi.json')
+            with open(spec_path, 'w') as f:
+                json.dump(spec, f, indent=2)
+
+            lazy = load_spec(spec_path)
+            self.assertIsInstance(lazy, LazyDict)
+            undecoded = lazy.pending
+            self.assertGreater(undecoded, 50, "Nothing should be decoded before it is read")
+            self.assertEqual(lazy["paths"]["/orders/7"]["get"]["summary"], "Order 7")
+            self.assertEqual(lazy.pending, undecoded - 1)
+            self.assertEqual(lazy, spec, "A lazy spec should equal the json.load result")
+            self.assertEqual(json.loads(json.dumps(lazy)), spec)
+            self.assertIs(type(copy.deepcopy(lazy)), dict)
+            self.assertEqual(lazy.pending, 0)
+
+            eager = SpecIndex(copy.deepcopy(spec))
+            indexed = SpecIndex(load_spec(spec_path))
+            self.assertEqual({key: operation["fingerprint"] for key, operation in indexed.operations.items()},
+                             {key: operation["fingerprint"] for key, operation in eager.operations.items()})
+
+            result = json.loads(DocumentationBuilderTool()._run(api_endpoints=["/orders/3"], format_type="markdown",
+                                                                api_spec_path=spec_path))
+            self.assertEqual(result["generated_documentation"]["operations"], 1)
+            cached = index_spec_file(spec_path).spec
+            self.assertEqual(dict.__len__(cached["paths"]) - cached["paths"].pending, 1,
+                             "Documenting one path should only decode that path item")
+            self.assertEqual(cached["components"]["schemas"].pending, 1, "Unreferenced schemas should stay undecoded")
+
+    def test_25_contract_history_timeline(self):
+        """Test validating every version of a spec along the git history, inline and in a process pool"""
+        import git
+        from tools.contract_validator import ContractValidatorTool
+
+        with tempfile.TemporaryDirectory() as repo_dir:
+            repo = git.Repo.init(repo_dir)
+            spec_path = os.path.join(repo_dir, 'api', 'openapi.json')
+            os.makedirs(os.path.dirname(spec_path))
+
+            def commit(message, spec=None):
+                if spec is not None:
+                    with open(spec_path, 'w') as f:
+                        f.write(spec if isinstance(spec, str) else json.dumps(spec))
+                    repo.index.add(['api/openapi.json'])
+                with open(os.path.join(repo_dir, 'README'), 'a') as f:
+                    f.write(message)
+                repo.index.add(['README'])
+                return repo.index.commit(message).hexsha
+
+            paths = {"/users": {"get": {"responses": {"200": {"description": "OK"}}}}}
+            for number in range(1, 11):
+                paths[f"/v{number}"] = {"get": {"responses": {"200": {"description": "OK"}}}}
+                if number == 4:
+                    del paths["/users"]
+                commit(f"Version {number}", {"openapi": "3.0.3", "info": {"title": "Users", "version": f"{number}.0"},
+                                             "paths": dict(paths)})
+            commit("Unrelated change")
+            commit("Broken spec", "{not json")
+            commit("Fixed spec", {"openapi": "3.0.3", "info": {"title": "Users", "version": "11.0"}, "paths": paths})
+
+            pooled = json.loads(ContractValidatorTool(history_workers=2, history_chunk_size=3)._run(
+                api_spec_path='api/openapi.json', repo_path=repo_dir))
+            inline = json.loads(ContractValidatorTool(history_workers=1)._run(
+                api_spec_path='api/openapi.json', repo_path=repo_dir))
+
+        validation = pooled["contract_validation"]
+        history = validation["history"]
+        self.assertEqual(history, inline["contract_validation"]["history"], "Pooled and inline validation should agree")
+        self.assertEqual([entry["message"] for entry in history["timeline"]],
+                         [f"Version {number}" for number in range(1, 11)] + ["Broken spec", "Fixed spec"],
+                         "Commits that do not touch the spec should not appear")
+        self.assertEqual(history["comparisons"], 11)
+        self.assertEqual(history["breaking_commits"], 1)
+        breaking = [entry for entry in history["timeline"] if entry.get("breaking_changes")][0]
+        self.assertEqual((breaking["message"], breaking["previous_version"], breaking["version"]), ("Version 4", "3.0", "4.0"))
+        self.assertEqual(history["timeline"][0]["event"], "added")
+        self.assertIn("JSONDecodeError", history["timeline"][-2]["error"])
+        self.assertIn("could not be parsed", history["timeline"][-1]["error"])
+        self.assertEqual(validation["breaking_changes"][0]["type"], "removed_path")
+        self.assertEqual(validation["breaking_changes"][0]["commit"], breaking["commit"])
+        self.assertEqual(validation["current_version"], "11.0")
+        self.assertEqual(validation["total_endpoints"], 10)
+
+    def test_26_security_rule_engine(self):
+        """Test OWASP API Top 10 rules over an OpenAPI spec and a repository's route handlers"""
+        import git
+        from tools.security_rules import RULES, RuleSet
+        from tools.security_scanner import SecurityScannerTool
+
+        spec = {
+            "openapi": "3.0.3", "info": {"title": "Shop", "version": "1.0"},
+            "security": [{"apiKey": []}],
+            "components": {
+                "securitySchemes": {"apiKey": {"type": "apiKey", "in": "header", "name": "X-API-Key"}},
+                "schemas": {"User": {"type": "object", "properties": {
+                    "name": {"type": "string"}, "password": {"type": "string"},
+                    "api_key": {"type": "string", "writeOnly": True}, "avatar_hash": {"type": "string"},
+                    "manager": {"$ref": "#/components/schemas/User"}}},
+                    "PageSize": {"type": "integer", "maximum": 100}},
+            },
+            "paths": {
+                "/users": {"get": {
+                    "security": [],
+                    "parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer"}}],
+                    "responses": {"200": {"description": "OK", "content": {"application/json": {
+                        "schema": {"type": "array", "items": {"$ref": "#/components/schemas/User"}}}}}}}},
+                "/orders": {"get": {
+                    "parameters": [{"name": "page_size", "in": "query", "schema": {"$ref": "#/components/schemas/PageSize"}}],
+                    "responses": {"200": {"description": "OK", "headers": {"X-RateLimit-Remaining": {}},
+                                          "content": {"application/json": {"schema": {"type": "array", "items": {}}}}}}}},
+                "/health": {"get": {"security": [], "responses": {"200": {"description": "OK"}, "429": {"description": "Slow down"}}}},
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as repo_dir:
+            spec_path = os.path.join(repo_dir, 'openapi.json')
+            with open(spec_path, 'w') as f:
+                json.dump(spec, f)
+            repo = git.Repo.init(repo_dir)
+            with open(os.path.join(repo_dir, 'app.py'), 'w') as f:
+                f.write(
+                    "from fastapi import FastAPI, Depends, Query\n"
+                    "app = FastAPI()\n"
+                    "@app.get('/items')\n"
+                    "def items(limit: int = Query(20, le=100), user=Depends(get_current_user)):\n"
+                    "    pass\n"
+                    "@app.delete('/items/{item_id}')\n"
+                    "def delete_item(item_id: int, page_size: int = 10):\n"
+                    "    pass\n"
+                    "@app.post('/exports')\n"
+                    "@require_http_methods(['POST'])\n"
+                    "def export(csrf_token: str):\n"
+                    "    pass\n"
+                )
+            repo.index.add(['app.py'])
+            repo.index.commit("Add handlers")
+
+            result = json.loads(SecurityScannerTool(incremental=False, endpoint_workers=1)._run(api_spec_path=spec_path, repo_path=repo_dir))
+
+        assessment = result["security_assessment"]
+        found = {(f["id"], f["endpoint"]) for f in assessment["vulnerabilities"]}
+        self.assertEqual(found, {
+            ("API2-001", "GET /users"), ("API4-001", "GET /users"), ("API4-002", "GET /users"),
+            ("API3-001", "GET /users"), ("API2-001", "DELETE /items/{item_id}"), ("API2-001", "POST /exports"),
+        }, "Only the expected rules should fire; require_http_methods is no authentication guard")
+        exposure = [f for f in assessment["vulnerabilities"] if f["id"] == "API3-001"]
+        self.assertEqual(len(exposure), 1, "writeOnly fields and recursive references should not be reported twice")
+        self.assertIn("'password'", exposure[0]["description"])
+        self.assertEqual(assessment["scanned_operations"], 3)
+        self.assertEqual(assessment["scanned_handlers"], 3)
+        self.assertEqual(assessment["high_findings"], 4)
+        self.assertTrue(assessment["vulnerabilities"][-1]["location"].startswith("app.py:"))
+
+        # Rules are indexed by the node types they check, each type once
+        ruleset = RuleSet(RULES)
+        self.assertEqual({rule.id for rule, _ in ruleset.by_type["handler"]}, {"API2-001", "API4-001"})
+        self.assertEqual(ruleset.version, RuleSet(reversed(RULES)).version)
+
+    def test_27_findings_accumulator(self):
+        """Test one-pass severity counts, scorecards and merging of findings accumulated in shards"""
+        import pickle
+        from tools.security_findings import FindingsAccumulator
+        from tools.security_scanner import SecurityScannerTool
+
+        severities = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+        findings = [
+            {"id": f"R{number % 3}", "severity": severities[number % 4], "owasp_category": f"Category {number % 2}",
+             "endpoint": f"GET /items/{number % 5}", "description": f"Finding {number}"}
+            for number in range(200)
+        ]
+        single = FindingsAccumulator(top_n=5)
+        single.extend(findings[:120], "orders").extend(findings[120:], "users")
+        single.record_scanned("orders", 40)
+        single.record_scanned("users", 10)
+
+        shards = []
+        for start in range(0, 200, 50):
+            shard = FindingsAccumulator(top_n=5)
+            shard.extend([f for f in findings[start:start + 50] if findings.index(f) < 120], "orders")
+            shard.extend([f for f in findings[start:start + 50] if findings.index(f) >= 120], "users")
+            shards.append(pickle.loads(pickle.dumps(shard)))
+        merged = shards[0]
+        for shard in shards[1:]:
+            merged = merged.merge(shard)
+        merged.record_scanned("orders", 40)
+        merged.record_scanned("users", 10)
+
+        scorecard = single.scorecard()
+        self.assertEqual(scorecard["total_findings"], 200)
+        self.assertEqual(scorecard["by_severity"], {"CRITICAL": 50, "HIGH": 50, "MEDIUM": 50, "LOW": 50})
+        self.assertEqual(scorecard["apis"]["users"]["total_findings"], 80)
+        self.assertEqual(scorecard["by_rule"]["R0"], 67)
+        self.assertEqual(scorecard["risk_score"], 50 * (10 + 5 + 2 + 1))
+        self.assertGreater(scorecard["apis"]["orders"]["security_score"], scorecard["apis"]["users"]["security_score"],
+                           "More risk per scanned operation should score lower")
+        self.assertEqual([f["description"] for f in scorecard["top_findings"]],
+                         ["Finding 3", "Finding 7", "Finding 11", "Finding 15", "Finding 19"],
+                         "The earliest CRITICAL findings should be kept")
+        # Every endpoint cycles through all severities: 6 x (10 + 5 + 2 + 1) risk points each in "orders"
+        self.assertEqual((scorecard["top_endpoints"][0]["api"], scorecard["top_endpoints"][0]["risk"]), ("orders", 108))
+        self.assertEqual(merged.scorecard(), scorecard, "Merged shards should match a single pass")
+
+        result = json.loads(SecurityScannerTool()._run(scan_type="owasp"))
+        analysis = result["analysis"]
+        self.assertEqual(sum(analysis["by_severity"].values()), result["security_assessment"]["total_findings"])
+        self.assertEqual(analysis["by_severity"]["HIGH"], result["security_assessment"]["high_findings"])
+        self.assertIn("recommendations", analysis)
+
+    def test_28_active_security_probes(self):
+        """Test safe active probes against stand-in services within per-host rate and concurrency limits"""
+        from tools.security_scanner import SecurityScannerTool
+
+        class LeakyHandler(_StandInHandler):
+            arrivals = []
+
+            def respond(self):
+                type(self).arrivals.append(time.monotonic())
+                if self.path in ('/api', '/v1', '/api/users'):
+                    status, body, content_type = 200, b'{"users": []}', 'application/json'
+                elif self.path == '/':
+                    status, body, content_type = 200, b'<html></html>', 'text/html'
+                else:
+                    status, body, content_type = 500, b'Traceback (most recent call last):', 'text/plain'
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                if self.headers.get('Origin'):
+                    self.send_header('Access-Control-Allow-Origin', self.headers['Origin'])
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_OPTIONS = respond
+
+            def version_string(self):
+                return 'nginx/1.18.0'
+
+        class HardenedHandler(LeakyHandler):
+            arrivals = []
+
+            def respond(self):
+                type(self).arrivals.append(time.monotonic())
+                self.send_response(401 if self.path in ('/api', '/v1') else 404)
+                self.send_header('RateLimit-Remaining', '99')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            do_GET = do_OPTIONS = respond
+
+            def version_string(self):
+                return 'api'
+
+        class MirrorHandler(LeakyHandler):
+            arrivals = []
+
+        spec = {"openapi": "3.0.3", "info": {"title": "Leaky", "version": "1.0"}, "security": [{"key": []}],
+                "components": {"securitySchemes": {"key": {"type": "apiKey", "in": "header", "name": "X-Key"}}},
+                "paths": {"/api/users": {"get": {"responses": {"200": {"description": "OK"}}}},
+                          "/status": {"get": {"security": [], "responses": {"200": {"description": "OK"}}}}}}
+        with _stand_in_server(LeakyHandler) as leaky, _stand_in_server(HardenedHandler) as hardened, \
+                _stand_in_server(MirrorHandler) as mirror:
+            network_scan = json.dumps({"active_services": [
+                {"ip": "127.0.0.1", "base_url": hardened, "potential_api": True},
+                {"ip": "127.0.0.1", "status": "open"},
+            ]})
+            result = json.loads(SecurityScannerTool(probe_rate_per_host=20, rate_limit_burst=5)._run(
+                base_urls=[leaky], network_scan=network_scan))
+            probes_sent = len(LeakyHandler.arrivals)
+            with tempfile.TemporaryDirectory() as spec_dir:
+                spec_path = os.path.join(spec_dir, 'openapi.json')
+                with open(spec_path, 'w') as f:
+                    json.dump(spec, f)
+                spec_tool = SecurityScannerTool(probe_rate_per_host=20, rate_limit_burst=5, incremental=False)
+                discovered_mirror = json.dumps({"active_services": [
+                    {"ip": "127.0.0.1", "base_url": mirror, "potential_api": True}]})
+                with_spec = json.loads(spec_tool._run(api_spec_path=spec_path, base_urls=[leaky],
+                                                      network_scan=discovered_mirror))
+                # A discovered service is only probed for the spec's operations when the spec names it
+                with open(spec_path, 'w') as f:
+                    json.dump(dict(spec, servers=[{"url": mirror + "/"}]), f)
+                served = json.loads(spec_tool._run(api_spec_path=spec_path, network_scan=discovered_mirror))
+
+        assessment = result["security_assessment"]
+        by_service = {}
+        for finding in assessment["vulnerabilities"]:
+            service = leaky if finding["endpoint"].startswith(leaky) else hardened
+            by_service.setdefault(service, set()).add(finding["id"])
+        self.assertEqual(by_service[leaky], {"API2-102", "API8-101", "API8-102", "API8-104", "API8-105", "API4-101"},
+                         "Every check should flag the leaky service")
+        root_access = [f for f in assessment["vulnerabilities"] if f["id"] == "API2-102"]
+        self.assertEqual({f["severity"] for f in root_access}, {"INFO"},
+                         "Public-looking root documents are informational without a known protected operation")
+        self.assertEqual(by_service[hardened], {"API8-102"}, "Only plaintext HTTP should be flagged on the hardened service")
+        checks = {service["base_url"]: service["checks"] for service in assessment["probed_services"]}
+        self.assertEqual(checks[hardened]["rate_limit"], "pass")
+        self.assertEqual(checks[hardened]["authentication"], "pass")
+        self.assertEqual(assessment["probe_requests"], probes_sent + len(HardenedHandler.arrivals))
+        # 3 auth, 1 CORS, 1 error and 5 burst requests at 20 requests/second span 0.45s (less arrival jitter)
+        self.assertEqual(probes_sent, 10)
+        self.assertGreater(LeakyHandler.arrivals[probes_sent - 1] - LeakyHandler.arrivals[0], 0.35,
+                           "Requests to one service should be paced by its rate limit")
+        self.assertIn(leaky, result["analysis"]["apis"])
+
+        # With a spec, the operations it protects are probed instead, and an answer is HIGH
+        unauthenticated = [(f["id"], f["endpoint"], f["severity"])
+                           for f in with_spec["security_assessment"]["vulnerabilities"] if f["id"].startswith("API2-1")]
+        self.assertEqual(unauthenticated, [("API2-101", leaky + "/api/users", "HIGH"),
+                                           ("API2-102", mirror + "/api", "INFO"), ("API2-102", mirror + "/v1", "INFO")],
+                         "A discovered service the spec does not name is not probed for its operations")
+        unauthenticated = [(f["id"], f["endpoint"], f["severity"])
+                           for f in served["security_assessment"]["vulnerabilities"] if f["id"].startswith("API2-1")]
+        self.assertEqual(unauthenticated, [("API2-101", mirror + "/api/users", "HIGH")])
+
+    def test_29_incremental_security_scan(self):
+        """Test re-scans that only re-evaluate operations and handlers whose content changed"""
+        import git
+        from tools.analysis_store import AnalysisStore
+        from tools.security_scanner import SecurityScannerTool
+
+        def operation(schema):
+            return {"parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer", "maximum": 50}}],
+                    "responses": {"200": {"description": "OK", "headers": {"RateLimit-Remaining": {}},
+                                          "content": {"application/json": {"schema": {"$ref": schema}}}}}}
+
+        spec = {
+            "openapi": "3.0.3", "info": {"title": "Estate", "version": "1.0"},
+            "security": [{"apiKey": []}],
+            "components": {"schemas": {
+                "Account": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Person"}}},
+                "Person": {"type": "object", "properties": {"name": {"type": "string"}}},
+                "Order": {"type": "object", "properties": {"total": {"type": "number"}}},
+            }},
+            "paths": {f"/{name.lower()}s/{{id}}": {"get": operation(f"#/components/schemas/{name}")}
+                      for name in ("Account", "Person", "Order")},
+        }
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            spec_path = os.path.join(work_dir, 'openapi.json')
+            repo_dir = os.path.join(work_dir, 'repo')
+            repo = git.Repo.init(repo_dir)
+            with open(os.path.join(repo_dir, 'app.py'), 'w') as f:
+                f.write("@app.route('/admin')\ndef admin():\n    pass\n")
+            repo.index.add(['app.py'])
+            repo.index.commit("Add handler")
+            store_url = f"sqlite:///{os.path.join(work_dir, 'store.db')}"
+            tool = SecurityScannerTool(analysis_store_url=store_url, endpoint_workers=1)
+
+            def scan():
+                with open(spec_path, 'w') as f:
+                    json.dump(spec, f)
+                incremental = tool._scan_sources(None, "owasp", api_spec_path=spec_path, repo_path=repo_dir)
+                full = SecurityScannerTool(incremental=False, endpoint_workers=1)._scan_sources(
+                    None, "owasp", api_spec_path=spec_path, repo_path=repo_dir)
+                self.assertEqual(incremental["vulnerabilities"], full["vulnerabilities"],
+                                 "Reused findings should match a full scan")
+                return incremental
+
+            first = scan()
+            self.assertEqual(first["incremental"], {"reused": 0, "evaluated": 4})
+            unchanged = scan()
+            self.assertEqual(unchanged["incremental"], {"reused": 4, "evaluated": 0},
+                             "An unchanged spec and tree should be answered from the store")
+            self.assertEqual(unchanged["scanned_operations"], 3)
+
+            # Person is returned directly and through Account's owner; Order and the handler are untouched
+            spec["components"]["schemas"]["Person"]["properties"]["password"] = {"type": "string"}
+            edited = scan()
+            self.assertEqual(edited["incremental"], {"reused": 2, "evaluated": 2})
+            self.assertEqual({f["endpoint"] for f in edited["vulnerabilities"] if f["id"] == "API3-001"},
+                             {"GET /accounts/{id}", "GET /persons/{id}"})
+
+            # Findings stored by another rule set version are not reused
+            store = AnalysisStore(store_url)
+            try:
+                self.assertEqual(store.cached_findings(["unknown"], "0:other"), {})
+                record = store.get_source_scan(f"tree:{repo.head.commit.tree.hexsha}:2", "0:other")
+                self.assertIsNone(record, "Source records are per rule set version")
+            finally:
+                store.close()
+
+    def test_30_load_scenarios(self):
+        """Test runnable rate-limit and performance scenarios against a local stand-in server"""
+        from collections import Counter
+        from tools.load_runner import LoadScenario
+        from tools.test_generator import TestGeneratorTool
+
+        class StandInHandler(_StandInHandler):
+            lock = threading.Lock()
+            hits = Counter()
+            limited = []
+
+            def do_GET(self):
+                if self.headers.get('Authorization') != 'Bearer load-test':
+                    self.send_response(401)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                with self.lock:
+                    self.hits[self.path] += 1
+                    count = self.hits[self.path]
+                    if self.path.startswith('/api/limited'):
+                        self.limited.append(time.monotonic())
+                        recent = sum(1 for hit in self.limited if self.limited[-1] - hit < 1.0)
+                if self.path.startswith('/api/limited') and recent > 30:
+                    status = 429
+                elif self.path == '/api/flaky' and count % 4 == 0:
+                    status = 500
+                else:
+                    time.sleep(0.02)
+                    status = 200
+                self.send_response(status)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+        tool = TestGeneratorTool(load_rps=40, load_duration_seconds=0.5, auth_headers={"Authorization": "Bearer load-test"},
+                                 rate_limit_rps=100, rate_limit_duration_seconds=0.5)
+        with _stand_in_server(StandInHandler) as base_url:
+            result = json.loads(tool._run(api_endpoints=["/api/limited/{id}", "/api/flaky", "/api/ok"],
+                                          test_type="performance", base_url=base_url))
+            # Without credentials every request is answered 401, which is no passing performance run
+            anonymous = json.loads(TestGeneratorTool(load_rps=40, load_duration_seconds=0.5)._run(
+                api_endpoints=["/api/ok"], test_type="performance", base_url=base_url))
+
+        suites = result["generated_tests"]["test_suites"]
+        runs = {(endpoint, test["type"]): test["execution"]
+                for endpoint, suite in suites.items() for test in suite["test_cases"]}
+        self.assertEqual(len(runs), 6, "Every endpoint should get a rate-limit and a performance scenario")
+
+        limited = runs[("/api/limited/{id}", "edge_case")]
+        self.assertTrue(limited["passed"], "A burst above the limit should draw 429s")
+        self.assertEqual(limited["requests"], 50)
+        self.assertEqual(limited["status_codes"], {"429": 20, "200": 30})
+        self.assertIn("429 from request 31 of 50", limited["verdict"])
+        self.assertFalse(runs[("/api/ok", "edge_case")]["passed"], "No 429s means no rate limiting")
+
+        flaky = runs[("/api/flaky", "performance")]
+        self.assertFalse(flaky["passed"])
+        self.assertEqual(flaky["errors"], 5)
+        self.assertEqual(flaky["error_rate"], 0.25)
+
+        healthy = runs[("/api/ok", "performance")]
+        self.assertTrue(healthy["passed"], healthy["verdict"])
+        self.assertEqual((healthy["requests"], healthy["completed"], healthy["errors"]), (20, 20, 0))
+        self.assertEqual(StandInHandler.hits["/api/ok"], 70, "Requests go to the sample path of the template")
+        self.assertEqual(StandInHandler.hits["/api/limited/1"], 70)
+        self.assertGreaterEqual(healthy["latency_ms"]["p50"], 19.8, "Latency includes the server's 20ms")
+        self.assertEqual(sum(bucket["count"] for bucket in healthy["latency_histogram"]), 20)
+        self.assertGreater(healthy["throughput_rps"], 20, "Requests are sent on schedule, not one after another")
+
+        analysis = result["coverage_analysis"]
+        self.assertEqual(analysis["load_tests"]["executed"], 6)
+        self.assertEqual(analysis["load_tests"]["passed"], 2)
+        # Still limited after its burst, so the latencies measured would be the limiter's
+        self.assertIn("rate limited (429)", runs[("/api/limited/{id}", "performance")]["verdict"])
+        self.assertTrue(any("No rate limiting observed on 2" in rec["description"] for rec in analysis["recommendations"]))
+
+        # Generated scenarios are plain data that can be re-run later
+        scenario = suites["/api/ok"]["test_cases"][1]["scenario"]
+        self.assertEqual(LoadScenario.from_dict(scenario).to_dict(), scenario)
+        self.assertEqual(scenario["path"], "/api/ok")
+        self.assertEqual(scenario["headers"], {}, "Credentials stay out of the generated scenarios")
+
+        rejected = [test["execution"] for test in anonymous["generated_tests"]["test_suites"]["/api/ok"]["test_cases"]
+                    if test["type"] == "performance"][0]
+        self.assertFalse(rejected["passed"], "401 responses are errors")
+        self.assertEqual((rejected["errors"], rejected["status_codes"]), (20, {"401": 20}))
+
+    def test_31_sdk_template_cache(self):
+        """Test template-rendered SDKs served from the on-disk cache while the spec's paths are unchanged"""
+        from tools import sdk_templates
+        from tools.sdk_generator import SDKGeneratorTool
+
+        spec = {"openapi": "3.0.3", "info": {"title": "Shop", "version": "1.0"}, "paths": {
+            "/api/users": {"get": {"summary": "List users", "responses": {"200": {"description": "OK"}}}},
+            "/api/users/{id}": {"get": {"responses": {"200": {"description": "OK"}}}},
+            "/api/orders": {"post": {"responses": {"201": {"description": "Created"}}}},
+        }}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spec_path = os.path.join(temp_dir, "openapi.json")
+            with open(spec_path, "w") as f:
+                json.dump(spec, f)
+            tool = SDKGeneratorTool(sdk_cache_dir=os.path.join(temp_dir, "sdks"))
+
+            first = json.loads(tool._run(languages=["python", "java", "go"], api_spec_path=spec_path))
+            self.assertEqual(first["endpoints"], list(spec["paths"]))
+            self.assertEqual(first["cached_languages"], [])
+            code = first["generated_sdks"]["python"]["code"]
+            compile(code, "enterprise_api_client.py", "exec")
+            for method in ("list_users", "create_users", "get_user", "update_user", "delete_user", "list_orders"):
+                self.assertIn(f"def {method}(", code)
+            self.assertIn("f'/api/users/{user_id}'", code, "Item paths are addressed by the ID argument")
+            self.assertIn('"/api/users/" + userId', first["generated_sdks"]["java"]["code"])
+
+            # Documentation edits leave the paths, and so the SDKs, unchanged
+            spec["paths"]["/api/users"]["get"]["summary"] = "List every user"
+            with open(spec_path, "w") as f:
+                json.dump(spec, f)
+            second = json.loads(tool._run(languages=["python", "java", "go"], api_spec_path=spec_path))
+            self.assertEqual(second["cached_languages"], ["python", "java", "go"])
+            self.assertEqual(second["generated_sdks"], first["generated_sdks"])
+
+            selected = json.loads(tool._run(["/api/users"], ["python"], api_spec_path=spec_path))
+            self.assertEqual(selected["cached_languages"], [], "Another endpoint selection is another SDK")
+            self.assertNotIn("def get_user(", selected["generated_sdks"]["python"]["code"])
+
+            with patch.object(sdk_templates, "GENERATOR_VERSION", sdk_templates.GENERATOR_VERSION + 1):
+                regenerated = json.loads(tool._run(languages=["python"], api_spec_path=spec_path))
+            self.assertEqual(regenerated["cached_languages"], [], "A new generator version invalidates the cache")
+
+            # Paths without an /api prefix, with dashes, nested under a parameter or duplicating another
+            spec["paths"] = {path: {"get": {"responses": {"200": {"description": "OK"}}}} for path in [
+                "/users", "/users/{id}", "/api/user-groups", "/api/users/{id}/orders", "/api/users/{user_id}"]}
+            with open(spec_path, "w") as f:
+                json.dump(spec, f)
+            real = json.loads(tool._run(languages=["python", "javascript"], api_spec_path=spec_path))
+            code = real["generated_sdks"]["python"]["code"]
+            compile(code, "enterprise_api_client.py", "exec")
+            for method in ("list_users", "get_user", "list_user_groups", "iter_user_groups"):
+                self.assertIn(f"def {method}(", code)
+            self.assertEqual(code.count("    def get_user("), 1, "One get_user, for /users/{id}")
+            self.assertIn("f'/users/{user_id}'", code)
+            self.assertIn("listUserGroups(", real["generated_sdks"]["javascript"]["code"])
+            self.assertEqual(real["skipped_endpoints"], ["/api/users/{id}/orders", "/api/users/{user_id}"])
+
+    def test_32_sdk_batch_generation(self):
+        """Test batch SDK generation of many APIs across a process pool, written to disk per SDK"""
+        from tools.sdk_generator import SDKGeneratorTool
+
+        spec = {"openapi": "3.0.3", "info": {"title": "Billing", "version": "1.0"}, "paths": {
+            "/api/invoices": {"get": {"responses": {"200": {"description": "OK"}}}},
+            "/api/invoices/{id}": {"get": {"responses": {"200": {"description": "OK"}}}},
+        }}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spec_path = os.path.join(temp_dir, "billing.json")
+            with open(spec_path, "w") as f:
+                json.dump(spec, f)
+            output_dir = os.path.join(temp_dir, "sdks")
+            tool = SDKGeneratorTool(sdk_cache_dir=os.path.join(temp_dir, "cache"), sdk_workers=2)
+            apis = {"billing": spec_path, "user service": ["/api/users", "/api/users/{id}"]}
+            languages = ["python", "javascript", "go"]
+
+            result = json.loads(tool._run(languages=languages, apis=apis, output_dir=output_dir))
+            self.assertEqual((result["generated"], result["cached"], result["failed"]), (6, 0, 0))
+            self.assertEqual([(entry["api"], entry["language"]) for entry in result["sdks"]],
+                             [(api, language) for api in sorted(apis) for language in languages])
+
+            python_sdk = os.path.join(output_dir, "billing", "python", "enterprise_api_client.py")
+            self.assertTrue(os.path.exists(os.path.join(output_dir, "user_service", "go", "enterprise_api_client.go")))
+            single = json.loads(SDKGeneratorTool(sdk_cache_dir=None)._run(languages=["python"], api_spec_path=spec_path))
+            with open(python_sdk, encoding="utf-8") as f:
+                self.assertEqual(f.read(), single["generated_sdks"]["python"]["code"],
+                                 "Batch and single runs render the same SDK")
+            self.assertEqual(result["sdks"][0]["path"], python_sdk)
+            self.assertEqual(result["sdks"][0]["bytes"], os.path.getsize(python_sdk))
+
+            again = json.loads(tool._run(languages=languages, apis=apis, output_dir=output_dir))
+            self.assertEqual(again["cached"], 6, "Unchanged APIs are copied from the SDK cache")
+
+    def test_33_sdk_client_pooling_and_retries(self):
+        """Test the generated Python client reusing pooled connections and retrying 429/5xx responses"""
+        import gzip
+        import types
+        from tools.sdk_templates import SDK_TEMPLATES, endpoint_model
+
+        class StandInHandler(_StandInHandler):
+            # Statuses answered before succeeding, with the Retry-After each one sends
+            failures = []
+            clients = set()
+            requests = 0
+            gzipped = 0
+
+            def do_GET(self):
+                StandInHandler.clients.add(self.client_address)
+                StandInHandler.requests += 1
+                if StandInHandler.failures:
+                    status, retry_after = StandInHandler.failures.pop(0)
+                    self.send_response(status)
+                    self.send_header("Retry-After", retry_after)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = gzip.compress(json.dumps([{"id": 1, "query": self.path}]).encode())
+                self.send_response(200)
+                if "gzip" not in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.decompress(body)
+                else:
+                    StandInHandler.gzipped += 1
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        with _stand_in_server(StandInHandler) as base_url:
+            code = SDK_TEMPLATES["python"].render(endpoint_model(["/api/users", "/api/users/{id}"]))["code"]
+            module = types.ModuleType("enterprise_api_client")
+            exec(compile(code, "enterprise_api_client.py", "exec"), module.__dict__)
+
+            with module.EnterpriseAPIClient(base_url, "key", timeout=2, backoff_factor=0, pool_size=4) as client:
+                self.assertEqual(client.timeout, (5.0, 2))
+                self.assertEqual(client.session.get_adapter(base_url)._pool_maxsize, 4)
+                for _ in range(5):
+                    self.assertEqual(client.get_user("7"), [{"id": 1, "query": "/api/users/7"}])
+                self.assertEqual(len(StandInHandler.clients), 1, "Calls should reuse one pooled connection")
+                self.assertEqual(StandInHandler.gzipped, 5, "Responses should be negotiated as gzip")
+
+                StandInHandler.failures = [(503, "0"), (502, "0")]
+                StandInHandler.requests = 0
+                self.assertEqual(client.get_user("7")[0]["id"], 1, "5xx responses should be retried")
+                self.assertEqual(StandInHandler.requests, 3)
+
+                StandInHandler.failures = [(429, "1")]
+                started = time.monotonic()
+                client.get_user("7")
+                self.assertGreaterEqual(time.monotonic() - started, 0.9, "Retry-After should be honored")
+
+                StandInHandler.failures = [(503, "0")] * 4
+                with self.assertRaises(Exception) as raised:
+                    client.get_user("7")
+                self.assertIn("503", str(raised.exception), "Retries give up after max_retries")
+
+    def test_34_async_sdk_client(self):
+        """Test the generated AsyncEnterpriseAPIClient fanning out calls under its concurrency limit"""
+        import asyncio
+        import types
+        from urllib.parse import parse_qs, urlsplit
+        from tools.sdk_templates import SDK_TEMPLATES, endpoint_model
+
+        in_flight = _InFlight()
+
+        class StandInHandler(_StandInHandler):
+            unavailable = 0
+
+            def do_GET(self):
+                with in_flight:
+                    with in_flight.lock:
+                        unavailable = StandInHandler.unavailable > 0
+                        StandInHandler.unavailable -= 1
+                    time.sleep(0.02)
+                url = urlsplit(self.path)
+                if unavailable:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if url.path == "/api/users":
+                    query = parse_qs(url.query)
+                    offset, limit = int(query["offset"][0]), int(query["limit"][0])
+                    body = [{"id": index} for index in range(offset, min(offset + limit, 45))]
+                else:
+                    body = {"id": url.path.rsplit("/", 1)[1]}
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        with _stand_in_server(StandInHandler) as base_url:
+            sdk = SDK_TEMPLATES["python"].render(endpoint_model(["/api/users", "/api/users/{id}"]))
+            module = types.ModuleType("enterprise_api_client")
+            exec(compile(sdk["code"], "enterprise_api_client.py", "exec"), module.__dict__)
+            self.assertTrue(hasattr(module, "EnterpriseAPIClient"), "The blocking client is still generated")
+            self.assertIn("httpx", sdk["installation"])
+
+            async def exercise():
+                async with module.AsyncEnterpriseAPIClient(base_url, "key", max_concurrency=8,
+                                                           backoff_factor=0) as client:
+                    users = await asyncio.gather(*(client.get_user(str(index)) for index in range(80)))
+                    StandInHandler.unavailable = 2
+                    retried = await client.get_user("7")
+                    streamed = [user["id"] async for user in client.iter_users(page_size=20)]
+                return users, retried, streamed
+
+            users, retried, streamed = asyncio.run(exercise())
+            self.assertEqual([user["id"] for user in users], [str(index) for index in range(80)])
+            self.assertLessEqual(in_flight.peak, 8, "No more than max_concurrency requests in flight")
+            self.assertGreaterEqual(in_flight.peak, 4, "Calls should overlap")
+            self.assertEqual(retried, {"id": "7"}, "503 responses should be retried")
+            self.assertEqual(streamed, list(range(45)), "iter_users pages through every record")
+
+    def test_35_sdk_prefetching_iterators(self):
+        """Test the generated SDK iterators streaming every page with a bounded number fetched ahead"""
+        import asyncio
+        import shutil
+        import subprocess
+        import types
+        from urllib.parse import parse_qs, urlsplit
+        from tools.sdk_templates import SDK_TEMPLATES, endpoint_model
+
+        in_flight = _InFlight()
+
+        class PagingHandler(_StandInHandler):
+            def do_GET(self):
+                with in_flight:
+                    time.sleep(0.02)
+                query = parse_qs(urlsplit(self.path).query)
+                offset, limit = int(query["offset"][0]), int(query["limit"][0])
+                data = json.dumps([{"id": index} for index in range(offset, min(offset + limit, 95))]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        with _stand_in_server(PagingHandler) as base_url:
+            model = endpoint_model(["/api/users", "/api/users/{id}"])
+            module = types.ModuleType("enterprise_api_client")
+            exec(compile(SDK_TEMPLATES["python"].render(model)["code"], "enterprise_api_client.py", "exec"),
+                 module.__dict__)
+
+            with module.EnterpriseAPIClient(base_url, "key") as client:
+                streamed = [user["id"] for user in client.iter_users(page_size=10, prefetch=3)]
+                self.assertEqual(streamed, list(range(95)), "iter_users yields every record in order")
+                self.assertGreater(in_flight.peak, 1, "Pages should be fetched ahead of the one consumed")
+                self.assertLessEqual(in_flight.peak, 4, "No more than prefetch + 1 pages in flight")
+                in_flight.reset()
+                users = client.iter_users(page_size=10, prefetch=2)
+                self.assertEqual(next(users), {"id": 0})
+                users.close()
+                time.sleep(0.1)
+                self.assertLessEqual(in_flight.requests, 3, "Stopping early should not keep paging")
+                in_flight.reset()
+                on_demand = [user["id"] for user in client.iter_users(page_size=10, prefetch=0)]
+                self.assertEqual(on_demand, list(range(95)))
+                self.assertEqual(in_flight.peak, 1, "prefetch=0 fetches one page at a time")
+
+            async def stream():
+                async with module.AsyncEnterpriseAPIClient(base_url, "key") as client:
+                    return [user["id"] async for user in client.iter_users(page_size=10, prefetch=3)]
+
+            in_flight.reset()
+            self.assertEqual(asyncio.run(stream()), list(range(95)), "The async iterator yields every record")
+            self.assertGreater(in_flight.peak, 1)
+            self.assertLessEqual(in_flight.peak, 4)
+
+            if shutil.which("node"):
+                script = SDK_TEMPLATES["javascript"].render(model)["code"] + (
+                    "\n(async () => {\n"
+                    f"    const client = new EnterpriseAPIClient('{base_url}', 'key');\n"
+                    "    const ids = [];\n"
+                    "    for await (const user of client.iterUsers(10, 3)) { ids.push(user.id); }\n"
+                    "    console.log(JSON.stringify(ids));\n"
+                    "})();\n")
+                result = subprocess.run(["node", "-"], input=script, capture_output=True, text=True, timeout=30)
+                self.assertEqual(result.returncode, 0, result.stderr)
+                self.assertEqual(json.loads(result.stdout), list(range(95)), "iterUsers yields every record")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.helpers import load_config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repository_analysis (
+    repository TEXT PRIMARY KEY,
+    head_sha TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    analyzed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS repository_files (
+    repository TEXT NOT NULL,
+    path TEXT NOT NULL,
+    blob_sha TEXT NOT NULL,
+    category TEXT,
+    PRIMARY KEY (repository, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS endpoint_cache (
+    blob_sha TEXT PRIMARY KEY,
+    extractor_version INTEGER NOT NULL,
+    result TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS security_findings (
+    content_hash TEXT PRIMARY KEY,
+    ruleset_version TEXT NOT NULL,
+    findings TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS security_sources (
+    source_hash TEXT PRIMARY KEY,
+    ruleset_version TEXT NOT NULL,
+    name TEXT NOT NULL,
+    scanned INTEGER NOT NULL,
+    content_hashes TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Analysis store used when neither a tool nor the app config names one
+DEFAULT_ANALYSIS_STORE_URL = "sqlite:///api_ecosystem.db"
+
+# SQLite's default limit on host parameters in a single statement is 999
+QUERY_BATCH_SIZE = 500
+
+def sqlite_path_from_url(url: str) -> str:
+    """Translate a `sqlite:///relative.db` / `sqlite:////absolute.db` URL into a file path."""
+    prefix = "sqlite://"
+    if not url.startswith(prefix):
+        raise ValueError(f"Unsupported database URL '{url}', only sqlite:// URLs are supported")
+    path = url[len(prefix):]
+    if path in ("", "/", "/:memory:"):
+        return ":memory:"
+    # sqlite:///name.db is relative, sqlite:////abs/name.db is absolute
+    return path[1:] if path.startswith("/") else path
+
+def configured_store_url(url: Optional[str] = None) -> str:
+    """Resolve a tool's analysis store URL, defaulting to the app's configured database."""
+    if url:
+        return url
+    try:
+        return load_config()["database"]["url"]
+    except (OSError, KeyError, ValueError):
+        return DEFAULT_ANALYSIS_STORE_URL
+
+class AnalysisStore:
+    """
+    Persistent record of analyzed repositories.
+
+    For every repository the store keeps the HEAD commit that was last
+    analyzed, a JSON summary of that analysis, and one row per file in the
+    tree (path, blob SHA and classifier category), so the next run can apply
+    an `old_sha..new_sha` diff instead of re-classifying the whole tree.
+    Security findings are kept per scanned node (spec operation or route
+    handler) by content hash, and per scanned source (spec file or tree) as
+    the list of its nodes' hashes.
+    """
+
+    def __init__(self, url: str):
+        path = sqlite_path_from_url(url)
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get_repository(self, repository: str) -> Optional[Dict]:
+        """Return the last recorded analysis of a repository, if any."""
+        row = self.connection.execute(
+            "SELECT head_sha, summary FROM repository_analysis WHERE repository = ?", (repository,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"head_sha": row[0], "summary": json.loads(row[1])}
+
+    def record_full_scan(self, repository: str, head_sha: str, summary: Dict,
+                         files: Iterable[Tuple[str, str, Optional[str]]]) -> Dict:
+        """
+        Replace every stored file of a repository with (path, blob_sha, category) rows.
+
+        Returns the saved summary, with file_count filled in from the stored rows.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM repository_files WHERE repository = ?", (repository,))
+            self.connection.executemany(
+                "INSERT INTO repository_files (repository, path, blob_sha, category) VALUES (?, ?, ?, ?)",
+                ((repository, path, sha, category) for path, sha, category in files)
+            )
+            return self._save_summary(repository, head_sha, summary)
+
+    def record_changes(self, repository: str, head_sha: str, summary: Dict,
+                       changes: Iterable[Tuple[str, str, Optional[str], Optional[str]]]) -> Dict:
+        """
+        Apply (status, path, blob_sha, category) changes from a tree diff.
+
+        Status 'D' deletes the path; any other status inserts or replaces it.
+        Returns the saved summary, with file_count filled in from the stored rows.
+        """
+        with self.connection:
+            for status, path, sha, category in changes:
+                if status == 'D':
+                    self.connection.execute(
+                        "DELETE FROM repository_files WHERE repository = ? AND path = ?", (repository, path)
+                    )
+                else:
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO repository_files (repository, path, blob_sha, category) "
+                        "VALUES (?, ?, ?, ?)",
+                        (repository, path, sha, category)
+                    )
+            return self._save_summary(repository, head_sha, summary)
+
+    def file_count(self, repository: str) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM repository_files WHERE repository = ?", (repository,)
+        ).fetchone()[0]
+
+    def categorized_files(self, repository: str) -> List[Tuple[str, str, str]]:
+        """Return (path, blob_sha, category) for every classified file, in path order."""
+        return self.connection.execute(
+            "SELECT path, blob_sha, category FROM repository_files "
+            "WHERE repository = ? AND category IS NOT NULL ORDER BY path",
+            (repository,)
+        ).fetchall()
+
+    def cached_endpoints(self, blob_shas: List[str], extractor_version: int) -> Dict[str, Dict]:
+        """Return cached endpoint extraction results for the given blobs."""
+        cached = {}
+        for start in range(0, len(blob_shas), QUERY_BATCH_SIZE):
+            batch = blob_shas[start:start + QUERY_BATCH_SIZE]
+            rows = self.connection.execute(
+                f"SELECT blob_sha, result FROM endpoint_cache "
+                f"WHERE extractor_version = ? AND blob_sha IN ({', '.join('?' * len(batch))})",
+                [extractor_version, *batch]
+            )
+            for blob_sha, result in rows:
+                cached[blob_sha] = json.loads(result)
+        return cached
+
+    def cache_endpoints(self, results: Dict[str, Dict], extractor_version: int) -> None:
+        """Store endpoint extraction results keyed by blob SHA."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO endpoint_cache (blob_sha, extractor_version, result) VALUES (?, ?, ?)",
+                ((blob_sha, extractor_version, json.dumps(result)) for blob_sha, result in results.items())
+            )
+
+    def cached_findings(self, content_hashes: List[str], ruleset_version: str) -> Dict[str, List[Dict]]:
+        """Return the stored security findings of the given nodes, if produced by this rule set version."""
+        cached = {}
+        for start in range(0, len(content_hashes), QUERY_BATCH_SIZE):
+            batch = content_hashes[start:start + QUERY_BATCH_SIZE]
+            rows = self.connection.execute(
+                f"SELECT content_hash, findings FROM security_findings "
+                f"WHERE ruleset_version = ? AND content_hash IN ({', '.join('?' * len(batch))})",
+                [ruleset_version, *batch]
+            )
+            for content_hash, findings in rows:
+                cached[content_hash] = json.loads(findings)
+        return cached
+
+    def cache_findings(self, results: Dict[str, List[Dict]], ruleset_version: str) -> None:
+        """Store the security findings of scanned nodes keyed by content hash."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO security_findings (content_hash, ruleset_version, findings) VALUES (?, ?, ?)",
+                ((content_hash, ruleset_version, json.dumps(findings)) for content_hash, findings in results.items())
+            )
+
+    def get_source_scan(self, source_hash: str, ruleset_version: str) -> Optional[Dict]:
+        """Return the name, node count and node hashes recorded for a source scanned by this rule set version."""
+        row = self.connection.execute(
+            "SELECT name, scanned, content_hashes FROM security_sources "
+            "WHERE source_hash = ? AND ruleset_version = ?",
+            (source_hash, ruleset_version)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"name": row[0], "scanned": row[1], "content_hashes": json.loads(row[2])}
+
+    def record_source_scan(self, source_hash: str, ruleset_version: str, name: str,
+                           content_hashes: List[str]) -> None:
+        """Record the nodes of a scanned source (spec file content or repository tree), in scan order."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO security_sources (source_hash, ruleset_version, name, scanned, content_hashes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source_hash, ruleset_version, name, len(content_hashes), json.dumps(content_hashes))
+            )
+
+    def _save_summary(self, repository: str, head_sha: str, summary: Dict) -> Dict:
+        summary = dict(summary, file_count=self.file_count(repository))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO repository_analysis (repository, head_sha, summary, analyzed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (repository, head_sha, json.dumps(summary), time.time())
+        )
+        return summary
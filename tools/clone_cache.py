@@ -0,0 +1,157 @@
+import hashlib
+import os
+import re
+import shutil
+import time
+import git
+from typing import Callable, List, Optional
+
+# Supported ways of cloning a remote repository into the cache
+CLONE_MODES = ("full", "shallow", "blobless", "sparse")
+
+# Marker file inside each cached mirror recording when it was last used
+LAST_USED_MARKER = "cache-last-used"
+
+class CloneCache:
+    """
+    On-disk cache of bare mirrors for remote repositories.
+
+    Each remote URL is cloned once as a bare mirror; later requests for the
+    same URL only run an incremental `git fetch`.  Mirrors can be cloned in
+    one of four modes:
+
+    * full     - complete history and every blob
+    * shallow  - only the last `depth` commits
+    * blobless - full history and trees but no file contents
+                 (`--filter=blob:none`); enough for name-based analysis
+    * sparse   - blobless, plus the blobs of the current tree whose paths
+                 match `sparse_filter`, fetched eagerly in a single batch
+
+    The cache is bounded by `max_bytes`: after every checkout the least
+    recently used mirrors are deleted until the cache fits its budget.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, mode: str = "blobless", depth: int = 50,
+                 sparse_filter: Optional[Callable[[str], bool]] = None):
+        if mode not in CLONE_MODES:
+            raise ValueError(f"Unsupported clone mode '{mode}', expected one of {', '.join(CLONE_MODES)}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.depth = depth
+        self.sparse_filter = sparse_filter
+
+    def checkout(self, url: str) -> str:
+        """Return the path of an up-to-date bare mirror of `url`, cloning it if needed."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.entry_path(url)
+
+        if os.path.isdir(path):
+            self._fetch(path)
+        else:
+            self._clone(url, path)
+
+        if self.mode == "sparse":
+            self._prefetch_blobs(path)
+
+        self._touch(path)
+        self.evict(keep=path)
+        return path
+
+    def entry_path(self, url: str) -> str:
+        """Directory of the mirror for `url`, keyed by URL and clone mode."""
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', url.rstrip('/').rsplit('/', 1)[-1])[:40]
+        return os.path.join(self.cache_dir, f"{name}-{digest}-{self.mode}")
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Delete least recently used mirrors until the cache fits `max_bytes`."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path):
+                entries.append((self._last_used(path), path, _directory_size(path)))
+
+        total = sum(size for _, _, size in entries)
+        evicted = []
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep and os.path.abspath(path) == os.path.abspath(keep):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted.append(path)
+        return evicted
+
+    def _clone(self, url: str, path: str) -> None:
+        options = ['--mirror']
+        if self.mode == "shallow":
+            options.append(f'--depth={self.depth}')
+        elif self.mode in ("blobless", "sparse"):
+            options.append('--filter=blob:none')
+        try:
+            git.Repo.clone_from(url, path, multi_options=options)
+        except Exception:
+            # Never leave a half-written mirror behind to be mistaken for a cache hit
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+    def _fetch(self, path: str) -> None:
+        repo = git.Repo(path)
+        if self.mode == "shallow":
+            repo.git.fetch('--prune', f'--depth={self.depth}', 'origin')
+        else:
+            repo.git.fetch('--prune', 'origin')
+
+    def _prefetch_blobs(self, path: str) -> None:
+        """Fetch the missing blobs of the current tree that match `sparse_filter` in one request."""
+        # Imported here to avoid a circular import with the analyzer tool
+        from tools.git_analyzer import iter_tree_blobs
+
+        repo = git.Repo(path)
+        missing = {
+            line[1:] for line in
+            repo.git.rev_list('--objects', '--missing=print', '--no-walk', 'HEAD').splitlines()
+            if line.startswith('?')
+        }
+        if not missing:
+            return
+        wanted = [
+            sha for sha, blob_path in iter_tree_blobs(repo)
+            if sha in missing and (self.sparse_filter is None or self.sparse_filter(blob_path))
+        ]
+        if wanted:
+            self._fetch_objects(repo, list(dict.fromkeys(wanted)))
+
+    def _fetch_objects(self, repo: git.Repo, shas: List[str]) -> None:
+        """Fetch specific objects from the promisor remote, as git's lazy fetch would."""
+        # Batch in chunks to keep the command line well below OS limits
+        for start in range(0, len(shas), 1000):
+            repo.git.execute([
+                'git', '-c', 'fetch.negotiationAlgorithm=noop', 'fetch', '--quiet', '--no-tags',
+                '--no-write-fetch-head', '--recurse-submodules=no', '--filter=blob:none', 'origin',
+                *shas[start:start + 1000]
+            ])
+
+    def _touch(self, path: str) -> None:
+        with open(os.path.join(path, LAST_USED_MARKER), 'w') as f:
+            f.write(str(time.time()))
+
+    def _last_used(self, path: str) -> float:
+        try:
+            with open(os.path.join(path, LAST_USED_MARKER)) as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            return 0.0
+
+def _directory_size(path: str) -> int:
+    """Total size in bytes of the files under `path`."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
@@ -1,23 +1,45 @@
 from crewai.tools import BaseTool
+import git
 import json
+import os
 import random
-from typing import Dict, List
+from typing import Dict, List, Optional
+from tools.spec_diff import compatibility_score, diff_specs, index_spec_file, validate_spec
+from tools.spec_history import HISTORY_CHUNK_SIZE, validate_spec_history
+
+# Suffixes that make a `previous_version` a specification file rather than a version label
+SPEC_FILE_SUFFIXES = ('.json', '.yaml', '.yml')
 
 class ContractValidatorTool(BaseTool):
     name: str = "Contract Validator Tool"
     description: str = "Validate API contracts and check for breaking changes"
 
-    def _run(self, api_spec_path: str = None, previous_version: str = None) -> str:
+    # Worker processes validating the versions of a spec in a repository's history; None uses one per CPU
+    history_workers: Optional[int] = None
+    # Consecutive spec versions validated per worker task
+    history_chunk_size: int = HISTORY_CHUNK_SIZE
+
+    def _run(self, api_spec_path: str = None, previous_version: str = None, repo_path: str = None) -> str:
         """
         Validate API contracts and check for breaking changes.
         
         Args:
-            api_spec_path: Path to API specification file (OpenAPI/Swagger)
-            previous_version: Previous version to compare against
+            api_spec_path: Path to API specification file (OpenAPI/Swagger, JSON or YAML)
+            previous_version: Previous version to compare against; a path to the
+                              previous specification file is diffed operation by operation.
+                              A version label is not compared (the score is None).
+                              With `repo_path`, a commit to start the history from
+            repo_path: Git repository whose history of `api_spec_path` (relative to the
+                       repository root) is validated version by version
         """
         try:
-            # Generate sample API contract validation
-            contract_data = self._generate_sample_contract_validation(api_spec_path, previous_version)
+            if repo_path and api_spec_path:
+                contract_data = self._validate_spec_history(repo_path, api_spec_path, previous_version)
+            elif api_spec_path:
+                contract_data = self._validate_spec_files(api_spec_path, previous_version)
+            else:
+                # Generate sample API contract validation
+                contract_data = self._generate_sample_contract_validation(api_spec_path, previous_version)
             
             # Analyze the contract validation
             analysis = self._analyze_contract_validation(contract_data)
@@ -34,6 +56,64 @@ class ContractValidatorTool(BaseTool):
         except Exception as e:
             return f"Contract validation failed: {str(e)}"
 
+    def _validate_spec_files(self, api_spec_path: str, previous_version: str = None) -> Dict:
+        """
+        Validate a real specification and diff it against the previous version's file, if given.
+
+        Without a previous file nothing is compared and the compatibility score is None; a
+        `previous_version` that looks like a path but does not exist is an error.
+        """
+        current = index_spec_file(api_spec_path)
+        changes = {"breaking_changes": [], "non_breaking_changes": []}
+        previous_label = previous_version
+        score = None
+        if previous_version and os.path.isfile(previous_version):
+            previous = index_spec_file(previous_version)
+            changes = diff_specs(previous, current)
+            previous_label = previous.version or previous_version
+            score = compatibility_score(previous, changes["breaking_changes"])
+        elif previous_version and (os.sep in previous_version or '/' in previous_version
+                                   or previous_version.lower().endswith(SPEC_FILE_SUFFIXES)):
+            raise FileNotFoundError(f"Previous specification not found: {previous_version}")
+        
+        return {
+            "api_name": current.title or os.path.basename(api_spec_path),
+            "current_version": current.version,
+            "previous_version": previous_label,
+            "total_endpoints": len(current.operations),
+            "breaking_changes": changes["breaking_changes"],
+            "non_breaking_changes": changes["non_breaking_changes"],
+            "validation_issues": validate_spec(current),
+            "compatibility_score": score
+        }
+
+    def _validate_spec_history(self, repo_path: str, api_spec_path: str, since: str = None) -> Dict:
+        """Validate each consecutive pair of versions of a spec file along the repository history."""
+        history = validate_spec_history(git.Repo(repo_path), api_spec_path, since=since,
+                                        max_workers=self.history_workers, chunk_size=self.history_chunk_size)
+        versions = [entry for entry in history["timeline"] if entry["event"] != "deleted"]
+        if not versions:
+            raise ValueError(f"{api_spec_path} has no versions in the history of {repo_path}")
+        latest, first = versions[-1], versions[0]
+        breaking, non_breaking = [], []
+        for entry in history["timeline"]:
+            commit = {"commit": entry["commit"], "date": entry["date"]}
+            breaking.extend(dict(change, **commit) for change in entry.get("breaking_changes", []))
+            non_breaking.extend(dict(change, **commit) for change in entry.get("non_breaking_changes", []))
+        
+        return {
+            "api_name": latest.get("title") or os.path.basename(api_spec_path),
+            "current_version": latest.get("version"),
+            "previous_version": first.get("version"),
+            "total_endpoints": latest.get("total_endpoints", 0),
+            "breaking_changes": breaking,
+            "non_breaking_changes": non_breaking,
+            "validation_issues": latest.get("validation_issues", []),
+            # Compatibility of the latest change; every earlier one is in the timeline
+            "compatibility_score": latest.get("compatibility_score", 100.0),
+            "history": history
+        }
+
     def _generate_sample_contract_validation(self, api_spec_path: str = None, previous_version: str = None) -> Dict:
         """Generate sample API contract validation data."""
         # Sample API endpoints
@@ -141,8 +221,14 @@ class ContractValidatorTool(BaseTool):
         breaking_changes = contract_data.get("breaking_changes", [])
         validation_issues = contract_data.get("validation_issues", [])
         
+        # A score of None means there was no previous specification to compare against
+        compatibility_score = contract_data.get("compatibility_score", 0)
+        if compatibility_score is None:
+            status = "NOT_COMPARED"
+        else:
+            status = "COMPATIBLE" if not breaking_changes else "BREAKING_CHANGES"
         analysis = {
-            "compatibility_status": "COMPATIBLE" if not breaking_changes else "BREAKING_CHANGES",
+            "compatibility_status": status,
             "issue_summary": {
                 "breaking_changes_count": len(breaking_changes),
                 "validation_issues_count": len(validation_issues)
@@ -167,8 +253,13 @@ class ContractValidatorTool(BaseTool):
             })
         
         # Overall compatibility assessment
-        compatibility_score = contract_data.get("compatibility_score", 0)
-        if compatibility_score >= 90:
+        if compatibility_score is None:
+            recommendations.append({
+                "priority": "MEDIUM",
+                "description": "Not compared with a previous version",
+                "action": "Pass the previous version's specification file to check for breaking changes"
+            })
+        elif compatibility_score >= 90:
             recommendations.append({
                 "priority": "LOW",
                 "description": "High compatibility score",
@@ -1,30 +1,37 @@
 from crewai.tools import BaseTool
+import html
 import json
 import random
 from typing import Dict, List
+from tools.spec_diff import HTTP_METHODS, PREFERRED_MEDIA_TYPES, index_spec_file
 
 class DocumentationBuilderTool(BaseTool):
     name: str = "Documentation Builder Tool"
     description: str = "Generate comprehensive API documentation and developer portal content"
 
-    def _run(self, api_endpoints: List[str] = None, format_type: str = "openapi") -> str:
+    def _run(self, api_endpoints: List[str] = None, format_type: str = "openapi", api_spec_path: str = None) -> str:
         """
         Generate API documentation.
         
         Args:
             api_endpoints: List of API endpoints to document
             format_type: Documentation format (openapi, markdown, html)
+            api_spec_path: OpenAPI/Swagger document (JSON or YAML) to document; `api_endpoints`
+                           then selects which of its paths are included
         """
         try:
-            # Generate sample documentation
-            doc_data = self._generate_sample_documentation(api_endpoints, format_type)
+            if api_spec_path:
+                doc_data = self._generate_spec_documentation(api_spec_path, api_endpoints, format_type)
+            else:
+                # Generate sample documentation
+                doc_data = self._generate_sample_documentation(api_endpoints, format_type)
             
             # Analyze the documentation quality
             analysis = self._analyze_documentation_quality(doc_data)
             
             result = {
                 "format_type": format_type,
-                "endpoints": api_endpoints or ["Sample endpoints"],
+                "endpoints": api_endpoints or ([f"All paths of {api_spec_path}"] if api_spec_path else ["Sample endpoints"]),
                 "generated_documentation": doc_data,
                 "quality_analysis": analysis
             }
@@ -34,6 +41,118 @@ class DocumentationBuilderTool(BaseTool):
         except Exception as e:
             return f"Documentation generation failed: {str(e)}"
 
+    def _generate_spec_documentation(self, api_spec_path: str, api_endpoints: List[str] = None,
+                                     format_type: str = "openapi") -> Dict:
+        """Document the operations of a real specification with dereferenced schemas."""
+        # The same cached index the contract validator uses, so resolved schemas are shared
+        resolver = index_spec_file(api_spec_path).resolver
+        spec = resolver.spec
+        all_paths = spec.get("paths") or {}
+        # Only the selected path items are read, so a lazily loaded spec decodes just those
+        paths = {path: resolver.normalize(all_paths[path]) for path in (api_endpoints or all_paths) if path in all_paths}
+        
+        if format_type == "openapi":
+            # Recursive schemas cannot be inlined; keep the components they refer to
+            components = {}
+            for ref in sorted(resolver.cycles):
+                tokens = [token.replace("~1", "/").replace("~0", "~") for token in ref[2:].split("/")]
+                holder = components
+                for token in tokens[:-1]:
+                    holder = holder.setdefault(token, {})
+                holder[tokens[-1]] = resolver.normalize(resolver.lookup(ref))
+            document = {key: value for key, value in spec.items() if key not in ("paths", "components", "definitions")}
+            document["paths"] = paths
+            document.update(components)
+            return document
+        
+        info = spec.get("info") or {}
+        title = info.get("title") or "API Documentation"
+        # Interned schemas are shared objects, so each distinct schema is rendered once
+        rendered: Dict[int, str] = {}
+        
+        def render(schema) -> str:
+            if id(schema) not in rendered:
+                rendered[id(schema)] = json.dumps(schema, indent=2)
+            return rendered[id(schema)]
+        
+        sections = []
+        for path, path_item in paths.items():
+            for method in HTTP_METHODS:
+                operation = path_item.get(method) if isinstance(path_item, dict) else None
+                if not isinstance(operation, dict):
+                    continue
+                parameters = [parameter for parameter in list(path_item.get("parameters") or []) + list(operation.get("parameters") or [])
+                              if isinstance(parameter, dict) and "name" in parameter]
+                body = operation.get("requestBody") or next(
+                    (parameter for parameter in parameters if parameter.get("in") == "body"), None)
+                sections.append({
+                    "method": method.upper(),
+                    "path": path,
+                    "summary": operation.get("summary") or operation.get("operationId") or f"{method.upper()} {path}",
+                    "description": operation.get("description", ""),
+                    "parameters": [
+                        {
+                            "name": parameter["name"],
+                            "in": parameter.get("in", "query"),
+                            "type": (parameter.get("schema") or parameter).get("type", "object"),
+                            "required": bool(parameter.get("required")),
+                            "description": parameter.get("description", ""),
+                        }
+                        for parameter in parameters if parameter.get("in") != "body"
+                    ],
+                    "request_body": render(_media_schema(body)) if _media_schema(body) is not None else None,
+                    "responses": [
+                        (str(code), (response or {}).get("description", ""), _media_schema(response))
+                        for code, response in (operation.get("responses") or {}).items()
+                    ],
+                })
+        
+        if format_type == "markdown":
+            content = f"# {title}\n\n{info.get('description', '')}\n\n## API Endpoints\n\n"
+            for section in sections:
+                content += f"### {section['summary']}\n\n**{section['method']}** `{section['path']}`\n\n"
+                if section["description"]:
+                    content += f"{section['description']}\n\n"
+                if section["parameters"]:
+                    content += "**Parameters:**\n\n"
+                    content += "| Parameter | In | Type | Required | Description |\n"
+                    content += "|-----------|----|------|----------|-------------|\n"
+                    for parameter in section["parameters"]:
+                        content += (f"| {parameter['name']} | {parameter['in']} | {parameter['type']} | "
+                                    f"{'Yes' if parameter['required'] else 'No'} | {parameter['description']} |\n")
+                    content += "\n"
+                if section["request_body"]:
+                    content += f"**Request Body:**\n\n```json\n{section['request_body']}\n```\n\n"
+                for code, description, schema in section["responses"]:
+                    content += f"**Response {code}:** {description}\n\n"
+                    if schema is not None:
+                        content += f"```json\n{render(schema)}\n```\n\n"
+            return {"format": "markdown", "content": content, "operations": len(sections)}
+        
+        content = (f"<!DOCTYPE html>\n<html>\n<head>\n    <title>{html.escape(title)}</title>\n</head>\n<body>\n"
+                   f"    <h1>{html.escape(title)}</h1>\n    <p>{html.escape(info.get('description', ''))}</p>\n"
+                   f"    <h2>API Endpoints</h2>\n")
+        for section in sections:
+            content += f"    <h3>{html.escape(section['summary'])}</h3>\n"
+            content += f"    <p><strong>{section['method']}</strong> <code>{html.escape(section['path'])}</code></p>\n"
+            if section["description"]:
+                content += f"    <p>{html.escape(section['description'])}</p>\n"
+            if section["parameters"]:
+                content += "    <table>\n        <tr><th>Parameter</th><th>In</th><th>Type</th><th>Required</th><th>Description</th></tr>\n"
+                for parameter in section["parameters"]:
+                    content += (f"        <tr><td>{html.escape(parameter['name'])}</td><td>{parameter['in']}</td>"
+                                f"<td>{parameter['type']}</td><td>{'Yes' if parameter['required'] else 'No'}</td>"
+                                f"<td>{html.escape(parameter['description'])}</td></tr>\n")
+                content += "    </table>\n"
+            if section["request_body"]:
+                content += f"    <p><strong>Request Body:</strong></p>\n    <pre>{html.escape(section['request_body'])}</pre>\n"
+            for code, description, schema in section["responses"]:
+                content += f"    <p><strong>Response {code}:</strong> {html.escape(description)}</p>\n"
+                if schema is not None:
+                    content += f"    <pre>{html.escape(render(schema))}</pre>\n"
+        content += "</body>\n</html>"
+        return {"format": "html", "content": content, "operations": len(sections)}
+
     def _generate_sample_documentation(self, api_endpoints: List[str] = None, format_type: str = "openapi") -> Dict:
         """Generate sample API documentation."""
         # Default endpoints if none provided
@@ -540,4 +659,16 @@ For support, contact api-support@example.com
             })
         
         analysis["recommendations"] = recommendations
-        return analysis
\ No newline at end of file
+        return analysis
+
+def _media_schema(holder):
+    """Schema of a request body or response: the preferred media type's (OpenAPI 3) or `schema` (Swagger 2)."""
+    if not isinstance(holder, dict):
+        return None
+    if "schema" in holder:
+        return holder["schema"]
+    content = holder.get("content")
+    if not isinstance(content, dict) or not content:
+        return None
+    media_type = next((media_type for media_type in PREFERRED_MEDIA_TYPES if media_type in content), next(iter(content)))
+    return (content[media_type] or {}).get("schema")
@@ -0,0 +1,383 @@
+import ast
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bump whenever extraction output changes so cached results are re-computed
+EXTRACTOR_VERSION = 2
+
+# Decorator/method names that register a route for one HTTP method
+HTTP_METHOD_DECORATORS = {'get', 'post', 'put', 'patch', 'delete', 'head', 'options'}
+# Django URL configuration helpers
+DJANGO_URL_FUNCTIONS = {'path', 're_path', 'url'}
+# FastAPI parameter helpers and where the parameter is read from
+FASTAPI_PARAM_SOURCES = {'Query': 'query', 'Path': 'path', 'Body': 'body', 'Header': 'header',
+                         'Cookie': 'cookie', 'Form': 'body', 'File': 'body'}
+# FastAPI dependency markers whose arguments are not client-supplied parameters
+FASTAPI_DEPENDENCIES = {'Depends', 'Security'}
+# Annotations FastAPI injects rather than reading from the request
+FASTAPI_INJECTED_TYPES = {'Request', 'Response', 'BackgroundTasks', 'WebSocket', 'HTTPConnection'}
+# Annotations FastAPI reads from the query string when not a path parameter
+FASTAPI_SCALAR_TYPES = {'int', 'float', 'str', 'bool', 'bytes', 'Optional', 'List', 'list', 'Set', 'UUID',
+                        'date', 'datetime', 'Decimal', 'Literal', 'Union'}
+
+# Flask/Django `<converter:name>` placeholders and FastAPI/Starlette `{name}` placeholders
+ANGLE_PARAM = re.compile(r'<(?:(\w+)(?:\([^)]*\))?:)?(\w+)>')
+BRACE_PARAM = re.compile(r'\{(\w+)(?::(\w+))?\}')
+REGEX_GROUP_PARAM = re.compile(r'\(\?P<(\w+)>')
+
+def _literal(node: Optional[ast.AST]):
+    """Return the value of a literal AST node, or None if it is not a literal."""
+    if node is None:
+        return None
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+def _keyword(call: ast.Call, name: str) -> Optional[ast.AST]:
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+def _call_name(node: ast.AST) -> Optional[str]:
+    """Name of the function a call invokes: `Depends(...)` -> 'Depends', `x.y(...)` -> 'y'."""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+def _path_params(path: str) -> List[Dict]:
+    if REGEX_GROUP_PARAM.search(path):
+        # Regular-expression routes (re_path/url): only named groups are parameters
+        return [{"name": name, "in": "path", "type": "string"} for name in REGEX_GROUP_PARAM.findall(path)]
+    params = []
+    for converter, name in ANGLE_PARAM.findall(path):
+        params.append({"name": name, "in": "path", "type": converter or "string"})
+    for name, converter in BRACE_PARAM.findall(path):
+        params.append({"name": name, "in": "path", "type": converter or None})
+    return params
+
+def _view_wrappers(view: Optional[ast.AST]) -> List[str]:
+    """Names of the calls wrapping a view function: `login_required(views.orders)` -> ['login_required']."""
+    wrappers = []
+    while isinstance(view, ast.Call) and view.args:
+        wrappers.append(_call_name(view))
+        view = view.args[0]
+    return [wrapper for wrapper in wrappers if wrapper]
+
+def _join_paths(prefix: str, path: str) -> str:
+    if not prefix:
+        return path
+    return prefix.rstrip('/') + '/' + path.lstrip('/') if path else prefix
+
+class _ModuleVisitor(ast.NodeVisitor):
+    """Collect route registrations from one parsed module."""
+
+    def __init__(self):
+        self.frameworks = set()
+        self.router_prefixes: Dict[str, str] = {}
+        self.endpoints: List[Dict] = []
+        self.includes: List[Dict] = []
+        # `from app.users import router` -> {"router": "app.users.router"}
+        self.imported_names: Dict[str, str] = {}
+
+    # Imports tell apart Flask and FastAPI, which share the `.get/.post` decorator style
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self._note_framework(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self._note_framework(node.module or '')
+        if node.module:
+            for alias in node.names:
+                self.imported_names[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def _note_framework(self, module: str):
+        root = module.split('.')[0]
+        if root in ('flask', 'fastapi', 'django', 'starlette'):
+            self.frameworks.add('fastapi' if root == 'starlette' else root)
+
+    def visit_Assign(self, node: ast.Assign):
+        # router = APIRouter(prefix="/users") / bp = Blueprint("users", __name__, url_prefix="/users")
+        if isinstance(node.value, ast.Call) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            constructor = _call_name(node.value)
+            prefix = None
+            if constructor == 'APIRouter':
+                prefix = _literal(_keyword(node.value, 'prefix'))
+            elif constructor == 'Blueprint':
+                prefix = _literal(_keyword(node.value, 'url_prefix'))
+            if isinstance(prefix, str):
+                self.router_prefixes[node.targets[0].id] = prefix
+        # urlpatterns = [path(...), ...] is handled by visit_Call
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        for decorator in node.decorator_list:
+            self._route_from_decorator(node, decorator)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call):
+        name = _call_name(node)
+        if name == 'add_url_rule' and isinstance(node.func, ast.Attribute):
+            self._route_from_add_url_rule(node)
+        elif name in ('include_router', 'register_blueprint') and isinstance(node.func, ast.Attribute) and node.args:
+            prefix = _literal(_keyword(node, 'prefix' if name == 'include_router' else 'url_prefix'))
+            router = ast.unparse(node.args[0])
+            head, _, rest = router.partition('.')
+            if head in self.imported_names:
+                # Qualify imported routers so the include can be matched to their module
+                router = self.imported_names[head] + ('.' + rest if rest else '')
+            self.includes.append({
+                "router": router,
+                "prefix": prefix if isinstance(prefix, str) else "",
+                "line": node.lineno
+            })
+        elif name in DJANGO_URL_FUNCTIONS and isinstance(node.func, ast.Name) and len(node.args) >= 2:
+            self._route_from_django(node)
+        self.generic_visit(node)
+
+    def _route_from_decorator(self, function, decorator: ast.AST):
+        if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute):
+            return
+        method_name = decorator.func.attr
+        if method_name not in HTTP_METHOD_DECORATORS and method_name not in ('route', 'api_route'):
+            return
+        path = _literal(decorator.args[0]) if decorator.args else _literal(_keyword(decorator, 'path'))
+        if not isinstance(path, str):
+            return
+
+        if method_name in HTTP_METHOD_DECORATORS:
+            methods = [method_name.upper()]
+        else:
+            methods = _literal(_keyword(decorator, 'methods')) or ['GET']
+
+        router = ast.unparse(decorator.func.value)
+        framework = self._decorator_framework(method_name)
+        params = _path_params(path)
+        # Other decorators (login_required, jwt_required...), except further route registrations
+        guards = [_call_name(other) for other in function.decorator_list
+                  if _call_name(other) not in HTTP_METHOD_DECORATORS | {'route', 'api_route'}]
+        if framework == 'fastapi':
+            params = self._fastapi_params(function, params)
+            guards += self._fastapi_dependencies(function, decorator)
+
+        for method in methods:
+            self.endpoints.append({
+                "path": _join_paths(self.router_prefixes.get(router, ''), path),
+                "method": str(method).upper(),
+                "handler": function.name,
+                "params": params,
+                "guards": [guard for guard in guards if guard],
+                "framework": framework,
+                "router": router,
+                "line": function.lineno
+            })
+
+    def _decorator_framework(self, method_name: str) -> str:
+        if method_name == 'route':
+            return 'flask'
+        if method_name == 'api_route' or 'fastapi' in self.frameworks:
+            return 'fastapi'
+        return 'flask' if 'flask' in self.frameworks else 'unknown'
+
+    def _fastapi_params(self, function, path_params: List[Dict]) -> List[Dict]:
+        """Classify FastAPI handler arguments into path, query, header and body parameters."""
+        by_name = {param["name"]: param for param in path_params}
+        params = []
+        arguments = function.args.posonlyargs + function.args.args + function.args.kwonlyargs
+        positional_defaults = [None] * (len(function.args.posonlyargs) + len(function.args.args)
+                                        - len(function.args.defaults)) + list(function.args.defaults)
+        defaults = positional_defaults + list(function.args.kw_defaults)
+
+        for argument, default in zip(arguments, defaults):
+            if argument.arg in ('self', 'cls'):
+                continue
+            annotation = ast.unparse(argument.annotation) if argument.annotation else None
+            annotation_root = _call_name(argument.annotation.value) if isinstance(argument.annotation, ast.Subscript) \
+                else _call_name(argument.annotation) if argument.annotation else None
+            source = _call_name(default) if isinstance(default, ast.Call) else None
+
+            if source in FASTAPI_DEPENDENCIES or annotation_root in FASTAPI_INJECTED_TYPES:
+                continue
+            if argument.arg in by_name:
+                location = 'path'
+            elif source in FASTAPI_PARAM_SOURCES:
+                location = FASTAPI_PARAM_SOURCES[source]
+            elif annotation_root is None or annotation_root in FASTAPI_SCALAR_TYPES:
+                location = 'query'
+            else:
+                # Anything else (typically a Pydantic model) is read from the request body
+                location = 'body'
+            param = {"name": argument.arg, "in": location, "type": annotation}
+            # Query(le=100) and friends bound the value, which matters for page sizes
+            maximum = _literal(_keyword(default, 'le') or _keyword(default, 'lt')) if source in FASTAPI_PARAM_SOURCES else None
+            if isinstance(maximum, (int, float)) and not isinstance(maximum, bool):
+                param["maximum"] = maximum
+            params.append(param)
+
+        # Path placeholders without a matching argument still belong to the route
+        seen = {param["name"] for param in params}
+        params.extend(param for param in path_params if param["name"] not in seen)
+        return params
+
+    def _fastapi_dependencies(self, function, decorator: ast.Call) -> List[str]:
+        """Callables a FastAPI route depends on: `Depends(get_current_user)` arguments and route `dependencies`."""
+        nodes = list(function.args.defaults) + [default for default in function.args.kw_defaults if default]
+        nodes += [argument.annotation for argument in function.args.args + function.args.kwonlyargs if argument.annotation]
+        nodes += [keyword.value for keyword in decorator.keywords if keyword.arg == 'dependencies']
+        dependencies = []
+        for root in nodes:
+            for node in ast.walk(root):
+                if isinstance(node, ast.Call) and _call_name(node) in FASTAPI_DEPENDENCIES and node.args:
+                    dependencies.append(_call_name(node.args[0]))
+        return dependencies
+
+    def _route_from_add_url_rule(self, call: ast.Call):
+        path = _literal(call.args[0]) if call.args else _literal(_keyword(call, 'rule'))
+        if not isinstance(path, str):
+            return
+        view = _keyword(call, 'view_func') or (call.args[2] if len(call.args) >= 3 else None)
+        methods = _literal(_keyword(call, 'methods')) or ['GET']
+        router = ast.unparse(call.func.value)
+        for method in methods:
+            self.endpoints.append({
+                "path": _join_paths(self.router_prefixes.get(router, ''), path),
+                "method": str(method).upper(),
+                "handler": ast.unparse(view) if view is not None else None,
+                "params": _path_params(path),
+                "guards": _view_wrappers(view),
+                "framework": 'flask',
+                "router": router,
+                "line": call.lineno
+            })
+
+    def _route_from_django(self, call: ast.Call):
+        path = _literal(call.args[0])
+        if not isinstance(path, str):
+            return
+        view = call.args[1]
+        if _call_name(view) == 'include':
+            target = _literal(view.args[0]) if isinstance(view, ast.Call) and view.args else None
+            if isinstance(target, str):
+                self.includes.append({
+                    "router": target,
+                    "prefix": '/' + path.lstrip('^/'),
+                    "urlconf": True,
+                    "line": call.lineno
+                })
+            return
+        if call.func.id == 'path':
+            display_path = path
+        else:
+            # re_path()/url() patterns: strip anchors for readability
+            display_path = path.lstrip('^').rstrip('$')
+        self.endpoints.append({
+            "path": '/' + display_path.lstrip('/'),
+            "method": 'ANY',
+            "handler": ast.unparse(view),
+            "params": _path_params(path),
+            "guards": _view_wrappers(view),
+            "framework": 'django',
+            "router": 'urlpatterns',
+            "line": call.lineno
+        })
+
+def extract_endpoints(source: str) -> Dict:
+    """
+    Statically extract route registrations from Python source.
+
+    Recognises Flask/FastAPI route decorators (`@app.route`, `@router.get`,
+    `@app.api_route`, ...), `add_url_rule`, Django `path`/`re_path`/`url`
+    entries, and router includes (`include_router`, `register_blueprint`,
+    Django `include`).  The result depends only on the source text, so it can
+    be cached by blob SHA.
+
+    Returns:
+        Dict with "endpoints" and "includes" lists; files that do not parse
+        return an "error" entry instead.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        return {"endpoints": [], "includes": [], "error": f"{type(e).__name__}: {e}"}
+    visitor = _ModuleVisitor()
+    visitor.visit(tree)
+    return {"endpoints": visitor.endpoints, "includes": visitor.includes}
+
+def extract_endpoints_parallel(sources: Iterable[Tuple[str, str]], max_workers: Optional[int] = None,
+                               batch_size: int = 1024, min_parallel: int = 32) -> Dict[str, Dict]:
+    """
+    Extract endpoints from many (key, source) pairs across a process pool.
+
+    Sources are consumed in batches so only one batch of file contents is
+    held in memory at a time.  Small inputs are parsed inline, where starting
+    worker processes would cost more than the parsing itself.
+    """
+    sources = iter(sources)
+    batch = list(islice(sources, batch_size))
+    if len(batch) < min_parallel:
+        return {key: extract_endpoints(source) for key, source in batch}
+
+    results = {}
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while batch:
+            chunksize = max(1, len(batch) // (workers * 4))
+            parsed = executor.map(extract_endpoints, [source for _, source in batch], chunksize=chunksize)
+            results.update(zip((key for key, _ in batch), parsed))
+            batch = list(islice(sources, batch_size))
+    return results
+
+def _include_target(include: Dict) -> Optional[Tuple[str, str]]:
+    """Map an include to (module file suffix, router variable) it mounts, if resolvable."""
+    router = include["router"]
+    if include.get("urlconf"):
+        # include("users.urls") mounts the urlpatterns of users/urls.py
+        return router.replace('.', '/') + '.py', 'urlpatterns'
+    if '.' in router and '(' not in router:
+        # include_router(users.router) mounts `router` defined in users.py,
+        # and an imported app.users.router the one in app/users.py
+        module, _, variable = router.rpartition('.')
+        return module.replace('.', '/') + '.py', variable
+    return None
+
+def build_endpoint_index(files: Iterable[Tuple[str, Dict]]) -> List[Dict]:
+    """
+    Merge per-file extraction results into one endpoint index.
+
+    Router includes are resolved across files where the target can be
+    matched to a module in the index (`app.include_router(users.router,
+    prefix="/v1")` prefixes the routes registered on `router` in any
+    `users.py`, and Django `include("users.urls")` those of `users/urls.py`),
+    so mounted routes report their full path.
+    """
+    files = list(files)
+    mounts = []
+    for _, result in files:
+        for include in result.get("includes", []):
+            target = _include_target(include)
+            if target:
+                mounts.append((target, include["prefix"]))
+
+    index = []
+    for path, result in files:
+        for endpoint in result.get("endpoints", []):
+            prefixes = [
+                prefix for (suffix, variable), prefix in mounts
+                if endpoint.get("router") == variable and (path == suffix or path.endswith('/' + suffix))
+            ] or ['']
+            for prefix in prefixes:
+                entry = dict(endpoint, file=path)
+                entry["path"] = _join_paths(prefix, endpoint["path"])
+                index.append(entry)
+    index.sort(key=lambda e: (e["file"], e["line"], e["path"], e["method"]))
+    return index
@@ -1,23 +1,179 @@
 from crewai.tools import BaseTool
 import git
 import os
-import tempfile
 import json
 import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from tools.analysis_store import AnalysisStore, configured_store_url
+from tools.clone_cache import CloneCache
+from tools.endpoint_extractor import EXTRACTOR_VERSION, build_endpoint_index, extract_endpoints_parallel
+
+# Filename fragments that mark a file as a likely API definition
+API_FILE_PATTERNS = ['openapi', 'swagger', 'api', 'routes', 'endpoints']
+# Extensions of files that are either configuration or API specifications
+SPEC_FILE_EXTENSIONS = ('.json', '.yaml', '.yml')
+# Filename fragments that mark a file as configuration
+CONFIG_FILE_PATTERNS = ['config', 'settings', 'env', '.env', '.ini', '.cfg']
+# Tree entry mode of submodules, which are commits rather than files
+SUBMODULE_MODE = b'160000'
+
+def classify_file(name: str) -> Optional[str]:
+    """Classify a file by name as api_definition, config_or_spec, python or config."""
+    filename = name.lower()
+    # Look for common API definition file patterns
+    if any(pattern in filename for pattern in API_FILE_PATTERNS):
+        return "api_definition"
+    if filename.endswith(SPEC_FILE_EXTENSIONS):
+        return "config_or_spec"
+    if filename.endswith('.py'):
+        return "python"
+    if any(pattern in filename for pattern in CONFIG_FILE_PATTERNS):
+        return "config"
+    return None
+
+def classify_path(path: str) -> Optional[str]:
+    """Classify a repository path by its file name."""
+    return classify_file(path.rsplit('/', 1)[-1])
+
+def _iter_nul_records(process) -> Iterator[bytes]:
+    """Stream the NUL-terminated records written by a `git ... -z` process."""
+    stream = process.proc.stdout
+    pending = b''
+    while True:
+        chunk = stream.read(1 << 16)
+        if not chunk:
+            break
+        records = (pending + chunk).split(b'\0')
+        pending = records.pop()
+        yield from records
+    process.wait()
+
+def iter_tree_blobs(repo: git.Repo, rev: str = "HEAD") -> Iterator[Tuple[str, str]]:
+    """
+    Stream (blob_sha, path) for every file in a commit's tree.
+
+    Reads `git ls-tree -r -z` incrementally instead of building GitPython
+    object trees, so very large trees are walked once in constant memory.
+    """
+    process = repo.git.ls_tree('-r', '-z', '--full-tree', rev, as_process=True)
+    for record in _iter_nul_records(process):
+        meta, path = record.split(b'\t', 1)
+        _, object_type, sha = meta.split(b' ')
+        # Submodules show up as 'commit' entries and are not files
+        if object_type == b'blob':
+            yield sha.decode('ascii'), path.decode('utf-8', 'replace')
+
+def index_repository_endpoints(repo: git.Repo, python_files: Iterable[Tuple[str, str]],
+                               store: Optional[AnalysisStore] = None, max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Endpoint index of (path, blob_sha) Python files of a repository.
+
+    Extraction results are cached by blob SHA in the analysis store, so
+    only files whose content is new are read and parsed; those are
+    parsed across a process pool.
+    """
+    paths_by_blob: Dict[str, List[str]] = {}
+    for path, sha in python_files:
+        paths_by_blob.setdefault(sha, []).append(path)
+
+    results = store.cached_endpoints(list(paths_by_blob), EXTRACTOR_VERSION) if store else {}
+    missing = [sha for sha in paths_by_blob if sha not in results]
+    if missing:
+        # Read through GitPython's persistent `git cat-file --batch` process
+        sources = ((sha, repo.git.get_object_data(sha)[3].decode('utf-8', 'replace')) for sha in missing)
+        parsed = extract_endpoints_parallel(sources, max_workers=max_workers)
+        if store:
+            store.cache_endpoints(parsed, EXTRACTOR_VERSION)
+        results.update(parsed)
+
+    return build_endpoint_index(
+        (path, results[sha]) for sha, paths in paths_by_blob.items() for path in paths
+    )
+
+def iter_tree_changes(repo: git.Repo, old_rev: str, new_rev: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Stream (status, path, blob_sha) for every file changed between two commits.
+
+    Status is 'D' for files that no longer exist (blob_sha is None) and
+    'A', 'M' or 'T' for files that were added or changed.
+    """
+    process = repo.git.diff_tree('-r', '-z', '--no-renames', '--no-commit-id', old_rev, new_rev, as_process=True)
+    records = _iter_nul_records(process)
+    for meta in records:
+        path = next(records).decode('utf-8', 'replace')
+        old_mode, new_mode, _, new_sha, status = meta.lstrip(b':').split(b' ')
+        if new_mode == SUBMODULE_MODE or status == b'D':
+            if old_mode != SUBMODULE_MODE:
+                yield 'D', path, None
+        else:
+            yield status.decode('ascii'), path, new_sha.decode('ascii')
+
+def iter_file_history(repo: git.Repo, path: str, rev: str = "HEAD") -> Iterator[Dict]:
+    """
+    Stream the versions of one file along the first-parent history of `rev`, oldest first.
+
+    Each commit that changed the file yields its sha, timestamp, author,
+    subject and the file's new blob SHA (None when the commit deleted it),
+    read from a single `git log --raw` instead of walking commit objects.
+    """
+    process = repo.git.log('--reverse', '--first-parent', '--diff-merges=first-parent', '--no-renames',
+                           '--raw', '--no-abbrev', '-z', '--format=%x01%H%x00%ct%x00%an%x00%s', rev, '--', path,
+                           as_process=True)
+    records = _iter_nul_records(process)
+    commit = None
+    for record in records:
+        if record.startswith(b'\n'):
+            record = record[1:]
+        if record.startswith(b'\x01'):
+            if commit:
+                yield commit
+            sha, timestamp, author = record[1:].decode('utf-8', 'replace'), next(records), next(records)
+            commit = {
+                "commit": sha,
+                "timestamp": int(timestamp),
+                "author": author.decode('utf-8', 'replace'),
+                "message": next(records).decode('utf-8', 'replace'),
+                "blob_sha": None,
+            }
+        elif record.startswith(b':') and commit:
+            # :old_mode new_mode old_sha new_sha status, followed by the path
+            _, new_mode, _, new_sha, status = record[1:].split(b' ')
+            next(records)
+            deleted = status == b'D' or new_mode == SUBMODULE_MODE
+            commit["blob_sha"] = None if deleted else new_sha.decode('ascii')
+    if commit:
+        yield commit
 
 class GitRepositoryAnalyzerTool(BaseTool):
     name: str = "Git Repository Analyzer Tool"
     description: str = "Parse repositories for API definitions and related files"
 
+    # Number of most recent commits included in the report
+    recent_commit_limit: int = 5
+    # Directory holding bare mirrors of analyzed remote repositories
+    clone_cache_dir: str = os.path.join(".cache", "repositories")
+    # Disk budget of the clone cache; least recently used mirrors are evicted beyond it
+    clone_cache_max_bytes: int = 2 * 1024 ** 3
+    # How remote repositories are cloned: full, shallow, blobless or sparse
+    # (sparse pulls the Python sources the endpoint extractor reads in one batch)
+    clone_mode: str = "sparse"
+    # History depth fetched in shallow mode
+    clone_depth: int = 50
+    # Only re-classify what changed since the HEAD recorded in the analysis store
+    incremental: bool = True
+    # SQLite URL of the analysis store; None uses database.url from configs/app_config.json
+    analysis_store_url: Optional[str] = None
+    # Parse Python sources into a structured endpoint index
+    extract_endpoints: bool = True
+    # Worker processes used for endpoint extraction; None uses one per CPU
+    endpoint_workers: Optional[int] = None
+
     def _run(self, repo_path: str = None, repo_url: str = None) -> str:
         # Clone repository if URL is provided
         if repo_url:
-            # Create a temporary directory to clone the repository
-            temp_dir = tempfile.mkdtemp()
             try:
-                # Clone the repository
-                git.Repo.clone_from(repo_url, temp_dir)
-                repo_path = temp_dir
+                # Reuse the cached mirror of the repository, fetching only what changed
+                repo_path = self._clone_cache().checkout(repo_url)
             except Exception as e:
                 return f"Failed to clone repository: {str(e)}"
         
@@ -33,64 +189,141 @@ class GitRepositoryAnalyzerTool(BaseTool):
             repo_info = {
                 "repository": repo_url or repo_path,
                 "active_branch": str(repo.active_branch),
-                "commit_count": len(list(repo.iter_commits())),
-                "file_count": len([item for item in repo.tree().traverse() if item.type == 'blob'])
             }
             
+            store = AnalysisStore(self._analysis_store_url()) if self.incremental else None
+            try:
+                if store:
+                    summary, files = self._analyze_incrementally(repo, store, repo_url or os.path.realpath(repo.git_dir))
+                else:
+                    summary, files = self._analyze_tree(repo)
+                endpoint_index = self._index_endpoints(repo, files, store) if self.extract_endpoints else None
+            finally:
+                if store:
+                    store.close()
+            
+            repo_info["commit_count"] = summary["commit_count"]
+            repo_info["file_count"] = summary["file_count"]
+            
             # Look for common API definition files and related files
             api_files = []
             python_files = []
             config_files = []
             
-            for item in repo.tree().traverse():
-                if item.type == 'blob':
-                    filename = item.name.lower()
-                    # Look for common API definition file patterns
-                    if any(pattern in filename for pattern in [
-                        'openapi', 'swagger', 'api', 'routes', 'endpoints'
-                    ]):
-                        api_files.append({
-                            "name": item.name,
-                            "path": item.path,
-                            "type": "api_definition"
-                        })
-                    elif filename.endswith(('.json', '.yaml', '.yml')):
-                        api_files.append({
-                            "name": item.name,
-                            "path": item.path,
-                            "type": "config_or_spec"
-                        })
-                    elif filename.endswith('.py'):
-                        python_files.append({
-                            "name": item.name,
-                            "path": item.path
-                        })
-                    elif any(pattern in filename for pattern in [
-                        'config', 'settings', 'env', '.env', '.ini', '.cfg'
-                    ]):
-                        config_files.append({
-                            "name": item.name,
-                            "path": item.path
-                        })
+            for path, _, category in files:
+                name = path.rsplit('/', 1)[-1]
+                if category == "api_definition" or category == "config_or_spec":
+                    api_files.append({
+                        "name": name,
+                        "path": path,
+                        "type": category
+                    })
+                elif category == "python":
+                    python_files.append({
+                        "name": name,
+                        "path": path
+                    })
+                elif category == "config":
+                    config_files.append({
+                        "name": name,
+                        "path": path
+                    })
             
             # Add file information to repo info
             repo_info["potential_api_files"] = api_files
             repo_info["python_files"] = python_files
             repo_info["config_files"] = config_files
-            
-            # Get recent commits
-            recent_commits = []
-            for commit in list(repo.iter_commits())[:5]:  # Last 5 commits
-                recent_commits.append({
-                    "sha": commit.hexsha[:8],
-                    "message": commit.message.strip(),
-                    "author": str(commit.author),
-                    "date": commit.committed_datetime.isoformat()
-                })
-            
-            repo_info["recent_commits"] = recent_commits
+            if endpoint_index is not None:
+                repo_info["endpoint_index"] = endpoint_index
+            repo_info["recent_commits"] = summary["recent_commits"]
             
             return json.dumps(repo_info, indent=2)
             
         except Exception as e:
-            return f"Failed to analyze repository: {str(e)}"
\ No newline at end of file
+            return f"Failed to analyze repository: {str(e)}"
+
+    def _analyze_tree(self, repo: git.Repo) -> Tuple[Dict, List[Tuple[str, str, str]]]:
+        """Classify the whole tree in a single pass without consulting the analysis store."""
+        summary = self._summarize_history(repo)
+        files = []
+        file_count = 0
+        for sha, path in iter_tree_blobs(repo):
+            file_count += 1
+            category = classify_path(path)
+            if category:
+                files.append((path, sha, category))
+        summary["file_count"] = file_count
+        return summary, files
+
+    def _analyze_incrementally(self, repo: git.Repo, store: AnalysisStore,
+                               repository: str) -> Tuple[Dict, List[Tuple[str, str, str]]]:
+        """
+        Bring the stored analysis of a repository up to its current HEAD.
+
+        An unchanged HEAD is answered straight from the store.  When HEAD
+        moved, only the files in the `old_sha..new_sha` tree diff are
+        re-classified; the whole tree is scanned only on the first run or
+        when the old commit is no longer available (e.g. after a force push).
+        """
+        head_sha = repo.head.commit.hexsha
+        record = store.get_repository(repository)
+        if record and record["head_sha"] == head_sha:
+            summary = record["summary"]
+        else:
+            summary = self._summarize_history(repo)
+            if record and self._has_commit(repo, record["head_sha"]):
+                changes = (
+                    (status, path, sha, classify_path(path) if sha else None)
+                    for status, path, sha in iter_tree_changes(repo, record["head_sha"], head_sha)
+                )
+                summary = store.record_changes(repository, head_sha, summary, changes)
+            else:
+                files = ((path, sha, classify_path(path)) for sha, path in iter_tree_blobs(repo, head_sha))
+                summary = store.record_full_scan(repository, head_sha, summary, files)
+        return summary, store.categorized_files(repository)
+
+    def _index_endpoints(self, repo: git.Repo, files: List[Tuple[str, str, str]],
+                         store: Optional[AnalysisStore]) -> List[Dict]:
+        """Build the endpoint index of the repository's Python sources."""
+        python_files = ((path, sha) for path, sha, _ in files if path.endswith('.py'))
+        return index_repository_endpoints(repo, python_files, store, self.endpoint_workers)
+
+    def _summarize_history(self, repo: git.Repo) -> Dict:
+        """Count commits and collect the most recent ones."""
+        # Get recent commits
+        recent_commits = []
+        for commit in repo.iter_commits(max_count=self.recent_commit_limit):
+            recent_commits.append({
+                "sha": commit.hexsha[:8],
+                "message": commit.message.strip(),
+                "author": str(commit.author),
+                "date": commit.committed_datetime.isoformat()
+            })
+        return {
+            # Let git count the history instead of materializing every commit
+            "commit_count": int(repo.git.rev_list('--count', 'HEAD')),
+            "recent_commits": recent_commits
+        }
+
+    def _has_commit(self, repo: git.Repo, sha: str) -> bool:
+        """Check whether a commit is present in the repository."""
+        try:
+            repo.git.cat_file('-e', f'{sha}^{{commit}}')
+            return True
+        except git.GitCommandError:
+            return False
+
+    def _analysis_store_url(self) -> str:
+        """Resolve the analysis store URL, defaulting to the app's configured database."""
+        return configured_store_url(self.analysis_store_url)
+
+    def _clone_cache(self) -> CloneCache:
+        """Build the clone cache configured for this tool."""
+        return CloneCache(
+            cache_dir=self.clone_cache_dir,
+            max_bytes=self.clone_cache_max_bytes,
+            mode=self.clone_mode,
+            depth=self.clone_depth,
+            # Sparse clones only pull files the classifier cares about
+            sparse_filter=lambda path: classify_path(path) is not None
+        )
@@ -0,0 +1,213 @@
+import asyncio
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import aiohttp
+except ImportError:  # Only running load scenarios needs aiohttp
+    aiohttp = None
+
+from tools.metrics_engine import HISTOGRAM_BOUNDS_MS, REPORTED_QUANTILES, LatencySketch, response_time_histogram
+
+# Kinds of load scenarios: sustained load judged by latency and errors, and a
+# burst above the expected limit that should be answered with 429s
+SCENARIO_KINDS = ("performance", "rate_limit")
+
+# Path template parameters ({id}) and the value requests substitute for them
+PATH_PARAMETER = re.compile(r'\{[^}/]+\}')
+SAMPLE_PATH_VALUE = "1"
+
+def sample_path(endpoint: str) -> str:
+    """A requestable path for an endpoint template: `/api/users/{id}` becomes `/api/users/1`."""
+    return PATH_PARAMETER.sub(SAMPLE_PATH_VALUE, endpoint)
+
+class LoadScenario:
+    """
+    One runnable load test: `rps` requests per second for `duration_seconds`
+    against `method path`, judged against `expect`.
+
+    `expect` holds `p99_ms` and `max_error_rate` for performance scenarios,
+    which also fail when requests are rate limited; rate-limit scenarios
+    pass when any request is answered with 429.  Failed and dropped
+    requests and responses other than 2xx, 3xx and 429 count as errors.
+    """
+
+    def __init__(self, name: str, kind: str, method: str, path: str, rps: float, duration_seconds: float,
+                 headers: Optional[Dict[str, str]] = None, expect: Optional[Dict] = None):
+        if kind not in SCENARIO_KINDS:
+            raise ValueError(f"Unknown load scenario kind '{kind}'")
+        if rps <= 0 or duration_seconds <= 0:
+            raise ValueError("Load scenarios need a positive rps and duration")
+        self.name = name
+        self.kind = kind
+        self.method = method.upper()
+        self.path = path
+        self.rps = rps
+        self.duration_seconds = duration_seconds
+        self.headers = headers or {}
+        self.expect = expect or {}
+
+    @property
+    def requests(self) -> int:
+        return max(1, round(self.rps * self.duration_seconds))
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "method": self.method,
+            "path": self.path,
+            "rps": self.rps,
+            "duration_seconds": self.duration_seconds,
+            "headers": self.headers,
+            "expect": self.expect,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LoadScenario":
+        return cls(data["name"], data["kind"], data["method"], data["path"], data["rps"], data["duration_seconds"],
+                   data.get("headers"), data.get("expect"))
+
+class _Recorder:
+    """Outcome of every request of one scenario run, by request number."""
+
+    def __init__(self, requests: int):
+        # Milliseconds from each request's scheduled send time to its response; NaN until answered
+        self.latencies = np.full(requests, np.nan)
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.dropped = 0
+        self.first_rate_limited: Optional[int] = None
+        self.max_send_lag = 0.0
+
+class LoadRunner:
+    """
+    Open-loop load generator.
+
+    Requests are sent on a fixed schedule (request i at start + i/rps)
+    whether or not earlier ones have been answered, so a slow target sees
+    the offered load pile up instead of throttling the test, and each
+    latency is measured from the scheduled send time, so queueing delay is
+    not hidden (coordinated omission).  Requests due while `max_in_flight`
+    are outstanding are dropped and counted as errors.  Scenarios of one
+    run share a pooled `aiohttp.ClientSession` (whose per-request overhead
+    is several times lower than httpx's, which matters when the client's
+    CPU caps the load it can offer) and run one after another.
+    """
+
+    def __init__(self, timeout: float = 10.0, max_in_flight: int = 1000):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required to run load scenarios")
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+
+    async def run(self, base_url: str, scenarios: Iterable[LoadScenario]) -> List[Dict]:
+        """Run scenarios against a target; one result per scenario, in order."""
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        async with aiohttp.ClientSession(connector=connector,
+                                         timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            return [await self._run_scenario(session, base_url.rstrip('/'), scenario) for scenario in scenarios]
+
+    async def _run_scenario(self, session: "aiohttp.ClientSession", base_url: str, scenario: LoadScenario) -> Dict:
+        loop = asyncio.get_running_loop()
+        url = base_url + scenario.path
+        total = scenario.requests
+        interval = 1.0 / scenario.rps
+        record = _Recorder(total)
+        in_flight = set()
+        start = loop.time()
+        sent = 0
+        while sent < total:
+            # Everything due by now goes out at once, so a late wake-up does not lower the offered rate
+            due = min(total, int((loop.time() - start) / interval) + 1)
+            for index in range(sent, due):
+                if len(in_flight) >= self.max_in_flight:
+                    record.dropped += 1
+                    continue
+                task = asyncio.ensure_future(self._send(session, url, scenario, start + index * interval, index, record))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            sent = due
+            if sent < total:
+                await asyncio.sleep(max(0.0, start + sent * interval - loop.time()))
+        if in_flight:
+            await asyncio.wait(in_flight)
+        return _summarize(scenario, url, record, loop.time() - start)
+
+    async def _send(self, session: "aiohttp.ClientSession", url: str, scenario: LoadScenario, scheduled: float,
+                    index: int, record: _Recorder) -> None:
+        loop = asyncio.get_running_loop()
+        record.max_send_lag = max(record.max_send_lag, loop.time() - scheduled)
+        try:
+            async with session.request(scenario.method, url, headers=scenario.headers,
+                                       allow_redirects=False) as response:
+                await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            record.errors += 1
+            record.statuses[type(e).__name__] += 1
+            return
+        record.latencies[index] = (loop.time() - scheduled) * 1000
+        record.statuses[str(status)] += 1
+        if status == 429:
+            if record.first_rate_limited is None or index < record.first_rate_limited:
+                record.first_rate_limited = index
+        elif not 200 <= status < 400:
+            # A 401 or 404 answers quickly, so it would otherwise pass for a fast endpoint
+            record.errors += 1
+
+def _summarize(scenario: LoadScenario, url: str, record: _Recorder, elapsed: float) -> Dict:
+    latencies = record.latencies[np.isfinite(record.latencies)]
+    total = scenario.requests
+    errors = record.errors + record.dropped
+    error_rate = errors / total
+    rate_limited = record.statuses.get("429", 0)
+    percentiles = LatencySketch.from_values(latencies).quantiles(list(REPORTED_QUANTILES.values()))[0]
+    latency = {key: round(float(value), 2) if np.isfinite(value) else None
+               for key, value in zip(REPORTED_QUANTILES, percentiles)}
+    histogram = response_time_histogram(latencies, np.zeros(len(latencies), dtype=np.int64), 1)[0]
+
+    if scenario.kind == "rate_limit":
+        passed = rate_limited > 0
+        verdict = (f"429 from request {record.first_rate_limited + 1} of {total} at {scenario.rps:g} rps" if passed
+                   else f"No 429 in {total} requests at {scenario.rps:g} rps")
+    else:
+        p99 = latency["p99"]
+        p99_limit = scenario.expect.get("p99_ms")
+        max_error_rate = scenario.expect.get("max_error_rate")
+        problems = []
+        if p99_limit is not None and (p99 is None or p99 > p99_limit):
+            problems.append(f"p99 {p99}ms above {p99_limit}ms")
+        if max_error_rate is not None and error_rate > max_error_rate:
+            problems.append(f"error rate {error_rate:.1%} above {max_error_rate:.1%}")
+        if rate_limited:
+            # Latencies of 429s measure the rate limiter, not the endpoint
+            problems.append(f"{rate_limited} requests rate limited (429)")
+        passed = not problems
+        verdict = "; ".join(problems) or f"p99 {p99}ms, error rate {error_rate:.1%} at {scenario.rps:g} rps"
+
+    return {
+        "scenario": scenario.name,
+        "kind": scenario.kind,
+        "target": f"{scenario.method} {url}",
+        "offered_rps": scenario.rps,
+        "requests": total,
+        "completed": int(len(latencies)),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "errors": errors,
+        "dropped": record.dropped,
+        "error_rate": round(error_rate, 4),
+        "rate_limited": rate_limited,
+        "status_codes": dict(record.statuses.most_common()),
+        "latency_ms": latency,
+        "latency_histogram": [
+            {"le_ms": bound, "count": int(count)}
+            for bound, count in zip(list(HISTOGRAM_BOUNDS_MS) + ["+Inf"], histogram)
+        ],
+        "max_send_lag_ms": round(record.max_send_lag * 1000, 2),
+        "passed": passed,
+        "verdict": verdict,
+    }
@@ -0,0 +1,278 @@
+import calendar
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+import numpy as np
+from tools.metrics_engine import MetricsFrame
+
+# Supported access log formats
+LOG_FORMATS = ("nginx", "envoy", "json")
+
+# Bytes of (decompressed) log read per batch; each batch becomes one MetricsFrame
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Responses with a status at or above this count towards the error rate
+ERROR_STATUS = 500
+
+# nginx "combined" format, optionally followed by $request_time in seconds:
+# 10.0.0.1 - - [10/Oct/2023:13:55:36 +0000] "GET /api/users?page=2 HTTP/1.1" 200 512 "-" "curl/8.0" 0.042
+NGINX_LINE = re.compile(
+    rb'^\S+ \S+ \S+ \[([^\]]+)\] "[A-Z]+ ([^ "?]*)[^"]*" (\d{3}) \S+(?: "[^"]*" "[^"]*"(?: ([\d.]+))?)?[^\n]*$',
+    re.MULTILINE
+)
+
+# Envoy's default access log format; %DURATION% is in milliseconds:
+# [2023-10-10T13:55:36.123Z] "GET /api/users HTTP/1.1" 200 - 0 512 42 40 "-" "curl/8.0" "..." "api" "10.0.0.2:80"
+ENVOY_LINE = re.compile(
+    rb'^\[(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?)Z?\] "[A-Z]+ ([^ "?]*)[^"]*" (\d{3}) \S+ \d+ \d+ (\d+)[^\n]*$',
+    re.MULTILINE
+)
+
+# JSON lines: accepted field names for each value, the first one present wins
+JSON_FIELDS = {
+    "timestamp": ("timestamp", "time", "ts", "@timestamp"),
+    "path": ("path", "uri", "request_uri", "url", "endpoint"),
+    "status": ("status", "status_code", "response_code"),
+    "duration_ms": ("response_time_ms", "duration_ms", "duration"),
+    "duration_s": ("request_time", "duration_s"),
+}
+
+# Path segments collapsed to {id} so /users/42 and /users/43 are one endpoint:
+# numbers, UUIDs and long hex ids (one path per line, so `$` ends a path)
+ID_SEGMENT_PATTERN = (
+    r'/(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+    r'|[0-9a-fA-F]{24,})(?=/|$)'
+)
+ID_SEGMENT = re.compile(ID_SEGMENT_PATTERN, re.MULTILINE)
+ID_SEGMENT_BYTES = re.compile(ID_SEGMENT_PATTERN.encode(), re.MULTILINE)
+
+MONTHS = {name: number for number, name in enumerate(
+    [b'Jan', b'Feb', b'Mar', b'Apr', b'May', b'Jun', b'Jul', b'Aug', b'Sep', b'Oct', b'Nov', b'Dec'], 1
+)}
+
+def normalize_endpoint(path: str) -> str:
+    """Strip the query string and replace numeric, UUID and hex id segments with {id}."""
+    return ID_SEGMENT.sub('/{id}', path.split('?', 1)[0] or '/')
+
+def _is_gzip(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+def open_log(path: str) -> BinaryIO:
+    """Open a log file for binary reading, transparently decompressing gzip files."""
+    return gzip.open(path, 'rb') if _is_gzip(path) else open(path, 'rb')
+
+def log_source(path: str) -> Dict:
+    """
+    Identity of a log file: its real path, device and inode, and its size.
+
+    A rotated log is a new inode at the same path and a log truncated in
+    place is shorter than before, so comparing identities tells whether a
+    previously ingested prefix is still there.  The size of a gzip file is
+    left out (None); offsets into it count decompressed bytes.
+    """
+    stat = os.stat(path)
+    return {
+        "path": os.path.realpath(path),
+        "device": stat.st_dev,
+        "inode": stat.st_ino,
+        "size": None if _is_gzip(path) else stat.st_size,
+    }
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = CHUNK_SIZE, boundary: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Yield blocks of roughly `chunk_size` bytes that always end on a line boundary.
+
+    When `boundary` is the offset of a line start, no block spans it.  A
+    last line without a newline is yielded as it is.
+    """
+    remainder = b''
+    position = 0
+    while True:
+        size = chunk_size
+        if boundary is not None and position < boundary < position + chunk_size:
+            size = boundary - position
+        block = stream.read(size)
+        if not block:
+            break
+        position += len(block)
+        block = remainder + block if remainder else block
+        cut = block.rfind(b'\n') + 1
+        if cut == 0:
+            remainder = block
+            continue
+        remainder = block[cut:]
+        yield block[:cut]
+    if remainder:
+        yield remainder
+
+def detect_format(line: bytes) -> str:
+    line = line.lstrip()
+    if line.startswith(b'{'):
+        return "json"
+    if ENVOY_LINE.match(line):
+        return "envoy"
+    return "nginx"
+
+class AccessLogReader:
+    """
+    Stream an access log into `MetricsFrame` batches.
+
+    The file is read in `chunk_size` blocks (decompressing gzip on the fly),
+    so memory use is bounded by one block no matter how large the log is.
+    nginx and Envoy lines are parsed with one `findall` over each block,
+    endpoints are normalized with one substitution over the block's paths,
+    and timestamps are converted once per distinct value in the block.  Each
+    request becomes one row with its response time and an error rate of 100
+    (5xx) or 0, so averages give the error percentage.
+    """
+
+    def __init__(self, path: str, log_format: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+                 boundary: Optional[int] = None):
+        if log_format and log_format not in LOG_FORMATS:
+            raise ValueError(f"Unsupported log format '{log_format}', expected one of {', '.join(LOG_FORMATS)}")
+        self.path = path
+        self.log_format = log_format
+        self.chunk_size = chunk_size
+        # Offset (of a line start) no chunk spans, so frames are wholly before or after it
+        self.boundary = boundary
+        # Byte range of the log the last frame was parsed from; `end` only covers complete lines
+        self.chunk_start = 0
+        self.chunk_end = 0
+        self.stats = {"format": log_format, "bytes": 0, "lines": 0, "parsed_lines": 0, "skipped_lines": 0}
+
+    def frames(self) -> Iterator[MetricsFrame]:
+        with open_log(self.path) as stream:
+            offset = 0
+            for chunk in iter_chunks(stream, self.chunk_size, self.boundary):
+                start, offset = offset, offset + len(chunk)
+                if not chunk.endswith(b'\n'):
+                    # A last line still being written is parsed but not counted as read past
+                    chunk += b'\n'
+                    offset = start
+                if not self.log_format:
+                    self.log_format = detect_format(chunk[:chunk.find(b'\n')])
+                    self.stats["format"] = self.log_format
+                lines = chunk.count(b'\n')
+                if self.log_format == "json":
+                    frame = self._parse_json(chunk)
+                else:
+                    frame = self._parse_lines(chunk)
+                self.stats["bytes"] += len(chunk)
+                self.stats["lines"] += lines
+                self.stats["parsed_lines"] += len(frame)
+                self.stats["skipped_lines"] += lines - len(frame)
+                if len(frame):
+                    self.chunk_start, self.chunk_end = start, offset
+                    yield frame
+
+    def _parse_lines(self, chunk: bytes) -> MetricsFrame:
+        pattern = ENVOY_LINE if self.log_format == "envoy" else NGINX_LINE
+        matches = pattern.findall(chunk)
+        if not matches:
+            return self._frame([], np.empty(0), np.empty(0), np.empty(0))
+        times, paths, statuses, durations = zip(*matches)
+
+        if self.log_format == "envoy":
+            timestamps = np.array(times).astype('datetime64[ms]').astype(np.int64) / 1e3
+            response_times = np.array(durations).astype(np.float64)
+        else:
+            parsed_times = {value: _parse_nginx_time(value) for value in set(times)}
+            timestamps = np.fromiter(map(parsed_times.__getitem__, times), dtype=np.float64, count=len(times))
+            durations = np.array(durations)
+            # $request_time is optional; lines without it have no response time
+            response_times = np.where(durations == b'', b'nan', durations).astype(np.float64) * 1000
+        statuses = np.array(statuses).astype(np.float64)
+        # A line whose time cannot be parsed is skipped, like a line the pattern does not match
+        valid = ~np.isnan(timestamps)
+        if not valid.all():
+            paths = [path for path, keep in zip(paths, valid) if keep]
+            timestamps, statuses, response_times = timestamps[valid], statuses[valid], response_times[valid]
+        return self._frame(paths, timestamps, statuses, response_times)
+
+    def _parse_json(self, chunk: bytes) -> MetricsFrame:
+        paths, timestamps, statuses, response_times = [], [], [], []
+        for line in chunk.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            path = _first_field(record, "path")
+            if not isinstance(path, str):
+                continue
+            # A record with a value that is not a number ("status": "-") is skipped, like a malformed line
+            try:
+                status = _optional_float(_first_field(record, "status"))
+                duration = _optional_float(_first_field(record, "duration_ms"))
+                if duration is None:
+                    duration = _optional_float(_first_field(record, "duration_s"))
+                    duration = None if duration is None else duration * 1000
+            except (TypeError, ValueError):
+                continue
+            paths.append(path.split('?', 1)[0].encode('utf-8'))
+            timestamps.append(_json_timestamp(_first_field(record, "timestamp")))
+            statuses.append(status)
+            response_times.append(duration)
+        return self._frame(paths, np.array(timestamps, dtype=np.float64),
+                           _float_array(statuses), _float_array(response_times))
+
+    def _frame(self, paths: List[bytes], timestamps: np.ndarray, statuses: np.ndarray,
+               response_times: np.ndarray) -> MetricsFrame:
+        normalized = ID_SEGMENT_BYTES.sub(b'/{id}', b'\n'.join(paths)).split(b'\n') if paths else []
+        # dict.fromkeys keeps first-seen order, so endpoint codes follow the log
+        endpoint_codes = {endpoint: code for code, endpoint in enumerate(dict.fromkeys(normalized))}
+        codes = np.fromiter(map(endpoint_codes.__getitem__, normalized), dtype=np.int64, count=len(normalized))
+        error_rate = np.where(statuses >= ERROR_STATUS, 100.0, 0.0)
+        error_rate[np.isnan(statuses)] = np.nan
+        endpoints = [endpoint.decode('utf-8', 'replace') or '/' for endpoint in endpoint_codes]
+        return MetricsFrame(endpoints, codes, timestamps,
+                            {"response_time_ms": response_times, "error_rate": error_rate})
+
+def _parse_nginx_time(value: bytes) -> float:
+    """Parse nginx's $time_local (10/Oct/2023:13:55:36 +0000) into epoch seconds, NaN if malformed."""
+    try:
+        # Slicing the fixed-width layout is much faster than strptime
+        offset = int(value[22:24]) * 3600 + int(value[24:26]) * 60
+        seconds = calendar.timegm((int(value[7:11]), MONTHS[value[3:6]], int(value[0:2]),
+                                   int(value[12:14]), int(value[15:17]), int(value[18:20])))
+        return float(seconds - offset if value[21:22] == b'+' else seconds + offset)
+    except (KeyError, ValueError):
+        pass
+    try:
+        return datetime.strptime(value.decode('ascii'), '%d/%b/%Y:%H:%M:%S %z').timestamp()
+    except ValueError:
+        return np.nan
+
+def _float_array(values: List[Optional[float]]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+def _optional_float(value) -> Optional[float]:
+    """A JSON value as a float, or None when absent; raises ValueError or TypeError otherwise."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise TypeError(f"not a number: {value!r}")
+    return float(value)
+
+def _first_field(record: Dict, field: str):
+    for name in JSON_FIELDS[field]:
+        if record.get(name) is not None:
+            return record[name]
+    return None
+
+def _json_timestamp(value) -> float:
+    """Epoch seconds from an ISO-8601 string or a number (seconds or milliseconds)."""
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return np.nan
+    return np.nan
@@ -0,0 +1,332 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Numeric columns of a metrics data point
+METRIC_COLUMNS = ("response_time_ms", "requests_per_minute", "error_rate", "cpu_usage", "memory_usage")
+
+# Per-point thresholds counted as performance issues: output key -> (column, threshold)
+ISSUE_THRESHOLDS = {
+    "slow_responses_count": ("response_time_ms", 300.0),
+    "high_error_rate_count": ("error_rate", 2.0),
+    "high_cpu_usage_count": ("cpu_usage", 80.0),
+}
+
+# Number of most recent response times compared against the older ones for the trend
+TREND_WINDOW = 5
+
+# Latency sketch layout: quantiles are exact to within this relative error
+# for values between SKETCH_MIN_MS and SKETCH_MAX_MS (values outside are clamped)
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MIN_MS = 0.01
+SKETCH_MAX_MS = 1e7
+
+# Quantiles reported for every endpoint: output key -> quantile
+REPORTED_QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p99.9": 0.999}
+
+# Upper bounds (inclusive, ms) of the fixed response time histogram; a final +Inf bucket follows
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+def _code_dtype(endpoint_count: int) -> np.dtype:
+    # Small integer codes let NumPy use radix sort for the stable group-by sorts
+    return np.dtype(np.uint16) if endpoint_count <= np.iinfo(np.uint16).max + 1 else np.dtype(np.uint32)
+
+def _to_epoch_seconds(values: Sequence) -> np.ndarray:
+    """Convert ISO-8601 strings, datetimes or numbers into float seconds since the epoch."""
+    if len(values) and isinstance(values[0], str):
+        return np.array(values, dtype='datetime64[us]').astype(np.int64) / 1e6
+    if len(values) and isinstance(values[0], datetime):
+        return np.array([value.timestamp() for value in values], dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+class MetricsFrame:
+    """
+    Columnar batch of metric data points.
+
+    Every metric is one float64 array and endpoints are stored once, with
+    each row holding an integer code into `endpoints`, so group-bys over
+    millions of points are NumPy `bincount`s instead of Python loops.
+    Missing values are NaN and are left out of averages.  Rows are
+    expected in time order, which is what "most recent" refers to.
+    """
+
+    def __init__(self, endpoints: List[str], codes: np.ndarray, timestamps: np.ndarray,
+                 columns: Dict[str, np.ndarray]):
+        self.endpoints = list(endpoints)
+        self.codes = np.asarray(codes, dtype=_code_dtype(len(self.endpoints)))
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.columns = {
+            name: np.asarray(columns[name], dtype=np.float64) if name in columns
+            else np.full(len(self.codes), np.nan)
+            for name in METRIC_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "MetricsFrame":
+        """Build a frame from data point dicts such as those of `_generate_sample_metrics`."""
+        endpoint_codes: Dict[str, int] = {}
+        codes = np.fromiter(
+            (endpoint_codes.setdefault(record["endpoint"], len(endpoint_codes)) for record in records),
+            dtype=np.int64, count=len(records)
+        )
+        timestamps = _to_epoch_seconds([record.get("timestamp", np.nan) for record in records])
+        columns = {
+            name: np.fromiter(
+                (np.nan if record.get(name) is None else record[name] for record in records),
+                dtype=np.float64, count=len(records)
+            )
+            for name in METRIC_COLUMNS
+        }
+        return cls(list(endpoint_codes), codes, timestamps, columns)
+
+class LatencySketch:
+    """
+    Mergeable quantile sketch for many latency series at once.
+
+    Values are counted in logarithmic buckets whose width grows with the
+    value (as in DDSketch / HDR histograms), so any quantile is answered
+    within `SKETCH_RELATIVE_ACCURACY` of the true value from a fixed-size
+    array of counts.  `counts` has one row per series (endpoint); the
+    bucket layout is a module-wide constant, so sketches built anywhere
+    merge by adding their counts.
+    """
+
+    GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    MIN_INDEX = int(np.floor(np.log(SKETCH_MIN_MS) / np.log(GAMMA)))
+    BUCKETS = int(np.ceil(np.log(SKETCH_MAX_MS) / np.log(GAMMA))) - MIN_INDEX + 1
+
+    def __init__(self, counts: np.ndarray):
+        self.counts = counts
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, codes: Optional[np.ndarray] = None,
+                    series: int = 1) -> "LatencySketch":
+        """Sketch `values`, grouped into `series` rows by `codes` (all in row 0 if omitted)."""
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.all():
+            values = values[finite]
+            codes = codes[finite] if codes is not None else None
+        buckets = cls.bucket_index(values)
+        if codes is not None:
+            buckets = codes.astype(np.int64) * cls.BUCKETS + buckets
+        counts = np.bincount(buckets, minlength=series * cls.BUCKETS)
+        return cls(counts.reshape(series, cls.BUCKETS))
+
+    @classmethod
+    def bucket_index(cls, values: np.ndarray) -> np.ndarray:
+        clamped = np.clip(values, SKETCH_MIN_MS, SKETCH_MAX_MS)
+        return np.ceil(np.log(clamped) / np.log(cls.GAMMA)).astype(np.int64) - cls.MIN_INDEX
+
+    @classmethod
+    def bucket_value(cls, index: np.ndarray) -> np.ndarray:
+        """Representative value of a bucket: the point with equal relative error to both edges."""
+        return 2 * cls.GAMMA ** (index + cls.MIN_INDEX) / (cls.GAMMA + 1)
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        return LatencySketch(self.counts + other.counts)
+
+    def quantiles(self, quantiles: Sequence[float]) -> np.ndarray:
+        """Return a (series, len(quantiles)) array of estimates; NaN for empty series."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        totals = cumulative[:, -1]
+        estimates = np.full((len(self.counts), len(quantiles)), np.nan)
+        for column, quantile in enumerate(quantiles):
+            # Nearest-rank: the bucket holding the ceil(q * n)-th smallest value
+            rank = np.maximum(np.ceil(quantile * totals), 1)
+            index = (cumulative < rank[:, None]).sum(axis=1)
+            estimates[:, column] = np.where(totals > 0, self.bucket_value(np.minimum(index, self.BUCKETS - 1)), np.nan)
+        return estimates
+
+def response_time_histogram(values: np.ndarray, codes: np.ndarray, series: int) -> np.ndarray:
+    """Count values per series into the fixed `HISTOGRAM_BOUNDS_MS` buckets (plus +Inf)."""
+    finite = np.isfinite(values)
+    if not finite.all():
+        values, codes = values[finite], codes[finite]
+    width = len(HISTOGRAM_BOUNDS_MS) + 1
+    buckets = np.searchsorted(np.asarray(HISTOGRAM_BOUNDS_MS, dtype=np.float64), values, side='left')
+    counts = np.bincount(codes.astype(np.int64) * width + buckets, minlength=series * width)
+    return counts.reshape(series, width)
+
+class MetricsAggregate:
+    """
+    Mergeable per-endpoint summary of a metrics stream.
+
+    Holds, per endpoint: the point count, the sum and number of non-missing
+    values of every metric, the threshold issue counts, a response time
+    `LatencySketch` and fixed-bucket histogram, the first and last
+    timestamps seen, and the last `TREND_WINDOW` response times.  That is
+    everything the analysis needs, so batches, time windows or workers can
+    be aggregated independently and combined with `merge` without re-reading
+    the raw points.
+    """
+
+    def __init__(self, endpoints: List[str], counts: np.ndarray, sums: Dict[str, np.ndarray],
+                 finite_counts: Dict[str, np.ndarray], issue_counts: Dict[str, np.ndarray],
+                 tails: List[np.ndarray], latency: LatencySketch, histogram: np.ndarray,
+                 first_seen: np.ndarray, last_seen: np.ndarray,
+                 thresholds: Dict[str, Tuple[str, float]] = ISSUE_THRESHOLDS):
+        self.endpoints = list(endpoints)
+        self.counts = counts
+        self.sums = sums
+        self.finite_counts = finite_counts
+        self.issue_counts = issue_counts
+        self.tails = tails
+        self.latency = latency
+        self.histogram = histogram
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        self.thresholds = dict(thresholds)
+
+    @classmethod
+    def empty(cls, thresholds: Dict[str, Tuple[str, float]] = ISSUE_THRESHOLDS) -> "MetricsAggregate":
+        return cls.from_frame(MetricsFrame([], np.empty(0), np.empty(0), {}), thresholds)
+
+    @classmethod
+    def from_frame(cls, frame: MetricsFrame, thresholds: Dict[str, Tuple[str, float]] = ISSUE_THRESHOLDS,
+                   sketch: bool = True) -> "MetricsAggregate":
+        """
+        Aggregate a frame in one pass, with one vectorized group-by per statistic.
+
+        `sketch=False` leaves `latency` unset, for callers with so many
+        groups that they keep the sketch buckets in sparse form instead.
+        """
+        size = len(frame.endpoints)
+        codes = frame.codes
+        counts = np.bincount(codes, minlength=size)
+
+        sums = {}
+        finite_counts = {}
+        for name, values in frame.columns.items():
+            finite = np.isfinite(values)
+            if finite.all():
+                sums[name] = np.bincount(codes, weights=values, minlength=size)
+                finite_counts[name] = counts.copy()
+            else:
+                sums[name] = np.bincount(codes[finite], weights=values[finite], minlength=size)
+                finite_counts[name] = np.bincount(codes[finite], minlength=size)
+
+        issue_counts = {
+            key: np.bincount(codes[frame.columns[column] > threshold], minlength=size)
+            for key, (column, threshold) in thresholds.items()
+        }
+
+        # fmin/fmax ignore rows without a timestamp
+        first_seen = np.full(size, np.nan)
+        last_seen = np.full(size, np.nan)
+        np.fmin.at(first_seen, codes, frame.timestamps)
+        np.fmax.at(last_seen, codes, frame.timestamps)
+
+        response_times = frame.columns["response_time_ms"]
+        return cls(frame.endpoints, counts, sums, finite_counts, issue_counts,
+                   last_values(codes, response_times, counts, TREND_WINDOW),
+                   LatencySketch.from_values(response_times, codes, size) if sketch else None,
+                   response_time_histogram(response_times, codes, size),
+                   first_seen, last_seen, thresholds)
+
+    def merge(self, other: "MetricsAggregate") -> "MetricsAggregate":
+        """
+        Combine with the aggregate of a later batch.
+
+        Endpoints are matched by name; `other` is treated as the more recent
+        data when the trend windows are combined.
+        """
+        if other.thresholds != self.thresholds:
+            raise ValueError("Cannot merge metrics aggregated with different issue thresholds")
+        endpoints = list(self.endpoints)
+        positions = {endpoint: index for index, endpoint in enumerate(endpoints)}
+        for endpoint in other.endpoints:
+            if endpoint not in positions:
+                positions[endpoint] = len(endpoints)
+                endpoints.append(endpoint)
+        size = len(endpoints)
+        mapping = np.array([positions[endpoint] for endpoint in other.endpoints], dtype=np.intp)
+
+        def combine(mine: np.ndarray, theirs: np.ndarray) -> np.ndarray:
+            combined = np.zeros((size,) + mine.shape[1:], dtype=np.result_type(mine, theirs))
+            combined[:len(mine)] = mine
+            combined[mapping] += theirs
+            return combined
+
+        def extreme(mine: np.ndarray, theirs: np.ndarray, function: np.ufunc) -> np.ndarray:
+            combined = np.full(size, np.nan)
+            combined[:len(mine)] = mine
+            combined[mapping] = function(combined[mapping], theirs)
+            return combined
+
+        tails = list(self.tails) + [np.empty(0)] * (size - len(self.tails))
+        for index, tail in zip(mapping, other.tails):
+            tails[index] = np.concatenate([tails[index], tail])[-TREND_WINDOW:]
+
+        return MetricsAggregate(
+            endpoints,
+            combine(self.counts, other.counts),
+            {name: combine(self.sums[name], other.sums[name]) for name in METRIC_COLUMNS},
+            {name: combine(self.finite_counts[name], other.finite_counts[name]) for name in METRIC_COLUMNS},
+            {key: combine(self.issue_counts[key], other.issue_counts[key]) for key in self.thresholds},
+            tails,
+            LatencySketch(combine(self.latency.counts, other.latency.counts)),
+            combine(self.histogram, other.histogram),
+            extreme(self.first_seen, other.first_seen, np.fmin),
+            extreme(self.last_seen, other.last_seen, np.fmax),
+            self.thresholds
+        )
+
+    def mean(self, name: str, index: int) -> Optional[float]:
+        """Average of one metric for one endpoint, or None if it has no values."""
+        finite = self.finite_counts[name][index]
+        return float(self.sums[name][index] / finite) if finite else None
+
+    def request_rate(self, index: int) -> Optional[float]:
+        """Requests per minute over the time an endpoint was seen (at least one minute)."""
+        span = self.last_seen[index] - self.first_seen[index]
+        if not np.isfinite(span):
+            return None
+        return float(self.counts[index] / max(span / 60, 1.0))
+
+    def trend(self, index: int) -> str:
+        """Compare the last `TREND_WINDOW` response times with the older ones."""
+        count = int(self.counts[index])
+        tail = self.tails[index]
+        if count > TREND_WINDOW:
+            older_count = self.finite_counts["response_time_ms"][index] - np.isfinite(tail).sum()
+            if not older_count:
+                return "stable"
+            older_avg = (self.sums["response_time_ms"][index] - np.nansum(tail)) / older_count
+        else:
+            # Short series: compare against its first half, which the tail still holds
+            older = tail[:count // 2]
+            if not len(older):
+                return "stable"
+            older_avg = np.mean(older)
+        recent_avg = np.mean(tail)
+        return "improving" if recent_avg < older_avg else "degrading"
+
+def last_values(codes: np.ndarray, values: np.ndarray, counts: np.ndarray, window: int) -> List[np.ndarray]:
+    """Return, per endpoint code, its last `window` values in row order."""
+    size = len(counts)
+    needed = np.minimum(counts, window)
+    # The newest rows almost always contain every endpoint, so sort only a
+    # suffix of the frame and grow it until every endpoint's window is covered
+    suffix = min(len(codes), max(4096, size * window * 4))
+    while True:
+        tail_codes = codes[len(codes) - suffix:]
+        if suffix == len(codes) or (np.bincount(tail_codes, minlength=size) >= needed).all():
+            break
+        suffix = min(len(codes), suffix * 8)
+
+    tail_values = values[len(codes) - suffix:]
+    order = np.argsort(tail_codes, kind='stable')
+    ends = np.cumsum(np.bincount(tail_codes, minlength=size))
+    return [tail_values[order[max(end - take, 0):end]] for end, take in zip(ends, needed)]
+
+def aggregate_frames(frames: Iterable[MetricsFrame],
+                     thresholds: Dict[str, Tuple[str, float]] = ISSUE_THRESHOLDS) -> MetricsAggregate:
+    """Aggregate a stream of frames in order, one batch at a time."""
+    aggregate = MetricsAggregate.empty(thresholds)
+    for frame in frames:
+        aggregate = aggregate.merge(MetricsAggregate.from_frame(frame, thresholds))
+    return aggregate
@@ -1,13 +1,39 @@
 from crewai.tools import BaseTool
+import asyncio
+import ipaddress
 import requests
 import socket
 import json
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
+from utils.helpers import run_coroutine
+
+# Common API endpoints to check on every open service
+PROBE_ENDPOINTS = ['/', '/api', '/v1', '/swagger', '/docs']
 
 class NetworkScannerTool(BaseTool):
     name: str = "Network Scanner Tool"
     description: str = "Scan network for API endpoints and active services"
 
+    # Common API ports to check on every host in the range
+    common_ports: List[int] = [80, 443, 8080, 8000, 3000, 5000, 5001, 9000]
+    # Seconds to wait for a TCP handshake before treating a port as closed
+    connect_timeout: float = 1.0
+    # Global cap on in-flight connection attempts across the whole sweep
+    max_concurrency: int = 512
+    # Cap on in-flight connection attempts against any single host
+    per_host_limit: int = 8
+    # Refuse ranges larger than this rather than silently scanning for hours
+    max_hosts: int = 65536
+    # Seconds to wait for each HTTP probe
+    probe_timeout: float = 3.0
+    # Worker threads shared by every HTTP probe in a scan
+    probe_workers: int = 32
+    # Keep-alive connections pooled per base_url; probes beyond this wait and reuse one
+    probe_connections_per_host: int = 2
+
     def _run(self, network_range: str = None) -> str:
         """
         Scan network for API endpoints.
@@ -22,36 +48,42 @@ class NetworkScannerTool(BaseTool):
                 local_ip = self._get_local_ip()
                 network_range = local_ip.rsplit('.', 1)[0] + '.0/24'
             
-            # For now, we'll just check common localhost ports
-            # In a full implementation, this would use nmap for comprehensive scanning
-            local_ip = self._get_local_ip()
+            hosts = self._expand_network_range(network_range)
+            ports = list(self.common_ports)
+            
+            print(f"Scanning {len(ports)} ports on {len(hosts)} hosts in {network_range}...")
+
+            started = time.perf_counter()
+            open_ports = run_coroutine(self._sweep(hosts, ports))
+            duration = time.perf_counter() - started
+
+            # Probe every open service at once rather than one after another
+            probes = self._probe_services(open_ports)
             
-            # Common API ports to check
-            common_ports = [80, 443, 8080, 8000, 3000, 5000, 5001, 9000]
             active_services = []
+            for host, port in open_ports:
+                service_info = {
+                    'ip': host,
+                    'port': port,
+                    'status': 'open'
+                }
             
-            print(f"Scanning common ports on {local_ip}...")
+                api_info = probes.get((host, port))
+                if api_info:
+                    service_info.update(api_info)
+                    service_info['potential_api'] = True
             
-            for port in common_ports:
-                if self._is_port_open(local_ip, port):
-                    service_info = {
-                        'ip': local_ip,
-                        'port': port,
-                        'status': 'open'
-                    }
-                    
-                    # Try to probe for API endpoints
-                    api_info = self._probe_api_endpoints(local_ip, port)
-                    if api_info:
-                        service_info.update(api_info)
-                        service_info['potential_api'] = True
-                    
-                    active_services.append(service_info)
+                active_services.append(service_info)
             
             result = {
                 'network_range': network_range,
-                'scanned_host': local_ip,
-                'scanned_ports': common_ports,
+                'scanned_hosts': len(hosts),
+                'scanned_ports': ports,
+                'scan_stats': {
+                    'connection_attempts': len(hosts) * len(ports),
+                    'duration_seconds': round(duration, 3),
+                    'hosts_per_second': round(len(hosts) / duration, 2) if duration > 0 else None
+                },
                 'active_services': active_services
             }
             
@@ -69,47 +101,150 @@ class NetworkScannerTool(BaseTool):
         except Exception:
             return "127.0.0.1"
 
-    def _is_port_open(self, host: str, port: int) -> bool:
+    def _expand_network_range(self, network_range: str) -> List[str]:
+        """Expand a CIDR range (or single address) into the list of hosts to scan."""
+        network = ipaddress.ip_network(network_range, strict=False)
+        if network.num_addresses > self.max_hosts + 2:
+            raise ValueError(
+                f"Network range {network_range} has {network.num_addresses} addresses, "
+                f"more than the configured limit of {self.max_hosts} hosts"
+            )
+        # /32 and /31 networks have no separate network/broadcast address
+        hosts = list(network.hosts()) or [network.network_address]
+        return [str(host) for host in hosts]
+
+    async def _sweep(self, hosts: List[str], ports: List[int]) -> List[Tuple[str, int]]:
+        """
+        Check every host x port pair concurrently and return the open ones.
+
+        A fixed pool of workers pulls targets from a shared iterator, so the
+        number of workers is the global connection cap and memory stays
+        bounded no matter how large the range is.  Targets are ordered port
+        by port so consecutive work items land on different hosts, and a
+        per-host semaphore keeps any single host from being flooded.
+        """
+        targets = ((host, port) for port in ports for host in hosts)
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+        open_ports = []
+
+        async def worker():
+            for host, port in targets:
+                slot = host_slots.get(host)
+                if slot is None:
+                    slot = host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+                async with slot:
+                    if await self._check_port(host, port):
+                        open_ports.append((host, port))
+
+        worker_count = max(1, min(self.max_concurrency, len(hosts) * len(ports)))
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+
+        open_ports.sort(key=lambda target: (ipaddress.ip_address(target[0]), target[1]))
+        return open_ports
+
+    async def _check_port(self, host: str, port: int) -> bool:
         """Check if a port is open on a host."""
+        # A bare non-blocking socket keeps each probe cheap; building a full
+        # stream reader/writer per attempt saturates the event loop on large sweeps
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)  # 1 second timeout
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except Exception:
+            loop = asyncio.get_running_loop()
+            await asyncio.wait_for(loop.sock_connect(sock, (host, port)), timeout=self.connect_timeout)
+            return True
+        except (OSError, asyncio.TimeoutError):
             return False
+        finally:
+            sock.close()
 
     def _probe_api_endpoints(self, host: str, port: int) -> Optional[dict]:
         """Probe common API endpoints to gather more information."""
+        return self._probe_services([(host, port)]).get((host, port))
+
+    def _probe_services(self, services: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Optional[dict]]:
+        """
+        Probe the common API endpoints of many services concurrently.
+
+        Every (service, endpoint) probe is submitted to one thread pool, so
+        probing N services costs roughly one wave of round trips instead of
+        5 x N sequential requests.  Each base_url gets its own pooled
+        session, and the pool blocks rather than opening extra sockets, so
+        the probes against one service share keep-alive connections.
+        """
+        if not services:
+            return {}
+
+        sessions = {}
+        base_urls = {}
+        for host, port in services:
+            base_url = f"https://{host}:{port}" if port == 443 else f"http://{host}:{port}"
+            base_urls[(host, port)] = base_url
+            sessions[base_url] = self._create_probe_session()
+
+        # Endpoint-major order so every service gets its first probe early
+        jobs = [(service, endpoint) for endpoint in PROBE_ENDPOINTS for service in services]
+
         try:
-            base_url = f"http://{host}:{port}"
-            if port == 443:
-                base_url = f"https://{host}:{port}"
-            
-            # Common API endpoints to check
-            endpoints = ['/', '/api', '/v1', '/swagger', '/docs']
-            found_endpoints = []
-            
-            for endpoint in endpoints:
-                try:
-                    url = base_url + endpoint
-                    response = requests.get(url, timeout=3)
-                    if response.status_code in [200, 401, 403]:
-                        found_endpoints.append({
-                            'endpoint': endpoint,
-                            'status_code': response.status_code,
-                            'content_type': response.headers.get('content-type', ''),
-                            'has_json': 'application/json' in response.headers.get('content-type', '')
-                        })
-                except requests.RequestException:
-                    # Continue to next endpoint if this one fails
-                    continue
-            
-            return {
-                'base_url': base_url,
+            with ThreadPoolExecutor(max_workers=max(1, min(self.probe_workers, len(jobs)))) as executor:
+                outcomes = list(executor.map(
+                    lambda job: self._probe_endpoint(sessions[base_urls[job[0]]], base_urls[job[0]], job[1]),
+                    jobs
+                ))
+        finally:
+            for session in sessions.values():
+                session.close()
+
+        found = {service: [] for service in services}
+        for (service, _), outcome in zip(jobs, outcomes):
+            if outcome:
+                found[service].append(outcome)
+
+        results = {}
+        for service, found_endpoints in found.items():
+            # Report endpoints in their canonical order regardless of completion order
+            found_endpoints.sort(key=lambda e: PROBE_ENDPOINTS.index(e['endpoint']))
+            results[service] = {
+                'base_url': base_urls[service],
                 'found_endpoints': found_endpoints
             } if found_endpoints else None
-            
-        except Exception:
-            return None
\ No newline at end of file
+        return results
+
+    def _create_probe_session(self) -> requests.Session:
+        """Create a session whose connection pool is shared by all probes of one service."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.probe_connections_per_host,
+            pool_block=True
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _probe_endpoint(self, session: requests.Session, base_url: str, endpoint: str) -> Optional[dict]:
+        """Probe one endpoint, trying HEAD first and falling back to GET."""
+        url = base_url + endpoint
+        started = time.perf_counter()
+        try:
+            method = 'HEAD'
+            response = session.head(url, timeout=self.probe_timeout, allow_redirects=True)
+            if response.status_code in [405, 501]:
+                # Server does not implement HEAD for this route
+                method = 'GET'
+                response = session.get(url, timeout=self.probe_timeout)
+        except requests.RequestException:
+            return None
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if response.status_code not in [200, 401, 403]:
+            return None
+        content_type = response.headers.get('content-type', '')
+        return {
+            'endpoint': endpoint,
+            'status_code': response.status_code,
+            'content_type': content_type,
+            'has_json': 'application/json' in content_type,
+            'probe_method': method,
+            'latency_ms': round(latency_ms, 2)
+        }
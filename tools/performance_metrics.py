@@ -1,23 +1,51 @@
 from crewai.tools import BaseTool
 import json
+import os
 import random
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Union
+import numpy as np
+from tools.log_ingestion import AccessLogReader, log_source, normalize_endpoint
+from tools.regression_detector import DETECTION_INTERVAL_SECONDS, RegressionDetector
+from tools.rollup_store import RollupStore
+from tools.metrics_engine import (
+    HISTOGRAM_BOUNDS_MS, ISSUE_THRESHOLDS, REPORTED_QUANTILES, MetricsAggregate, MetricsFrame,
+    aggregate_frames
+)
 
 class PerformanceMetricsTool(BaseTool):
     name: str = "Performance Metrics Tool"
     description: str = "Collect and analyze performance data for APIs and services"
 
-    def _run(self, api_endpoint: str = None, duration_hours: int = 24) -> str:
+    # Responses slower than this are counted as slow responses
+    slow_threshold_ms: float = 300.0
+    # Access log format (nginx, envoy or json); None detects it from the first line
+    log_format: Optional[str] = None
+    # Directory of the minute/hour/day rollup store; ingested logs are recorded
+    # there and analyses without a log are answered from it. None disables it
+    rollup_store_dir: Optional[str] = None
+    # Points are averaged over intervals of this many seconds for regression detection
+    detection_interval_seconds: int = DETECTION_INTERVAL_SECONDS
+
+    def _run(self, api_endpoint: str = None, duration_hours: int = 24, log_path: str = None) -> str:
         """
         Collect and analyze performance metrics.
         
         Args:
             api_endpoint: Specific API endpoint to analyze (optional)
             duration_hours: Duration of metrics to analyze (default: 24 hours)
+            log_path: nginx/envoy/JSON-lines access log (optionally gzipped) to
+                      analyze instead of sample data; the whole file is streamed
+                      and duration_hours reports the time span it covers
         """
         try:
+            if log_path:
+                return json.dumps(self._analyze_log(log_path, api_endpoint), indent=2)
+            
+            if self.rollup_store_dir and os.path.isdir(self.rollup_store_dir):
+                return json.dumps(self._analyze_rollups(api_endpoint, duration_hours), indent=2)
+            
             # Generate sample performance data
             metrics_data = self._generate_sample_metrics(api_endpoint, duration_hours)
             
@@ -36,6 +64,87 @@ class PerformanceMetricsTool(BaseTool):
         except Exception as e:
             return f"Performance metrics collection failed: {str(e)}"
 
+    def _analyze_log(self, log_path: str, api_endpoint: str = None) -> Dict:
+        """Stream an access log through the metrics engine one chunk at a time."""
+        store = RollupStore(self.rollup_store_dir, thresholds=self._issue_thresholds()) if self.rollup_store_dir else None
+        source = log_source(log_path) if store else None
+        resume = store.resume_offset(source) if store else None
+        reader = AccessLogReader(log_path, self.log_format, boundary=resume)
+        started = time.perf_counter()
+        detector = RegressionDetector(self.detection_interval_seconds)
+        frames = self._detect_regressions(reader.frames(), detector)
+        recorded = []
+        if store:
+            frames = self._record_rollups(frames, store, reader, source, resume, recorded)
+        aggregate = aggregate_frames(frames, self._issue_thresholds())
+        detector.flush()
+        if store:
+            store.apply_retention()
+            store.compact_dirty()
+        elapsed = time.perf_counter() - started
+        
+        analysis = self._analyze_aggregate(aggregate, detector)
+        if api_endpoint:
+            endpoint = normalize_endpoint(api_endpoint)
+            analysis = {name: result for name, result in analysis.items() if name == endpoint}
+        
+        span_seconds = np.nanmax(aggregate.last_seen) - np.nanmin(aggregate.first_seen) if aggregate.endpoints else np.nan
+        return {
+            "endpoint": api_endpoint or "All monitored endpoints",
+            "duration_hours": round(float(span_seconds) / 3600, 2) if np.isfinite(span_seconds) else 0,
+            "ingestion": dict(
+                reader.stats,
+                log_path=log_path,
+                duration_seconds=round(elapsed, 3),
+                lines_per_second=round(reader.stats["lines"] / elapsed) if elapsed > 0 else None,
+                **({"rollups": {"resumed_at_byte": resume, "recorded_rows": sum(recorded)}} if store else {})
+            ),
+            "analysis": analysis if aggregate.endpoints else {"error": "No metrics data to analyze"}
+        }
+
+    def _detect_regressions(self, frames: Iterable[MetricsFrame],
+                            detector: RegressionDetector) -> Iterator[MetricsFrame]:
+        """Feed every frame to the regression detector as it streams past."""
+        for frame in frames:
+            detector.update(frame)
+            yield frame
+
+    def _record_rollups(self, frames: Iterable[MetricsFrame], store: RollupStore, reader: AccessLogReader,
+                        source: Dict, resume: int, recorded: List[int]) -> Iterator[MetricsFrame]:
+        """
+        Append the frames past the source's watermark to the rollup store as they stream past.
+
+        Frames of the part of the log appended by an earlier run are only
+        analyzed, and the watermark advances after each frame stored, so
+        ingesting the same log again adds nothing to the rollups.
+        """
+        for frame in frames:
+            if reader.chunk_start >= resume and reader.chunk_end > reader.chunk_start:
+                recorded.append(store.append_frame(frame))
+                store.record_source(source, reader.chunk_end)
+            yield frame
+
+    def _analyze_rollups(self, api_endpoint: str = None, duration_hours: int = 24) -> Dict:
+        """Analyze the last `duration_hours` from pre-aggregated rollup buckets."""
+        store = RollupStore(self.rollup_store_dir, thresholds=self._issue_thresholds())
+        end = time.time()
+        start = end - duration_hours * 3600
+        endpoints = [normalize_endpoint(api_endpoint)] if api_endpoint else None
+        aggregate = store.query(start, end, endpoints, now=end)
+        return {
+            "endpoint": api_endpoint or "All monitored endpoints",
+            "duration_hours": duration_hours,
+            "rollups": {
+                "store": self.rollup_store_dir,
+                "pieces": [
+                    {"tier": tier, "start": datetime.fromtimestamp(piece_start).isoformat(),
+                     "end": datetime.fromtimestamp(piece_end).isoformat()}
+                    for tier, piece_start, piece_end in store.plan(start, end, now=end)
+                ]
+            },
+            "analysis": self._analyze_aggregate(aggregate) if aggregate.endpoints else {"error": "No metrics data to analyze"}
+        }
+
     def _generate_sample_metrics(self, api_endpoint: str = None, duration_hours: int = 24) -> Dict:
         """Generate sample performance metrics data."""
         # Generate time series data
@@ -78,58 +187,80 @@ class PerformanceMetricsTool(BaseTool):
         
         return metrics_data
 
-    def _analyze_metrics(self, metrics_data: List[Dict]) -> Dict:
-        """Analyze performance metrics and identify patterns."""
-        if not metrics_data:
+    def _analyze_metrics(self, metrics_data: Union[List[Dict], MetricsFrame]) -> Dict:
+        """
+        Analyze performance metrics and identify patterns.
+        
+        Data points are converted to a columnar `MetricsFrame` and summarized
+        with vectorized per-endpoint group-bys rather than Python passes over
+        per-point dicts.
+        """
+        if not len(metrics_data):
             return {"error": "No metrics data to analyze"}
         
-        # Group metrics by endpoint
-        endpoint_metrics = {}
-        for metric in metrics_data:
-            endpoint = metric["endpoint"]
-            if endpoint not in endpoint_metrics:
-                endpoint_metrics[endpoint] = []
-            endpoint_metrics[endpoint].append(metric)
+        frame = metrics_data if isinstance(metrics_data, MetricsFrame) else MetricsFrame.from_records(metrics_data)
+        detector = RegressionDetector(self.detection_interval_seconds)
+        detector.update(frame)
+        detector.flush()
+        return self._analyze_aggregate(MetricsAggregate.from_frame(frame, self._issue_thresholds()), detector)
+
+    def _issue_thresholds(self) -> Dict:
+        """Per-point issue thresholds, with the configured slow response threshold."""
+        return dict(ISSUE_THRESHOLDS, slow_responses_count=("response_time_ms", self.slow_threshold_ms))
+
+    def _analyze_aggregate(self, aggregate: MetricsAggregate, detector: RegressionDetector = None) -> Dict:
+        """
+        Build the per-endpoint analysis from an aggregated metrics summary.
         
+        With a `detector` that has seen the same points, the trend follows its
+        last detected change and its regressions are listed per endpoint; the
+        trend falls back to comparing the last response times otherwise.
+        """
         analysis = {}
+        regressions = {}
+        for event in detector.events if detector else []:
+            if event["direction"] == "regression":
+                regressions.setdefault(event["endpoint"], []).append({
+                    "metric": event["metric"],
+                    "change_point": datetime.fromtimestamp(event["change_point"]).isoformat(),
+                    "detected_at": datetime.fromtimestamp(event["detected_at"]).isoformat(),
+                    "baseline": _round(event["baseline"]),
+                    "current": _round(event["current"])
+                })
+        percentiles = aggregate.latency.quantiles(list(REPORTED_QUANTILES.values()))
+        histogram_bounds = list(HISTOGRAM_BOUNDS_MS) + ["+Inf"]
         
-        for endpoint, metrics in endpoint_metrics.items():
-            # Calculate averages
-            avg_response_time = sum(m["response_time_ms"] for m in metrics) / len(metrics)
-            avg_requests_per_minute = sum(m["requests_per_minute"] for m in metrics) / len(metrics)
-            avg_error_rate = sum(m["error_rate"] for m in metrics) / len(metrics)
-            avg_cpu_usage = sum(m["cpu_usage"] for m in metrics) / len(metrics)
-            avg_memory_usage = sum(m["memory_usage"] for m in metrics) / len(metrics)
-            
-            # Find performance issues
-            slow_responses = [m for m in metrics if m["response_time_ms"] > 300]
-            high_errors = [m for m in metrics if m["error_rate"] > 2.0]
-            high_cpu = [m for m in metrics if m["cpu_usage"] > 80]
-            
-            # Identify trends
-            recent_metrics = metrics[-5:]  # Last 5 data points
-            older_metrics = metrics[:-5] if len(metrics) > 5 else metrics[:len(metrics)//2]
-            
-            if older_metrics:
-                recent_avg_response = sum(m["response_time_ms"] for m in recent_metrics) / len(recent_metrics)
-                older_avg_response = sum(m["response_time_ms"] for m in older_metrics) / len(older_metrics)
-                
-                trend = "improving" if recent_avg_response < older_avg_response else "degrading"
-            else:
-                trend = "stable"
+        for index, endpoint in enumerate(aggregate.endpoints):
+            if not aggregate.counts[index]:
+                continue
+            avg_response_time = aggregate.mean("response_time_ms", index)
+            avg_requests_per_minute = aggregate.mean("requests_per_minute", index)
+            if avg_requests_per_minute is None:
+                # Access logs have one row per request rather than a sampled rate
+                avg_requests_per_minute = aggregate.request_rate(index)
+            avg_error_rate = aggregate.mean("error_rate", index)
+            avg_cpu_usage = aggregate.mean("cpu_usage", index)
+            avg_memory_usage = aggregate.mean("memory_usage", index)
             
             analysis[endpoint] = {
-                "average_response_time_ms": round(avg_response_time, 2),
-                "average_requests_per_minute": round(avg_requests_per_minute, 2),
-                "average_error_rate_percent": round(avg_error_rate, 2),
-                "average_cpu_usage_percent": round(avg_cpu_usage, 2),
-                "average_memory_usage_percent": round(avg_memory_usage, 2),
+                "average_response_time_ms": _round(avg_response_time),
+                "average_requests_per_minute": _round(avg_requests_per_minute),
+                "average_error_rate_percent": _round(avg_error_rate),
+                "average_cpu_usage_percent": _round(avg_cpu_usage),
+                "average_memory_usage_percent": _round(avg_memory_usage),
+                "response_time_percentiles_ms": {
+                    key: _round(float(value)) if np.isfinite(value) else None
+                    for key, value in zip(REPORTED_QUANTILES, percentiles[index])
+                },
+                "response_time_histogram": [
+                    {"le_ms": bound, "count": int(count)}
+                    for bound, count in zip(histogram_bounds, aggregate.histogram[index])
+                ],
                 "performance_issues": {
-                    "slow_responses_count": len(slow_responses),
-                    "high_error_rate_count": len(high_errors),
-                    "high_cpu_usage_count": len(high_cpu)
+                    key: int(counts[index]) for key, counts in aggregate.issue_counts.items()
                 },
-                "trend": trend,
+                "trend": (detector and detector.trend(endpoint)) or aggregate.trend(index),
+                "regressions": regressions.get(endpoint, []),
                 "recommendations": self._generate_recommendations(
                     avg_response_time, avg_error_rate, avg_cpu_usage
                 )
@@ -137,20 +268,24 @@ class PerformanceMetricsTool(BaseTool):
         
         return analysis
 
-    def _generate_recommendations(self, avg_response_time: float, avg_error_rate: float, avg_cpu_usage: float) -> List[str]:
-        """Generate performance recommendations based on metrics."""
+    def _generate_recommendations(self, avg_response_time: Optional[float], avg_error_rate: Optional[float],
+                                  avg_cpu_usage: Optional[float]) -> List[str]:
+        """Generate performance recommendations based on metrics; missing (None) metrics are skipped."""
         recommendations = []
         
-        if avg_response_time > 200:
+        if avg_response_time is not None and avg_response_time > 200:
             recommendations.append("Consider optimizing database queries or implementing caching")
-        if avg_error_rate > 1.0:
+        if avg_error_rate is not None and avg_error_rate > 1.0:
             recommendations.append("Investigate error handling and validation logic")
-        if avg_cpu_usage > 70:
+        if avg_cpu_usage is not None and avg_cpu_usage > 70:
             recommendations.append("Consider scaling horizontally or optimizing resource usage")
-        if avg_response_time > 500:
+        if avg_response_time is not None and avg_response_time > 500:
             recommendations.append("Implement request queuing or load balancing")
             
         if not recommendations:
             recommendations.append("Performance is within acceptable ranges")
             
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
@@ -0,0 +1,240 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+from tools.metrics_engine import MetricsFrame
+
+# Metrics watched for regressions: column -> (relative floor of the interval
+# noise, floor of the per-point standard deviation), so a flat baseline does
+# not alarm on tiny changes.  The error rate is 0 or 100 per request in access
+# logs, with a standard deviation of 100 * sqrt(p * (1 - p)) at error rate p;
+# a per-point floor of 20 treats it at least as noisy as a 4.2% error rate
+DETECTED_METRICS = {
+    "response_time_ms": (0.05, 1.0),
+    "error_rate": (0.0, 20.0),
+}
+
+# Points are averaged over intervals of this many seconds; each interval is one detector step
+DETECTION_INTERVAL_SECONDS = 60
+
+# EWMA weight of the newest interval in the baseline mean and variance
+EWMA_ALPHA = 0.03
+
+# CUSUM slack and decision threshold, both in baseline standard deviations
+CUSUM_SLACK = 0.5
+CUSUM_THRESHOLD = 8.0
+
+# Intervals averaged into the initial baseline before any alarm is raised
+WARMUP_INTERVALS = 20
+
+# Deviations are clipped to this many standard deviations, in the CUSUM and the
+# baseline update alike, so one outlying interval cannot raise an alarm alone
+DEVIATION_CLIP = 3.0
+
+# Most recent change events kept by a detector
+MAX_EVENTS = 1000
+
+class RegressionDetector:
+    """
+    Online change-point detector for per-endpoint latency and error rates.
+
+    Points are averaged into fixed intervals per endpoint.  Each finished
+    interval updates an EWMA baseline (mean and variance) and a two-sided
+    CUSUM of its deviation from that baseline; when the upper sum crosses
+    `CUSUM_THRESHOLD` a regression is reported, with the change point set to
+    the interval where the sum last left zero, and the baseline is learned
+    again from the intervals that follow.  The lower sum reports improvements
+    the same way.
+
+    State is a fixed handful of floats per endpoint and metric (plus the
+    partially filled interval), held in arrays indexed by endpoint id, so
+    each interval updates every endpoint that reported in it with a few
+    vectorized operations and thousands of endpoints can be watched by a
+    long-running monitor.  Frames may split an interval; it is only
+    evaluated once a later interval of the same endpoint arrives (or on
+    `flush`), and points older than the pending interval are folded into it.
+    """
+
+    def __init__(self, interval_seconds: int = DETECTION_INTERVAL_SECONDS, alpha: float = EWMA_ALPHA,
+                 slack: float = CUSUM_SLACK, threshold: float = CUSUM_THRESHOLD,
+                 warmup: int = WARMUP_INTERVALS, max_events: int = MAX_EVENTS):
+        self.interval_seconds = interval_seconds
+        self.alpha = alpha
+        self.slack = slack
+        self.threshold = threshold
+        self.warmup = warmup
+        self.metrics = list(DETECTED_METRICS)
+        self.endpoints: List[str] = []
+        self._endpoint_ids: Dict[str, int] = {}
+        self.events = deque(maxlen=max_events)
+
+        shape = (0, len(self.metrics))
+        self._mean = np.zeros(shape)
+        self._var = np.zeros(shape)
+        self._point_var = np.zeros(shape)
+        self._seen = np.zeros(shape, dtype=np.int64)
+        self._upper = np.zeros(shape)
+        self._lower = np.zeros(shape)
+        self._upper_start = np.full(shape, np.nan)
+        self._lower_start = np.full(shape, np.nan)
+        # Last reported change per endpoint and metric: 1 regression, -1 improvement, 0 none
+        self._last_change = np.zeros(shape, dtype=np.int8)
+        self._pending_sum = np.zeros(shape)
+        self._pending_count = np.zeros(shape)
+        self._pending_squares = np.zeros(shape)
+        self._pending_bucket = np.zeros(0, dtype=np.int64)
+
+    def update(self, frame: MetricsFrame) -> List[Dict]:
+        """Feed a frame of points; returns the change events it completed."""
+        timestamped = np.isfinite(frame.timestamps)
+        if not timestamped.any():
+            return []
+        ids = self._register_endpoints(frame.endpoints)[frame.codes[timestamped]]
+        buckets = np.floor(frame.timestamps[timestamped] / self.interval_seconds).astype(np.int64)
+
+        # One row per (interval, endpoint), in interval order
+        stride = len(self.endpoints)
+        keys, groups = np.unique(buckets * stride + ids, return_inverse=True)
+        sums = np.zeros((len(keys), len(self.metrics)))
+        counts = np.zeros((len(keys), len(self.metrics)))
+        squares = np.zeros((len(keys), len(self.metrics)))
+        for column, name in enumerate(self.metrics):
+            values = frame.columns[name][timestamped]
+            finite = np.isfinite(values)
+            sums[:, column] = np.bincount(groups[finite], weights=values[finite], minlength=len(keys))
+            counts[:, column] = np.bincount(groups[finite], minlength=len(keys))
+            squares[:, column] = np.bincount(groups[finite], weights=values[finite] ** 2, minlength=len(keys))
+        row_buckets = keys // stride
+        row_ids = keys % stride
+
+        events = []
+        boundaries = np.flatnonzero(np.diff(row_buckets)) + 1
+        for rows in np.split(np.arange(len(keys)), boundaries):
+            events.extend(self._step(row_ids[rows], int(row_buckets[rows[0]]), sums[rows], counts[rows], squares[rows]))
+        return events
+
+    def flush(self) -> List[Dict]:
+        """Evaluate every pending interval, e.g. at the end of a finite stream."""
+        pending = np.flatnonzero(self._pending_count.sum(axis=1) > 0)
+        if not len(pending):
+            return []
+        events = self._evaluate(pending)
+        self._pending_sum[pending] = 0
+        self._pending_count[pending] = 0
+        self._pending_squares[pending] = 0
+        return events
+
+    def trend(self, endpoint: str, metric: str = "response_time_ms") -> Optional[str]:
+        """
+        'degrading' or 'improving' after the last detected change of a metric,
+        'stable' if none was detected, or None while the endpoint has too few
+        intervals for the detector to have run at all.
+        """
+        index = self._endpoint_ids.get(endpoint)
+        if index is None:
+            return None
+        column = self.metrics.index(metric)
+        change = self._last_change[index, column]
+        if change:
+            return "degrading" if change > 0 else "improving"
+        return "stable" if self._seen[index, column] > self.warmup else None
+
+    def _register_endpoints(self, names: List[str]) -> np.ndarray:
+        new = [name for name in dict.fromkeys(names) if name not in self._endpoint_ids]
+        if new:
+            for name in new:
+                self._endpoint_ids[name] = len(self.endpoints)
+                self.endpoints.append(name)
+            grow = len(new)
+            for attribute in ("_mean", "_var", "_point_var", "_seen", "_upper", "_lower", "_last_change",
+                              "_pending_sum", "_pending_count", "_pending_squares"):
+                current = getattr(self, attribute)
+                setattr(self, attribute, np.concatenate([current, np.zeros((grow,) + current.shape[1:], current.dtype)]))
+            for attribute in ("_upper_start", "_lower_start"):
+                current = getattr(self, attribute)
+                setattr(self, attribute, np.concatenate([current, np.full((grow,) + current.shape[1:], np.nan)]))
+            self._pending_bucket = np.concatenate(
+                [self._pending_bucket, np.full(grow, np.iinfo(np.int64).min, dtype=np.int64)]
+            )
+        return np.array([self._endpoint_ids[name] for name in names], dtype=np.int64)
+
+    def _step(self, ids: np.ndarray, bucket: int, sums: np.ndarray, counts: np.ndarray,
+              squares: np.ndarray) -> List[Dict]:
+        """Add one interval's sums for `ids`, first evaluating the intervals they close."""
+        closing = self._pending_bucket[ids] < bucket
+        finished = ids[closing & (self._pending_count[ids].sum(axis=1) > 0)]
+        events = self._evaluate(finished) if len(finished) else []
+        self._pending_sum[ids[closing]] = 0
+        self._pending_count[ids[closing]] = 0
+        self._pending_squares[ids[closing]] = 0
+        self._pending_bucket[ids[closing]] = bucket
+        self._pending_sum[ids] += sums
+        self._pending_count[ids] += counts
+        self._pending_squares[ids] += squares
+        return events
+
+    def _evaluate(self, ids: np.ndarray) -> List[Dict]:
+        """Run one detector step on the pending interval of every endpoint in `ids`."""
+        counts = self._pending_count[ids]
+        observed = counts > 0
+        size = np.maximum(counts, 1)
+        values = np.where(observed, self._pending_sum[ids] / size, 0.0)
+        spread = np.maximum(self._pending_squares[ids] / size - values * values, 0.0)
+        moment = (self._pending_bucket[ids] * self.interval_seconds).astype(np.float64)[:, None]
+
+        mean, var, point_var, seen = self._mean[ids], self._var[ids], self._point_var[ids], self._seen[ids]
+        relative, point_floor = (np.array(floors) for floors in zip(*DETECTED_METRICS.values()))
+        # The noise of an interval mean is the larger of the observed interval-to-interval
+        # variance and the sampling noise of averaging `counts` points
+        sigma = np.sqrt(np.maximum.reduce([
+            var, np.maximum(point_var, point_floor ** 2) / size, (relative * mean) ** 2
+        ]))
+        deviation = np.clip((values - mean) / sigma, -DEVIATION_CLIP, DEVIATION_CLIP)
+
+        # CUSUM only runs once the baseline has warmed up
+        armed = observed & (seen >= self.warmup)
+        upper = np.where(armed, np.maximum(self._upper[ids] + deviation - self.slack, 0.0), self._upper[ids])
+        lower = np.where(armed, np.maximum(self._lower[ids] - deviation - self.slack, 0.0), self._lower[ids])
+        upper_start = np.where(armed & (self._upper[ids] == 0) & (upper > 0), moment, self._upper_start[ids])
+        lower_start = np.where(armed & (self._lower[ids] == 0) & (lower > 0), moment, self._lower_start[ids])
+
+        # Baseline: plain running mean/variance while warming up, clipped EWMA afterwards
+        warming = observed & (seen < self.warmup)
+        weight = np.where(warming, 1.0 / (seen + 1), self.alpha)
+        step = np.where(warming, values - mean, deviation * sigma)
+        new_mean = np.where(observed, mean + weight * step, mean)
+        new_var = np.where(
+            warming, var + (step * (values - new_mean) - var) * weight,
+            np.where(observed, (1 - weight) * (var + weight * step * step), var)
+        )
+        new_point_var = np.where(observed, point_var + weight * (spread - point_var), point_var)
+
+        raised = upper > self.threshold
+        dropped = lower > self.threshold
+        events = []
+        for rows, columns, direction, starts in (
+            (*np.nonzero(raised), "regression", upper_start),
+            (*np.nonzero(dropped & ~raised), "improvement", lower_start),
+        ):
+            for row, column in zip(rows.tolist(), columns.tolist()):
+                events.append({
+                    "endpoint": self.endpoints[ids[row]],
+                    "metric": self.metrics[column],
+                    "direction": direction,
+                    "change_point": float(starts[row, column]),
+                    "detected_at": float(moment[row, 0]),
+                    "baseline": float(mean[row, column]),
+                    "current": float(values[row, column]),
+                })
+        changed = raised | dropped
+        upper[changed] = 0.0
+        lower[changed] = 0.0
+        self._last_change[ids] = np.where(raised, 1, np.where(dropped, -1, self._last_change[ids]))
+
+        self._mean[ids], self._var[ids], self._point_var[ids] = new_mean, new_var, new_point_var
+        # After a change the baseline warms up again from the following intervals
+        self._seen[ids] = np.where(changed, 0, seen + observed)
+        self._upper[ids], self._lower[ids] = upper, lower
+        self._upper_start[ids], self._lower_start[ids] = upper_start, lower_start
+        self.events.extend(events)
+        return events
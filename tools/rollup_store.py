@@ -0,0 +1,448 @@
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from tools.metrics_engine import (
+    ISSUE_THRESHOLDS, METRIC_COLUMNS, TREND_WINDOW, LatencySketch, MetricsAggregate, MetricsFrame,
+    last_values, response_time_histogram
+)
+
+# Rollup tiers, finest first: name -> (bucket seconds, seconds of data per segment file, default retention days)
+TIERS = {
+    "minute": (60, 86400, 7),
+    "hour": (3600, 86400 * 16, 90),
+    "day": (86400, 86400 * 256, 3650),
+}
+TIER_NAMES = list(TIERS)
+
+# Bump whenever the on-disk record layout changes
+STORE_VERSION = 1
+
+HISTOGRAM_WIDTH = len(response_time_histogram(np.empty(0), np.empty(0, dtype=np.int64), 1)[0])
+
+# One pre-aggregated (bucket, endpoint) summary; mirrors the fields of MetricsAggregate
+RECORD_DTYPE = np.dtype([
+    ("bucket", "<i8"),
+    ("endpoint", "<u4"),
+    ("count", "<u8"),
+    ("sums", "<f8", (len(METRIC_COLUMNS),)),
+    ("finite", "<u8", (len(METRIC_COLUMNS),)),
+    ("issues", "<u8", (len(ISSUE_THRESHOLDS),)),
+    ("first_seen", "<f8"),
+    ("last_seen", "<f8"),
+    ("histogram", "<u4", (HISTOGRAM_WIDTH,)),
+    ("tail", "<f8", (TREND_WINDOW,)),
+    ("tail_len", "<u1"),
+    ("sketch_start", "<i8"),
+    ("sketch_len", "<u4"),
+])
+
+# Latency sketch buckets are stored sparsely, one entry per non-empty bucket of a record
+SKETCH_DTYPE = np.dtype([("bucket", "<u2"), ("count", "<u4")])
+
+# Merges producing at most this many dense sketch cells skip sorting the sparse entries
+DENSE_MERGE_LIMIT = 1 << 22
+
+class RollupStore:
+    """
+    Pre-aggregated, time-bucketed metrics history on local disk.
+
+    Every ingested frame is summarized into minute, hour and day buckets.
+    Each tier is a directory of segment files covering a fixed span of
+    time; a segment is a pair of flat NumPy record arrays (`.rec` with one
+    `RECORD_DTYPE` summary per bucket and endpoint, `.sk` with the sparse
+    latency sketch buckets those records point into), so appending is a
+    plain write to the end of two files and reading is `np.fromfile`.
+
+    Range queries cover the middle of a range with the coarsest tier that
+    fits and its edges with finer tiers, then merge the records into one
+    `MetricsAggregate`; a 90 day query therefore reads ~90 day records per
+    endpoint instead of millions of raw points.  Whole segments older than
+    a tier's retention are deleted by `apply_retention`.
+
+    Appending is not idempotent, so the store also keeps a watermark per
+    ingested source (see `log_source`): how far into it data has been
+    appended, which `resume_offset` returns while the source is the same
+    file, so re-reading a log only appends what was added since.
+    """
+
+    def __init__(self, root: str, retention_days: Optional[Dict[str, float]] = None,
+                 thresholds: Dict[str, Tuple[str, float]] = ISSUE_THRESHOLDS):
+        self.root = root
+        self.retention_days = {name: days for name, (_, _, days) in TIERS.items()}
+        self.retention_days.update(retention_days or {})
+        os.makedirs(root, exist_ok=True)
+        for name in TIERS:
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+        meta_path = os.path.join(root, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("version") != STORE_VERSION:
+                raise ValueError(f"Rollup store at {root} has version {meta.get('version')}, expected {STORE_VERSION}")
+            # Issue counts are stored pre-computed, so the store keeps the thresholds it was created with
+            self.thresholds = {key: (column, value) for key, (column, value) in meta["thresholds"].items()}
+        else:
+            self.thresholds = dict(thresholds)
+            self._write_json(meta_path, {"version": STORE_VERSION, "thresholds": self.thresholds})
+
+        self._endpoints_path = os.path.join(root, "endpoints.json")
+        if os.path.exists(self._endpoints_path):
+            with open(self._endpoints_path) as f:
+                self.endpoints: List[str] = json.load(f)
+        else:
+            self.endpoints = []
+        self._endpoint_ids = {name: index for index, name in enumerate(self.endpoints)}
+
+        self._sources_path = os.path.join(root, "sources.json")
+        if os.path.exists(self._sources_path):
+            with open(self._sources_path) as f:
+                self.sources: Dict[str, Dict] = json.load(f)
+        else:
+            self.sources = {}
+        # Segments appended to since the last compaction: (tier, segment start)
+        self.dirty_segments = set()
+
+    def append_frame(self, frame: MetricsFrame) -> int:
+        """Summarize a frame into every tier and append the records; returns the rows stored."""
+        timestamped = np.isfinite(frame.timestamps)
+        if not timestamped.any():
+            return 0
+        ids = self._register_endpoints(frame.endpoints)[frame.codes[timestamped]]
+        timestamps = frame.timestamps[timestamped]
+        columns = {name: values[timestamped] for name, values in frame.columns.items()}
+
+        # Raw points are aggregated into minute records only; every coarser
+        # tier is downsampled from the records of the tier below it
+        width, segment_seconds, _ = TIERS[TIER_NAMES[0]]
+        buckets = (np.floor(timestamps / width) * width).astype(np.int64)
+        keys, groups = np.unique(buckets * (len(self.endpoints) + 1) + ids, return_inverse=True)
+        grouped = MetricsFrame([None] * len(keys), groups, timestamps, columns)
+        aggregate = MetricsAggregate.from_frame(grouped, self.thresholds, sketch=False)
+        records, sketch = self._records_from_aggregate(aggregate, groups, columns["response_time_ms"])
+        records["bucket"] = keys // (len(self.endpoints) + 1)
+        records["endpoint"] = keys % (len(self.endpoints) + 1)
+        self._append_records(TIER_NAMES[0], segment_seconds, records, sketch)
+
+        for name in TIER_NAMES[1:]:
+            width, segment_seconds, _ = TIERS[name]
+            records, sketch = self._downsample(records, sketch, width)
+            self._append_records(name, segment_seconds, records, sketch)
+        return int(timestamped.sum())
+
+    def resume_offset(self, source: Dict) -> int:
+        """Offset up to which `source` has been appended; 0 when it was rotated, truncated or never seen."""
+        known = self.sources.get(source["path"])
+        if not known or (known["device"], known["inode"]) != (source["device"], source["inode"]):
+            return 0
+        if source["size"] is not None and known["offset"] > source["size"]:
+            return 0
+        return known["offset"]
+
+    def record_source(self, source: Dict, offset: int) -> None:
+        """Record that `source` has been appended up to `offset`."""
+        self.sources[source["path"]] = dict(source, offset=offset)
+        self._write_json(self._sources_path, self.sources)
+
+    def query(self, start: float, end: float, endpoints: Optional[List[str]] = None,
+              now: Optional[float] = None) -> MetricsAggregate:
+        """Merge the stored buckets covering [start, end) into one aggregate per endpoint."""
+        wanted = None
+        if endpoints is not None:
+            wanted = np.array([self._endpoint_ids[name] for name in endpoints if name in self._endpoint_ids],
+                              dtype=np.uint32)
+
+        record_parts, sketch_parts = [], []
+        sketch_offset = 0
+        for tier, piece_start, piece_end in self.plan(start, end, now):
+            for records, sketch in self._load_range(tier, piece_start, piece_end):
+                if wanted is not None:
+                    records = records[np.isin(records["endpoint"], wanted)]
+                records["sketch_start"] += sketch_offset
+                record_parts.append(records)
+                sketch_parts.append(sketch)
+                sketch_offset += len(sketch)
+
+        if not record_parts:
+            return MetricsAggregate.empty(self.thresholds)
+        records = np.concatenate(record_parts)
+        sketch = np.concatenate(sketch_parts)
+        # Chronological order keeps the merged trend window the most recent values
+        records = records[np.argsort(records["bucket"], kind="stable")]
+        endpoint_ids, groups = np.unique(records["endpoint"], return_inverse=True)
+        merged, merged_sketch = _combine_records(records, sketch, groups, len(endpoint_ids))
+        return self._aggregate_from_records(merged, merged_sketch)
+
+    def plan(self, start: float, end: float, now: Optional[float] = None) -> List[Tuple[str, int, int]]:
+        """
+        Split [start, end) into (tier, bucket_start, bucket_end) pieces.
+
+        Whole days come from the day tier, whole hours at the edges from the
+        hour tier and the remainder from the minute tier, unless a finer tier
+        no longer retains that part of the range, in which case the coarser
+        tier's bucket is used whole.
+        """
+        now = time.time() if now is None else now
+        cutoffs = [now - self.retention_days[name] * 86400 for name in TIER_NAMES]
+        pieces: List[Tuple[str, int, int]] = []
+
+        def cover(start: float, end: float, level: int):
+            if start >= end:
+                return
+            width = TIERS[TIER_NAMES[level]][0]
+            floor_start = int(math.floor(start / width) * width)
+            if level == 0:
+                pieces.append((TIER_NAMES[0], floor_start, int(math.ceil(end))))
+                return
+            first_whole = int(math.ceil(start / width) * width)
+            last_whole = int(math.floor(end / width) * width)
+            finer_retains = start >= cutoffs[level - 1]
+            if first_whole >= last_whole:
+                if finer_retains:
+                    cover(start, end, level - 1)
+                else:
+                    pieces.append((TIER_NAMES[level], floor_start, int(math.ceil(end))))
+                return
+            if finer_retains:
+                cover(start, first_whole, level - 1)
+                pieces.append((TIER_NAMES[level], first_whole, last_whole))
+            else:
+                pieces.append((TIER_NAMES[level], floor_start, last_whole))
+            cover(last_whole, end, level - 1)
+
+        cover(start, end, len(TIER_NAMES) - 1)
+        return pieces
+
+    def apply_retention(self, now: Optional[float] = None) -> List[str]:
+        """Delete segments whose data is entirely older than their tier's retention."""
+        now = time.time() if now is None else now
+        removed = []
+        for name, (_, segment_seconds, _) in TIERS.items():
+            cutoff = now - self.retention_days[name] * 86400
+            for segment_start in self._segment_starts(name):
+                if segment_start + segment_seconds <= cutoff:
+                    for suffix in (".rec", ".sk", ".unsorted"):
+                        path = self._segment_path(name, segment_start, suffix)
+                        if os.path.exists(path):
+                            os.remove(path)
+                    removed.append(self._segment_path(name, segment_start, ".rec"))
+        return removed
+
+    def compact(self, tier: str, segment_start: int) -> None:
+        """
+        Rewrite one segment with a single record per bucket and endpoint.
+
+        Every appended batch adds its own partial records for the buckets it
+        touches; compaction merges them so queries read one record each.
+        """
+        records, sketch = (np.array(data) for data in self._read_segment(tier, segment_start))
+        if not len(records):
+            return
+        records = records[np.argsort(records["bucket"], kind="stable")]
+        keys, groups = np.unique(
+            records["bucket"].astype(np.int64) * (len(self.endpoints) + 1) + records["endpoint"], return_inverse=True
+        )
+        merged, merged_sketch = _combine_records(records, sketch, groups, len(keys))
+        for suffix, data in ((".sk", merged_sketch), (".rec", merged)):
+            path = self._segment_path(tier, segment_start, suffix)
+            data.tofile(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        unsorted_marker = self._segment_path(tier, segment_start, ".unsorted")
+        if os.path.exists(unsorted_marker):
+            os.remove(unsorted_marker)
+
+    def compact_dirty(self) -> None:
+        """Compact every segment appended to since the last compaction."""
+        for tier, segment_start in sorted(self.dirty_segments):
+            if os.path.exists(self._segment_path(tier, segment_start, ".rec")):
+                self.compact(tier, segment_start)
+        self.dirty_segments.clear()
+
+    def _register_endpoints(self, names: List[str]) -> np.ndarray:
+        new = [name for name in dict.fromkeys(names) if name not in self._endpoint_ids]
+        if new:
+            for name in new:
+                self._endpoint_ids[name] = len(self.endpoints)
+                self.endpoints.append(name)
+            self._write_json(self._endpoints_path, self.endpoints)
+        return np.array([self._endpoint_ids[name] for name in names], dtype=np.int64)
+
+    def _downsample(self, records: np.ndarray, sketch: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge bucket-ordered records into records of `width`-second buckets."""
+        buckets = records["bucket"] // width * width
+        keys, groups = np.unique(buckets * (len(self.endpoints) + 1) + records["endpoint"], return_inverse=True)
+        merged, merged_sketch = _combine_records(records, sketch, groups, len(keys))
+        merged["bucket"] = keys // (len(self.endpoints) + 1)
+        return merged, merged_sketch
+
+    def _records_from_aggregate(self, aggregate: MetricsAggregate, groups: np.ndarray,
+                                response_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        size = len(aggregate.counts)
+        records = np.zeros(size, dtype=RECORD_DTYPE)
+        records["count"] = aggregate.counts
+        records["sums"] = np.column_stack([aggregate.sums[name] for name in METRIC_COLUMNS])
+        records["finite"] = np.column_stack([aggregate.finite_counts[name] for name in METRIC_COLUMNS])
+        records["issues"] = np.column_stack([aggregate.issue_counts[key] for key in self.thresholds])
+        records["first_seen"] = aggregate.first_seen
+        records["last_seen"] = aggregate.last_seen
+        records["histogram"] = aggregate.histogram
+        _pack_tails(records, aggregate.tails)
+
+        finite = np.isfinite(response_times)
+        keys, counts = np.unique(
+            groups[finite].astype(np.int64) * LatencySketch.BUCKETS + LatencySketch.bucket_index(response_times[finite]),
+            return_counts=True
+        )
+        sketch = np.empty(len(keys), dtype=SKETCH_DTYPE)
+        sketch["bucket"] = keys % LatencySketch.BUCKETS
+        sketch["count"] = counts
+        _set_sketch_ranges(records, keys // LatencySketch.BUCKETS)
+        return records, sketch
+
+    def _aggregate_from_records(self, records: np.ndarray, sketch: np.ndarray) -> MetricsAggregate:
+        size = len(records)
+        owners = np.repeat(np.arange(size), records["sketch_len"].astype(np.int64))
+        latency = np.bincount(
+            owners * LatencySketch.BUCKETS + sketch["bucket"].astype(np.int64),
+            weights=sketch["count"], minlength=size * LatencySketch.BUCKETS
+        ).astype(np.int64).reshape(size, LatencySketch.BUCKETS)
+        return MetricsAggregate(
+            [self.endpoints[index] for index in records["endpoint"]],
+            records["count"].astype(np.int64),
+            {name: records["sums"][:, column] for column, name in enumerate(METRIC_COLUMNS)},
+            {name: records["finite"][:, column].astype(np.int64) for column, name in enumerate(METRIC_COLUMNS)},
+            {key: records["issues"][:, column].astype(np.int64) for column, key in enumerate(self.thresholds)},
+            [row["tail"][:row["tail_len"]] for row in records],
+            LatencySketch(latency),
+            records["histogram"].astype(np.int64),
+            records["first_seen"],
+            records["last_seen"],
+            self.thresholds
+        )
+
+    def _append_records(self, tier: str, segment_seconds: int, records: np.ndarray, sketch: np.ndarray) -> None:
+        segments = records["bucket"] // segment_seconds * segment_seconds
+        for segment_start in np.unique(segments):
+            selected = np.flatnonzero(segments == segment_start)
+            part = records[selected]
+            entries = _gather_sketch(part, sketch)
+            record_path = self._segment_path(tier, int(segment_start), ".rec")
+            last = _map_array(record_path, RECORD_DTYPE)[-1:]
+            if len(last) and part["bucket"][0] < last["bucket"][0]:
+                # Out-of-order data; queries scan this segment until it is compacted
+                open(self._segment_path(tier, int(segment_start), ".unsorted"), "w").close()
+            sketch_path = self._segment_path(tier, int(segment_start), ".sk")
+            offset = os.path.getsize(sketch_path) // SKETCH_DTYPE.itemsize if os.path.exists(sketch_path) else 0
+            part["sketch_start"] = offset + np.concatenate([[0], np.cumsum(part["sketch_len"][:-1], dtype=np.int64)])
+            # Sketch entries go first, so a record never points past the end of its sketch file
+            with open(sketch_path, "ab") as f:
+                entries.tofile(f)
+            with open(record_path, "ab") as f:
+                part.tofile(f)
+            self.dirty_segments.add((tier, int(segment_start)))
+
+    def _load_range(self, tier: str, start: int, end: int):
+        segment_seconds = TIERS[tier][1]
+        for segment_start in self._segment_starts(tier):
+            if segment_start + segment_seconds <= start or segment_start >= end:
+                continue
+            records, sketch = self._read_segment(tier, segment_start)
+            if os.path.exists(self._segment_path(tier, segment_start, ".unsorted")):
+                part = records[(records["bucket"] >= start) & (records["bucket"] < end)]
+            else:
+                # Sorted segments are binary searched, so only the pages in range are read
+                buckets = records["bucket"]
+                part = records[np.searchsorted(buckets, start):np.searchsorted(buckets, end)]
+            if len(part) == len(records):
+                yield np.array(records), np.array(sketch)
+            elif len(part):
+                part = np.array(part)
+                entries = _gather_sketch(part, sketch)
+                _set_sketch_ranges(part, np.repeat(np.arange(len(part)), part["sketch_len"].astype(np.int64)))
+                yield part, entries
+
+    def _read_segment(self, tier: str, segment_start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Map a segment's record and sketch arrays without reading them into memory."""
+        return (_map_array(self._segment_path(tier, segment_start, ".rec"), RECORD_DTYPE),
+                _map_array(self._segment_path(tier, segment_start, ".sk"), SKETCH_DTYPE))
+
+    def _segment_starts(self, tier: str) -> List[int]:
+        names = os.listdir(os.path.join(self.root, tier))
+        return sorted(int(name[:-4]) for name in names if name.endswith(".rec"))
+
+    def _segment_path(self, tier: str, segment_start: int, suffix: str) -> str:
+        return os.path.join(self.root, tier, f"{segment_start}{suffix}")
+
+    def _write_json(self, path: str, data) -> None:
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
+def _map_array(path: str, dtype: np.dtype) -> np.ndarray:
+    if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(os.path.getsize(path) // dtype.itemsize,))
+
+def _pack_tails(records: np.ndarray, tails: List[np.ndarray]) -> None:
+    for index, tail in enumerate(tails):
+        records["tail"][index, :len(tail)] = tail
+        records["tail_len"][index] = len(tail)
+
+def _set_sketch_ranges(records: np.ndarray, owners: np.ndarray) -> None:
+    """Point each record at its run of entries in a sketch array sorted by owning record."""
+    lengths = np.bincount(owners, minlength=len(records))
+    records["sketch_len"] = lengths
+    records["sketch_start"] = np.concatenate([[0], np.cumsum(lengths[:-1], dtype=np.int64)])
+
+def _gather_sketch(records: np.ndarray, sketch: np.ndarray) -> np.ndarray:
+    """Collect the sketch entries of `records`, in record order."""
+    lengths = records["sketch_len"].astype(np.int64)
+    if not lengths.sum():
+        return np.empty(0, dtype=SKETCH_DTYPE)
+    run_offsets = np.concatenate([[0], np.cumsum(lengths[:-1])])
+    index = np.repeat(records["sketch_start"] - run_offsets, lengths) + np.arange(lengths.sum())
+    return sketch[index]
+
+def _combine_records(records: np.ndarray, sketch: np.ndarray, groups: np.ndarray,
+                     size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge chronologically ordered records into one record per group id."""
+    merged = np.zeros(size, dtype=RECORD_DTYPE)
+    first_of_group = np.full(size, len(records))
+    np.minimum.at(first_of_group, groups, np.arange(len(records)))
+    merged["bucket"] = records["bucket"][first_of_group]
+    merged["endpoint"] = records["endpoint"][first_of_group]
+    for field in ("count", "sums", "finite", "issues", "histogram"):
+        values = records[field].reshape(len(records), -1)
+        merged[field] = np.column_stack([
+            np.bincount(groups, weights=values[:, column], minlength=size) for column in range(values.shape[1])
+        ]).reshape(merged[field].shape)
+    merged["first_seen"] = np.nan
+    merged["last_seen"] = np.nan
+    np.fmin.at(merged["first_seen"], groups, records["first_seen"])
+    np.fmax.at(merged["last_seen"], groups, records["last_seen"])
+
+    tail_lengths = records["tail_len"].astype(np.int64)
+    tail_values = records["tail"][np.arange(TREND_WINDOW) < tail_lengths[:, None]]
+    tail_groups = np.repeat(groups, tail_lengths)
+    _pack_tails(merged, last_values(tail_groups, tail_values, np.bincount(tail_groups, minlength=size), TREND_WINDOW))
+
+    entries = _gather_sketch(records, sketch)
+    owners = np.repeat(groups, records["sketch_len"].astype(np.int64)).astype(np.int64)
+    flat = owners * LatencySketch.BUCKETS + entries["bucket"]
+    if size * LatencySketch.BUCKETS <= DENSE_MERGE_LIMIT:
+        # Few groups: summing into dense sketches is much cheaper than sorting the entries
+        totals = np.bincount(flat, weights=entries["count"], minlength=size * LatencySketch.BUCKETS)
+        keys = np.flatnonzero(totals)
+        counts = totals[keys]
+    else:
+        keys, inverse = np.unique(flat, return_inverse=True)
+        counts = np.bincount(inverse, weights=entries["count"], minlength=len(keys))
+    merged_sketch = np.empty(len(keys), dtype=SKETCH_DTYPE)
+    merged_sketch["bucket"] = keys % LatencySketch.BUCKETS
+    merged_sketch["count"] = counts
+    _set_sketch_ranges(merged, keys // LatencySketch.BUCKETS)
+    return merged, merged_sketch
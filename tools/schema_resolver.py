@@ -0,0 +1,209 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, Set, Tuple
+
+# Keywords that only document a schema or operation; they never affect compatibility
+# (nor fingerprints), so documentation edits do not force a deep comparison
+DOCUMENTATION_KEYWORDS = {"description", "summary", "title", "example", "examples", "externalDocs",
+                          "deprecated", "operationId", "tags", "xml"}
+
+# Keywords whose value maps names to schemas or objects, so its keys are data, not keywords
+NAMED_MAPS = {"properties", "patternProperties", "definitions", "schemas", "responses", "content", "headers",
+              "paths", "parameters", "requestBodies", "securitySchemes", "links", "callbacks"}
+
+# Keywords dropped from normalized schemas when they hold their default value
+DEFAULT_KEYWORDS = {"nullable": False, "deprecated": False, "readOnly": False, "writeOnly": False,
+                    "uniqueItems": False, "required": False}
+
+# Normalized schemas kept by content hash, shared by every resolver (and so every spec version)
+SCHEMA_CACHE_SIZE = 100_000
+
+# Schema comparisons kept by (old fingerprint, new fingerprint, direction)
+DIFFERENCE_CACHE_SIZE = 100_000
+
+class LRUCache:
+    """Mapping bounded to `maxsize` entries that evicts the least recently used one."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+NORMALIZED_SCHEMAS = LRUCache(SCHEMA_CACHE_SIZE)
+SCHEMA_DIFFERENCES = LRUCache(DIFFERENCE_CACHE_SIZE)
+
+class SchemaResolver:
+    """
+    Memoized `$ref` resolution over one OpenAPI 3 or Swagger 2 document.
+
+    Two views of a fragment are offered.  `fingerprint` is a contract hash
+    that ignores documentation keywords and hashes each `$ref` as its
+    target, so equal fingerprints mean equal contracts.  `normalize`
+    returns the fragment with every `$ref` inlined and default-valued
+    keywords, type lists and `required` lists canonicalized; recursion
+    points stay `$ref`s (their targets are listed in `cycles`).  Every
+    referenced component is fingerprinted and normalized once per
+    document, and normalized dicts and lists are interned by a content hash
+    in a process-wide LRU cache, so identical subschemas, within a
+    document or across versions of it, are one shared object.
+    """
+
+    def __init__(self, spec: Dict, cache: LRUCache = NORMALIZED_SCHEMAS):
+        self.spec = spec or {}
+        self.cache = cache
+        self.cycles: Set[str] = set()
+        self._ref_fingerprints: Dict[str, str] = {}
+        self._fingerprinting: Set[str] = set()
+        self._normalized_refs: Dict[str, Tuple[object, str]] = {}
+        self._normalizing: Set[str] = set()
+
+    def lookup(self, ref: str):
+        """The object a local JSON pointer (`#/components/schemas/User`) points to, or None."""
+        node = self.spec
+        for token in ref[2:].split("/") if ref != "#" else []:
+            token = token.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, dict):
+                node = node.get(token)
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                return None
+        return node
+
+    def resolve(self, node):
+        """Follow a chain of local `$ref`s to the referenced object."""
+        seen = set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            ref = node["$ref"]
+            if ref in seen or not ref.startswith("#"):
+                return node
+            seen.add(ref)
+            node = self.lookup(ref)
+        return node
+
+    def fingerprint(self, node) -> str:
+        """Content hash of a spec fragment, with `$ref`s hashed as their targets."""
+        return self._digest(node)
+
+    def normalize(self, node):
+        """Canonical, fully dereferenced and interned copy of a spec fragment."""
+        return self._normalize(node)[0]
+
+    def _digest(self, node, names: bool = False) -> str:
+        """`names` marks maps keyed by names (properties, media types...), which are never filtered."""
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and not names:
+                return self._ref_digest(ref)
+            parts = [
+                f"{key}={self._digest(value, not names and key in NAMED_MAPS)}" for key, value in sorted(node.items())
+                if names or (key not in DOCUMENTATION_KEYWORDS and not key.startswith("x-"))
+            ]
+            text = "{" + ",".join(parts) + "}"
+        elif isinstance(node, list):
+            text = "[" + ",".join(self._digest(item) for item in node) + "]"
+        else:
+            return repr(node)
+        return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+    def _ref_digest(self, ref: str) -> str:
+        fingerprint = self._ref_fingerprints.get(ref)
+        if fingerprint is not None:
+            return fingerprint
+        if ref in self._fingerprinting:
+            # Recursive schema: refer to the cycle by name instead of expanding it forever
+            return f"cycle:{ref}"
+        self._fingerprinting.add(ref)
+        try:
+            target = self.lookup(ref) if ref.startswith("#") else {"external": ref}
+            fingerprint = self._digest(target)
+        finally:
+            self._fingerprinting.discard(ref)
+        self._ref_fingerprints[ref] = fingerprint
+        return fingerprint
+
+    def _normalize(self, node, names: bool = False) -> Tuple[object, str]:
+        """(normalized node, content hash); dicts and lists are interned in `cache` by that hash."""
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and not names:
+                return self._normalize_ref(ref)
+            items = []
+            for key, value in node.items():
+                if not names:
+                    if DEFAULT_KEYWORDS.get(key, ...) is value or (key == "required" and value == []):
+                        continue
+                    value = _canonical_keyword(key, value)
+                normalized, digest = self._normalize(value, not names and key in NAMED_MAPS)
+                items.append((key, normalized, digest))
+            text = "{" + ",".join(f"{key!r}={digest}" for key, _, digest in sorted(items, key=lambda item: item[0])) + "}"
+        elif isinstance(node, list):
+            items = [self._normalize(item) for item in node]
+            text = "[" + ",".join(digest for _, digest in items) + "]"
+        else:
+            return node, repr(node)
+
+        digest = hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+        interned = self.cache.get(digest)
+        if interned is None:
+            if isinstance(node, dict):
+                interned = {key: normalized for key, normalized, _ in items}
+            else:
+                interned = [normalized for normalized, _ in items]
+            self.cache.put(digest, interned)
+        return interned, digest
+
+    def _normalize_ref(self, ref: str) -> Tuple[object, str]:
+        known = self._normalized_refs.get(ref)
+        if known is not None:
+            return known
+        target = self.lookup(ref) if ref.startswith("#") else None
+        if target is None:
+            # External or dangling references are kept as they are
+            return {"$ref": ref}, f"ref:{ref}"
+        if ref in self._normalizing:
+            self.cycles.add(ref)
+            return {"$ref": ref}, f"cycle:{ref}"
+        self._normalizing.add(ref)
+        try:
+            known = self._normalize(target)
+        finally:
+            self._normalizing.discard(ref)
+        self._normalized_refs[ref] = known
+        return known
+
+def _canonical_keyword(key: str, value):
+    """Order-insensitive keyword values in one canonical form."""
+    if key == "type" and isinstance(value, list):
+        types = sorted(set(value), key=str)
+        return types[0] if len(types) == 1 else types
+    if key == "required" and isinstance(value, list) and all(isinstance(name, str) for name in value):
+        return sorted(set(value))
+    return value
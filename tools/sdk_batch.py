@@ -0,0 +1,85 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from tools.sdk_cache import SDKCache
+from tools.sdk_templates import endpoint_model, render_sdk, sdk_cache_key
+from utils.output_saver import get_file_extension
+
+# Batches with fewer jobs are generated inline, where starting worker processes costs more
+MIN_PARALLEL_JOBS = 4
+
+# Endpoints and endpoint model of every API in the batch, installed once per worker process
+_SHARED_APIS: Dict[str, Tuple[List[str], List[Dict]]] = {}
+
+def sdk_file_path(output_dir: str, api: str, language: str) -> str:
+    """Where a batch writes the SDK of one API in one language."""
+    directory = re.sub(r'[^A-Za-z0-9_.-]', '_', api)
+    return os.path.join(output_dir, directory, language, f"enterprise_api_client.{get_file_extension(language)}")
+
+def generate_sdk_batch(apis: Dict[str, List[str]], languages: List[str], output_dir: str,
+                       cache_dir: Optional[str] = None, max_workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Generate the SDK of every (API, language) pair into `output_dir`.
+
+    Every API's endpoint model is built once, here, and installed in each
+    worker process when it starts, so a job is only an (API, language) pair
+    and a worker never re-parses an API's endpoints.  Workers take an SDK
+    from the SDK cache or render it, and write it to `sdk_file_path`
+    themselves, so each SDK reaches the disk as soon as it is done and its
+    code is never sent back to this process.
+
+    Yields one entry per job as it finishes, with the file written or the
+    job's error.
+    """
+    shared = {api: (endpoints, endpoint_model(endpoints)) for api, endpoints in apis.items()}
+    jobs = [(api, language, output_dir, cache_dir) for api in apis for language in languages]
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1 or len(jobs) < MIN_PARALLEL_JOBS:
+        _share_apis(shared)
+        try:
+            for job in jobs:
+                yield _generate_job(*job)
+        finally:
+            _share_apis({})
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_share_apis, initargs=(shared,)) as executor:
+        futures = [executor.submit(_generate_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def _share_apis(shared: Dict[str, Tuple[List[str], List[Dict]]]) -> None:
+    global _SHARED_APIS
+    _SHARED_APIS = shared
+
+def _generate_job(api: str, language: str, output_dir: str, cache_dir: Optional[str]) -> Dict:
+    """Generate and write one SDK.  Runs in worker processes."""
+    started = time.perf_counter()
+    try:
+        endpoints, model = _SHARED_APIS[api]
+        cache = SDKCache(cache_dir) if cache_dir else None
+        key = sdk_cache_key(endpoints, language)
+        sdk = cache.get(key) if cache else None
+        cached = sdk is not None
+        if not cached:
+            sdk = render_sdk(language, endpoints, model)
+            if cache:
+                cache.put(key, sdk)
+        path = sdk_file_path(output_dir, api, language)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8', newline='') as f:
+            f.write(sdk["code"])
+        os.replace(temporary, path)
+    except Exception as e:
+        return {"api": api, "language": language, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "api": api,
+        "language": language,
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "cached": cached,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
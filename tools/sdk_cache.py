@@ -0,0 +1,38 @@
+import json
+import os
+from typing import Dict, Optional
+
+class SDKCache:
+    """
+    On-disk cache of generated SDKs, one file per `sdk_cache_key`.
+
+    Each entry is one line of JSON metadata (language, installation, usage
+    example) followed by the SDK's code, so a hit reads megabytes of source
+    back without JSON-decoding it.  Entries are written aside and renamed
+    into place, so readers in other processes never see a partial entry.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding='utf-8', newline='') as f:
+                sdk = json.loads(f.readline())
+                sdk["code"] = f.read()
+                return sdk
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, sdk: Dict) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        metadata = {field: value for field, value in sdk.items() if field != "code"}
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8', newline='') as f:
+            f.write(json.dumps(metadata) + "\n")
+            f.write(sdk["code"])
+        os.replace(temporary, path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.sdk")
@@ -0,0 +1,153 @@
+import heapq
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+# Severities from most to least urgent
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+# Risk points of one finding per severity; unknown severities count as LOW,
+# INFO findings are reported but add no risk
+SEVERITY_WEIGHTS = {"CRITICAL": 10, "HIGH": 5, "MEDIUM": 2, "LOW": 1, "INFO": 0}
+
+# Findings and endpoints listed in a scorecard's top-N lists
+TOP_FINDINGS = 10
+
+# Findings without an API label are grouped under this name
+DEFAULT_API = "default"
+
+def security_score(risk: int, scanned: int) -> float:
+    """
+    0-100 score from the risk points of an API's findings per scanned node
+    (operation or handler): 100 without findings, 50 at one LOW finding per
+    node, about 17 at one HIGH finding per node.
+    """
+    return round(100.0 / (1 + risk / max(scanned, 1)), 1)
+
+class FindingsAccumulator:
+    """
+    Counts, risk and top-N findings of a scan, built in one pass.
+
+    Each finding bumps two per-API Counters, one keyed by (severity,
+    category, rule) and one holding the risk points of each endpoint, and
+    is offered to a bounded heap of the most severe findings; severity,
+    category, rule and per-API counts, scores and the riskiest endpoints
+    are all derived from those Counters, so a scorecard never re-reads the
+    findings.  Accumulators of scan shards (e.g. one per API or worker
+    process) are combined with `merge`.
+    """
+
+    def __init__(self, top_n: int = TOP_FINDINGS):
+        self.top_n = top_n
+        self.total = 0
+        self.groups: Dict[str, Counter] = {}
+        self.endpoint_risk: Dict[str, Counter] = {}
+        # Operations and handlers scanned per API, the denominator of its score
+        self.scanned: Counter = Counter()
+        # Min-heap of (weight, -sequence, finding): the root is the least severe, latest kept finding
+        self._top: List = []
+        self._sequence = 0
+
+    def add(self, finding: Dict, api: str = DEFAULT_API) -> None:
+        self.extend((finding,), api)
+
+    def extend(self, findings: Iterable[Dict], api: str = DEFAULT_API) -> "FindingsAccumulator":
+        # The per-API Counters are looked up once per batch, not once per finding
+        groups = self.groups.setdefault(api, Counter())
+        endpoint_risk = self.endpoint_risk.setdefault(api, Counter())
+        top, top_n, sequence = self._top, self.top_n, self._sequence
+        for finding in findings:
+            severity = finding.get("severity", "LOW")
+            weight = SEVERITY_WEIGHTS.get(severity, 1)
+            key = (severity, finding.get("owasp_category") or finding.get("compliance_framework", "Other"),
+                   finding.get("id"))
+            groups[key] = groups.get(key, 0) + 1
+            endpoint = finding.get("endpoint")
+            if endpoint:
+                endpoint_risk[endpoint] = endpoint_risk.get(endpoint, 0) + weight
+            sequence += 1
+            # Most findings are no more severe than the least severe one kept, which ends the work here
+            if len(top) < top_n:
+                heapq.heappush(top, (weight, -sequence, finding))
+            elif weight > top[0][0]:
+                heapq.heapreplace(top, (weight, -sequence, finding))
+        self.total += sequence - self._sequence
+        self._sequence = sequence
+        return self
+
+    def record_scanned(self, api: str, nodes: int) -> None:
+        self.scanned[api] += nodes
+
+    def merge(self, other: "FindingsAccumulator") -> "FindingsAccumulator":
+        """Combine with the accumulator of another shard of the scan."""
+        merged = FindingsAccumulator(max(self.top_n, other.top_n))
+        merged.total = self.total + other.total
+        merged.scanned = self.scanned + other.scanned
+        for name in ("groups", "endpoint_risk"):
+            combined = getattr(merged, name)
+            for part in (getattr(self, name), getattr(other, name)):
+                for api, counts in part.items():
+                    combined[api] = combined[api] + counts if api in combined else Counter(counts)
+        # Re-numbered so this shard's findings stay ahead of the other's among equally severe ones
+        for part in (self, other):
+            for weight, _, finding in sorted(part._top, key=lambda entry: -entry[1]):
+                merged._sequence += 1
+                entry = (weight, -merged._sequence, finding)
+                if len(merged._top) < merged.top_n:
+                    heapq.heappush(merged._top, entry)
+                elif weight > merged._top[0][0]:
+                    heapq.heapreplace(merged._top, entry)
+        return merged
+
+    def severity_counts(self, api: Optional[str] = None) -> Dict[str, int]:
+        counts = dict.fromkeys(SEVERITIES, 0)
+        for group_api, groups in self.groups.items():
+            if api is None or group_api == api:
+                for (severity, _, _), found in groups.items():
+                    counts[severity] = counts.get(severity, 0) + found
+        return counts
+
+    def top_findings(self) -> List[Dict]:
+        """The most severe findings, earliest first among equally severe ones."""
+        return [finding for _, _, finding in sorted(self._top, key=lambda entry: entry[:2], reverse=True)]
+
+    def top_endpoints(self) -> List[Dict]:
+        """The endpoints with the most risk points, across APIs."""
+        ranked = heapq.nlargest(self.top_n, (
+            (risk, api, endpoint) for api, risks in self.endpoint_risk.items()
+            for endpoint, risk in risks.most_common(self.top_n)
+        ), key=lambda entry: entry[0])
+        return [{"api": api, "endpoint": endpoint, "risk": risk} for risk, api, endpoint in ranked]
+
+    def scorecard(self) -> Dict:
+        by_category: Counter = Counter()
+        by_rule: Counter = Counter()
+        apis = {}
+        for api in sorted(set(self.groups) | set(self.scanned)):
+            summary = {"total_findings": 0, "by_severity": dict.fromkeys(SEVERITIES, 0)}
+            categories: Counter = Counter()
+            risk = 0
+            for (severity, category, rule), found in self.groups.get(api, {}).items():
+                summary["total_findings"] += found
+                summary["by_severity"][severity] = summary["by_severity"].get(severity, 0) + found
+                categories[category] += found
+                by_rule[rule] += found
+                risk += found * SEVERITY_WEIGHTS.get(severity, 1)
+            by_category.update(categories)
+            summary["by_category"] = dict(categories.most_common())
+            summary["scanned"] = self.scanned.get(api, 0)
+            summary["risk_score"] = risk
+            summary["security_score"] = security_score(risk, summary["scanned"])
+            apis[api] = summary
+
+        risk = sum(summary["risk_score"] for summary in apis.values())
+        return {
+            "total_findings": self.total,
+            "by_severity": self.severity_counts(),
+            "by_category": dict(by_category.most_common()),
+            "by_rule": dict(by_rule.most_common()),
+            "risk_score": risk,
+            "security_score": security_score(risk, sum(self.scanned.values())),
+            "apis": apis,
+            "top_findings": self.top_findings(),
+            "top_endpoints": self.top_endpoints(),
+        }
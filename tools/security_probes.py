@@ -0,0 +1,269 @@
+import asyncio
+import json
+import re
+import ssl
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:  # Only active probing needs httpx
+    httpx = None
+
+from tools.security_rules import PUBLIC_PATH, RATE_LIMIT_HEADER, Rule
+
+# Paths requested without credentials when no protected operation of the service is known;
+# index and version documents are often public, so answers only make an INFO finding
+AUTH_PROBE_PATHS = ('/api', '/v1', '/')
+
+# Protected operations (from a spec or a repository's handlers) requested without credentials per service
+MAX_PROTECTED_PROBES = 5
+
+# Path template parameters ({id}, <int:id>) and the value probes substitute for them
+PATH_PARAMETER = re.compile(r'\{[^}/]+\}|<[^>/]+>')
+SAMPLE_PATH_VALUE = "1"
+
+# Origin sent by the CORS check; a service that echoes it back trusts any site
+PROBE_ORIGIN = "https://security-probe.invalid"
+
+# Path that should not exist, requested with a malformed query to provoke an error page
+ERROR_PROBE_PATH = "/__security_probe__/%ff?id='\"<probe>"
+
+# Response bodies that reveal stack traces, framework debug pages or database errors
+ERROR_LEAK = re.compile(
+    r'Traceback \(most recent call last\)|File "[^"]+\.py", line \d+|\bat [\w$.]+\([\w$]+\.java:\d+\)|'
+    r'Exception in thread|Werkzeug Debugger|django\.core\.exceptions|SQLSTATE\[|ORA-\d{5}|'
+    r'java\.lang\.\w+Exception|System\.\w+Exception|node_modules/|PG::\w+Error|<b>Warning</b>:',
+    re.IGNORECASE
+)
+
+# Headers whose values disclose server software versions (nginx/1.18.0, PHP/7.4.3, ...)
+VERSION_DISCLOSURE = re.compile(r'/\d+(\.\d+)+')
+VERSION_HEADERS = ("server", "x-powered-by", "x-aspnet-version", "x-aspnetmvc-version")
+
+# TLS protocol versions considered too old to accept
+WEAK_TLS_VERSIONS = {"SSLv2", "SSLv3", "TLSv1", "TLSv1.1"}
+
+# Checks run against every service, in report order
+ACTIVE_CHECKS = ("authentication", "cors", "tls", "error_leakage", "rate_limit")
+
+# Findings of the active checks
+PROBE_RULES = {
+    "authentication": Rule("API2-101", "Unauthenticated API Access", "HIGH", "API2:2023 Broken Authentication"),
+    "authentication_root": Rule("API2-102", "API Root Answers Without Credentials", "INFO",
+                                "API2:2023 Broken Authentication"),
+    "cors": Rule("API8-101", "Permissive CORS Policy", "MEDIUM", "API8:2023 Security Misconfiguration"),
+    "plaintext": Rule("API8-102", "Plaintext HTTP", "MEDIUM", "API8:2023 Security Misconfiguration"),
+    "tls": Rule("API8-103", "Weak TLS Configuration", "HIGH", "API8:2023 Security Misconfiguration"),
+    "error_leakage": Rule("API8-104", "Verbose Error Leakage", "MEDIUM", "API8:2023 Security Misconfiguration"),
+    "version_disclosure": Rule("API8-105", "Server Version Disclosure", "LOW", "API8:2023 Security Misconfiguration"),
+    "rate_limit": Rule("API4-101", "No Rate Limiting Observed", "LOW", "API4:2023 Unrestricted Resource Consumption"),
+}
+
+class HostRateLimiter:
+    """
+    Spaces the requests sent to one host at least 1/rate seconds apart.
+
+    Each caller reserves the next free slot and sleeps until it, so waiting
+    callers are served in arrival order without a lock (the event loop runs
+    them one at a time).
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class ActiveProber:
+    """
+    Safe, read-only security checks against live services.
+
+    Every request goes through one pooled `httpx.AsyncClient` and waits for,
+    in order, a per-host concurrency slot, its host's rate limiter
+    (`per_host_rate` requests/second) and a global slot, so hundreds of services are
+    probed at once while none of them sees more than a trickle of requests.
+    Checks only send GET/OPTIONS requests without credentials.
+
+    The authentication check requests up to `MAX_PROTECTED_PROBES` of the
+    service's `protected_paths` passed to `probe` (GET operations a spec or
+    the service's handlers say require credentials); an answer to one of
+    those is HIGH.  Services without any fall back to `AUTH_PROBE_PATHS`,
+    whose answers are only INFO.
+    """
+
+    def __init__(self, max_concurrency: int = 64, per_host_limit: int = 2, per_host_rate: float = 5.0,
+                 timeout: float = 5.0, rate_limit_burst: int = 10):
+        if httpx is None:
+            raise ImportError("httpx is required for active security probing")
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.per_host_rate = per_host_rate
+        self.timeout = timeout
+        self.rate_limit_burst = rate_limit_burst
+        self.requests_sent = 0
+
+    async def probe(self, base_urls: Iterable[str],
+                    protected_paths: Optional[Dict[str, Iterable[str]]] = None) -> List[Dict]:
+        """
+        Run every check against every base URL; one result per service, in input order.
+
+        `protected_paths` maps a base URL to the paths of its operations that
+        require credentials.
+        """
+        base_urls = list(dict.fromkeys(url.rstrip('/') for url in base_urls))
+        self._protected_paths = {}
+        for base_url, paths in (protected_paths or {}).items():
+            self._protected_paths[base_url.rstrip('/')] = list(dict.fromkeys(
+                PATH_PARAMETER.sub(SAMPLE_PATH_VALUE, path) for path in paths if not PUBLIC_PATH.search(path)
+            ))[:MAX_PROTECTED_PROBES]
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._limiters: Dict[str, HostRateLimiter] = {}
+        limits = httpx.Limits(max_connections=self.max_concurrency,
+                              max_keepalive_connections=min(self.max_concurrency, len(base_urls) * self.per_host_limit))
+        # Certificates are judged by the TLS check, so the other checks still reach self-signed services
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, verify=False,
+                                     follow_redirects=False) as client:
+            self._client = client
+            return await asyncio.gather(*(self._probe_service(url) for url in base_urls))
+
+    async def _probe_service(self, base_url: str) -> Dict:
+        checks = {
+            "authentication": self._check_authentication,
+            "cors": self._check_cors,
+            "tls": self._check_tls,
+            "error_leakage": self._check_error_leakage,
+            "rate_limit": self._check_rate_limit,
+        }
+        outcomes = await asyncio.gather(*(checks[name](base_url) for name in ACTIVE_CHECKS), return_exceptions=True)
+        findings = []
+        statuses = {}
+        for name, outcome in zip(ACTIVE_CHECKS, outcomes):
+            if isinstance(outcome, Exception):
+                statuses[name] = f"error: {type(outcome).__name__}: {outcome}"
+                continue
+            statuses[name] = "fail" if outcome else "pass"
+            findings.extend(outcome)
+        return {"base_url": base_url, "checks": statuses, "findings": findings}
+
+    def _host(self, netloc: str):
+        """Rate limiter and concurrency slot of one host:port."""
+        if netloc not in self._limiters:
+            self._limiters[netloc] = HostRateLimiter(self.per_host_rate)
+            self._host_slots[netloc] = asyncio.Semaphore(self.per_host_limit)
+        return self._limiters[netloc], self._host_slots[netloc]
+
+    async def _request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        limiter, slot = self._host(urlsplit(url).netloc)
+        async with slot:
+            # Paced inside the host's slot, so requests held up by it do not leave in a burst
+            await limiter.wait()
+            async with self._global:
+                self.requests_sent += 1
+                return await self._client.request(method, url, **kwargs)
+
+    def _finding(self, check: str, description: str, base_url: str, path: str = "") -> Dict:
+        return PROBE_RULES[check].finding(description, base_url + path, "active probe")
+
+    async def _check_authentication(self, base_url: str) -> List[Dict]:
+        findings = []
+        protected_paths = self._protected_paths.get(base_url)
+        protected = bool(protected_paths)
+        for path in protected_paths or AUTH_PROBE_PATHS:
+            response = await self._request("GET", base_url + path)
+            content_type = response.headers.get("content-type", "")
+            if response.is_success and "json" in content_type:
+                findings.append(self._finding(
+                    "authentication" if protected else "authentication_root",
+                    f"GET {path}{', which requires authentication,' if protected else ''} returned "
+                    f"{response.status_code} with JSON and no credentials", base_url, path))
+        return findings
+
+    async def _check_cors(self, base_url: str) -> List[Dict]:
+        response = await self._request("OPTIONS", base_url + "/", headers={
+            "Origin": PROBE_ORIGIN, "Access-Control-Request-Method": "GET"})
+        allowed = response.headers.get("access-control-allow-origin")
+        credentials = response.headers.get("access-control-allow-credentials", "").lower() == "true"
+        if allowed == PROBE_ORIGIN:
+            return [self._finding("cors", f"Any origin is reflected in Access-Control-Allow-Origin"
+                                  + (" with credentials allowed" if credentials else ""), base_url)]
+        if allowed == "*" and credentials:
+            return [self._finding("cors", "Access-Control-Allow-Origin is * with credentials allowed", base_url)]
+        return []
+
+    async def _check_tls(self, base_url: str) -> List[Dict]:
+        parts = urlsplit(base_url)
+        if parts.scheme != "https":
+            return [self._finding("plaintext", f"{base_url} serves the API over unencrypted HTTP", base_url)]
+        findings = []
+        # Handshake twice: once accepting anything to read the protocol, once verifying the certificate
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        context.minimum_version = ssl.TLSVersion.MINIMUM_SUPPORTED
+        # Without lowering the security level OpenSSL would refuse old protocols instead of reporting them
+        context.set_ciphers("DEFAULT:@SECLEVEL=0")
+        version = await self._handshake(parts, context)
+        if version in WEAK_TLS_VERSIONS:
+            findings.append(self._finding("tls", f"The server negotiated {version}", base_url))
+        try:
+            await self._handshake(parts, ssl.create_default_context())
+        except ssl.SSLCertVerificationError as e:
+            findings.append(self._finding("tls", f"The certificate is not trusted: {e.verify_message}", base_url))
+        return findings
+
+    async def _handshake(self, parts, context: ssl.SSLContext) -> Optional[str]:
+        """TLS protocol version negotiated with the server of a parsed https URL."""
+        limiter, slot = self._host(parts.netloc)
+        async with slot:
+            await limiter.wait()
+            async with self._global:
+                self.requests_sent += 1
+                connection = asyncio.open_connection(parts.hostname, parts.port or 443, ssl=context,
+                                                     server_hostname=parts.hostname)
+                _, writer = await asyncio.wait_for(connection, self.timeout)
+                try:
+                    return writer.get_extra_info("ssl_object").version()
+                finally:
+                    writer.close()
+                    try:
+                        await writer.wait_closed()
+                    except OSError:
+                        # The version is already known; a peer dropping the connection uncleanly changes nothing
+                        pass
+
+    async def _check_error_leakage(self, base_url: str) -> List[Dict]:
+        response = await self._request("GET", base_url + ERROR_PROBE_PATH)
+        findings = []
+        match = ERROR_LEAK.search(response.text[:65536])
+        if match:
+            findings.append(self._finding(
+                "error_leakage", f"An error response ({response.status_code}) exposes internals: '{match.group(0)}'",
+                base_url, ERROR_PROBE_PATH.split('?')[0]))
+        for header in VERSION_HEADERS:
+            value = response.headers.get(header)
+            if value and VERSION_DISCLOSURE.search(value):
+                findings.append(self._finding("version_disclosure", f"The {header} header discloses '{value}'", base_url))
+        return findings
+
+    async def _check_rate_limit(self, base_url: str) -> List[Dict]:
+        # A short burst, still paced by the host's rate limiter, looking for 429s or rate-limit headers
+        for _ in range(self.rate_limit_burst):
+            response = await self._request("GET", base_url + "/")
+            if response.status_code == 429 or any(RATE_LIMIT_HEADER.search(name) for name in response.headers):
+                return []
+        return [self._finding("rate_limit", f"{self.rate_limit_burst} requests drew neither a 429 response "
+                                            f"nor rate-limit headers", base_url)]
+
+def discovered_base_urls(network_scan: Union[str, Dict]) -> List[str]:
+    """Base URLs of the API services in a NetworkScannerTool result (its JSON text or parsed dict)."""
+    if isinstance(network_scan, str):
+        network_scan = json.loads(network_scan)
+    return [service["base_url"] for service in network_scan.get("active_services", [])
+            if service.get("potential_api") and service.get("base_url")]
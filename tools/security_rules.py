@@ -0,0 +1,411 @@
+import hashlib
+import json
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tools.spec_diff import HTTP_METHODS, PREFERRED_MEDIA_TYPES, SpecIndex
+from tools.spec_loader import LazyDict
+
+# Bump whenever a rule's logic changes so stored findings are re-evaluated
+RULESET_VERSION = 2
+
+# Kinds of nodes rules can target: spec operations, properties of the schemas
+# operations return (with 2xx responses), and extracted Python route handlers
+NODE_TYPES = ("operation", "response_property", "handler")
+
+# Paths that are public by design (probes, docs, sign-in) and need no authentication
+PUBLIC_PATH = re.compile(
+    r'/(health|healthz|livez|readyz|ready|ping|status|metrics|docs|redoc|openapi|swagger|'
+    r'login|logout|signin|signup|register|token|oauth|\.well-known)(\.json|\.ya?ml)?(/|$)', re.IGNORECASE
+)
+
+# Names of handler decorators and dependencies that enforce authentication (login_required,
+# Depends(get_current_user)...), matched whole so require_POST or csrf_token are no guard
+AUTH_GUARD = re.compile(
+    r'^(?:\w+_)?(login|permission|roles?|staff_member|superuser|auth|jwt|token|api_?key)_(required|accepted)$|'
+    r'^requires?_(auth\w*|login|jwt|token|api_?key|permissions?|roles?|scopes?|user)$|'
+    r'^user_passes_test$|^(permission|authentication)_classes$|^(get_)?current_(active_)?(user|account|principal)$|'
+    r'^(verify|validate|check|decode)_(jwt|token|access_token|api_?key|credentials?|auth\w*)$|'
+    r'^(auth|authenticate\w*|authenticated|protected)$|^oauth2_?scheme$|^OAuth2\w*|^HTTP(Bearer|Basic|Digest)$|'
+    r'^APIKey(Header|Query|Cookie)$|^api_?key_(header|query|cookie|scheme)$|^bearer_?scheme$',
+    re.IGNORECASE
+)
+
+# Query parameters that size a page, compared lower-case without separators
+PAGE_SIZE_PARAMS = {"limit", "pagesize", "perpage", "size", "count", "maxresults", "top", "first", "take"}
+
+# Response headers announcing a rate limit (X-RateLimit-*, RateLimit-* and Retry-After)
+RATE_LIMIT_HEADER = re.compile(r'^(x-)?rate-?limit|^retry-after$', re.IGNORECASE)
+
+# Property names that should never be returned to clients
+SENSITIVE_FIELD = re.compile(
+    r'passw(or)?d|passwd|secret|private_?key|api_?key|access_?token|refresh_?token|session_?token|'
+    r'auth_?token|^token$|credit_?card|card_?number|^cvv$|^cvc$|^ssn$|social_?security|^pin$|(^|_)salt$|'
+    r'pw_?hash|hashed_?pw',
+    re.IGNORECASE
+)
+
+# Schema keywords whose values hold further schemas of the same value
+NESTED_SCHEMA_KEYWORDS = ("allOf", "anyOf", "oneOf")
+
+# A `$ref` member in JSON text, capturing the (still escaped) reference
+REF_IN_JSON = re.compile(r'"\$ref"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+Check = Callable[[Dict], Optional[str]]
+
+class Rule:
+    """
+    One static check, with a function per node type it applies to.
+
+    A check receives the node and returns the finding's description, or
+    None when the node passes.
+    """
+
+    def __init__(self, rule_id: str, name: str, severity: str, owasp_category: str, **checks: Check):
+        unknown = set(checks) - set(NODE_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown node types for rule {rule_id}: {sorted(unknown)}")
+        self.id = rule_id
+        self.name = name
+        self.severity = severity
+        self.owasp_category = owasp_category
+        self.checks = checks
+
+    def finding(self, description: str, endpoint: str, location: str) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": description,
+            "severity": self.severity,
+            "owasp_category": self.owasp_category,
+            "endpoint": endpoint,
+            "location": location,
+        }
+
+class RuleSet:
+    """
+    Rules compiled into an index by the node type they target.
+
+    Scans walk a spec (or an endpoint index) once and hand every node only
+    to the checks registered for its type, so adding rules adds checks, not
+    traversals, and each node's context (effective security, parameters,
+    resolved responses) is built once however many rules read it.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        self.by_type: Dict[str, Tuple[Tuple[Rule, Check], ...]] = {
+            node_type: tuple((rule, rule.checks[node_type]) for rule in self.rules if node_type in rule.checks)
+            for node_type in NODE_TYPES
+        }
+        ids = ",".join(sorted(rule.id for rule in self.rules))
+        # Identifies the logic findings were produced by, for caches of findings
+        self.version = f"{RULESET_VERSION}:{hashlib.blake2b(ids.encode(), digest_size=6).hexdigest()}"
+
+    def evaluate(self, node_type: str, node: Dict, endpoint: str, location: str) -> List[Dict]:
+        findings = []
+        for rule, check in self.by_type[node_type]:
+            description = check(node)
+            if description:
+                findings.append(rule.finding(description, endpoint, location))
+        return findings
+
+    def scan_spec(self, index: SpecIndex) -> List[Dict]:
+        """Findings of every operation of an indexed OpenAPI 3 / Swagger 2 document."""
+        findings = []
+        # Property findings per schema object, so a schema shared by many operations is walked once
+        schema_findings: Dict[int, List[Tuple[str, Rule, str]]] = {}
+        for path, method, path_item in spec_operations(index):
+            findings.extend(self.scan_operation(index, path, method, path_item, schema_findings))
+        return findings
+
+    def scan_operation(self, index: SpecIndex, path: str, method: str, path_item: Dict,
+                       schema_findings: Optional[Dict[int, List]] = None) -> List[Dict]:
+        """Findings of one operation; pass the same `schema_findings` dict for every operation of a document."""
+        operation = path_item.get(method)
+        if not isinstance(operation, dict):
+            return []
+        schema_findings = schema_findings if schema_findings is not None else {}
+        node = _operation_node(index, path, method, operation, path_item)
+        endpoint = node["endpoint"]
+        findings = self.evaluate("operation", node, endpoint, f"paths.{path}.{method}")
+        if not self.by_type["response_property"]:
+            return findings
+        for code, schema in node["response_schemas"].items():
+            if not code.startswith("2"):
+                continue
+            for field, rule, description in self._schema_findings(index, schema, schema_findings):
+                findings.append(rule.finding(f"Response {code} of {endpoint} {description}", endpoint,
+                                             f"paths.{path}.{method}.responses.{code}:{field}"))
+        return findings
+
+    def scan_endpoints(self, endpoints: Iterable[Dict]) -> List[Dict]:
+        """Findings of route handlers from an endpoint index (see `build_endpoint_index`)."""
+        findings = []
+        for endpoint in endpoints:
+            findings.extend(self.scan_handler(endpoint))
+        return findings
+
+    def scan_handler(self, endpoint: Dict) -> List[Dict]:
+        label = f"{endpoint['method']} {endpoint['path']}"
+        location = f"{endpoint.get('file', '<source>')}:{endpoint.get('line')}"
+        return self.evaluate("handler", endpoint, label, location)
+
+    def _schema_findings(self, index: SpecIndex, schema, memo: Dict[int, List],
+                         active: Optional[set] = None) -> List[Tuple[str, Rule, str]]:
+        """(field path, rule, description) for the properties a schema can return, recursing through refs."""
+        schema = index.resolve(schema)
+        if not isinstance(schema, dict):
+            return []
+        key = id(schema)
+        if key in memo:
+            return memo[key]
+        active = active if active is not None else set()
+        if key in active:
+            # Recursive schema: its properties are reported where the recursion starts
+            return []
+        active.add(key)
+        results = []
+        for name, prop in (schema.get("properties") or {}).items():
+            prop = index.resolve(prop)
+            if not isinstance(prop, dict):
+                continue
+            node = {"name": name, "schema": prop}
+            for rule, check in self.by_type["response_property"]:
+                description = check(node)
+                if description:
+                    results.append((name, rule, description))
+            results.extend((f"{name}.{field}", rule, description)
+                           for field, rule, description in self._schema_findings(index, prop, memo, active))
+        nested = [schema.get("items"), schema.get("additionalProperties")]
+        for keyword in NESTED_SCHEMA_KEYWORDS:
+            nested.extend(schema.get(keyword) or [])
+        for child in nested:
+            if isinstance(child, dict):
+                results.extend(self._schema_findings(index, child, memo, active))
+        active.discard(key)
+        memo[key] = results
+        return results
+
+def spec_operations(index: SpecIndex) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    (path, method, resolved path item) for every operation of a document,
+    in document order, without decoding the operations of a lazily loaded spec.
+    """
+    for path, path_item in (index.spec.get("paths") or {}).items():
+        path_item = index.resolve(path_item)
+        if not isinstance(path_item, dict):
+            continue
+        for method in HTTP_METHODS:
+            if method in path_item:
+                yield path, method, path_item
+
+class OperationKeys:
+    """
+    Content hashes of a document's operations, for caches of their findings.
+
+    A key covers everything rules read about an operation: its path,
+    method, path-level parameters, the document's default security and the
+    operation's JSON text, plus the text of every component it reaches
+    through `$ref`s (transitively), so editing a shared schema changes the
+    key of each operation that returns it.  Operations and components of a
+    lazily loaded spec are hashed from their undecoded text, so computing
+    every key of an unchanged document decodes almost nothing; each
+    `$ref` is expanded once per document.
+    """
+
+    def __init__(self, index: SpecIndex):
+        self.index = index
+        spec = index.spec
+        self._document = json.dumps([
+            "swagger" if index.is_swagger else "openapi", spec.get("security")
+        ], sort_keys=True, default=str)
+        # Digest of everything reachable from a `$ref`, by `$ref`
+        self._closures: Dict[str, str] = {}
+
+    def key(self, path: str, method: str, path_item: Dict) -> str:
+        text = "|".join((self._document, method, path, _json_text(path_item, "parameters"),
+                         _json_text(path_item, method)))
+        text += "".join(f"|{ref}={self._closure(ref)}" for ref in sorted(set(_refs_in(text))))
+        return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+    def _closure(self, ref: str) -> str:
+        """Digest of the text of a `$ref`'s target and of every component it reaches."""
+        known = self._closures.get(ref)
+        if known is None:
+            digests = {}
+            pending = [ref]
+            while pending:
+                current = pending.pop()
+                if current not in digests:
+                    digests[current], refs = self._component(current)
+                    pending.extend(refs)
+            text = "|".join(f"{ref}={digest}" for ref, digest in sorted(digests.items()))
+            known = hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+            self._closures[ref] = known
+        return known
+
+    def _component(self, ref: str) -> Tuple[str, List[str]]:
+        """(digest, `$ref`s) of the text of a `$ref`'s target."""
+        if ref.startswith("#/"):
+            parent, _, token = ref.rpartition("/")
+            text = _json_text(self.index.resolver.lookup(parent), token.replace("~1", "/").replace("~0", "~"))
+        else:
+            text = json.dumps(ref)
+        return hashlib.blake2b(text.encode(), digest_size=12).hexdigest(), _refs_in(text)
+
+def _json_text(container, key) -> str:
+    """JSON text of `container[key]`, straight from the document for values a lazy spec has not decoded."""
+    if not isinstance(container, dict) or key not in container:
+        return "null"
+    raw = container.raw(key) if isinstance(container, LazyDict) else None
+    if raw is not None:
+        return raw
+    return json.dumps(container[key], sort_keys=True, default=str)
+
+def _refs_in(text: str) -> List[str]:
+    """`$ref` values in the JSON text of a spec fragment."""
+    return [json.loads(f'"{ref}"') if "\\" in ref else ref for ref in REF_IN_JSON.findall(text)]
+
+def handler_key(endpoint: Dict) -> str:
+    """Content hash of an extracted route handler (route, guards, parameters, file and line)."""
+    text = json.dumps(endpoint, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+def _operation_node(index: SpecIndex, path: str, method: str, operation: Dict, path_item: Dict) -> Dict:
+    """Everything operation rules read, resolved once."""
+    parameters = {}
+    for parameter in list(path_item.get("parameters") or []) + list(operation.get("parameters") or []):
+        parameter = index.resolve(parameter)
+        if isinstance(parameter, dict) and "name" in parameter:
+            if isinstance(parameter.get("schema"), dict) and "$ref" in parameter["schema"]:
+                parameter = dict(parameter, schema=index.resolve(parameter["schema"]))
+            parameters[(parameter["name"], parameter.get("in", "query"))] = parameter
+
+    responses = {}
+    schemas = {}
+    for code, response in (operation.get("responses") or {}).items():
+        response = index.resolve(response)
+        if not isinstance(response, dict):
+            response = {}
+        responses[str(code)] = response
+        schemas[str(code)] = index.resolve(response.get("schema") if index.is_swagger else _content_schema(response))
+
+    return {
+        "endpoint": f"{method.upper()} {path}",
+        "path": path,
+        "method": method.upper(),
+        "operation": operation,
+        "parameters": parameters,
+        "responses": responses,
+        "response_schemas": schemas,
+        "authenticated": requires_authentication(index, operation),
+    }
+
+def requires_authentication(index: SpecIndex, operation: Dict) -> bool:
+    """Whether an operation, or the document's default, requires credentials."""
+    security = operation.get("security", index.spec.get("security"))
+    # An empty requirement ({}) makes authentication optional
+    return bool(security) and all(requirement for requirement in security)
+
+def spec_server_urls(index: SpecIndex) -> List[str]:
+    """
+    Absolute base URLs a document declares its API is served from: OpenAPI 3
+    `servers` (without templated ones) or Swagger 2 `schemes`, `host` and `basePath`.
+    """
+    if index.is_swagger:
+        host = index.spec.get("host")
+        if not isinstance(host, str):
+            return []
+        base_path = index.spec.get("basePath") or ""
+        return [f"{scheme}://{host}{base_path}" for scheme in index.spec.get("schemes") or ("https", "http")]
+    urls = [server.get("url") for server in index.spec.get("servers") or [] if isinstance(server, dict)]
+    return [url for url in urls if isinstance(url, str) and "://" in url and "{" not in url]
+
+def has_auth_guard(endpoint: Dict) -> bool:
+    """Whether an extracted route handler has a decorator or dependency that enforces authentication."""
+    return any(AUTH_GUARD.search(guard) for guard in endpoint.get("guards") or [])
+
+def _content_schema(holder: Dict):
+    content = holder.get("content") or {}
+    if not isinstance(content, dict) or not content:
+        return None
+    for media_type in PREFERRED_MEDIA_TYPES:
+        if media_type in content:
+            return (content[media_type] or {}).get("schema")
+    return (next(iter(content.values())) or {}).get("schema")
+
+def _page_size_parameter(names: Iterable[str]) -> Optional[str]:
+    for name in names:
+        if name.lower().replace("_", "").replace("-", "") in PAGE_SIZE_PARAMS:
+            return name
+    return None
+
+def _returns_collection(schema) -> bool:
+    if not isinstance(schema, dict):
+        return False
+    if schema.get("type") == "array" or "items" in schema:
+        return True
+    # Envelopes such as {"data": [...], "next": ...}
+    return any(isinstance(prop, dict) and prop.get("type") == "array"
+               for prop in (schema.get("properties") or {}).values())
+
+def _operation_without_auth(node: Dict) -> Optional[str]:
+    if node["authenticated"] or PUBLIC_PATH.search(node["path"]):
+        return None
+    return f"{node['endpoint']} does not require authentication"
+
+def _handler_without_auth(node: Dict) -> Optional[str]:
+    if PUBLIC_PATH.search(node["path"]) or has_auth_guard(node):
+        return None
+    return f"Handler {node.get('handler')} of {node['method']} {node['path']} has no authentication guard"
+
+def _operation_unbounded_pagination(node: Dict) -> Optional[str]:
+    if node["method"] != "GET":
+        return None
+    ok = [schema for code, schema in node["response_schemas"].items() if code.startswith("2")]
+    if not any(_returns_collection(schema) for schema in ok):
+        return None
+    name = _page_size_parameter(name for name, location in node["parameters"] if location == "query")
+    if name is None:
+        return f"{node['endpoint']} returns a collection without a page-size parameter"
+    parameter = node["parameters"][(name, "query")]
+    if "maximum" not in (parameter.get("schema") or parameter):
+        return f"Page-size parameter '{name}' of {node['endpoint']} has no maximum"
+    return None
+
+def _handler_unbounded_pagination(node: Dict) -> Optional[str]:
+    if node["method"] not in ("GET", "ANY"):
+        return None
+    queries = {param["name"]: param for param in node.get("params") or [] if param.get("in") == "query"}
+    name = _page_size_parameter(queries)
+    if name is not None and "maximum" not in queries[name]:
+        return f"Page-size parameter '{name}' of handler {node.get('handler')} has no upper bound"
+    return None
+
+def _operation_without_rate_limit(node: Dict) -> Optional[str]:
+    if "429" in node["responses"]:
+        return None
+    for response in node["responses"].values():
+        if any(RATE_LIMIT_HEADER.search(header) for header in response.get("headers") or {}):
+            return None
+    return f"{node['endpoint']} documents neither a 429 response nor rate-limit headers"
+
+def _sensitive_property(node: Dict) -> Optional[str]:
+    if node["schema"].get("writeOnly") or not SENSITIVE_FIELD.search(node["name"]):
+        return None
+    return f"exposes the sensitive field '{node['name']}'"
+
+# OWASP API Security Top 10 (2023) checks run by default
+RULES = [
+    Rule("API2-001", "Missing Authentication", "HIGH", "API2:2023 Broken Authentication",
+         operation=_operation_without_auth, handler=_handler_without_auth),
+    Rule("API3-001", "Sensitive Field Exposure", "HIGH", "API3:2023 Broken Object Property Level Authorization",
+         response_property=_sensitive_property),
+    Rule("API4-001", "Unbounded Pagination", "MEDIUM", "API4:2023 Unrestricted Resource Consumption",
+         operation=_operation_unbounded_pagination, handler=_handler_unbounded_pagination),
+    Rule("API4-002", "Missing Rate Limiting", "LOW", "API4:2023 Unrestricted Resource Consumption",
+         operation=_operation_without_rate_limit),
+]
+
+DEFAULT_RULESET = RuleSet(RULES)
@@ -1,26 +1,74 @@
 from crewai.tools import BaseTool
+import git
+import hashlib
 import json
+import os
 import random
-from typing import List, Dict
+from collections import Counter
+from datetime import datetime, timezone
+from functools import partial
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from tools.analysis_store import AnalysisStore, configured_store_url
+from tools.endpoint_extractor import EXTRACTOR_VERSION
+from tools.git_analyzer import index_repository_endpoints, iter_tree_blobs
+from tools.security_findings import FindingsAccumulator
+from tools.security_probes import ActiveProber, discovered_base_urls
+from tools.security_rules import (
+    DEFAULT_RULESET, OperationKeys, handler_key, has_auth_guard, requires_authentication, spec_operations,
+    spec_server_urls
+)
+from tools.spec_diff import index_spec_file
+from utils.helpers import run_coroutine
 
 class SecurityScannerTool(BaseTool):
     name: str = "Security Scanner Tool"
     description: str = "Automated security vulnerability detection and compliance checking"
 
-    def _run(self, target: str = None, scan_type: str = "comprehensive") -> str:
+    # Worker processes extracting route handlers from a repository's Python files; None uses one per CPU
+    endpoint_workers: Optional[int] = None
+    # Keep the findings of every spec operation and route handler by content hash in the analysis
+    # store and only re-evaluate those that changed (or all of them when the rule set changes)
+    incremental: bool = True
+    # SQLite URL of the analysis store; None uses database.url from configs/app_config.json
+    analysis_store_url: Optional[str] = None
+    # Global cap on in-flight active probe requests across all services
+    probe_concurrency: int = 64
+    # Cap on in-flight active probe requests against any single service
+    probe_per_host_limit: int = 2
+    # Requests per second sent to any single service by the active probes
+    probe_rate_per_host: float = 5.0
+    # Seconds to wait for each active probe request
+    probe_timeout: float = 5.0
+    # Requests sent to each service by the rate-limit check before reporting that none was enforced
+    rate_limit_burst: int = 10
+
+    def _run(self, target: str = None, scan_type: str = "comprehensive", api_spec_path: str = None,
+             repo_path: str = None, base_urls: List[str] = None, network_scan: str = None) -> str:
         """
         Perform security scanning and compliance checking.
         
         Args:
             target: Target to scan (API endpoint, repository, etc.)
             scan_type: Type of scan to perform (comprehensive, owasp, compliance)
+            api_spec_path: OpenAPI/Swagger file (JSON or YAML) checked against the static rules
+            repo_path: Git repository whose Python route handlers are checked against the static rules
+            base_urls: Live services (e.g. http://10.0.0.5:8080) to run the safe active probes against
+            network_scan: NetworkScannerTool result (JSON) whose discovered API services are probed
         """
         try:
-            # Generate sample security assessment
-            security_data = self._generate_sample_security_assessment(target, scan_type)
+            # Counts, scores and top findings are accumulated as findings are produced
+            findings = FindingsAccumulator()
+            discovered_urls = discovered_base_urls(network_scan) if network_scan else []
+            if api_spec_path or repo_path or base_urls or discovered_urls:
+                security_data = self._scan_sources(target, scan_type, api_spec_path, repo_path, findings, base_urls,
+                                                   discovered_urls)
+            else:
+                # Generate sample security assessment
+                security_data = self._generate_sample_security_assessment(target, scan_type, findings)
             
             # Analyze the security findings
-            analysis = self._analyze_security_findings(security_data)
+            analysis = self._analyze_security_findings(findings)
             
             result = {
                 "target": target or "Default target",
@@ -34,7 +82,187 @@ class SecurityScannerTool(BaseTool):
         except Exception as e:
             return f"Security scan failed: {str(e)}"
 
-    def _generate_sample_security_assessment(self, target: str = None, scan_type: str = "comprehensive") -> Dict:
+    def _scan_sources(self, target: str, scan_type: str, api_spec_path: str = None, repo_path: str = None,
+                      accumulator: FindingsAccumulator = None, base_urls: List[str] = None,
+                      discovered_urls: List[str] = None) -> Dict:
+        """
+        Run the OWASP API Top 10 rules over a spec, a repository's route handlers and/or live services.
+
+        The operations the spec or the handlers protect are probed on `base_urls`; of the services in
+        `discovered_urls`, only those the spec's servers name are probed for the spec's operations.
+        """
+        accumulator = accumulator if accumulator is not None else FindingsAccumulator()
+        findings = []
+        probe_urls = list(base_urls or []) + list(discovered_urls or [])
+        assessment = {
+            "scan_timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": target or api_spec_path or repo_path or ", ".join(probe_urls),
+            "scan_type": scan_type,
+            "ruleset_version": DEFAULT_RULESET.version,
+            "rules": [rule.id for rule in DEFAULT_RULESET.rules],
+        }
+        store = AnalysisStore(configured_store_url(self.analysis_store_url)) \
+            if self.incremental and (api_spec_path or repo_path) else None
+        # Nodes whose findings came from the store and nodes the rules were run on
+        reuse = Counter(reused=0, evaluated=0)
+        protected_paths = {}
+        try:
+            if api_spec_path:
+                api, spec_findings, scanned = self._scan_spec(api_spec_path, store, reuse)
+                accumulator.extend(spec_findings, api)
+                accumulator.record_scanned(api, scanned)
+                findings.extend(spec_findings)
+                assessment["scanned_operations"] = scanned
+            if repo_path:
+                api, handler_findings, scanned = self._scan_repository(repo_path, store, reuse)
+                accumulator.extend(handler_findings, api)
+                accumulator.record_scanned(api, scanned)
+                findings.extend(handler_findings)
+                assessment["scanned_handlers"] = scanned
+            if probe_urls:
+                protected_paths = self._protected_paths(base_urls, discovered_urls, api_spec_path, repo_path, store)
+        finally:
+            if store:
+                store.close()
+        if store:
+            assessment["incremental"] = dict(reuse)
+        if probe_urls:
+            prober = ActiveProber(self.probe_concurrency, self.probe_per_host_limit, self.probe_rate_per_host,
+                                  self.probe_timeout, self.rate_limit_burst)
+            services = run_coroutine(prober.probe(probe_urls, protected_paths))
+            for service in services:
+                accumulator.extend(service["findings"], service["base_url"])
+                accumulator.record_scanned(service["base_url"], 1)
+                findings.extend(service["findings"])
+            assessment["probed_services"] = [
+                {"base_url": service["base_url"], "checks": service["checks"]} for service in services
+            ]
+            assessment["probe_requests"] = prober.requests_sent
+
+        assessment.update(self._finding_counts(accumulator))
+        assessment["vulnerabilities"] = findings
+        return assessment
+
+    def _protected_paths(self, base_urls: List[str] = None, discovered_urls: List[str] = None,
+                         api_spec_path: str = None, repo_path: str = None,
+                         store: Optional[AnalysisStore] = None) -> Dict[str, List[str]]:
+        """
+        GET paths the spec or the repository's handlers require credentials for, per base URL to probe.
+
+        Base URLs passed in get all of them.  A discovered service may be anything that answered on the
+        network, so it only gets the spec's paths, under the server's base path, if the spec's servers
+        name its origin.
+        """
+        spec_paths, handler_paths, servers = [], [], []
+        if api_spec_path:
+            index = index_spec_file(api_spec_path)
+            spec_paths = [path for path, method, path_item in spec_operations(index)
+                          if method == "get" and requires_authentication(index, path_item[method])]
+            servers = spec_server_urls(index)
+        if repo_path:
+            repo = git.Repo(repo_path)
+            python_files = ((path, sha) for sha, path in iter_tree_blobs(repo) if path.endswith('.py'))
+            # Parse results are cached in the store, so the handlers scanned above are not parsed again
+            handler_paths = [endpoint["path"] for endpoint in index_repository_endpoints(repo, python_files, store,
+                                                                                       self.endpoint_workers)
+                             if endpoint["method"] in ("GET", "ANY") and has_auth_guard(endpoint)]
+        protected = {base_url.rstrip('/'): spec_paths + handler_paths for base_url in base_urls or []}
+        for base_url in discovered_urls or []:
+            server = next((server for server in servers if _origin(server) == _origin(base_url)), None)
+            if server and base_url.rstrip('/') not in protected:
+                prefix = urlsplit(server).path.rstrip('/')
+                protected[base_url.rstrip('/')] = [prefix + path for path in spec_paths]
+        return protected
+
+    def _finding_counts(self, accumulator: FindingsAccumulator) -> Dict:
+        counts = accumulator.severity_counts()
+        return {
+            "total_findings": accumulator.total,
+            "critical_findings": counts["CRITICAL"],
+            "high_findings": counts["HIGH"],
+            "medium_findings": counts["MEDIUM"],
+            "low_findings": counts["LOW"],
+        }
+
+    def _scan_spec(self, api_spec_path: str, store: Optional[AnalysisStore],
+                   reuse: Counter) -> Tuple[str, List[Dict], int]:
+        """(API name, findings, operation count) of a spec file."""
+        def nodes():
+            index = index_spec_file(api_spec_path)
+            keys = OperationKeys(index) if store else None
+            # Property findings per schema object, shared by the operations evaluated in this run
+            schema_findings = {}
+            return index.title or os.path.basename(api_spec_path), [
+                (keys.key(*operation) if keys else None,
+                 partial(DEFAULT_RULESET.scan_operation, index, *operation, schema_findings=schema_findings))
+                for operation in spec_operations(index)
+            ]
+
+        source_hash = None
+        if store:
+            with open(api_spec_path, 'rb') as f:
+                source_hash = "spec:" + hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        return self._scan_nodes(store, source_hash, nodes, reuse)
+
+    def _scan_repository(self, repo_path: str, store: Optional[AnalysisStore],
+                         reuse: Counter) -> Tuple[str, List[Dict], int]:
+        """(repository name, findings, handler count) of the Python route handlers committed at HEAD."""
+        repo = git.Repo(repo_path)
+
+        def nodes():
+            python_files = ((path, sha) for sha, path in iter_tree_blobs(repo) if path.endswith('.py'))
+            endpoints = index_repository_endpoints(repo, python_files, store, self.endpoint_workers)
+            return os.path.basename(os.path.abspath(repo_path)), [
+                (handler_key(endpoint) if store else None, partial(DEFAULT_RULESET.scan_handler, endpoint))
+                for endpoint in endpoints
+            ]
+
+        # Handlers depend on the extractor as well as the tree
+        source_hash = f"tree:{repo.head.commit.tree.hexsha}:{EXTRACTOR_VERSION}" if store else None
+        return self._scan_nodes(store, source_hash, nodes, reuse)
+
+    def _scan_nodes(self, store: Optional[AnalysisStore], source_hash: Optional[str],
+                    nodes: Callable[[], Tuple[str, List[Tuple[Optional[str], Callable[[], List[Dict]]]]]],
+                    reuse: Counter) -> Tuple[str, List[Dict], int]:
+        """
+        Findings of a source whose `nodes()` returns its name and a
+        (content hash, evaluate) pair per operation or handler.
+
+        A source scanned before with the same content and rule set is
+        answered from the store without being parsed; otherwise only nodes
+        whose content hash has no stored findings are evaluated, and the
+        rest reuse the findings stored for their hash.
+        """
+        version = DEFAULT_RULESET.version
+        if store:
+            recorded = store.get_source_scan(source_hash, version)
+            if recorded:
+                cached = store.cached_findings(list(dict.fromkeys(recorded["content_hashes"])), version)
+                if all(key in cached for key in recorded["content_hashes"]):
+                    reuse["reused"] += recorded["scanned"]
+                    findings = [finding for key in recorded["content_hashes"] for finding in cached[key]]
+                    return recorded["name"], findings, recorded["scanned"]
+
+        name, scanned = nodes()
+        cached = store.cached_findings(list(dict.fromkeys(key for key, _ in scanned)), version) if store else {}
+        evaluated: Dict[str, List[Dict]] = {}
+        findings = []
+        for key, evaluate in scanned:
+            if key in cached:
+                findings.extend(cached[key])
+                reuse["reused"] += 1
+                continue
+            node_findings = evaluate()
+            evaluated[key] = node_findings
+            findings.extend(node_findings)
+            reuse["evaluated"] += 1
+        if store:
+            store.cache_findings(evaluated, version)
+            store.record_source_scan(source_hash, version, name, [key for key, _ in scanned])
+        return name, findings, len(scanned)
+
+    def _generate_sample_security_assessment(self, target: str = None, scan_type: str = "comprehensive",
+                                             accumulator: FindingsAccumulator = None) -> Dict:
         """Generate sample security assessment data."""
         # Define common security vulnerabilities
         common_vulnerabilities = [
@@ -146,65 +374,51 @@ class SecurityScannerTool(BaseTool):
         
         # Combine findings
         all_findings = selected_vulnerabilities + additional_findings
+        accumulator = accumulator if accumulator is not None else FindingsAccumulator()
+        accumulator.extend(all_findings)
         
         # Add some metadata
         assessment = {
             "scan_timestamp": "2025-09-07T21:05:00Z",
             "target": target or "Sample API Endpoint",
             "scan_type": scan_type,
-            "total_findings": len(all_findings),
-            "critical_findings": len([f for f in all_findings if f["severity"] == "CRITICAL"]),
-            "high_findings": len([f for f in all_findings if f["severity"] == "HIGH"]),
-            "medium_findings": len([f for f in all_findings if f["severity"] == "MEDIUM"]),
-            "low_findings": len([f for f in all_findings if f["severity"] == "LOW"]),
+            **self._finding_counts(accumulator),
             "vulnerabilities": all_findings
         }
         
         return assessment
 
-    def _analyze_security_findings(self, security_data: Dict) -> Dict:
-        """Analyze security findings and provide recommendations."""
-        vulnerabilities = security_data.get("vulnerabilities", [])
-        
-        # Group by severity
-        by_severity = {}
-        by_category = {}
-        
-        for vuln in vulnerabilities:
-            severity = vuln["severity"]
-            if severity not in by_severity:
-                by_severity[severity] = []
-            by_severity[severity].append(vuln)
-            
-            # Group by OWASP category or compliance framework
-            category = vuln.get("owasp_category") or vuln.get("compliance_framework", "Other")
-            if category not in by_category:
-                by_category[category] = []
-            by_category[category].append(vuln)
+    def _analyze_security_findings(self, findings: FindingsAccumulator) -> Dict:
+        """Build the scorecard of accumulated findings and provide recommendations."""
+        scorecard = findings.scorecard()
+        by_severity = scorecard["by_severity"]
+        # Grouped by OWASP category or compliance framework
+        by_category = scorecard["by_category"]
         
         # Generate recommendations
         recommendations = []
         
         # Critical and high severity issues
-        critical_high = by_severity.get("CRITICAL", []) + by_severity.get("HIGH", [])
+        critical_high = by_severity["CRITICAL"] + by_severity["HIGH"]
         if critical_high:
             recommendations.append({
                 "priority": "IMMEDIATE",
-                "description": f"Address {len(critical_high)} critical/high severity vulnerabilities immediately",
+                "description": f"Address {critical_high} critical/high severity vulnerabilities immediately",
                 "action": "Implement proper input validation, fix authentication issues, and enforce access controls"
             })
         
         # Medium severity issues
-        medium = by_severity.get("MEDIUM", [])
+        medium = by_severity["MEDIUM"]
         if medium:
             recommendations.append({
                 "priority": "HIGH",
-                "description": f"Address {len(medium)} medium severity vulnerabilities in next sprint",
+                "description": f"Address {medium} medium severity vulnerabilities in next sprint",
                 "action": "Implement rate limiting, fix data exposure issues, and improve logging"
             })
         
-        # OWASP-specific recommendations
-        if "Broken Authentication" in by_category:
+        # OWASP-specific recommendations (rule findings carry OWASP API Top 10 categories such as
+        # "API2:2023 Broken Authentication")
+        if any("Broken Authentication" in category for category in by_category):
             recommendations.append({
                 "priority": "IMMEDIATE",
                 "description": "Authentication vulnerabilities detected",
@@ -218,6 +432,20 @@ class SecurityScannerTool(BaseTool):
                 "action": "Use parameterized queries and input validation libraries"
             })
         
+        if any("Unrestricted Resource Consumption" in category for category in by_category):
+            recommendations.append({
+                "priority": "HIGH",
+                "description": "Endpoints without bounded page sizes or rate limits detected",
+                "action": "Cap page-size parameters, return 429 with Retry-After and document rate-limit headers"
+            })
+        
+        if any("Broken Object Property Level Authorization" in category for category in by_category):
+            recommendations.append({
+                "priority": "IMMEDIATE",
+                "description": "Responses expose sensitive fields",
+                "action": "Remove secrets from response schemas or mark them writeOnly"
+            })
+        
         # Compliance-specific recommendations
         if "GDPR" in by_category:
             recommendations.append({
@@ -240,8 +468,14 @@ class SecurityScannerTool(BaseTool):
                 "action": "Continue regular security monitoring and assessments"
             })
         
-        return {
-            "by_severity": by_severity,
-            "by_category": by_category,
-            "recommendations": recommendations
-        }
\ No newline at end of file
+        scorecard["recommendations"] = recommendations
+        return scorecard
+
+def _origin(url: str) -> Tuple[str, Optional[str], Optional[int]]:
+    """Scheme, host and port of a URL, with the scheme's default port filled in."""
+    parts = urlsplit(url)
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    return parts.scheme, parts.hostname, port or {"http": 80, "https": 443}.get(parts.scheme)
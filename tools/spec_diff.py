@@ -0,0 +1,433 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from tools.schema_resolver import SCHEMA_DIFFERENCES, LRUCache, SchemaResolver
+from tools.spec_loader import load_spec, parse_spec
+
+# Operation keys of an OpenAPI/Swagger path item
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+# Swagger 2 keeps non-body parameter schemas inline in the parameter object
+SWAGGER_PARAMETER_SCHEMA_KEYS = ("type", "format", "items", "enum", "collectionFormat", "default",
+                                 "maximum", "minimum", "exclusiveMaximum", "exclusiveMinimum",
+                                 "maxLength", "minLength", "pattern", "maxItems", "minItems", "uniqueItems")
+
+# Type changes that accept strictly more values (old type, new type)
+WIDENING_TYPE_CHANGES = {("integer", "number")}
+
+# Constraints whose smaller value accepts fewer values, and those whose larger value does
+UPPER_BOUNDS = ("maximum", "maxLength", "maxItems", "maxProperties")
+LOWER_BOUNDS = ("minimum", "minLength", "minItems", "minProperties")
+
+# Media types preferred when an operation declares several
+PREFERRED_MEDIA_TYPES = ("application/json", "application/*+json", "*/*")
+
+# Indexed spec files kept by (path, mtime, size) or blob SHA, so the version validated last is not indexed again
+SPEC_INDEX_CACHE_SIZE = 8
+
+PATH_TEMPLATE_PARAM = re.compile(r'\{[^}/]+\}')
+PATH_TEMPLATE_NAME = re.compile(r'\{([^}/]+)\}')
+
+def index_spec_file(path: str) -> "SpecIndex":
+    """
+    `SpecIndex` of a spec file, cached while the file is unchanged, so
+    validating v1 -> v2 and then v2 -> v3 loads and fingerprints v2 once and
+    documentation runs reuse its resolver's normalized schemas.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    index = SPEC_INDEXES.get(key)
+    if index is None:
+        index = SpecIndex(load_spec(path))
+        SPEC_INDEXES.put(key, index)
+    return index
+
+def index_spec_blob(blob_sha: str, data: bytes) -> "SpecIndex":
+    """`SpecIndex` of a spec version stored in git, cached by blob SHA (the same content is parsed once)."""
+    key = ("blob", blob_sha)
+    index = SPEC_INDEXES.get(key)
+    if index is None:
+        index = SpecIndex(parse_spec(data, blob_sha))
+        SPEC_INDEXES.put(key, index)
+    return index
+
+def normalize_path(path: str) -> str:
+    """Path template with parameter names erased, so renaming `{id}` to `{userId}` is not a new path."""
+    return PATH_TEMPLATE_PARAM.sub('{}', path)
+
+class SpecIndex:
+    """
+    Hash indexes over one OpenAPI 3 or Swagger 2 document.
+
+    Operations are keyed by (normalized path, METHOD) and every schema,
+    parameter and operation gets a content fingerprint in which `$ref`s
+    are replaced by the fingerprint of their target.  Each referenced
+    component is fingerprinted once by the document's `SchemaResolver`
+    (memoized by `$ref`), so indexing is linear in the size of the
+    document, and two versions can be compared by key lookups with deep
+    comparisons only where fingerprints differ.
+    """
+
+    def __init__(self, spec: Dict):
+        self.spec = spec or {}
+        self.is_swagger = "swagger" in self.spec
+        self.resolver = SchemaResolver(self.spec)
+        self._paths: Optional[Dict[str, str]] = None
+        self._operations: Optional[Dict[Tuple[str, str], Dict]] = None
+
+    @property
+    def paths(self) -> Dict[str, str]:
+        """Original path template by normalized path."""
+        if self._paths is None:
+            self._build()
+        return self._paths
+
+    @property
+    def operations(self) -> Dict[Tuple[str, str], Dict]:
+        """Indexed operations by (normalized path, METHOD)."""
+        if self._operations is None:
+            self._build()
+        return self._operations
+
+    def _build(self) -> None:
+        # Built on first use, so a lazily loaded spec that is only documented in part stays partly decoded
+        paths: Dict[str, str] = {}
+        operations: Dict[Tuple[str, str], Dict] = {}
+        for path, path_item in (self.spec.get("paths") or {}).items():
+            path_item = self.resolve(path_item)
+            if not isinstance(path_item, dict):
+                continue
+            key = normalize_path(path)
+            paths[key] = path
+            shared = path_item.get("parameters") or []
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if isinstance(operation, dict):
+                    operations[(key, method.upper())] = self._index_operation(path, method, operation, shared)
+        self._paths, self._operations = paths, operations
+
+    @property
+    def title(self) -> Optional[str]:
+        return (self.spec.get("info") or {}).get("title")
+
+    @property
+    def version(self) -> Optional[str]:
+        return (self.spec.get("info") or {}).get("version")
+
+    def resolve(self, node):
+        """Follow a chain of local `$ref`s to the referenced object."""
+        return self.resolver.resolve(node)
+
+    def fingerprint(self, node) -> str:
+        """Content hash of a spec fragment, with `$ref`s hashed as their targets."""
+        return self.resolver.fingerprint(node)
+
+    def _index_operation(self, path: str, method: str, operation: Dict, shared: List) -> Dict:
+        parameters: Dict[Tuple[str, str], Dict] = {}
+        request_body = None
+        # Path parameters are keyed by their position in the template, so renaming one is no change
+        template_positions = {name: f"{{{position}}}" for position, name in enumerate(PATH_TEMPLATE_NAME.findall(path))}
+        for parameter in list(shared) + list(operation.get("parameters") or []):
+            parameter = self.resolve(parameter)
+            if not isinstance(parameter, dict) or "name" not in parameter:
+                continue
+            if parameter.get("in") == "body":
+                request_body = {"required": bool(parameter.get("required")), "schema": parameter.get("schema")}
+                continue
+            location = parameter.get("in", "query")
+            name = template_positions.get(parameter["name"], parameter["name"]) if location == "path" else parameter["name"]
+            # Operation-level parameters override path-level ones with the same name and location
+            parameters[(name, location)] = {
+                "name": parameter["name"],
+                "required": bool(parameter.get("required")) or location == "path",
+                "schema": self._parameter_schema(parameter),
+            }
+
+        body = self.resolve(operation.get("requestBody"))
+        if isinstance(body, dict):
+            request_body = {"required": bool(body.get("required")), "schema": self._content_schema(body)}
+
+        responses = {}
+        for code, response in (operation.get("responses") or {}).items():
+            response = self.resolve(response)
+            if not isinstance(response, dict):
+                response = {}
+            schema = response.get("schema") if self.is_swagger else self._content_schema(response)
+            responses[str(code)] = schema
+
+        return {
+            "path": path,
+            "method": method.upper(),
+            "parameters": parameters,
+            "request_body": request_body,
+            "responses": responses,
+            "fingerprint": self.fingerprint({"shared": shared, "operation": operation}),
+        }
+
+    def _parameter_schema(self, parameter: Dict):
+        if "schema" in parameter:
+            return parameter["schema"]
+        if "content" in parameter:
+            return self._content_schema(parameter)
+        return {key: parameter[key] for key in SWAGGER_PARAMETER_SCHEMA_KEYS if key in parameter}
+
+    def _content_schema(self, holder: Dict):
+        content = holder.get("content") or {}
+        if not isinstance(content, dict) or not content:
+            return None
+        for media_type in PREFERRED_MEDIA_TYPES:
+            if media_type in content:
+                return (content[media_type] or {}).get("schema")
+        return (next(iter(content.values())) or {}).get("schema")
+
+SPEC_INDEXES = LRUCache(SPEC_INDEX_CACHE_SIZE)
+
+def diff_specs(old: SpecIndex, new: SpecIndex) -> Dict[str, List[Dict]]:
+    """
+    Compare two indexed spec versions from the point of view of existing clients.
+
+    Breaking changes are removed paths and operations, newly required
+    parameters, request bodies and request properties, request schemas that
+    accept fewer values (narrowed types, enums and bounds), removed response
+    codes and response schemas that may return something old clients do not
+    expect.  Operations whose fingerprints match are skipped without being
+    compared.
+    """
+    breaking: List[Dict] = []
+    non_breaking: List[Dict] = []
+    comparator = _SchemaComparator(old, new)
+
+    for key, path in old.paths.items():
+        if key not in new.paths:
+            breaking.append({"type": "removed_path", "endpoint": path, "description": f"Path {path} was removed"})
+
+    for key, operation in old.operations.items():
+        endpoint = f"{operation['method']} {operation['path']}"
+        current = new.operations.get(key)
+        if current is None:
+            if key[0] in new.paths:
+                breaking.append({"type": "removed_operation", "endpoint": endpoint,
+                                 "description": f"Operation {endpoint} was removed"})
+        elif current["fingerprint"] != operation["fingerprint"]:
+            _diff_operation(operation, current, endpoint, comparator, breaking, non_breaking)
+
+    for key, operation in new.operations.items():
+        if key not in old.operations:
+            endpoint = f"{operation['method']} {operation['path']}"
+            change = "added_path" if key[0] not in old.paths else "added_operation"
+            non_breaking.append({"type": change, "endpoint": endpoint, "description": f"Operation {endpoint} was added"})
+    return {"breaking_changes": breaking, "non_breaking_changes": non_breaking}
+
+def compatibility_score(old: SpecIndex, breaking_changes: List[Dict]) -> float:
+    """Percentage of the previous version's operations that no breaking change affects."""
+    if not old.operations:
+        return 100.0
+    removed_paths = {change["endpoint"] for change in breaking_changes if change["type"] == "removed_path"}
+    affected = {change["endpoint"] for change in breaking_changes if change["type"] != "removed_path"}
+    affected.update(
+        f"{operation['method']} {operation['path']}" for operation in old.operations.values()
+        if operation["path"] in removed_paths
+    )
+    return round(100.0 * (1 - len(affected) / len(old.operations)), 2)
+
+def validate_spec(index: SpecIndex) -> List[Dict]:
+    """Structural issues of one spec version: undeclared path parameters and undocumented 2xx bodies."""
+    issues = []
+    for (key, method), operation in index.operations.items():
+        endpoint = f"{method} {operation['path']}"
+        declared = {parameter["name"] for (_, location), parameter in operation["parameters"].items()
+                    if location == "path"}
+        for name in PATH_TEMPLATE_NAME.findall(operation["path"]):
+            if name not in declared:
+                issues.append({"type": "undeclared_path_parameter", "endpoint": endpoint,
+                               "description": f"Path parameter '{name}' is not declared on {endpoint}"})
+        if not operation["responses"]:
+            issues.append({"type": "missing_responses", "endpoint": endpoint,
+                           "description": f"{endpoint} documents no responses"})
+        for code, schema in operation["responses"].items():
+            if code.startswith("2") and code != "204" and schema is None and method not in ("DELETE", "HEAD"):
+                issues.append({"type": "missing_response_schema", "endpoint": endpoint,
+                               "description": f"Response schema not defined for {code} status"})
+    return issues
+
+def _diff_operation(old: Dict, new: Dict, endpoint: str, comparator: "_SchemaComparator",
+                    breaking: List[Dict], non_breaking: List[Dict]) -> None:
+    for key, parameter in new["parameters"].items():
+        previous = old["parameters"].get(key)
+        where = f"{key[1]} parameter '{parameter['name']}'"
+        if previous is None:
+            if parameter["required"]:
+                breaking.append({"type": "new_required_parameter", "endpoint": endpoint, "location": where,
+                                 "description": f"New required {where} on {endpoint}"})
+            else:
+                non_breaking.append({"type": "added_parameter", "endpoint": endpoint, "location": where,
+                                     "description": f"New optional {where} on {endpoint}"})
+            continue
+        if parameter["required"] and not previous["required"]:
+            breaking.append({"type": "new_required_parameter", "endpoint": endpoint, "location": where,
+                             "description": f"The {where} on {endpoint} is now required"})
+        comparator.compare(previous["schema"], parameter["schema"], "request", endpoint, where, breaking)
+
+    old_body, new_body = old["request_body"], new["request_body"]
+    if new_body is not None:
+        if new_body["required"] and (old_body is None or not old_body["required"]):
+            breaking.append({"type": "new_required_parameter", "endpoint": endpoint, "location": "request body",
+                             "description": f"A request body is now required on {endpoint}"})
+        if old_body is not None:
+            comparator.compare(old_body["schema"], new_body["schema"], "request", endpoint, "request body", breaking)
+
+    for code, schema in old["responses"].items():
+        if code not in new["responses"]:
+            breaking.append({"type": "removed_response_code", "endpoint": endpoint, "location": f"response {code}",
+                             "description": f"Response {code} was removed from {endpoint}"})
+        else:
+            comparator.compare(schema, new["responses"][code], "response", endpoint, f"response {code}", breaking)
+    for code in new["responses"]:
+        if code not in old["responses"]:
+            non_breaking.append({"type": "added_response_code", "endpoint": endpoint, "location": f"response {code}",
+                                 "description": f"Response {code} was added to {endpoint}"})
+
+class _SchemaComparator:
+    """
+    Structural comparison of schema pairs across two spec versions.
+
+    Request schemas must still accept every value they accepted before;
+    response schemas must not produce values old clients cannot read.
+    Pairs with equal fingerprints are skipped, and the differences of each
+    pair of referenced components are computed once and re-used by every
+    operation that shares it.  They are cached by the pair's fingerprints
+    in a process-wide LRU cache, so validating the next version (or the
+    same pair again) only compares components that changed since.  Pairs
+    already on the comparison stack end recursion on cyclic schemas.
+    """
+
+    def __init__(self, old: SpecIndex, new: SpecIndex, cache: LRUCache = SCHEMA_DIFFERENCES):
+        self.old = old
+        self.new = new
+        self.cache = cache
+        self._active: Set[Tuple[str, str, str]] = set()
+
+    def compare(self, old_schema, new_schema, direction: str, endpoint: str, location: str,
+                changes: List[Dict]) -> None:
+        """Append the breaking differences of a schema pair, as changes located under `location`."""
+        for change_type, suffix, detail in self._differences(old_schema, new_schema, direction):
+            where = location + suffix
+            changes.append({"type": change_type, "endpoint": endpoint, "location": where,
+                            "description": f"{where} of {endpoint}: {detail}"})
+
+    def _differences(self, old_schema, new_schema, direction: str) -> List[Tuple[str, str, str]]:
+        """(change type, location suffix, detail) for every breaking difference."""
+        if old_schema is None or new_schema is None:
+            if old_schema is not None and direction == "response":
+                return [("response_schema_changed", "", "no longer documents a response body")]
+            return []
+        old_fingerprint, new_fingerprint = self.old.fingerprint(old_schema), self.new.fingerprint(new_schema)
+        if old_fingerprint == new_fingerprint:
+            return []
+        if not (_ref(old_schema) and _ref(new_schema)):
+            return self._compare_resolved(self.old.resolve(old_schema), self.new.resolve(new_schema), direction)
+        pair = (old_fingerprint, new_fingerprint, direction)
+        differences = self.cache.get(pair)
+        if differences is not None:
+            return differences
+        if pair in self._active:
+            return []
+        self._active.add(pair)
+        try:
+            differences = self._compare_resolved(self.old.resolve(old_schema), self.new.resolve(new_schema), direction)
+        finally:
+            self._active.discard(pair)
+        self.cache.put(pair, differences)
+        return differences
+
+    def _compare_resolved(self, old: Dict, new: Dict, direction: str) -> List[Tuple[str, str, str]]:
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            return []
+        request = direction == "request"
+        kind = "narrowed_type" if request else "response_schema_changed"
+        differences = []
+
+        old_types, new_types = _types(old), _types(new)
+        if old_types and new_types and old_types != new_types:
+            # Requests must accept every old type; responses must only return old types
+            required, offered = (old_types, new_types) if request else (new_types, old_types)
+            if not all(needed in offered or any((needed, wider) in WIDENING_TYPE_CHANGES for wider in offered)
+                       for needed in required):
+                return [(kind, "", f"type changed from {_type_text(old_types)} to {_type_text(new_types)}")]
+        elif new_types and not old_types and request:
+            differences.append((kind, "", f"type restricted to {_type_text(new_types)}"))
+
+        if "enum" in old or "enum" in new:
+            old_values, new_values = _enum_set(old.get("enum")), _enum_set(new.get("enum"))
+            if request and new_values is not None and (old_values is None or old_values - new_values):
+                missing = sorted(old_values - new_values) if old_values is not None else []
+                detail = f"no longer accepts {', '.join(missing)}" if missing else "is now restricted to an enum"
+                differences.append((kind, "", detail))
+            elif not request and old_values is not None and (new_values is None or new_values - old_values):
+                added = sorted(new_values - old_values) if new_values is not None else []
+                detail = f"may now return {', '.join(added)}" if added else "is no longer restricted to an enum"
+                differences.append((kind, "", detail))
+
+        if request:
+            for bound in UPPER_BOUNDS:
+                if bound in new and (bound not in old or _number(new[bound]) < _number(old[bound])):
+                    differences.append((kind, "", f"{bound} tightened to {new[bound]}"))
+            for bound in LOWER_BOUNDS:
+                if bound in new and (bound not in old or _number(new[bound]) > _number(old[bound])):
+                    differences.append((kind, "", f"{bound} tightened to {new[bound]}"))
+            if old.get("format") and new.get("format") and old["format"] != new["format"]:
+                differences.append((kind, "", f"format changed from {old['format']} to {new['format']}"))
+
+        old_required = set(old["required"]) if isinstance(old.get("required"), list) else set()
+        new_required = set(new["required"]) if isinstance(new.get("required"), list) else set()
+        old_properties = old.get("properties") or {}
+        new_properties = new.get("properties") or {}
+        if request:
+            for name in sorted(new_required - old_required):
+                differences.append(("new_required_parameter", f".{name}", "property is now required"))
+        else:
+            for name in sorted(old_properties):
+                if name not in new_properties:
+                    differences.append((kind, f".{name}", "property was removed"))
+            for name in sorted(old_required - new_required):
+                if name in new_properties:
+                    differences.append((kind, f".{name}", "property is no longer always returned"))
+        for name, schema in old_properties.items():
+            if name in new_properties:
+                differences.extend(
+                    (change_type, f".{name}{suffix}", detail)
+                    for change_type, suffix, detail in self._differences(schema, new_properties[name], direction)
+                )
+
+        if "items" in old and "items" in new:
+            differences.extend(
+                (change_type, f"[]{suffix}", detail)
+                for change_type, suffix, detail in self._differences(old["items"], new["items"], direction)
+            )
+        old_parts, new_parts = old.get("allOf") or [], new.get("allOf") or []
+        if len(old_parts) == len(new_parts):
+            for old_part, new_part in zip(old_parts, new_parts):
+                differences.extend(self._differences(old_part, new_part, direction))
+        return differences
+
+def _ref(schema) -> Optional[str]:
+    return schema.get("$ref") if isinstance(schema, dict) else None
+
+def _types(schema: Dict) -> frozenset:
+    value = schema.get("type")
+    if isinstance(value, list):
+        return frozenset(value)
+    return frozenset([value]) if isinstance(value, str) else frozenset()
+
+def _type_text(types: frozenset) -> str:
+    return "/".join(sorted(types))
+
+def _enum_set(values) -> Optional[Set[str]]:
+    return {json.dumps(value, sort_keys=True) for value in values} if isinstance(values, list) else None
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
@@ -0,0 +1,143 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import git
+from tools.git_analyzer import iter_file_history
+from tools.spec_diff import compatibility_score, diff_specs, index_spec_blob, validate_spec
+
+# Consecutive versions validated by one worker task; neighbouring chunks share a boundary version
+HISTORY_CHUNK_SIZE = 16
+
+# Histories with fewer comparisons are validated inline, where starting worker processes costs more
+MIN_PARALLEL_COMPARISONS = 8
+
+def validate_spec_history(repo: git.Repo, spec_path: str, rev: str = "HEAD", since: Optional[str] = None,
+                          max_workers: Optional[int] = None, chunk_size: int = HISTORY_CHUNK_SIZE) -> Dict:
+    """
+    Validate every version of a spec file in a repository's history.
+
+    The commits that touched `spec_path` come from one `git log` over the
+    first-parent history of `rev` (only those after `since`, compared
+    against the version at `since`, when given).  Runs of consecutive
+    versions are validated in chunks across a process pool; each task parses
+    every version it is given once (cached by blob SHA) and diffs each one
+    against the one before, so a version is parsed once although it takes
+    part in two comparisons, apart from the one shared by two chunks.
+
+    Returns:
+        Dict with one timeline entry per commit that added, modified or
+        deleted the file, oldest first; modifications carry the breaking and
+        non-breaking changes against the previous version.
+    """
+    commits = list(iter_file_history(repo, spec_path, f"{since}..{rev}" if since else rev))
+    if since:
+        try:
+            baseline = repo.git.rev_parse(f"{since}:{spec_path}")
+        except git.GitCommandError:
+            baseline = None
+        if baseline:
+            commit = repo.commit(since)
+            commits.insert(0, {"commit": commit.hexsha, "timestamp": commit.committed_date,
+                               "author": str(commit.author), "message": commit.summary, "blob_sha": baseline})
+
+    # Runs of versions that can be compared: a deletion ends one, and unchanged content is skipped
+    runs: List[List[Dict]] = [[]]
+    timeline: List[Dict] = []
+    previous_blob = None
+    for commit in commits:
+        if commit["blob_sha"] == previous_blob:
+            continue
+        entry = {
+            "commit": commit["commit"],
+            "date": datetime.fromtimestamp(commit["timestamp"], timezone.utc).isoformat(),
+            "author": commit["author"],
+            "message": commit["message"],
+        }
+        if commit["blob_sha"] is None:
+            entry["event"] = "deleted"
+            if runs[-1]:
+                runs.append([])
+        else:
+            entry["event"] = "modified" if runs[-1] else "added"
+            runs[-1].append(dict(commit, entry=entry))
+        timeline.append(entry)
+        previous_blob = commit["blob_sha"]
+
+    comparisons = sum(max(len(run) - 1, 0) for run in runs)
+    workers = max_workers or os.cpu_count() or 1
+    # Short histories are split evenly so every worker gets a share
+    size = max(1, min(chunk_size, -(-comparisons // workers)))
+    chunks = [run[start:start + size + 1] for run in runs if run
+              for start in range(0, max(len(run) - 1, 1), size)]
+    for chunk, results in zip(chunks, _run_chunks(repo, chunks, comparisons, workers)):
+        for position, (version, result) in enumerate(zip(chunk, results)):
+            entry = version["entry"]
+            # A chunk's first version is the previous chunk's last one
+            if position == 0 and entry["event"] == "modified":
+                continue
+            entry.update(result)
+
+    versions = [entry for entry in timeline if entry["event"] != "deleted"]
+    return {
+        "spec_path": spec_path,
+        "versions": len(versions),
+        "comparisons": comparisons,
+        "breaking_commits": sum(1 for entry in timeline if entry.get("breaking_changes")),
+        "timeline": timeline,
+    }
+
+def _run_chunks(repo: git.Repo, chunks: List[List[Dict]], comparisons: int, workers: int) -> Iterator[List[Dict]]:
+    """Validate chunks in order, across a process pool unless the history is small."""
+    tasks = (_read_versions(repo, chunk) for chunk in chunks)
+    if workers == 1 or comparisons < MIN_PARALLEL_COMPARISONS:
+        for versions in tasks:
+            yield _validate_versions(versions)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Blob contents are read as tasks are submitted, a bounded number ahead of the results
+        pending = deque()
+        for versions in tasks:
+            pending.append(executor.submit(_validate_versions, versions))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _read_versions(repo: git.Repo, chunk: List[Dict]) -> List[Tuple[str, bytes]]:
+    return [(version["blob_sha"], repo.git.get_object_data(version["blob_sha"])[3]) for version in chunk]
+
+def _validate_versions(versions: List[Tuple[str, bytes]]) -> List[Dict]:
+    """
+    Index each (blob_sha, content) version once and diff it against the one before.
+
+    Runs in worker processes.  Versions that do not parse report an error,
+    as do comparisons with them.
+    """
+    results = []
+    previous = None
+    for position, (blob_sha, data) in enumerate(versions):
+        try:
+            index = index_spec_blob(blob_sha, data)
+            result = {
+                "blob_sha": blob_sha,
+                "title": index.title,
+                "version": index.version,
+                "total_endpoints": len(index.operations),
+                "validation_issues": validate_spec(index),
+            }
+        except Exception as e:
+            index = None
+            result = {"blob_sha": blob_sha, "error": f"{type(e).__name__}: {e}"}
+        if previous is not None and index is not None:
+            changes = diff_specs(previous, index)
+            result["previous_version"] = previous.version
+            result.update(changes)
+            result["compatibility_score"] = compatibility_score(previous, changes["breaking_changes"])
+        elif position and index is not None:
+            result["error"] = "The previous version could not be parsed"
+        results.append(result)
+        previous = index
+    return results
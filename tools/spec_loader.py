@@ -0,0 +1,175 @@
+import json
+import re
+from json.decoder import scanstring
+from typing import Dict, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:  # YAML specs need PyYAML; JSON specs do not
+    yaml = None
+
+# JSON objects nested less deeply than this are indexed lazily (the document,
+# `paths`/`components` and their sections, path items and schemas); deeper
+# values are decoded whole on first access
+LAZY_DEPTH = 3
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+_DECODER = json.JSONDecoder()
+
+class _Pending:
+    """Span of a JSON value in the document text that has not been decoded yet."""
+
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+
+class LazyDict(dict):
+    """
+    JSON object whose values are decoded on first access.
+
+    Keys are known up front, so iteration, `in` and `len` are plain dict
+    operations; each value is held as a text span until it is read and
+    then replaced by the decoded object.  It is a real dict subclass (and
+    overrides `__iter__`, which makes `dict(...)` and `**` go through
+    `__getitem__`), so code written for `json.load` output works
+    unchanged.
+    """
+
+    __slots__ = ("_text", "_undecoded")
+
+    def __init__(self, text: str, entries: Dict):
+        super().__init__(entries)
+        self._undecoded = sum(type(value) is _Pending for value in entries.values())
+        # Once every value is decoded the document text is no longer referenced from here
+        self._text = text if self._undecoded else None
+
+    def _materialize(self, key, value):
+        if type(value) is _Pending:
+            value = _DECODER.decode(self._text[value.start:value.end])
+            dict.__setitem__(self, key, value)
+            self._undecoded -= 1
+            if not self._undecoded:
+                self._text = None
+        return value
+
+    def __getitem__(self, key):
+        return self._materialize(key, dict.__getitem__(self, key))
+
+    def raw(self, key) -> Optional[str]:
+        """JSON text of a value that has not been decoded yet, or None (decoded, nested lazily or absent)."""
+        value = dict.get(self, key)
+        if type(value) is _Pending:
+            return self._text[value.start:value.end]
+        return None
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __iter__(self):
+        return dict.__iter__(self)
+
+    def items(self):
+        return [(key, self[key]) for key in dict.keys(self)]
+
+    def values(self):
+        return [self[key] for key in dict.keys(self)]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def copy(self) -> Dict:
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __reduce_ex__(self, protocol):
+        # Pickle and deepcopy a plain, fully decoded dict
+        return dict, (self.items(),)
+
+    @property
+    def pending(self) -> int:
+        """Values not decoded yet (nested lazy objects count their own)."""
+        return self._undecoded + sum(value.pending for value in dict.values(self) if isinstance(value, LazyDict))
+
+def load_spec(path: str) -> Dict:
+    """
+    Load an OpenAPI 3 / Swagger 2 document from a JSON or YAML file.
+
+    JSON documents are indexed lazily: the top levels become `LazyDict`s
+    whose leaves (operations, schemas...) are decoded on first access, so
+    working with a subset of a large spec only builds that subset.  YAML is
+    parsed whole, with libyaml's C loader when PyYAML was built with it.
+    """
+    with open(path, 'rb') as f:
+        return parse_spec(f.read(), path)
+
+def parse_spec(data: bytes, name: str = "<spec>") -> Dict:
+    """Parse spec file contents (e.g. a git blob) the way `load_spec` parses files."""
+    if data.lstrip()[:1] == b'{':
+        text = data.decode('utf-8-sig')
+        document, end = _index_object(text, WHITESPACE.match(text).end(), 0)
+        if text[WHITESPACE.match(text, end).end():]:
+            raise ValueError(f"Extra data after the JSON document in {name}")
+        return document
+    if data.lstrip()[:1] == b'[':
+        return json.loads(data)
+    if yaml is None:
+        raise ValueError(f"PyYAML is required to load the YAML spec {name}")
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(data, Loader=loader)
+
+def _index_object(text: str, pos: int, depth: int) -> Tuple[LazyDict, int]:
+    """Index the JSON object starting at `text[pos]` ('{'); returns it and the position after it."""
+    entries = {}
+    pos = WHITESPACE.match(text, pos + 1).end()
+    if text[pos:pos + 1] == '}':
+        return LazyDict(text, entries), pos + 1
+    while True:
+        if text[pos:pos + 1] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = WHITESPACE.match(text, pos + 1).end()
+        if text[pos:pos + 1] == '{' and depth + 1 < LAZY_DEPTH:
+            entries[key], pos = _index_object(text, pos, depth + 1)
+        else:
+            # Decoding is the fastest way to find where a value ends; the object is dropped straight away
+            _, end = _DECODER.raw_decode(text, pos)
+            entries[key] = _Pending(pos, end)
+            pos = end
+        pos = WHITESPACE.match(text, pos).end()
+        delimiter = text[pos:pos + 1]
+        if delimiter == '}':
+            return LazyDict(text, entries), pos + 1
+        if delimiter != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = WHITESPACE.match(text, pos + 1).end()
@@ -2,22 +2,44 @@ from crewai.tools import BaseTool
 import json
 import random
 from typing import Dict, List
+from tools.load_runner import LoadRunner, LoadScenario, sample_path
+from utils.helpers import run_coroutine
 
 class TestGeneratorTool(BaseTool):
     name: str = "Test Generator Tool"
     description: str = "Generate test cases for API endpoints and integration scenarios"
 
-    def _run(self, api_endpoints: List[str] = None, test_type: str = "integration") -> str:
+    # Sustained load of each endpoint's performance scenario
+    load_rps: float = 20.0
+    load_duration_seconds: float = 5.0
+    # Performance scenarios pass at or below this p99 latency and error rate (fraction of requests)
+    p99_target_ms: float = 500.0
+    max_error_rate: float = 0.01
+    # Burst of each endpoint's rate-limit scenario, which should draw 429 responses
+    rate_limit_rps: float = 100.0
+    rate_limit_duration_seconds: float = 2.0
+    # Seconds to wait for each load test response
+    load_timeout: float = 10.0
+    # Outstanding requests beyond which scheduled ones are dropped (and counted as errors)
+    max_in_flight: int = 1000
+    # Headers (e.g. Authorization) sent with every load test request; added when scenarios run,
+    # so credentials never appear in the generated test cases
+    auth_headers: Dict[str, str] = {}
+
+    def _run(self, api_endpoints: List[str] = None, test_type: str = "integration", base_url: str = None) -> str:
         """
         Generate test cases for API endpoints.
         
         Args:
             api_endpoints: List of API endpoints to generate tests for
-            test_type: Type of tests to generate (unit, integration, contract)
+            test_type: Type of tests to generate (unit, integration, contract, performance)
+            base_url: Service (e.g. http://localhost:8000) to run the generated load scenarios against
         """
         try:
             # Generate sample test cases
             test_data = self._generate_sample_test_cases(api_endpoints, test_type)
+            if base_url:
+                self._execute_load_scenarios(test_data, base_url)
             
             # Analyze the test coverage
             analysis = self._analyze_test_coverage(test_data)
@@ -75,18 +97,39 @@ class TestGeneratorTool(BaseTool):
                     "expected_result": "401 Unauthorized with proper error message"
                 })
                 
-                # Edge case test cases
+            if test_type in ["integration", "contract", "performance"]:
+                # Edge case test cases, runnable as a burst above the expected limit
+                rate_limit = self._load_scenario(endpoint, "rate_limit")
                 tests.append({
                     "id": f"TC-003-{len(tests)+1}",
                     "name": f"Rate limiting for {endpoint}",
                     "type": "edge_case",
                     "description": "Verify rate limiting is enforced",
                     "steps": [
-                        "Send multiple rapid requests",
+                        f"Send {rate_limit.requests} {rate_limit.method} requests at {rate_limit.rps:g} requests/second",
                         "Validate that rate limiting kicks in",
                         "Validate 429 Too Many Requests response"
                     ],
-                    "expected_result": "429 Too Many Requests after rate limit exceeded"
+                    "expected_result": "429 Too Many Requests after rate limit exceeded",
+                    "scenario": rate_limit.to_dict()
+                })
+            
+            if test_type in ["integration", "performance"]:
+                # Sustained load judged by tail latency and error rate
+                performance = self._load_scenario(endpoint, "performance")
+                tests.append({
+                    "id": f"TC-006-{len(tests)+1}",
+                    "name": f"Performance under load for {endpoint}",
+                    "type": "performance",
+                    "description": "Verify latency and error rate under sustained load",
+                    "steps": [
+                        f"Send {performance.method} requests at {performance.rps:g} requests/second "
+                        f"for {performance.duration_seconds:g}s on a fixed schedule",
+                        f"Validate p99 latency is at most {self.p99_target_ms:g}ms",
+                        f"Validate error rate is at most {self.max_error_rate:.1%}"
+                    ],
+                    "expected_result": "Latency and error rate within targets at the offered load",
+                    "scenario": performance.to_dict()
                 })
             
             if test_type == "integration":
@@ -124,15 +167,43 @@ class TestGeneratorTool(BaseTool):
                 "negative_tests": len([t for t in tests if t["type"] == "negative"]),
                 "edge_case_tests": len([t for t in tests if t["type"] == "edge_case"]),
                 "integration_tests": len([t for t in tests if t["type"] == "integration"]),
+                "performance_tests": len([t for t in tests if t["type"] == "performance"]),
                 "test_cases": tests
             }
         
         return {
+            "test_type": test_type,
             "test_suites": test_suites,
             "total_test_suites": len(test_suites),
             "total_test_cases": sum(suite["total_tests"] for suite in test_suites.values())
         }
 
+    def _load_scenario(self, endpoint: str, kind: str) -> LoadScenario:
+        """Runnable load scenario of an endpoint: sustained `performance` load or a `rate_limit` burst."""
+        if kind == "rate_limit":
+            return LoadScenario(f"Rate limiting for {endpoint}", kind, "GET", sample_path(endpoint),
+                                self.rate_limit_rps, self.rate_limit_duration_seconds)
+        return LoadScenario(f"Performance under load for {endpoint}", kind, "GET", sample_path(endpoint),
+                            self.load_rps, self.load_duration_seconds,
+                            expect={"p99_ms": self.p99_target_ms, "max_error_rate": self.max_error_rate})
+
+    def _execute_load_scenarios(self, test_data: Dict, base_url: str) -> None:
+        """Run every generated load scenario against `base_url` and attach its result to the test case."""
+        cases = [test for suite in test_data["test_suites"].values() for test in suite["test_cases"] if "scenario" in test]
+        runner = LoadRunner(timeout=self.load_timeout, max_in_flight=self.max_in_flight)
+        scenarios = [LoadScenario.from_dict(test["scenario"]) for test in cases]
+        for scenario in scenarios:
+            scenario.headers = {**scenario.headers, **self.auth_headers}
+        results = run_coroutine(runner.run(base_url, scenarios))
+        for test, result in zip(cases, results):
+            test["execution"] = result
+        test_data["load_tests"] = {
+            "target": base_url,
+            "executed": len(results),
+            "passed": sum(result["passed"] for result in results),
+            "failed": [result["scenario"] for result in results if not result["passed"]],
+        }
+
     def _analyze_test_coverage(self, test_data: Dict) -> Dict:
         """Analyze test coverage and provide recommendations."""
         test_suites = test_data.get("test_suites", {})
@@ -183,6 +254,8 @@ class TestGeneratorTool(BaseTool):
         required_types = ["positive", "negative", "edge_case"]
         if "integration" in test_data.get("test_type", ""):
             required_types.append("integration")
+        if test_data.get("test_type") == "performance":
+            required_types = ["edge_case", "performance"]
             
         missing_types = [t for t in required_types if t not in coverage_by_type]
         if missing_types:
@@ -192,5 +265,27 @@ class TestGeneratorTool(BaseTool):
                 "action": f"Add test cases covering {', '.join(missing_types)} scenarios"
             })
         
+        # Executed load scenarios
+        load_tests = test_data.get("load_tests")
+        if load_tests:
+            analysis["load_tests"] = load_tests
+            results = [test["execution"] for suite in test_suites.values()
+                       for test in suite.get("test_cases", []) if "execution" in test]
+            unlimited = [result["target"] for result in results if result["kind"] == "rate_limit" and not result["passed"]]
+            if unlimited:
+                recommendations.append({
+                    "priority": "HIGH",
+                    "description": f"No rate limiting observed on {len(unlimited)} endpoint(s): {', '.join(unlimited)}",
+                    "action": "Enforce per-client rate limits and answer excess requests with 429 and Retry-After"
+                })
+            slow = [f"{result['target']} ({result['verdict']})" for result in results
+                    if result["kind"] == "performance" and not result["passed"]]
+            if slow:
+                recommendations.append({
+                    "priority": "HIGH",
+                    "description": f"Performance targets missed: {'; '.join(slow)}",
+                    "action": "Profile the slow endpoints and fix their error sources before raising traffic"
+                })
+
         analysis["recommendations"] = recommendations
         return analysis
\ No newline at end of file
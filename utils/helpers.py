@@ -1,3 +1,5 @@
+import asyncio
+import concurrent.futures
 import json
 import os
 
@@ -12,4 +14,19 @@ def get_gemini_api_key():
 
 def format_api_response(data):
     """Format API response data."""
-    return json.dumps(data, indent=2)
\ No newline at end of file
+    return json.dumps(data, indent=2)
+
+def run_coroutine(coro):
+    """Run a coroutine to completion from synchronous tool code.
+
+    Tools are invoked synchronously, but the caller may already be inside a
+    running event loop; in that case the coroutine runs on a fresh loop in a
+    worker thread instead of failing with "asyncio.run() cannot be called
+    from a running event loop".
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()